@@ -27,6 +27,7 @@ class EventType(Enum):
     # XML文件相关事件
     XML_FILE_LOADED = "xml_file_loaded"
     XML_FILE_SAVED = "xml_file_saved"
+    XML_FILE_SAVE_FAILED = "xml_file_save_failed"
     XML_FILE_VALIDATED = "xml_file_validated"
     
     # Map分析相关事件
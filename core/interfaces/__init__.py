@@ -19,6 +19,7 @@ from .xml_data_processor import (
     ValidationResult,
     XMLParseError,
     XMLWriteError,
+    XMLWriteVerificationError,
     ValidationError,
     BackupError
 )
@@ -122,6 +123,7 @@ __all__ = [
     "ValidationResult",
     "XMLParseError",
     "XMLWriteError",
+    "XMLWriteVerificationError",
     "ValidationError",
     "BackupError",
     
@@ -193,12 +193,26 @@ class XMLParseError(Exception):
         self.line_number = line_number
         self.column_number = column_number
 
+    def __reduce__(self):
+        # 保留行列号，使异常可在进程池之间传递
+        return (self.__class__, (str(self), self.line_number, self.column_number))
+
 
 class XMLWriteError(Exception):
     """XML写入错误"""
     pass
 
 
+class XMLWriteVerificationError(XMLWriteError):
+    """写入校验失败：临时文件与预期不一致，原文件保持不变，不应再回退到其他写入方式"""
+    def __init__(self, message: str, verification: Any = None):
+        super().__init__(message)
+        self.verification = verification
+
+    def __reduce__(self):
+        return (self.__class__, (str(self), self.verification))
+
+
 class ValidationError(Exception):
     """数据验证错误"""
     def __init__(self, message: str, field_name: Optional[str] = None):
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑Map点数据模型
+==liuq debug== FastMapV2 使用__slots__与连续浮点数组存储的MapPoint变体
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 多设备对比与保存快照会同时持有多份配置。CompactMapPoint没有实例__dict__，
+      坐标、权重、全部范围与tran值存放在每个点一个array('d')中，多边形顶点存为扁平数组；
+      属性名、脏字段跟踪与MapPoint一致，可直接用于get/set_map_point_field_value与分析器
+"""
+
+import copy
+import logging
+from array import array
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.models.map_data import EDIT_SEQUENCE, MapConfiguration, MapPoint, MapType, SceneType
+from core.models.map_point_index import INDEXES_ATTRIBUTE, KEY_ATTRIBUTES, record_key_edit
+
+logger = logging.getLogger(__name__)
+
+# 单值浮点字段（数组开头）
+_SCALAR_FIELDS = ('x', 'y', 'offset_x', 'offset_y', 'weight')
+
+# 范围字段：每个占数组中相邻的(min, max)两个位置
+_RANGE_FIELDS = (
+    'bv_range', 'ir_range', 'cct_range', 'ctemp_range', 'e_ratio_range', 'ac_range',
+    'count_range', 'color_cct_range', 'diff_ctemp_range', 'face_ctemp_range',
+)
+
+# tran字段
+_TRAN_FIELDS = (
+    'tran_bv_min', 'tran_bv_max', 'tran_ctemp_min', 'tran_ctemp_max',
+    'tran_ir_min', 'tran_ir_max', 'tran_ac_min', 'tran_ac_max',
+    'tran_count_min', 'tran_count_max', 'tran_color_cct_min', 'tran_color_cct_max',
+    'tran_diff_ctemp_min', 'tran_diff_ctemp_max', 'tran_face_ctemp_min', 'tran_face_ctemp_max',
+)
+
+# 其余字段按原对象保存在槽位中
+_OBJECT_FIELDS = (
+    'alias_name', 'trans_step', 'detect_flag', 'map_type', 'scene_type',
+    'is_polygon', 'detect_map_flag', 'extra_attributes',
+)
+
+_SCALAR_INDEX = {name: index for index, name in enumerate(_SCALAR_FIELDS)}
+_RANGE_INDEX = {name: len(_SCALAR_FIELDS) + 2 * index for index, name in enumerate(_RANGE_FIELDS)}
+_TRAN_INDEX = {name: len(_SCALAR_FIELDS) + 2 * len(_RANGE_FIELDS) + index
+               for index, name in enumerate(_TRAN_FIELDS)}
+_VALUE_COUNT = len(_SCALAR_FIELDS) + 2 * len(_RANGE_FIELDS) + len(_TRAN_FIELDS)
+
+# MapPoint全部公开属性（顺序与构造参数无关，仅用于转换与比较）
+MAP_POINT_FIELDS = _SCALAR_FIELDS + _RANGE_FIELDS + _TRAN_FIELDS + _OBJECT_FIELDS + ('polygon_vertices',)
+
+
+class CompactMapPoint:
+    """
+    紧凑Map点
+
+    - 数值字段存于一个array('d')；原值为int的位置记在_int_mask中，读取时还原为int
+    - 既不是int也不是float的数值（如Decimal、字符串）放在_objects中原样保存
+    - polygon_vertices读取时返回新的顶点列表，修改顶点需整体赋值
+    """
+
+    __slots__ = ('_values', '_int_mask', '_objects', '_vertices', '_dirty_fields', '_revision',
+                 INDEXES_ATTRIBUTE) + _OBJECT_FIELDS
+
+    def __init__(self):
+        """创建全部字段为MapPoint默认值的紧凑Map点（通常使用from_map_point）"""
+        object.__setattr__(self, '_dirty_fields', None)
+        object.__setattr__(self, '_revision', 0)
+        object.__setattr__(self, INDEXES_ATTRIBUTE, None)
+        object.__setattr__(self, '_values', _ZERO_VALUES[:])
+        object.__setattr__(self, '_int_mask', 0)
+        object.__setattr__(self, '_objects', None)
+        object.__setattr__(self, '_vertices', None)
+        object.__setattr__(self, 'alias_name', '')
+        object.__setattr__(self, 'trans_step', 0)
+        object.__setattr__(self, 'detect_flag', True)
+        object.__setattr__(self, 'map_type', MapType.ENHANCE)
+        object.__setattr__(self, 'scene_type', SceneType.INDOOR)
+        object.__setattr__(self, 'is_polygon', False)
+        object.__setattr__(self, 'detect_map_flag', True)
+        object.__setattr__(self, 'extra_attributes', {})
+
+    @classmethod
+    def from_map_point(cls, map_point: MapPoint) -> 'CompactMapPoint':
+        """
+        由MapPoint创建紧凑Map点（保留脏字段状态）
+
+        Args:
+            map_point: 源Map点
+
+        Returns:
+            CompactMapPoint: 紧凑Map点，extra_attributes为浅拷贝
+        """
+        compact = cls()
+        for name in _SCALAR_FIELDS + _TRAN_FIELDS + _RANGE_FIELDS + _OBJECT_FIELDS:
+            object.__setattr__(compact, name, getattr(map_point, name))
+        object.__setattr__(compact, 'extra_attributes', dict(map_point.extra_attributes))
+        object.__setattr__(compact, 'polygon_vertices', map_point.polygon_vertices)
+        dirty_fields = map_point.get_dirty_fields()
+        if dirty_fields is not None:
+            object.__setattr__(compact, '_dirty_fields', frozenset(dirty_fields) or _CLEAN)
+        return compact
+
+    def to_map_point(self) -> MapPoint:
+        """
+        还原为普通MapPoint（保留场景类型与脏字段状态）
+
+        Returns:
+            MapPoint: 新的Map点对象
+        """
+        kwargs = {name: getattr(self, name) for name in MAP_POINT_FIELDS}
+        kwargs['extra_attributes'] = dict(self.extra_attributes)
+        map_point = MapPoint(**kwargs)
+        # __post_init__会按别名重新推断场景类型，这里恢复原值后再设置脏字段基线
+        object.__setattr__(map_point, 'scene_type', self.scene_type)
+        dirty_fields = self._dirty_fields
+        if dirty_fields is None:
+            map_point.__dict__.pop('_dirty_fields', None)
+        else:
+            object.__setattr__(map_point, '_dirty_fields', set(dirty_fields))
+        return map_point
+
+    # ---- 数值存取 ----
+
+    def _get_value(self, index: int) -> Any:
+        objects = self._objects
+        if objects is not None and index in objects:
+            return objects[index]
+        value = self._values[index]
+        return int(value) if self._int_mask >> index & 1 else value
+
+    def _set_value(self, index: int, value: Any):
+        objects = self._objects
+        if objects is not None:
+            objects.pop(index, None)
+        bit = 1 << index
+        if isinstance(value, float):
+            self._values[index] = value
+            object.__setattr__(self, '_int_mask', self._int_mask & ~bit)
+        elif isinstance(value, int) and not isinstance(value, bool) and -2 ** 53 <= value <= 2 ** 53:
+            self._values[index] = value
+            object.__setattr__(self, '_int_mask', self._int_mask | bit)
+        else:
+            if objects is None:
+                objects = {}
+                object.__setattr__(self, '_objects', objects)
+            objects[index] = value
+
+    @property
+    def polygon_vertices(self) -> List[Tuple[float, float]]:
+        vertices = self._vertices
+        if not vertices:
+            return []
+        return [(vertices[i], vertices[i + 1]) for i in range(0, len(vertices), 2)]
+
+    @polygon_vertices.setter
+    def polygon_vertices(self, vertices: List[Tuple[float, float]]):
+        flat = array('d', [coordinate for vertex in vertices or () for coordinate in vertex])
+        object.__setattr__(self, '_vertices', flat if flat else None)
+
+    # ---- 属性赋值与脏字段跟踪（语义同MapPoint） ----
+
+    def __setattr__(self, name: str, value: Any):
+        """属性赋值时记录脏字段与修改序号（值未变化或私有属性不记录）"""
+        if not name.startswith('_') and getattr(self, name, _MISSING) != value:
+            self.mark_dirty(name)
+            if name in KEY_ATTRIBUTES:
+                record_key_edit(self)
+        object.__setattr__(self, name, value)
+
+    def mark_dirty(self, *names: str):
+        """显式标记脏字段（用于原地修改的属性，如extra_attributes['ml']）"""
+        object.__setattr__(self, '_revision', next(EDIT_SEQUENCE))
+        # 脏字段存为共享的不可变集合，未修改的点不单独占用set
+        dirty_fields = self._dirty_fields
+        if dirty_fields is not None and not dirty_fields.issuperset(names):
+            object.__setattr__(self, '_dirty_fields', dirty_fields.union(names))
+
+    def get_dirty_fields(self) -> Optional[Set[str]]:
+        """获取自上次保存以来被修改的属性/字段名，未启用跟踪时返回None"""
+        return set(self._dirty_fields) if self._dirty_fields is not None else None
+
+    def clear_dirty(self):
+        """清空脏字段并启用跟踪（保存成功后调用）"""
+        object.__setattr__(self, '_dirty_fields', _CLEAN)
+
+    # ---- 与MapPoint共用的只读方法 ----
+
+    _infer_scene_type = MapPoint._infer_scene_type
+    get_coordinate_tuple = MapPoint.get_coordinate_tuple
+    is_in_range = MapPoint.is_in_range
+    get_polygon_vertex_count = MapPoint.get_polygon_vertex_count
+    calculate_polygon_centroid = MapPoint.calculate_polygon_centroid
+    get_coordinate_mode = MapPoint.get_coordinate_mode
+    get_detailed_range_info = MapPoint.get_detailed_range_info
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (CompactMapPoint, MapPoint)):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in MAP_POINT_FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"CompactMapPoint(alias_name={self.alias_name!r}, x={self.x!r}, y={self.y!r}, "
+                f"weight={self.weight!r}, vertices={len(self._vertices or ())//2})")
+
+    def __getstate__(self):
+        # 所属索引只对当前对象有意义，复制与序列化后为None
+        return {name: getattr(self, name) for name in self.__slots__ if name != INDEXES_ATTRIBUTE}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+
+_MISSING = object()
+_CLEAN = frozenset()
+_ZERO_VALUES = array('d', [0.0] * _VALUE_COUNT)
+
+
+def _scalar_property(index: int) -> property:
+    def getter(self):
+        return self._get_value(index)
+
+    def setter(self, value):
+        self._set_value(index, value)
+    return property(getter, setter)
+
+
+def _range_property(index: int) -> property:
+    def getter(self):
+        return (self._get_value(index), self._get_value(index + 1))
+
+    def setter(self, value):
+        range_min, range_max = value
+        self._set_value(index, range_min)
+        self._set_value(index + 1, range_max)
+    return property(getter, setter)
+
+
+for _name, _index in {**_SCALAR_INDEX, **_TRAN_INDEX}.items():
+    setattr(CompactMapPoint, _name, _scalar_property(_index))
+for _name, _index in _RANGE_INDEX.items():
+    setattr(CompactMapPoint, _name, _range_property(_index))
+del _name, _index
+
+
+def compact_configuration(config: MapConfiguration) -> MapConfiguration:
+    """
+    创建使用CompactMapPoint的配置副本（用于长期持有的对比配置与保存快照）
+
+    Map点与基础边界点转为紧凑表示并保留脏字段，元数据与参考点深拷贝，与原配置不共享可变状态
+
+    Args:
+        config: 源配置
+
+    Returns:
+        MapConfiguration: 新配置
+    """
+    return _convert_configuration(config, CompactMapPoint.from_map_point)
+
+
+def expand_configuration(config: MapConfiguration) -> MapConfiguration:
+    """
+    把compact_configuration的结果还原为使用普通MapPoint的配置（用于编辑与写入）
+
+    Args:
+        config: 紧凑配置（普通MapPoint会被复制）
+
+    Returns:
+        MapConfiguration: 新配置
+    """
+    def expand(map_point):
+        if isinstance(map_point, CompactMapPoint):
+            return map_point.to_map_point()
+        return copy.deepcopy(map_point)
+    return _convert_configuration(config, expand)
+
+
+def _convert_configuration(config: MapConfiguration, convert) -> MapConfiguration:
+    """逐点转换配置；Map点在构造之后赋值，避免__post_init__清空脏字段"""
+    result = MapConfiguration(
+        device_type=config.device_type,
+        base_boundary=copy.copy(config.base_boundary),
+        map_points=[],
+        reference_points=list(config.reference_points),
+        metadata=copy.deepcopy(config.metadata),
+    )
+    result.map_points = [convert(map_point) for map_point in config.map_points]
+    if config.base_boundary_point is not None:
+        result.base_boundary_point = convert(config.base_boundary_point)
+    return result
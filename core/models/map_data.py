@@ -16,10 +16,21 @@ Action: Added; Timestamp: 2025-07-25 17:40:00 +08:00; Reason: P1-LD-002 设计
 
 import logging
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Tuple, Optional, Union
+from typing import TYPE_CHECKING, List, Dict, Any, Tuple, Optional, Union, Set
 from enum import Enum
 from decimal import Decimal
-from utils.number_formatter import format_decimal_precise
+
+import numpy as np
+
+from utils.number_formatter import format_decimal_fast
+from core.models.map_point_index import (
+    EDIT_SEQUENCE, INDEXES_ATTRIBUTE, KEY_ATTRIBUTES, MapPointList, record_key_edit
+)
+
+if TYPE_CHECKING:
+    # 两者都导入本模块，运行时在方法内延迟导入
+    from core.models.map_point_table import MapPointTable
+    from core.models.map_spatial_index import MapSpatialIndex
 
 logger = logging.getLogger(__name__)
 
@@ -128,8 +139,53 @@ class MapPoint:
     def __post_init__(self):
         """初始化后处理，自动推断场景类型"""
         if not hasattr(self, '_scene_inferred'):
-            self.scene_type = self._infer_scene_type()
+            # 构造阶段的推断不算修改，不记录修改序号
+            object.__setattr__(self, 'scene_type', self._infer_scene_type())
             self._scene_inferred = True
+        # 初始化完成后开始记录被修改的属性
+        object.__setattr__(self, '_dirty_fields', set())
+
+    def __setattr__(self, name: str, value: Any):
+        """属性赋值时记录脏字段与修改序号（值未变化或私有属性不记录）"""
+        if not name.startswith('_'):
+            attributes = self.__dict__
+            if name in attributes and attributes[name] != value:
+                # 修改序号供MapPointTable等派生数据判断该点是否需要刷新
+                attributes['_revision'] = next(EDIT_SEQUENCE)
+                if name in KEY_ATTRIBUTES:
+                    record_key_edit(self)
+            dirty_fields = attributes.get('_dirty_fields')
+            if dirty_fields is not None and (name not in attributes or attributes[name] != value):
+                dirty_fields.add(name)
+        object.__setattr__(self, name, value)
+
+    def mark_dirty(self, *names: str):
+        """显式标记脏字段（用于原地修改的属性，如extra_attributes['ml']）"""
+        self.__dict__['_revision'] = next(EDIT_SEQUENCE)
+        dirty_fields = self.__dict__.get('_dirty_fields')
+        if dirty_fields is not None:
+            dirty_fields.update(names)
+
+    def get_dirty_fields(self) -> Optional[Set[str]]:
+        """
+        获取自上次保存以来被修改的属性/字段名
+
+        Returns:
+            脏字段集合；未启用跟踪（如旧版本缓存反序列化的对象）时返回None，表示需全量检查
+        """
+        dirty_fields = self.__dict__.get('_dirty_fields')
+        return set(dirty_fields) if dirty_fields is not None else None
+
+    def clear_dirty(self):
+        """清空脏字段并启用跟踪（保存成功后调用）"""
+        object.__setattr__(self, '_dirty_fields', set())
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """序列化与复制时不保存修改序号与所属索引（只对当前对象有意义）"""
+        state = dict(self.__dict__)
+        state.pop('_revision', None)
+        state.pop(INDEXES_ATTRIBUTE, None)
+        return state
     
 
     def _infer_scene_type(self) -> SceneType:
@@ -742,7 +798,7 @@ def format_field_value(value: Any, field_name: str) -> str:
             # {{CHENGQI:
             # Action: Modified; Timestamp: 2025-08-02 11:00:00 +08:00; Reason: 重构使用统一的格式化核心算法，消除代码重复; Principle_Applied: DRY原则;
             # }}
-            result = format_decimal_precise(value)
+            result = format_decimal_fast(value)
             # 关键精度日志
 
             return result
@@ -781,121 +837,12 @@ def set_map_point_field_value(map_point: 'MapPoint', field_name: str, value: Any
         bool: 是否设置成功
     """
     try:
-        # 小工具：将字符串/任意输入转换为目标类型
-        def _to_float(v, default=0.0):
-            try:
-                return float(v)
-            except Exception:
-                return float(default)
-        def _to_int(v, default=0):
-            try:
-                return int(float(v))
-            except Exception:
-                return int(default)
-        def _to_bool(v, default=False):
-            try:
-                s = str(v).strip().lower()
-                return s in ('1','true','yes','是','y')
-            except Exception:
-                return bool(default)
-
-        # 直接属性设置：尽量按现有属性类型做转换，避免字符串污染
-        if hasattr(map_point, field_name):
-            cur = getattr(map_point, field_name)
-            if isinstance(cur, float):
-                setattr(map_point, field_name, _to_float(value, cur))
-            elif isinstance(cur, int):
-                setattr(map_point, field_name, _to_int(value, cur))
-            elif isinstance(cur, bool):
-                setattr(map_point, field_name, _to_bool(value, cur))
-            else:
-                setattr(map_point, field_name, value)
-            return True
-
-        # 特殊字段映射（范围类，统一转为 float）
-        if field_name == 'bv_min':
-            v = _to_float(value)
-            if not map_point.bv_range:
-                map_point.bv_range = (v, 100.0)
-            else:
-                map_point.bv_range = (v, float(map_point.bv_range[1]))
-            return True
-        elif field_name == 'bv_max':
-            v = _to_float(value)
-            if not map_point.bv_range:
-                map_point.bv_range = (0.0, v)
-            else:
-                map_point.bv_range = (float(map_point.bv_range[0]), v)
-            return True
-        elif field_name == 'ir_min':
-            v = _to_float(value)
-            if not map_point.ir_range:
-                map_point.ir_range = (v, 999.0)
-            else:
-                map_point.ir_range = (v, float(map_point.ir_range[1]))
-            return True
-        elif field_name == 'ir_max':
-            v = _to_float(value)
-            if not map_point.ir_range:
-                map_point.ir_range = (0.0, v)
-            else:
-                map_point.ir_range = (float(map_point.ir_range[0]), v)
-            return True
-        elif field_name == 'ctemp_min':
-            v = _to_int(value, 1500)
-            if not map_point.ctemp_range:
-                map_point.ctemp_range = (v, 12000)
-            else:
-                map_point.ctemp_range = (v, int(map_point.ctemp_range[1]))
-            return True
-        elif field_name == 'ctemp_max':
-            v = _to_int(value, 12000)
-            if not map_point.ctemp_range:
-                map_point.ctemp_range = (1500, v)
-            else:
-                map_point.ctemp_range = (int(map_point.ctemp_range[0]), v)
-            return True
-        # e_ratio
-        elif field_name == 'e_ratio_min':
-            v = _to_float(value)
-            if not map_point.e_ratio_range:
-                map_point.e_ratio_range = (v, 100.0)
-            else:
-                map_point.e_ratio_range = (v, float(map_point.e_ratio_range[1]))
-            return True
-        elif field_name == 'e_ratio_max':
-            v = _to_float(value)
-            if not map_point.e_ratio_range:
-                map_point.e_ratio_range = (0.0, v)
-            else:
-                map_point.e_ratio_range = (float(map_point.e_ratio_range[0]), v)
-            return True
-        elif field_name == 'ml':
-            # ml字段的GUI输入值到内部值的反向转换
-            if not hasattr(map_point, 'extra_attributes'):
-                map_point.extra_attributes = {}
-            input_value = _to_float(value)
-            # 反向转换：GUI友好值 → 内部值
-            if input_value == 2:
-                internal_value = 65471
-            elif input_value == 3:
-                internal_value = 65535
-            else:
-                internal_value = input_value
-            # 存储为整数（若可）
-            try:
-                map_point.extra_attributes['ml'] = int(internal_value)
-            except Exception:
-                map_point.extra_attributes['ml'] = internal_value
-            return True
-
-
-        # Tran字段设置
-        elif field_name.startswith('tran_'):
-            setattr(map_point, field_name, value)
-            return True
-
-        return False
+        success = get_field_setter(field_name)(map_point, value)
+        mark_dirty = getattr(map_point, 'mark_dirty', None)
+        if success and callable(mark_dirty):
+            # 设置成功后再显式标记：ml等字段会原地修改extra_attributes，属性赋值跟踪不到
+            mark_dirty(field_name)
+        return success
 
     except Exception as e:
         logger.error(f"==liuq debug== 设置字段值失败: {field_name} = {value}, {e}")
@@ -967,47 +914,248 @@ def get_map_point_field_value(map_point: 'MapPoint', field_name: str) -> Any:
     Returns:
         字段值
     """
-    # 直接属性访问
-    if hasattr(map_point, field_name):
-        return getattr(map_point, field_name)
-
-    # 特殊字段映射
-    field_mapping = {
-        'bv_min': lambda obj: obj.bv_range[0] if obj.bv_range else 0.0,
-        'bv_max': lambda obj: obj.bv_range[1] if obj.bv_range else 100.0,
-        'ir_min': lambda obj: obj.ir_range[0] if obj.ir_range else 0.0,
-        'ir_max': lambda obj: obj.ir_range[1] if obj.ir_range else 999.0,
-        'ctemp_min': lambda obj: obj.ctemp_range[0] if obj.ctemp_range else 1500,
-        'ctemp_max': lambda obj: obj.ctemp_range[1] if obj.ctemp_range else 12000,
-        'ac_min': lambda obj: obj.ac_range[0] if obj.ac_range else 0.0,
-        'ac_max': lambda obj: obj.ac_range[1] if obj.ac_range else 999.0,
-        'count_min': lambda obj: obj.count_range[0] if obj.count_range else 0,
-        'count_max': lambda obj: obj.count_range[1] if obj.count_range else 3072,
-        'color_cct_min': lambda obj: obj.color_cct_range[0] if obj.color_cct_range else 1,
-        'color_cct_max': lambda obj: obj.color_cct_range[1] if obj.color_cct_range else 12000,
-        'diff_ctemp_min': lambda obj: obj.diff_ctemp_range[0] if obj.diff_ctemp_range else 0,
-        'diff_ctemp_max': lambda obj: obj.diff_ctemp_range[1] if obj.diff_ctemp_range else 9000,
-        'face_ctemp_min': lambda obj: obj.face_ctemp_range[0] if obj.face_ctemp_range else 0,
-        'face_ctemp_max': lambda obj: obj.face_ctemp_range[1] if obj.face_ctemp_range else 9000,
-        # {{CHENGQI:
-        # Action: Added; Timestamp: 2025-08-02 16:35:00 +08:00; Reason: 添加e_ratio字段映射以修复GUI编辑后XML文件未更新的问题; Principle_Applied: 数据一致性和完整性;
-        # }}
-        'e_ratio_min': lambda obj: obj.e_ratio_range[0] if obj.e_ratio_range else 0.0,
-        'e_ratio_max': lambda obj: obj.e_ratio_range[1] if obj.e_ratio_range else 100.0,
-        'ml': lambda obj: obj.extra_attributes.get('ml', 0)
-    }
+    return get_field_getter(field_name)(map_point)
+
+
+def get_fields(map_points: List['MapPoint'], field_names: List[str], dtype: Any = object) -> np.ndarray:
+    """
+    批量获取多个Map点的多个字段值
+
+    Args:
+        map_points: Map点列表
+        field_names: 字段名列表（XML字段、MapPoint属性或字段注册表中的字段ID）
+        dtype: 结果数组类型；默认object保留原值类型（int/float/元组），数值分析可传float
+
+    Returns:
+        np.ndarray: 形状为(len(map_points), len(field_names))，与逐个调用get_map_point_field_value结果一致
+    """
+    getters = [get_field_getter(field_name) for field_name in field_names]
+    result = np.empty((len(map_points), len(getters)), dtype=dtype)
+    if result.dtype == object:
+        # 逐元素赋值，避免元组等序列值被展开
+        for row, map_point in enumerate(map_points):
+            values = result[row]
+            for column, getter in enumerate(getters):
+                values[column] = getter(map_point)
+    else:
+        for column, getter in enumerate(getters):
+            result[:, column] = np.fromiter((getter(map_point) for map_point in map_points),
+                                            dtype=result.dtype, count=len(map_points))
+    return result
+
+
+# ---- 预编译的字段读写表 ----
+# 每个字段名对应一个读取函数与一个设置函数，首次使用时按XML_FIELD_CONFIG生成并缓存，
+# 逐单元格填充表格与保存规划时不再每次调用都构建映射字典与闭包
+
+def _to_float(value: Any, default: Any = 0.0) -> float:
+    try:
+        return float(value)
+    except Exception:
+        return float(default)
+
+
+def _to_int(value: Any, default: Any = 0) -> int:
+    try:
+        return int(float(value))
+    except Exception:
+        return int(default)
 
-    if field_name in field_mapping:
-        try:
-            return field_mapping[field_name](map_point)
-        except (AttributeError, IndexError, TypeError):
-            pass
 
-    # 返回默认值
+def _field_default(field_name: str) -> Any:
     config = XML_FIELD_CONFIG.get(field_name)
     return config.default_value if config else 0
 
 
+# 由MapPoint的*_range属性派生的min/max字段：字段名 → (属性名, 下标)
+_RANGE_FIELD_SOURCES: Dict[str, Tuple[str, int]] = {
+    f'{prefix}_{bound}': (f'{prefix}_range', index)
+    for prefix in ('bv', 'ir', 'ctemp', 'ac', 'count', 'color_cct', 'diff_ctemp', 'face_ctemp', 'e_ratio')
+    for index, bound in enumerate(('min', 'max'))
+}
+
+# 支持设置的范围字段：范围前缀 → 元素类型（其他范围字段保持只读）
+_SETTABLE_RANGE_TYPES: Dict[str, type] = {'bv': float, 'ir': float, 'ctemp': int, 'e_ratio': float}
+
+_FIELD_GETTERS: Dict[str, Any] = {}
+_FIELD_SETTERS: Dict[str, Any] = {}
+_MISSING = object()
+
+
+def _compile_getter(field_name: str):
+    default = _field_default(field_name)
+    if field_name in _RANGE_FIELD_SOURCES:
+        attribute, index = _RANGE_FIELD_SOURCES[field_name]
+
+        def get_range_value(map_point):
+            try:
+                value_range = getattr(map_point, attribute)
+                return value_range[index] if value_range else default
+            except (AttributeError, IndexError, TypeError):
+                return default
+        return get_range_value
+
+    if field_name == 'ml':
+        def get_ml(map_point):
+            try:
+                return map_point.extra_attributes.get('ml', 0)
+            except (AttributeError, TypeError):
+                return default
+        return get_ml
+
+    def get_attribute(map_point):
+        return getattr(map_point, field_name, default)
+    return get_attribute
+
+
+def _compile_setter(field_name: str):
+    prefix, _, bound = field_name.rpartition('_')
+    if field_name in _RANGE_FIELD_SOURCES and prefix in _SETTABLE_RANGE_TYPES:
+        attribute, index = _RANGE_FIELD_SOURCES[field_name]
+        element_type = _SETTABLE_RANGE_TYPES[prefix]
+        if element_type is int:
+            def convert(value):
+                return _to_int(value, _field_default(field_name))
+        else:
+            convert = _to_float
+        # 范围为空时另一端使用该端字段的默认值
+        other_default = _field_default(f"{prefix}_{'max' if index == 0 else 'min'}")
+
+        def set_range_value(map_point, value):
+            new_value = convert(value)
+            value_range = getattr(map_point, attribute)
+            other = element_type(value_range[1 - index]) if value_range else other_default
+            setattr(map_point, attribute, (new_value, other) if index == 0 else (other, new_value))
+            return True
+        return set_range_value
+
+    if field_name == 'ml':
+        def set_ml(map_point, value):
+            if not hasattr(map_point, 'extra_attributes'):
+                map_point.extra_attributes = {}
+            input_value = _to_float(value)
+            # 反向转换：GUI友好值 → 内部值
+            if input_value == 2:
+                internal_value = 65471
+            elif input_value == 3:
+                internal_value = 65535
+            else:
+                internal_value = input_value
+            # 存储为整数（若可）
+            try:
+                map_point.extra_attributes['ml'] = int(internal_value)
+            except Exception:
+                map_point.extra_attributes['ml'] = internal_value
+            return True
+        return set_ml
+
+    def set_attribute(map_point, value):
+        # 直接属性设置：尽量按现有属性类型做转换，避免字符串污染
+        current = getattr(map_point, field_name, _MISSING)
+        if current is _MISSING:
+            if field_name.startswith('tran_'):
+                setattr(map_point, field_name, value)
+                return True
+            return False
+        if isinstance(current, float):
+            value = _to_float(value, current)
+        elif isinstance(current, int):
+            value = _to_int(value, current)
+        setattr(map_point, field_name, value)
+        return True
+    return set_attribute
+
+
+def get_field_getter(field_name: str):
+    """
+    获取字段的预编译读取函数（未知字段名按MapPoint属性读取，缺失时返回默认值）
+
+    Args:
+        field_name: 字段名称
+
+    Returns:
+        Callable[[MapPoint], Any]: 读取函数
+    """
+    getter = _FIELD_GETTERS.get(field_name)
+    if getter is None:
+        getter = _FIELD_GETTERS[field_name] = _compile_getter(field_name)
+    return getter
+
+
+def get_field_setter(field_name: str):
+    """
+    获取字段的预编译设置函数（不负责脏字段标记，见set_map_point_field_value）
+
+    Args:
+        field_name: 字段名称
+
+    Returns:
+        Callable[[MapPoint, Any], bool]: 设置函数，返回是否设置成功
+    """
+    setter = _FIELD_SETTERS.get(field_name)
+    if setter is None:
+        setter = _FIELD_SETTERS[field_name] = _compile_setter(field_name)
+    return setter
+
+
+def is_settable_map_point_field(field_name: str) -> bool:
+    """
+    字段是否可通过set_map_point_field_value设置（与_compile_setter的分支一致）
+
+    ac、count、color_cct、diff_ctemp、face_ctemp等只读范围字段返回False
+    """
+    prefix = field_name.rpartition('_')[0]
+    if field_name in _RANGE_FIELD_SOURCES:
+        return prefix in _SETTABLE_RANGE_TYPES
+    if field_name == 'ml' or field_name.startswith('tran_'):
+        return True
+    return field_name in MapPoint.__dataclass_fields__ or hasattr(MapPoint, field_name)
+
+
+for _field_name in XML_FIELD_CONFIG:
+    get_field_getter(_field_name)
+    get_field_setter(_field_name)
+del _field_name
+
+
+def get_xml_fields_for_attribute(name: str) -> List[str]:
+    """
+    将MapPoint属性名或字段名映射为XML_FIELD_CONFIG字段名
+
+    Args:
+        name: 属性名（如bv_range、extra_attributes）或字段名（如bv_min、ml）
+
+    Returns:
+        对应的XML字段名列表，不写入XML的属性返回空列表
+    """
+    if name in XML_FIELD_CONFIG:
+        return [name]
+    if name.endswith('_range'):
+        prefix = name[:-len('_range')]
+        return [f for f in (f'{prefix}_min', f'{prefix}_max') if f in XML_FIELD_CONFIG]
+    if name == 'extra_attributes':
+        return ['ml']
+    return []
+
+
+def get_dirty_xml_fields(map_point: 'MapPoint') -> Optional[List[str]]:
+    """
+    获取Map点自上次保存以来需写回的XML字段（按XML_FIELD_CONFIG顺序）
+
+    Returns:
+        字段名列表；Map点未启用脏字段跟踪时返回None，表示需全量检查
+    """
+    get_dirty = getattr(map_point, 'get_dirty_fields', None)
+    dirty_names = get_dirty() if get_dirty is not None else None
+    if dirty_names is None:
+        return None
+
+    xml_fields = set()
+    for name in dirty_names:
+        xml_fields.update(get_xml_fields_for_attribute(name))
+    return [field_name for field_name in XML_FIELD_CONFIG if field_name in xml_fields]
+
+
 @dataclass
 class BaseBoundary:
     """基础边界数据模型"""
@@ -1033,7 +1181,54 @@ class MapConfiguration:
         """初始化后处理"""
         # 保持Map点的原始XML顺序，不进行权重排序
         # 这样可以确保Map点与XML节点的正确映射关系
-        pass
+        # 解析阶段的赋值不算修改，以创建时的状态作为脏字段跟踪的基线
+        self.clear_dirty()
+
+    def __setattr__(self, name: str, value: Any):
+        """map_points赋值时转为MapPointList，使别名/场景/类型索引能感知列表增删"""
+        if name == 'map_points' and not isinstance(value, MapPointList):
+            value = MapPointList(value)
+        object.__setattr__(self, name, value)
+
+    def _get_point_index(self):
+        """获取map_points上的索引（反序列化的旧缓存中map_points可能仍是普通list）"""
+        map_points = self.map_points
+        if not isinstance(map_points, MapPointList):
+            self.map_points = map_points = MapPointList(map_points)
+        return map_points.get_index()
+
+    def get_dirty_xml_fields(self) -> Dict[int, Optional[List[str]]]:
+        """
+        获取有修改的Map点及其需写回的XML字段
+
+        Returns:
+            Dict[int, Optional[List[str]]]: Map点下标 → XML_FIELD_CONFIG字段名列表（None表示需全量检查）；
+            未修改的Map点不出现在结果中
+        """
+        dirty = {}
+        for index, map_point in enumerate(self.map_points):
+            xml_fields = get_dirty_xml_fields(map_point)
+            if xml_fields is None or xml_fields:
+                dirty[index] = xml_fields
+        return dirty
+
+    def clear_dirty(self, up_to_revision: Optional[int] = None):
+        """
+        清空Map点的脏字段（加载或保存成功后调用）
+
+        Args:
+            up_to_revision: 只清空修改序号（_revision）不大于该值的Map点，用于后台保存完成时
+                保留提交快照之后又被修改的点；None表示全部清空
+        """
+        # MapPoint与CompactMapPoint都提供clear_dirty
+        points = list(self.map_points)
+        if self.base_boundary_point is not None:
+            points.append(self.base_boundary_point)
+        for map_point in points:
+            if not hasattr(map_point, 'clear_dirty'):
+                continue
+            if up_to_revision is None or getattr(map_point, '_revision', 0) <= up_to_revision:
+                map_point.clear_dirty()
     
     def get_map_points_by_scene(self, scene_type: SceneType) -> List[MapPoint]:
         """
@@ -1045,7 +1240,7 @@ class MapConfiguration:
         Returns:
             指定场景的Map点列表
         """
-        return [mp for mp in self.map_points if mp.scene_type == scene_type]
+        return self._get_point_index().by_scene(scene_type)
     
     def get_map_points_by_type(self, map_type: MapType) -> List[MapPoint]:
         """
@@ -1057,8 +1252,55 @@ class MapConfiguration:
         Returns:
             指定类型的Map点列表
         """
-        return [mp for mp in self.map_points if mp.map_type == map_type]
+        return self._get_point_index().by_type(map_type)
     
+    def get_point_table(self) -> 'MapPointTable':
+        """
+        获取Map点列式视图（首次调用时构建，之后每次调用只刷新被修改的行）
+
+        Returns:
+            MapPointTable: 与map_points行顺序一致的NumPy列式视图
+        """
+        from core.models.map_point_table import MapPointTable
+
+        table = self.__dict__.get('_point_table')
+        if table is None:
+            table = MapPointTable(self.map_points)
+            self._point_table = table
+        else:
+            table.sync(self.map_points)
+        return table
+
+    def get_spatial_index(self, use_base_boundary: bool = False) -> 'MapSpatialIndex':
+        """
+        获取Map点空间索引（首次调用时构建，之后每次调用只重新登记被修改的Map点）
+
+        Args:
+            use_base_boundary: 单点坐标使用base_boundary + offset（分析器口径），否则使用x/y（绘图口径）
+
+        Returns:
+            MapSpatialIndex: 行号与map_points顺序一致的空间索引
+        """
+        from core.models.map_spatial_index import MapSpatialIndex
+
+        origin = None
+        if use_base_boundary and self.base_boundary is not None:
+            origin = (float(self.base_boundary.rpg), float(self.base_boundary.bpg))
+        indexes = self.__dict__.setdefault('_spatial_indexes', {})
+        index = indexes.get(use_base_boundary)
+        if index is None or index.origin != origin:
+            index = indexes[use_base_boundary] = MapSpatialIndex(self.map_points, origin=origin)
+        else:
+            index.sync(self.map_points)
+        return index
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """序列化（解析缓存、深拷贝）时不保存派生的列式视图与空间索引"""
+        state = dict(self.__dict__)
+        state.pop('_point_table', None)
+        state.pop('_spatial_indexes', None)
+        return state
+
     def get_coordinate_bounds(self) -> Tuple[Tuple[float, float], Tuple[float, float]]:
         """
         获取所有Map点的坐标边界
@@ -1068,12 +1310,7 @@ class MapConfiguration:
         """
         if not self.map_points:
             return ((0, 0), (0, 0))
-        
-        x_coords = [mp.x for mp in self.map_points]
-        y_coords = [mp.y for mp in self.map_points]
-        
-        return ((min(x_coords), max(x_coords)), 
-                (min(y_coords), max(y_coords)))
+        return self.get_point_table().coordinate_bounds()
     
     def get_weight_statistics(self) -> Dict[str, float]:
         """
@@ -1084,14 +1321,7 @@ class MapConfiguration:
         """
         if not self.map_points:
             return {}
-        
-        weights = [mp.weight for mp in self.map_points]
-        return {
-            'min': min(weights),
-            'max': max(weights),
-            'mean': sum(weights) / len(weights),
-            'count': len(weights)
-        }
+        return self.get_point_table().weight_statistics()
     
     def find_map_point_by_alias(self, alias_name: str) -> Optional[MapPoint]:
         """
@@ -1103,10 +1333,7 @@ class MapConfiguration:
         Returns:
             找到的Map点，如果不存在则返回None
         """
-        for mp in self.map_points:
-            if mp.alias_name == alias_name:
-                return mp
-        return None
+        return self._get_point_index().find_by_alias(alias_name)
 
 
 @dataclass
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Map点索引
+==liuq debug== FastMapV2 MapConfiguration的别名/场景/类型索引
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.1.0
+描述: MapConfiguration.map_points使用MapPointList保存，增删改时通知所属的MapPointIndex增量更新；
+      Map点以弱引用集合记录包含它的索引，alias_name/scene_type/map_type被修改时只通知这些索引，
+      索引在下次查询时只处理自己的变更点，其他配置的编辑不产生任何开销。查询结果与原线性扫描一致：别名重复时返回列表中最靠前的Map点，
+      场景/类型结果按map_points中的顺序返回
+"""
+
+import itertools
+import logging
+import weakref
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 全局修改序号：Map点属性值变化时记录取到的序号（_revision），大于某个时刻的序号即表示之后被修改过
+EDIT_SEQUENCE = itertools.count(1)
+
+# 参与索引的Map点属性
+KEY_ATTRIBUTES = frozenset(('alias_name', 'scene_type', 'map_type'))
+
+# Map点上记录所属索引的属性（weakref.WeakSet，索引被回收后自动移除）
+INDEXES_ATTRIBUTE = '_key_indexes'
+
+
+def record_key_edit(map_point: Any):
+    """通知包含该Map点的索引其别名/场景/类型已变化（由MapPoint/CompactMapPoint属性赋值调用）"""
+    indexes = getattr(map_point, INDEXES_ATTRIBUTE, None)
+    if indexes:
+        for index in list(indexes):
+            index.key_changed(map_point)
+
+
+def _register_index(map_point: Any, index: 'MapPointIndex'):
+    indexes = getattr(map_point, INDEXES_ATTRIBUTE, None)
+    if indexes is None:
+        indexes = weakref.WeakSet()
+        try:
+            object.__setattr__(map_point, INDEXES_ATTRIBUTE, indexes)
+        except AttributeError:
+            # 不支持附加属性的对象：键变化无法通知，只在增删时更新
+            return
+    indexes.add(index)
+
+
+def _unregister_index(map_point: Any, index: 'MapPointIndex'):
+    indexes = getattr(map_point, INDEXES_ATTRIBUTE, None)
+    if indexes is not None:
+        indexes.discard(index)
+
+
+class MapPointList(list):
+    """
+    Map点列表
+
+    行为与list相同，修改时通知挂接的MapPointIndex；复制或序列化时只保留元素
+    """
+
+    _index: Optional['MapPointIndex'] = None
+
+    def __reduce_ex__(self, protocol):
+        return (self.__class__, (list(self),))
+
+    def get_index(self) -> 'MapPointIndex':
+        """获取（首次调用时构建）挂接在本列表上的索引"""
+        if self._index is None:
+            self._index = MapPointIndex(self)
+        return self._index
+
+    def _notify(self, added: Iterable = (), removed: Iterable = (), appended: bool = False):
+        index = self._index
+        if index is not None:
+            index.points_changed(list(added), list(removed), appended)
+
+    def append(self, map_point):
+        super().append(map_point)
+        self._notify(added=(map_point,), appended=True)
+
+    def extend(self, map_points):
+        map_points = list(map_points)
+        super().extend(map_points)
+        self._notify(added=map_points, appended=True)
+
+    def __iadd__(self, map_points):
+        self.extend(map_points)
+        return self
+
+    def insert(self, position, map_point):
+        super().insert(position, map_point)
+        self._notify(added=(map_point,), appended=position >= len(self) - 1)
+
+    def remove(self, map_point):
+        super().remove(map_point)
+        self._notify(removed=(map_point,))
+
+    def pop(self, position=-1):
+        map_point = super().pop(position)
+        self._notify(removed=(map_point,))
+        return map_point
+
+    def clear(self):
+        removed = list(self)
+        super().clear()
+        self._notify(removed=removed)
+
+    def __setitem__(self, key, value):
+        removed = self[key] if isinstance(key, slice) else [self[key]]
+        added = list(value) if isinstance(key, slice) else [value]
+        super().__setitem__(key, added if isinstance(key, slice) else value)
+        self._notify(added=added, removed=removed)
+
+    def __delitem__(self, key):
+        removed = self[key] if isinstance(key, slice) else [self[key]]
+        super().__delitem__(key)
+        self._notify(removed=removed)
+
+    def __imul__(self, count):
+        added = list(self) * (count - 1) if count > 1 else []
+        removed = [] if count > 0 else list(self)
+        super().__imul__(count)
+        self._notify(added=added, removed=removed, appended=True)
+        return self
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._notify()
+
+    def reverse(self):
+        super().reverse()
+        self._notify()
+
+
+class MapPointIndex:
+    """
+    别名字典与场景/类型分桶
+
+    - 每个桶是按插入顺序的{id(Map点): Map点}字典；追加到列表末尾的Map点保持列表顺序，
+      其他位置的插入、排序与重新分类只把桶标记为待排序，下次读取该桶时按列表位置重排一次
+    - 别名桶通常只有一个Map点，重复别名时按列表位置取最靠前者
+    """
+
+    def __init__(self, map_points: List):
+        """
+        Args:
+            map_points: 被索引的Map点列表（通常为MapPointList）
+        """
+        self._points = map_points
+        self._rebuild()
+
+    # ---- 维护 ----
+
+    def _rebuild(self):
+        for entry in getattr(self, '_entries', {}).values():
+            _unregister_index(entry[0], self)
+        self._entries: Dict[int, list] = {}  # id → [Map点, 别名, 场景, 类型, 在列表中出现的次数]
+        self._changed: Dict[int, Any] = {}  # 上次同步后键发生变化的Map点
+        self._by_alias: Dict[Any, Dict[int, Any]] = {}
+        self._by_scene: Dict[Any, Dict[int, Any]] = {}
+        self._by_type: Dict[Any, Dict[int, Any]] = {}
+        self._unordered: set = set()
+        self._positions: Optional[Dict[int, int]] = None
+        for map_point in self._points:
+            self._add(map_point, in_order=True)
+        logger.debug(f"==liuq debug== 构建Map点索引: {len(self._entries)} 个Map点")
+
+    def points_changed(self, added: List, removed: List, appended: bool):
+        """MapPointList修改后调用：增量更新桶，位置缓存失效"""
+        for map_point in removed:
+            self._remove(map_point)
+        for map_point in added:
+            self._add(map_point, in_order=appended)
+        if appended and not removed and self._positions is not None:
+            start = len(self._points) - len(added)
+            for offset, map_point in enumerate(added):
+                self._positions.setdefault(id(map_point), start + offset)
+        else:
+            self._positions = None
+            if not added and not removed:
+                # 排序/反转：所有桶都需按新位置重排
+                self._unordered.update(self._bucket_keys())
+
+    def _bucket_keys(self):
+        yield from (('alias', key) for key in self._by_alias)
+        yield from (('scene', key) for key in self._by_scene)
+        yield from (('type', key) for key in self._by_type)
+
+    def _add(self, map_point, in_order: bool):
+        entry = self._entries.get(id(map_point))
+        if entry is not None:
+            # 同一Map点在列表中出现多次（如交换元素的中间状态），其首次出现的位置可能改变
+            entry[4] += 1
+            self._mark_unordered(entry[1:4])
+            return
+        keys = (getattr(map_point, 'alias_name', None), getattr(map_point, 'scene_type', None),
+                getattr(map_point, 'map_type', None))
+        self._entries[id(map_point)] = [map_point, *keys, 1]
+        _register_index(map_point, self)
+        self._file(map_point, keys, in_order)
+
+    def _remove(self, map_point):
+        entry = self._entries.get(id(map_point))
+        if entry is None:
+            return
+        entry[4] -= 1
+        if entry[4] > 0:
+            self._mark_unordered(entry[1:4])
+            return
+        del self._entries[id(map_point)]
+        self._changed.pop(id(map_point), None)
+        _unregister_index(map_point, self)
+        self._unfile(map_point, entry[1:4])
+
+    def _file(self, map_point, keys, in_order: bool):
+        for kind, buckets, key in zip(('alias', 'scene', 'type'),
+                                      (self._by_alias, self._by_scene, self._by_type), keys):
+            bucket = buckets.setdefault(key, {})
+            bucket[id(map_point)] = map_point
+            if not in_order and len(bucket) > 1:
+                self._unordered.add((kind, key))
+
+    def _mark_unordered(self, keys):
+        self._unordered.update(zip(('alias', 'scene', 'type'), keys))
+
+    def _unfile(self, map_point, keys):
+        for kind, buckets, key in zip(('alias', 'scene', 'type'),
+                                      (self._by_alias, self._by_scene, self._by_type), keys):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.pop(id(map_point), None)
+                if not bucket:
+                    del buckets[key]
+                    self._unordered.discard((kind, key))
+
+    def key_changed(self, map_point):
+        """Map点的别名/场景/类型变化时由record_key_edit调用，下次查询时重新分桶"""
+        entry = self._entries.get(id(map_point))
+        if entry is not None and entry[0] is map_point:
+            self._changed[id(map_point)] = map_point
+
+    def sync(self):
+        """重新分桶上次同步后键发生变化的Map点（无变更时O(1)）"""
+        if not self._changed:
+            return
+        changed, self._changed = self._changed, {}
+        for map_point in changed.values():
+            entry = self._entries.get(id(map_point))
+            if entry is None or entry[0] is not map_point:
+                continue
+            keys = (map_point.alias_name, map_point.scene_type, map_point.map_type)
+            if tuple(entry[1:4]) != keys:
+                self._unfile(map_point, entry[1:4])
+                entry[1:4] = keys
+                self._file(map_point, keys, in_order=False)
+
+    # ---- 查询 ----
+
+    def _ordered(self, kind: str, buckets: Dict[Any, Dict[int, Any]], key) -> Dict[int, Any]:
+        bucket = buckets.get(key)
+        if bucket is None:
+            return {}
+        if (kind, key) in self._unordered:
+            if self._positions is None:
+                self._positions = {}
+                for position, map_point in enumerate(self._points):
+                    self._positions.setdefault(id(map_point), position)
+            positions = self._positions
+            bucket = dict(sorted(bucket.items(), key=lambda item: positions[item[0]]))
+            buckets[key] = bucket
+            self._unordered.discard((kind, key))
+        return bucket
+
+    def find_by_alias(self, alias_name: str) -> Optional[Any]:
+        """按别名查找（重复别名返回列表中最靠前的Map点）"""
+        self.sync()
+        bucket = self._by_alias.get(alias_name)
+        if not bucket:
+            return None
+        if len(bucket) > 1:
+            bucket = self._ordered('alias', self._by_alias, alias_name)
+        return next(iter(bucket.values()))
+
+    def by_scene(self, scene_type) -> List[Any]:
+        """指定场景的Map点（按列表顺序）"""
+        self.sync()
+        return list(self._ordered('scene', self._by_scene, scene_type).values())
+
+    def by_type(self, map_type) -> List[Any]:
+        """指定类型的Map点（按列表顺序）"""
+        self.sync()
+        return list(self._ordered('type', self._by_type, map_type).values())
+
+    def aliases(self) -> List[str]:
+        """当前索引中的全部别名"""
+        self.sync()
+        return list(self._by_alias)
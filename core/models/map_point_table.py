@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Map点列式视图
+==liuq debug== FastMapV2 MapConfiguration的NumPy列式（struct-of-arrays）视图
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 每个配置只建一次：坐标、权重、全部范围min/max与tran列、场景/类型编码、多边形顶点（CSR偏移）
+      各为一个数组，统计与筛选直接在数组上完成。Map点属性变化时记录全局修改序号，
+      同步时只重读序号新于上次同步的行；Map点增删或换序时整体重建
+"""
+
+import logging
+import operator
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.models.map_data import EDIT_SEQUENCE, MapType, SceneType
+
+logger = logging.getLogger(__name__)
+
+# 单值数值列
+SCALAR_COLUMNS: Tuple[str, ...] = ('x', 'y', 'offset_x', 'offset_y', 'weight', 'trans_step')
+
+# 范围列 → (MapPoint范围属性, 下标)；除XML字段外还包含cct_min/cct_max
+RANGE_COLUMNS: Dict[str, Tuple[str, int]] = {
+    f'{prefix}_{bound}': (f'{prefix}_range', index)
+    for prefix in ('bv', 'ir', 'cct', 'ctemp', 'e_ratio', 'ac', 'count', 'color_cct', 'diff_ctemp', 'face_ctemp')
+    for index, bound in enumerate(('min', 'max'))
+}
+
+# tran列
+TRAN_COLUMNS: Tuple[str, ...] = tuple(
+    f'tran_{prefix}_{bound}'
+    for prefix in ('bv', 'ctemp', 'ir', 'ac', 'count', 'color_cct', 'diff_ctemp', 'face_ctemp')
+    for bound in ('min', 'max')
+)
+
+NUMERIC_COLUMNS: Tuple[str, ...] = SCALAR_COLUMNS + tuple(RANGE_COLUMNS) + TRAN_COLUMNS
+
+# 场景/类型编码即枚举的定义顺序
+SCENE_TYPES: Tuple[SceneType, ...] = tuple(SceneType)
+MAP_TYPES: Tuple[MapType, ...] = tuple(MapType)
+_SCENE_CODES = {scene: code for code, scene in enumerate(SCENE_TYPES)}
+_MAP_TYPE_CODES = {map_type: code for code, map_type in enumerate(MAP_TYPES)}
+
+_NUMERIC_INDEX = {name: index for index, name in enumerate(NUMERIC_COLUMNS)}
+_RANGE_ATTRIBUTES = tuple(dict.fromkeys(attribute for attribute, _ in RANGE_COLUMNS.values()))
+
+
+def _read_numeric_row(map_point) -> List[float]:
+    """按NUMERIC_COLUMNS顺序读取一个Map点的数值（与列顺序一致：单值、范围、tran）"""
+    row = [getattr(map_point, name) for name in SCALAR_COLUMNS]
+    for attribute in _RANGE_ATTRIBUTES:
+        row.extend(getattr(map_point, attribute) or (np.nan, np.nan))
+    row.extend(getattr(map_point, name) for name in TRAN_COLUMNS)
+    return row
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class MapPointTable:
+    """
+    Map点列式视图
+
+    - table['weight']、table['bv_min']等返回长度为N的float64数组（N为Map点数），列之间互不复制
+    - alias_names为object数组，scene_codes/map_type_codes为枚举下标，is_polygon为bool数组
+    - 多边形顶点按行拼接在polygon_vertices（M×2）中，第i行的顶点为polygon_offsets[i]:polygon_offsets[i+1]
+    - 返回的数组只读，修改请通过MapPoint属性，再调用sync（MapConfiguration.get_point_table会自动同步）
+    """
+
+    def __init__(self, map_points: Iterable):
+        """
+        由Map点序列构建列式视图
+
+        Args:
+            map_points: Map点序列（MapPoint或CompactMapPoint）
+        """
+        self._points: List = list(map_points)
+        self._build()
+
+    # ---- 构建与同步 ----
+
+    def _build(self):
+        """从全部Map点重建所有列"""
+        self._synced_at = next(EDIT_SEQUENCE)
+        points = self._points
+        count = len(points)
+
+        numeric = np.empty((count, len(NUMERIC_COLUMNS)), dtype=np.float64, order='F')
+        for row, map_point in enumerate(points):
+            numeric[row] = self._numeric_row(map_point)
+        self._numeric = numeric
+
+        self.alias_names = np.array([map_point.alias_name for map_point in points], dtype=object)
+        self.scene_codes = np.array([_SCENE_CODES.get(map_point.scene_type, -1) for map_point in points], dtype=np.int8)
+        self.map_type_codes = np.array([_MAP_TYPE_CODES.get(map_point.map_type, -1) for map_point in points], dtype=np.int8)
+        self.is_polygon = np.array([bool(map_point.is_polygon) for map_point in points], dtype=bool)
+        self._row_vertices = [self._vertex_array(map_point) for map_point in points]
+        self._pack_vertices()
+        self._freeze()
+        logger.debug(f"==liuq debug== 构建Map点列式视图: {count} 行")
+
+    def sync(self, map_points: Optional[Sequence] = None) -> int:
+        """
+        与Map点同步：增删或换序时整体重建，否则只重读修改序号新于上次同步的行
+
+        Args:
+            map_points: 当前Map点序列，None表示沿用构建时的序列
+
+        Returns:
+            int: 刷新的行数（整体重建时为总行数）
+        """
+        if map_points is not None and (len(map_points) != len(self._points)
+                                       or not all(map(operator.is_, map_points, self._points))):
+            self._points = list(map_points)
+            self._build()
+            return len(self._points)
+
+        synced_at = self._synced_at
+        # 先取新序号再扫描，扫描期间发生的修改会在下次同步时读取
+        self._synced_at = next(EDIT_SEQUENCE)
+        changed = [row for row, map_point in enumerate(self._points)
+                   if getattr(map_point, '_revision', 0) > synced_at]
+        if changed:
+            self._thaw()
+            vertices_changed = False
+            for row in changed:
+                map_point = self._points[row]
+                self._numeric[row] = self._numeric_row(map_point)
+                self.alias_names[row] = map_point.alias_name
+                self.scene_codes[row] = _SCENE_CODES.get(map_point.scene_type, -1)
+                self.map_type_codes[row] = _MAP_TYPE_CODES.get(map_point.map_type, -1)
+                self.is_polygon[row] = bool(map_point.is_polygon)
+                vertices = self._vertex_array(map_point)
+                if not np.array_equal(vertices, self._row_vertices[row]):
+                    self._row_vertices[row] = vertices
+                    vertices_changed = True
+            if vertices_changed:
+                self._pack_vertices()
+            self._freeze()
+            logger.debug(f"==liuq debug== Map点列式视图刷新 {len(changed)} 行")
+        return len(changed)
+
+    @staticmethod
+    def _numeric_row(map_point) -> List[float]:
+        row = _read_numeric_row(map_point)
+        try:
+            return [float(value) for value in row]
+        except (TypeError, ValueError):
+            return [_to_float(value) for value in row]
+
+    @staticmethod
+    def _vertex_array(map_point) -> np.ndarray:
+        vertices = getattr(map_point, 'polygon_vertices', None)
+        if not vertices:
+            return np.empty((0, 2), dtype=np.float64)
+        return np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+
+    def _pack_vertices(self):
+        """按行拼接多边形顶点并计算CSR偏移"""
+        counts = np.fromiter((len(vertices) for vertices in self._row_vertices), dtype=np.int64,
+                             count=len(self._row_vertices))
+        self.polygon_offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.polygon_offsets[1:])
+        if self._row_vertices:
+            self.polygon_vertices = np.concatenate(self._row_vertices)
+        else:
+            self.polygon_vertices = np.empty((0, 2), dtype=np.float64)
+
+    def _arrays(self) -> Tuple[np.ndarray, ...]:
+        return (self._numeric, self.alias_names, self.scene_codes, self.map_type_codes,
+                self.is_polygon, self.polygon_offsets, self.polygon_vertices)
+
+    def _freeze(self):
+        for array in self._arrays():
+            array.flags.writeable = False
+
+    def _thaw(self):
+        for array in self._arrays():
+            array.flags.writeable = True
+
+    # ---- 访问 ----
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """按列名取数值列（见NUMERIC_COLUMNS）"""
+        try:
+            return self._numeric[:, _NUMERIC_INDEX[column]]
+        except KeyError:
+            raise KeyError(f"未知的Map点列: {column}") from None
+
+    def __contains__(self, column: str) -> bool:
+        return column in _NUMERIC_INDEX
+
+    @property
+    def points(self) -> List:
+        """与行顺序一致的Map点列表（副本）"""
+        return list(self._points)
+
+    @property
+    def numeric(self) -> np.ndarray:
+        """N×len(NUMERIC_COLUMNS)的数值矩阵（列主序）"""
+        return self._numeric
+
+    def columns(self, names: Iterable[str]) -> np.ndarray:
+        """
+        取多个数值列组成的N×K矩阵
+
+        Args:
+            names: 列名序列
+
+        Returns:
+            np.ndarray: 新数组
+        """
+        return self._numeric[:, [_NUMERIC_INDEX[name] for name in names]]
+
+    def polygon(self, row: int) -> np.ndarray:
+        """第row行的多边形顶点（K×2，非多边形为空数组）"""
+        return self.polygon_vertices[self.polygon_offsets[row]:self.polygon_offsets[row + 1]]
+
+    def scene_mask(self, scene_type: SceneType) -> np.ndarray:
+        """场景类型为scene_type的行"""
+        return self.scene_codes == _SCENE_CODES[scene_type]
+
+    def type_mask(self, map_type: MapType) -> np.ndarray:
+        """Map类型为map_type的行"""
+        return self.map_type_codes == _MAP_TYPE_CODES[map_type]
+
+    def select(self, mask: np.ndarray) -> List:
+        """按布尔掩码或行号数组取Map点"""
+        rows = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask)
+        return [self._points[row] for row in rows]
+
+    def map_type_counts(self, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """
+        统计各Map类型的数量
+
+        Args:
+            mask: 只统计掩码选中的行，None表示全部
+
+        Returns:
+            Dict[str, int]: MapType.value → 数量
+        """
+        codes = self.map_type_codes if mask is None else self.map_type_codes[mask]
+        counts = np.bincount(codes[codes >= 0], minlength=len(MAP_TYPES))
+        return {map_type.value: int(counts[code]) for code, map_type in enumerate(MAP_TYPES)}
+
+    # ---- 统计 ----
+
+    def coordinate_bounds(self) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        """所有行的坐标边界((x_min, x_max), (y_min, y_max))，空表返回((0, 0), (0, 0))"""
+        if not len(self):
+            return ((0, 0), (0, 0))
+        x, y = self['x'], self['y']
+        return ((float(x.min()), float(x.max())), (float(y.min()), float(y.max())))
+
+    def weight_statistics(self) -> Dict[str, float]:
+        """权重min/max/mean/count，空表返回空字典"""
+        if not len(self):
+            return {}
+        weights = self['weight']
+        return {
+            'min': float(weights.min()),
+            'max': float(weights.max()),
+            'mean': float(weights.mean()),
+            'count': len(weights),
+        }
+
+    @classmethod
+    def concat(cls, tables: Sequence['MapPointTable']) -> Tuple['MapPointTable', np.ndarray]:
+        """
+        把多个配置的列式视图拼接为一个（用于多配置统计，不重新读取Map点）
+
+        Args:
+            tables: 列式视图序列（调用前应已同步）
+
+        Returns:
+            Tuple[MapPointTable, np.ndarray]: 拼接后的视图，以及每行所属视图下标
+        """
+        table = cls.__new__(cls)
+        table._points = [map_point for source in tables for map_point in source._points]
+        table._synced_at = min((source._synced_at for source in tables), default=next(EDIT_SEQUENCE))
+        if tables:
+            table._numeric = np.asfortranarray(np.concatenate([source._numeric for source in tables]))
+        else:
+            table._numeric = np.empty((0, len(NUMERIC_COLUMNS)), dtype=np.float64, order='F')
+        table.alias_names = np.concatenate([source.alias_names for source in tables] or [np.empty(0, object)])
+        table.scene_codes = np.concatenate([source.scene_codes for source in tables] or [np.empty(0, np.int8)])
+        table.map_type_codes = np.concatenate([source.map_type_codes for source in tables]
+                                              or [np.empty(0, np.int8)])
+        table.is_polygon = np.concatenate([source.is_polygon for source in tables] or [np.empty(0, bool)])
+        table._row_vertices = [vertices for source in tables for vertices in source._row_vertices]
+        table._pack_vertices()
+        table._freeze()
+        groups = np.repeat(np.arange(len(tables)), [len(source) for source in tables])
+        return table, groups
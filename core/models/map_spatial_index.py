@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Map空间索引
+==liuq debug== FastMapV2 RpG/BpG平面上Map多边形与单点的均匀网格索引
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 每个Map点按外接矩形登记到覆盖的网格单元中，查询时先取单元内候选、再做外接矩形预筛，
+      最后只对少量候选做精确几何判断。支持点查询（点击命中、白点落在哪些Map内）、
+      矩形查询与多边形重叠查询；Map点顶点/偏移被修改后按修改序号只重新登记变化的点。不依赖Qt
+"""
+
+import logging
+import math
+import operator
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.models.map_data import EDIT_SEQUENCE
+
+logger = logging.getLogger(__name__)
+
+Vertex = Tuple[float, float]
+BBox = Tuple[float, float, float, float]  # (x_min, y_min, x_max, y_max)
+
+# 单个Map点最多登记的网格单元数，超过时放入“大对象”列表，每次查询都检查
+_MAX_CELLS_PER_ITEM = 64
+
+
+def point_in_polygon(x: float, y: float, vertices: Sequence[Vertex]) -> bool:
+    """
+    判断点是否在多边形内（射线法，偶奇规则；落在边上的点按射线方向归属）
+
+    Args:
+        x, y: 点坐标
+        vertices: 多边形顶点
+
+    Returns:
+        bool: 点在多边形内
+    """
+    inside = False
+    count = len(vertices)
+    if count < 3:
+        return False
+    x1, y1 = vertices[-1]
+    for x2, y2 in vertices:
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def _cross(ox: float, oy: float, ax: float, ay: float, bx: float, by: float) -> float:
+    return (ax - ox) * (by - oy) - (ay - oy) * (bx - ox)
+
+
+def _segments_intersect(p1: Vertex, p2: Vertex, q1: Vertex, q2: Vertex) -> bool:
+    """线段p1p2与q1q2是否相交（含端点接触与共线重叠）"""
+    d1 = _cross(*q1, *q2, *p1)
+    d2 = _cross(*q1, *q2, *p2)
+    d3 = _cross(*p1, *p2, *q1)
+    d4 = _cross(*p1, *p2, *q2)
+    if ((d1 > 0) != (d2 > 0) and d1 != 0 and d2 != 0) and ((d3 > 0) != (d4 > 0) and d3 != 0 and d4 != 0):
+        return True
+
+    def on_segment(a: Vertex, b: Vertex, c: Vertex, d: float) -> bool:
+        return d == 0 and min(a[0], b[0]) <= c[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= c[1] <= max(a[1], b[1])
+
+    return (on_segment(q1, q2, p1, d1) or on_segment(q1, q2, p2, d2)
+            or on_segment(p1, p2, q1, d3) or on_segment(p1, p2, q2, d4))
+
+
+def polygons_overlap(first: Sequence[Vertex], second: Sequence[Vertex]) -> bool:
+    """
+    判断两个多边形是否重叠（边相交或一方包含另一方，边界接触也算重叠）
+
+    Args:
+        first, second: 多边形顶点（各至少3个）
+
+    Returns:
+        bool: 是否重叠
+    """
+    if len(first) < 3 or len(second) < 3:
+        return False
+    for i in range(len(first)):
+        a1, a2 = first[i - 1], first[i]
+        for j in range(len(second)):
+            if _segments_intersect(a1, a2, second[j - 1], second[j]):
+                return True
+    return point_in_polygon(*first[0], second) or point_in_polygon(*second[0], first)
+
+
+def polygon_bbox(vertices: Iterable[Vertex]) -> BBox:
+    """多边形（或点集）的外接矩形"""
+    xs, ys = zip(*vertices)
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _bbox_overlap(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class MapSpatialIndex:
+    """
+    Map点空间索引（均匀网格 + 外接矩形预筛）
+
+    - 多边形Map（is_polygon且有顶点）按polygon_vertices登记；其余按单点坐标登记
+    - 单点坐标：给定origin（通常为base_boundary的(rpg, bpg)）时为origin + (offset_x, offset_y)，
+      否则为(x, y)，与调用方绘图/分析所用坐标一致
+    - 查询返回按map_points顺序排列的行号；Map点可通过index.map_points[row]取得
+    """
+
+    def __init__(self, map_points: Iterable, origin: Optional[Vertex] = None,
+                 cell_size: Optional[float] = None):
+        """
+        Args:
+            map_points: Map点序列（MapPoint或CompactMapPoint）
+            origin: 单点坐标的原点，None表示直接使用x/y
+            cell_size: 网格单元边长，None表示按数据范围与点数自动选择
+        """
+        self.origin = origin
+        self._fixed_cell_size = cell_size
+        self._points: List = list(map_points)
+        self._build()
+
+    @property
+    def map_points(self) -> List:
+        """被索引的Map点（按行号顺序）"""
+        return self._points
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    # ---- 构建与同步 ----
+
+    def _geometry(self, map_point) -> Tuple[Optional[List[Vertex]], BBox]:
+        """Map点的（多边形顶点或None, 外接矩形）"""
+        vertices = map_point.polygon_vertices if map_point.is_polygon else None
+        if vertices:
+            vertices = [(float(x), float(y)) for x, y in vertices]
+            return vertices, polygon_bbox(vertices)
+        if self.origin is None:
+            x, y = float(map_point.x), float(map_point.y)
+        else:
+            x = float(self.origin[0]) + float(map_point.offset_x)
+            y = float(self.origin[1]) + float(map_point.offset_y)
+        return None, (x, y, x, y)
+
+    def _build(self):
+        """从全部Map点重建网格"""
+        self._synced_at = next(EDIT_SEQUENCE)
+        geometries = [self._geometry(map_point) for map_point in self._points]
+        self._vertices: List[Optional[List[Vertex]]] = [vertices for vertices, _ in geometries]
+        self._bboxes: List[BBox] = [bbox for _, bbox in geometries]
+        self._cell_size = self._fixed_cell_size or self._auto_cell_size()
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._row_cells: List[Optional[List[Tuple[int, int]]]] = [None] * len(self._points)
+        self._oversized: set = set()
+        for row in range(len(self._points)):
+            self._insert(row)
+        logger.debug(f"==liuq debug== 构建Map空间索引: {len(self._points)} 个Map点, "
+                     f"网格 {len(self._cells)} 个单元, 单元边长 {self._cell_size:.6g}")
+
+    def _auto_cell_size(self) -> float:
+        """按全部外接矩形的范围与数量选择单元边长（约每单元一个Map点）"""
+        if not self._bboxes:
+            return 1.0
+        x_min = min(bbox[0] for bbox in self._bboxes)
+        y_min = min(bbox[1] for bbox in self._bboxes)
+        x_max = max(bbox[2] for bbox in self._bboxes)
+        y_max = max(bbox[3] for bbox in self._bboxes)
+        extent = max(x_max - x_min, y_max - y_min)
+        if extent <= 0:
+            return 1.0
+        return extent / max(1, math.ceil(math.sqrt(len(self._bboxes))))
+
+    def _cell_range(self, bbox: BBox) -> Tuple[int, int, int, int]:
+        size = self._cell_size
+        return (math.floor(bbox[0] / size), math.floor(bbox[1] / size),
+                math.floor(bbox[2] / size), math.floor(bbox[3] / size))
+
+    def _insert(self, row: int):
+        cx0, cy0, cx1, cy1 = self._cell_range(self._bboxes[row])
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > _MAX_CELLS_PER_ITEM:
+            self._oversized.add(row)
+            self._row_cells[row] = None
+            return
+        cells = [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)]
+        for cell in cells:
+            self._cells.setdefault(cell, []).append(row)
+        self._row_cells[row] = cells
+
+    def _remove(self, row: int):
+        self._oversized.discard(row)
+        for cell in self._row_cells[row] or ():
+            rows = self._cells[cell]
+            rows.remove(row)
+            if not rows:
+                del self._cells[cell]
+        self._row_cells[row] = None
+
+    def sync(self, map_points: Optional[Sequence] = None) -> int:
+        """
+        与Map点同步：增删或换序时整体重建，否则只重新登记修改序号新于上次同步的Map点
+
+        Args:
+            map_points: 当前Map点序列，None表示沿用构建时的序列
+
+        Returns:
+            int: 重新登记的Map点数（整体重建时为总数）
+        """
+        if map_points is not None and (len(map_points) != len(self._points)
+                                       or not all(map(operator.is_, map_points, self._points))):
+            self._points = list(map_points)
+            self._build()
+            return len(self._points)
+
+        synced_at = self._synced_at
+        self._synced_at = next(EDIT_SEQUENCE)
+        changed = [row for row, map_point in enumerate(self._points)
+                   if getattr(map_point, '_revision', 0) > synced_at]
+        for row in changed:
+            self._remove(row)
+            self._vertices[row], self._bboxes[row] = self._geometry(self._points[row])
+            self._insert(row)
+        if changed:
+            logger.debug(f"==liuq debug== Map空间索引增量更新: {len(changed)} 个Map点")
+        return len(changed)
+
+    # ---- 查询 ----
+
+    def _candidates(self, bbox: BBox) -> List[int]:
+        """外接矩形与bbox重叠的行号（升序）"""
+        cx0, cy0, cx1, cy1 = self._cell_range(bbox)
+        found = set(row for row in self._oversized if _bbox_overlap(self._bboxes[row], bbox))
+        cells = self._cells
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # 查询范围覆盖的单元多于已登记单元时直接遍历已登记单元
+            for (cx, cy), rows in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.update(rows)
+        else:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    found.update(cells.get((cx, cy), ()))
+        bboxes = self._bboxes
+        return sorted(row for row in found if _bbox_overlap(bboxes[row], bbox))
+
+    def query_point(self, x: float, y: float, tolerance: float = 0.0,
+                    polygons: bool = True, points: bool = True) -> List[int]:
+        """
+        查询覆盖点(x, y)的多边形Map，以及距该点不超过tolerance的单点Map
+
+        Args:
+            x, y: 查询点
+            tolerance: 单点命中距离
+            polygons: 是否包含多边形Map
+            points: 是否包含单点Map
+
+        Returns:
+            List[int]: 命中的行号（升序）
+        """
+        hits = []
+        for row in self._candidates((x - tolerance, y - tolerance, x + tolerance, y + tolerance)):
+            vertices = self._vertices[row]
+            if vertices is not None:
+                if polygons and point_in_polygon(x, y, vertices):
+                    hits.append(row)
+            elif points:
+                px, py, _, _ = self._bboxes[row]
+                if (px - x) ** 2 + (py - y) ** 2 <= tolerance ** 2:
+                    hits.append(row)
+        return hits
+
+    def nearest_point(self, x: float, y: float, max_distance: float) -> Optional[int]:
+        """
+        距(x, y)最近且距离小于max_distance的单点Map
+
+        Returns:
+            Optional[int]: 行号，没有时为None（距离相同时取行号小者）
+        """
+        best_row, best_distance = None, max_distance
+        for row in self.query_point(x, y, max_distance, polygons=False):
+            px, py, _, _ = self._bboxes[row]
+            distance = math.hypot(px - x, py - y)
+            if distance < best_distance:
+                best_row, best_distance = row, distance
+        return best_row
+
+    def query_rect(self, x_min: float, y_min: float, x_max: float, y_max: float) -> List[int]:
+        """
+        查询与矩形（含边界）相交的Map
+
+        Returns:
+            List[int]: 行号（升序）
+        """
+        rect = [(x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max)]
+        hits = []
+        for row in self._candidates((x_min, y_min, x_max, y_max)):
+            vertices = self._vertices[row]
+            bbox = self._bboxes[row]
+            # 外接矩形完全落在查询矩形内时无需精确判断
+            if vertices is None or (x_min <= bbox[0] and bbox[2] <= x_max and y_min <= bbox[1] and bbox[3] <= y_max) \
+                    or polygons_overlap(vertices, rect):
+                hits.append(row)
+        return hits
+
+    def query_polygon(self, vertices: Sequence[Vertex]) -> List[int]:
+        """
+        查询与多边形重叠的Map（多边形Map：边相交或包含；单点Map：点在多边形内）
+
+        Args:
+            vertices: 查询多边形顶点
+
+        Returns:
+            List[int]: 行号（升序）
+        """
+        vertices = [(float(x), float(y)) for x, y in vertices]
+        if len(vertices) < 3:
+            return []
+        hits = []
+        for row in self._candidates(polygon_bbox(vertices)):
+            row_vertices = self._vertices[row]
+            if row_vertices is None:
+                px, py, _, _ = self._bboxes[row]
+                if point_in_polygon(px, py, vertices):
+                    hits.append(row)
+            elif polygons_overlap(row_vertices, vertices):
+                hits.append(row)
+        return hits
+
+    def bbox_candidates(self, bbox: BBox) -> List[int]:
+        """只做外接矩形预筛的候选行号（调用方自行做精确判断时使用）"""
+        return self._candidates(bbox)
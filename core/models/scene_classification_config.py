@@ -14,6 +14,8 @@ from typing import Dict, Any
 import json
 from pathlib import Path
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,6 +90,32 @@ class SceneClassificationConfig:
             logger.error(f"==liuq debug== 场景分类失败: {e}")
             return 'indoor'
     
+    def classify_scenes_by_rules(self, bv_min: Any, ir_ratio: Any, alias_names: Any = None) -> np.ndarray:
+        """
+        批量场景分类（规则与classify_scene_by_rules一致）
+
+        Args:
+            bv_min: BV最小值数组
+            ir_ratio: IR比值（ir_min）数组
+            alias_names: 别名数组（可选，关键词优先）
+
+        Returns:
+            场景类型数组（object类型，元素为'outdoor'、'indoor'或'night'）
+        """
+        bv_min = np.asarray(bv_min, dtype=np.float64)
+        ir_ratio = np.asarray(ir_ratio, dtype=np.float64)
+
+        scenes = np.full(bv_min.shape, 'indoor', dtype=object)
+        scenes[(bv_min > self.bv_outdoor_threshold) | (ir_ratio > self.ir_outdoor_threshold)] = 'outdoor'
+        scenes[bv_min < self.bv_indoor_min] = 'night'
+
+        if alias_names is not None:
+            aliases = np.char.lower(np.asarray([str(alias or '') for alias in alias_names], dtype=str))
+            # 按优先级从低到高覆盖：outdoor > indoor > night
+            for keyword in ('night', 'indoor', 'outdoor'):
+                scenes[np.char.find(aliases, keyword) >= 0] = keyword
+        return scenes
+
     def validate_config(self) -> Dict[str, Any]:
         """
         验证配置的有效性
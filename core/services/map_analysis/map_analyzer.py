@@ -16,10 +16,10 @@ Action: Added; Timestamp: 2025-07-25 17:51:00 +08:00; Reason: P1-LD-004 实现XM
 
 import logging
 import numpy as np
-from typing import Dict, List, Any, Tuple
+from typing import Dict, Any
 from datetime import datetime
 
-from core.models.map_data import MapConfiguration, MapPoint, AnalysisResult, SceneType, MapType
+from core.models.map_data import MapConfiguration, AnalysisResult, SceneType, MapType
 from core.interfaces.report_generator import IReportDataProvider, IVisualizationProvider
 
 logger = logging.getLogger(__name__)
@@ -100,22 +100,25 @@ class MapAnalyzer(IReportDataProvider, IVisualizationProvider):
         """分析场景统计"""
         try:
             scene_stats = {}
+            table = self.configuration.get_point_table()
             
             for scene_type in SceneType:
-                scene_points = self.configuration.get_map_points_by_scene(scene_type)
+                mask = table.scene_mask(scene_type)
                 
-                if scene_points:
-                    weights = [mp.weight for mp in scene_points]
-                    coordinates = [(mp.x, mp.y) for mp in scene_points]
+                if mask.any():
+                    weights = table['weight'][mask]
+                    x_coords = table['x'][mask]
+                    y_coords = table['y'][mask]
                     
                     scene_stats[scene_type.value] = {
-                        'count': len(scene_points),
+                        'count': int(np.count_nonzero(mask)),
                         'avg_weight': np.mean(weights),
                         'max_weight': np.max(weights),
                         'min_weight': np.min(weights),
                         'weight_std': np.std(weights),
-                        'coordinate_bounds': self._get_coordinate_bounds(coordinates),
-                        'map_types': self._count_map_types(scene_points)
+                        'coordinate_bounds': ((float(x_coords.min()), float(x_coords.max())),
+                                              (float(y_coords.min()), float(y_coords.max()))),
+                        'map_types': table.map_type_counts(mask)
                     }
                 else:
                     scene_stats[scene_type.value] = {
@@ -141,19 +144,19 @@ class MapAnalyzer(IReportDataProvider, IVisualizationProvider):
             if not self.configuration.map_points:
                 return {}
             
-            coordinates = [(mp.x, mp.y) for mp in self.configuration.map_points]
-            x_coords = [coord[0] for coord in coordinates]
-            y_coords = [coord[1] for coord in coordinates]
+            table = self.configuration.get_point_table()
+            x_coords = table['x']
+            y_coords = table['y']
             
             analysis = {
-                'total_points': len(coordinates),
-                'x_range': (min(x_coords), max(x_coords)),
-                'y_range': (min(y_coords), max(y_coords)),
+                'total_points': len(table),
+                'x_range': (float(x_coords.min()), float(x_coords.max())),
+                'y_range': (float(y_coords.min()), float(y_coords.max())),
                 'x_center': np.mean(x_coords),
                 'y_center': np.mean(y_coords),
                 'x_std': np.std(x_coords),
                 'y_std': np.std(y_coords),
-                'density_analysis': self._calculate_density_analysis(coordinates)
+                'density_analysis': self._calculate_density_analysis(len(table))
             }
             
 
@@ -169,7 +172,8 @@ class MapAnalyzer(IReportDataProvider, IVisualizationProvider):
             if not self.configuration.map_points:
                 return {}
             
-            weights = [mp.weight for mp in self.configuration.map_points]
+            weights = self.configuration.get_point_table()['weight']
+            percentiles = np.percentile(weights, [25, 50, 75, 90, 95])
             
             analysis = {
                 'total_points': len(weights),
@@ -179,11 +183,11 @@ class MapAnalyzer(IReportDataProvider, IVisualizationProvider):
                 'min': np.min(weights),
                 'max': np.max(weights),
                 'percentiles': {
-                    '25': np.percentile(weights, 25),
-                    '50': np.percentile(weights, 50),
-                    '75': np.percentile(weights, 75),
-                    '90': np.percentile(weights, 90),
-                    '95': np.percentile(weights, 95)
+                    '25': percentiles[0],
+                    '50': percentiles[1],
+                    '75': percentiles[2],
+                    '90': percentiles[3],
+                    '95': percentiles[4]
                 },
                 'distribution': self._analyze_weight_distribution(weights)
             }
@@ -218,12 +222,14 @@ class MapAnalyzer(IReportDataProvider, IVisualizationProvider):
         """获取散点图数据"""
         try:
             datasets = []
+            table = self.configuration.get_point_table()
             
             # 按场景类型分组
             for scene_type in SceneType:
-                scene_points = self.configuration.get_map_points_by_scene(scene_type)
-                if scene_points:
-                    data_points = [{'x': mp.x, 'y': mp.y} for mp in scene_points]
+                mask = table.scene_mask(scene_type)
+                if mask.any():
+                    data_points = [{'x': x, 'y': y}
+                                   for x, y in zip(table['x'][mask].tolist(), table['y'][mask].tolist())]
                     datasets.append({
                         'label': f'{scene_type.value}场景',
                         'data': data_points
@@ -247,15 +253,11 @@ class MapAnalyzer(IReportDataProvider, IVisualizationProvider):
                 return {}
             
             # 创建权重网格
-            coordinates = [(mp.x, mp.y) for mp in self.configuration.map_points]
-            weights = [mp.weight for mp in self.configuration.map_points]
+            table = self.configuration.get_point_table()
+            weights = table['weight']
             
             # 简化的热力图数据（实际应用中可能需要更复杂的插值）
-            x_coords = [coord[0] for coord in coordinates]
-            y_coords = [coord[1] for coord in coordinates]
-            
-            x_min, x_max = min(x_coords), max(x_coords)
-            y_min, y_max = min(y_coords), max(y_coords)
+            (x_min, x_max), (y_min, y_max) = table.coordinate_bounds()
             
             # 创建网格
             grid_size = 10
@@ -271,7 +273,7 @@ class MapAnalyzer(IReportDataProvider, IVisualizationProvider):
                 row = []
                 for j in range(grid_size):
                     # 简单的权重分配（可以改进为更复杂的插值）
-                    weight_sum = sum(weights) / len(weights) if weights else 0
+                    weight_sum = float(weights.mean()) if len(weights) else 0
                     row.append(weight_sum * np.random.uniform(0.5, 1.5))
                 values.append(row)
             
@@ -323,38 +325,15 @@ class MapAnalyzer(IReportDataProvider, IVisualizationProvider):
                 return {}
             
             # 统计各参数的范围
-            bv_ranges = [mp.bv_range for mp in self.configuration.map_points]
-            ir_ranges = [mp.ir_range for mp in self.configuration.map_points]
-            cct_ranges = [mp.cct_range for mp in self.configuration.map_points]
-            
-            ranges = []
-            
-            if bv_ranges:
-                bv_mins = [r[0] for r in bv_ranges]
-                bv_maxs = [r[1] for r in bv_ranges]
-                ranges.append({
-                    'label': 'BV范围',
-                    'min': min(bv_mins),
-                    'max': max(bv_maxs)
-                })
-            
-            if ir_ranges:
-                ir_mins = [r[0] for r in ir_ranges]
-                ir_maxs = [r[1] for r in ir_ranges]
-                ranges.append({
-                    'label': 'IR范围',
-                    'min': min(ir_mins),
-                    'max': max(ir_maxs)
-                })
-            
-            if cct_ranges:
-                cct_mins = [r[0] for r in cct_ranges]
-                cct_maxs = [r[1] for r in cct_ranges]
-                ranges.append({
-                    'label': 'CCT范围',
-                    'min': min(cct_mins),
-                    'max': max(cct_maxs)
-                })
+            table = self.configuration.get_point_table()
+            ranges = [
+                {
+                    'label': label,
+                    'min': float(table[f'{prefix}_min'].min()),
+                    'max': float(table[f'{prefix}_max'].max())
+                }
+                for label, prefix in (('BV范围', 'bv'), ('IR范围', 'ir'), ('CCT范围', 'cct'))
+            ]
             
             return {
                 'title': 'Map触发条件范围图',
@@ -394,40 +373,21 @@ class MapAnalyzer(IReportDataProvider, IVisualizationProvider):
         return self.analysis_result.get_summary()
     
     # 辅助方法
-    def _get_coordinate_bounds(self, coordinates: List[Tuple[float, float]]) -> Tuple[Tuple[float, float], Tuple[float, float]]:
-        """获取坐标边界"""
-        if not coordinates:
-            return ((0, 0), (0, 0))
-        
-        x_coords = [coord[0] for coord in coordinates]
-        y_coords = [coord[1] for coord in coordinates]
-        
-        return ((min(x_coords), max(x_coords)), (min(y_coords), max(y_coords)))
-    
-    def _count_map_types(self, map_points: List[MapPoint]) -> Dict[str, int]:
-        """统计Map类型"""
-        type_counts = {'enhance': 0, 'reduce': 0}
-        
-        for mp in map_points:
-            type_counts[mp.map_type.value] += 1
-        
-        return type_counts
-    
-    def _calculate_density_analysis(self, coordinates: List[Tuple[float, float]]) -> Dict[str, Any]:
+    def _calculate_density_analysis(self, point_count: int) -> Dict[str, Any]:
         """计算密度分析"""
         # 简化的密度分析
         return {
-            'high_density_areas': len(coordinates) // 4,  # 简化计算
-            'sparse_areas': len(coordinates) // 8,
-            'cluster_count': max(1, len(coordinates) // 10)
+            'high_density_areas': point_count // 4,  # 简化计算
+            'sparse_areas': point_count // 8,
+            'cluster_count': max(1, point_count // 10)
         }
     
-    def _analyze_weight_distribution(self, weights: List[float]) -> Dict[str, Any]:
+    def _analyze_weight_distribution(self, weights: np.ndarray) -> Dict[str, Any]:
         """分析权重分布"""
         # 权重分布分析
-        high_weight = sum(1 for w in weights if w > 0.7)
-        medium_weight = sum(1 for w in weights if 0.3 <= w <= 0.7)
-        low_weight = sum(1 for w in weights if w < 0.3)
+        high_weight = int(np.count_nonzero(weights > 0.7))
+        medium_weight = int(np.count_nonzero((weights >= 0.3) & (weights <= 0.7)))
+        low_weight = int(np.count_nonzero(weights < 0.3))
         
         return {
             'high_weight_count': high_weight,
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Map触发模拟器
+==liuq debug== FastMapV2 批量EXIF样本 × Map点的触发与权重矩阵
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.1
+描述: 输入每张图片的BV、IR、CCT/Ctemp、AC、count、ColorCCT、diffCtemp、FaceCtemp、检测标志与RpG/BpG数组，
+      基于MapPointTable的列一次性广播计算全部Map的范围窗口、tran过渡窗口与多边形包含关系，
+      得到样本×Map的触发矩阵与权重矩阵，用于对比不同设备/配置下同一批图片触发的Map差异
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from core.models.map_data import MapConfiguration
+
+logger = logging.getLogger(__name__)
+
+# 条件维度 → tran列前缀（None表示该维度没有tran过渡窗口）
+CONDITION_DIMENSIONS: Dict[str, Optional[str]] = {
+    'bv': 'bv',
+    'ir': 'ir',
+    'cct': None,
+    'ctemp': 'ctemp',
+    'ac': 'ac',
+    'count': 'count',
+    'color_cct': 'color_cct',
+    'diff_ctemp': 'diff_ctemp',
+    'face_ctemp': 'face_ctemp',
+    'e_ratio': None,
+}
+
+# 条件名 → EXIF CSV列名（EXIF导出中的实际列名；表中没有的列不参与判断）
+# count、color_cct、diff_ctemp在EXIF导出中没有对应列，需要时由调用方通过columns参数指定，
+# 例如 dict(DEFAULT_CONDITION_COLUMNS, count='my_count_column')
+DEFAULT_CONDITION_COLUMNS: Dict[str, str] = {
+    'bv': 'meta_data_currentFrame_bv',
+    'ir': 'color_sensor_irRatio',
+    'cct': 'color_sensor_sensorCct',
+    'ctemp': 'meta_data_currentFrame_ctemp',
+    'ac': 'color_sensor_acRatio',
+    'face_ctemp': 'face_info_final_skin_cct',
+    'e_ratio': 'ealgo_data_eRatio',
+    'rpg': 'ealgo_data_SGW_gray_RpG',
+    'bpg': 'ealgo_data_SGW_gray_BpG',
+}
+
+
+def _to_float_array(values: Any) -> np.ndarray:
+    """转为float64数组，无法转换的值（空串、None、文本）记为NaN"""
+    try:
+        return np.asarray(values, dtype=np.float64).reshape(-1)
+    except (TypeError, ValueError):
+        result = []
+        for value in values:
+            try:
+                result.append(float(value))
+            except (TypeError, ValueError):
+                result.append(np.nan)
+        return np.asarray(result, dtype=np.float64)
+
+
+def conditions_from_table(table: Any, columns: Optional[Mapping[str, str]] = None) -> Dict[str, np.ndarray]:
+    """
+    从EXIF CSV数据提取模拟条件
+
+    Args:
+        table: pandas.DataFrame、{列名: 值序列}字典或csv.DictReader得到的行字典列表
+        columns: 条件名 → 列名，默认DEFAULT_CONDITION_COLUMNS（不含count、color_cct、diff_ctemp，
+            需要这些维度时传入完整映射）；另可包含'detect'
+
+    Returns:
+        Dict[str, np.ndarray]: 条件名 → float64数组（表中不存在的列被跳过）
+    """
+    columns = DEFAULT_CONDITION_COLUMNS if columns is None else columns
+    if isinstance(table, list):
+        rows = table
+        table = {column: [row.get(column) for row in rows] for column in set(columns.values())
+                 if any(column in row for row in rows[:1])}
+    conditions = {}
+    for name, column in columns.items():
+        if column in table:
+            conditions[name] = _to_float_array(table[column])
+    return conditions
+
+
+def _points_in_polygon(x: np.ndarray, y: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """射线法判断多个点是否在多边形内（点×边广播）"""
+    if len(vertices) < 3:
+        return np.zeros(len(x), dtype=bool)
+    x1, y1 = vertices[:, 0], vertices[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    px, py = x[:, None], y[:, None]
+    straddle = (y1 > py) != (y2 > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing_x = (x2 - x1) * (py - y1) / (y2 - y1) + x1
+    crosses = straddle & (px < crossing_x)
+    return (np.count_nonzero(crosses, axis=1) % 2).astype(bool)
+
+
+@dataclass
+class MapTriggerResult:
+    """
+    触发模拟结果
+
+    hits/core_hits/factors/weights均为(样本数, Map数)数组，列顺序与alias_names一致
+    """
+    alias_names: List[str]
+    hits: np.ndarray        # 触发（全部窗口因子>0且满足多边形/检测条件）
+    core_hits: np.ndarray   # 落在全部主范围窗口内（不含tran过渡区）
+    factors: np.ndarray     # 各维度过渡因子的乘积（0~1）
+    weights: np.ndarray     # factors × Map权重（未触发为0）
+
+    @property
+    def sample_count(self) -> int:
+        return self.hits.shape[0]
+
+    def hit_counts(self) -> Dict[str, int]:
+        """每个Map被触发的样本数"""
+        return dict(zip(self.alias_names, np.count_nonzero(self.hits, axis=0).tolist()))
+
+    def maps_for_sample(self, sample: int) -> List[str]:
+        """某个样本触发的Map别名（按Map顺序）"""
+        return [self.alias_names[column] for column in np.flatnonzero(self.hits[sample])]
+
+    def compare(self, other: 'MapTriggerResult') -> List[Dict[str, List[str]]]:
+        """
+        与另一配置对同一批样本的结果按别名对比
+
+        Returns:
+            List[Dict]: 每个样本 {'only_self': 只在本结果触发的别名, 'only_other': 只在other触发的别名}；
+            只存在于一方配置中的别名视为另一方未触发
+        """
+        if other.sample_count != self.sample_count:
+            raise ValueError(f"样本数不一致: {self.sample_count} != {other.sample_count}")
+        aliases = list(dict.fromkeys(self.alias_names + other.alias_names))
+        mine = self._aligned_hits(aliases)
+        theirs = other._aligned_hits(aliases)
+        only_self = mine & ~theirs
+        only_other = theirs & ~mine
+        names = np.array(aliases, dtype=object)
+        return [{'only_self': names[only_self[sample]].tolist(), 'only_other': names[only_other[sample]].tolist()}
+                for sample in range(self.sample_count)]
+
+    def _aligned_hits(self, aliases: Sequence[str]) -> np.ndarray:
+        columns = {}
+        for column, alias in enumerate(self.alias_names):
+            columns.setdefault(alias, column)
+        aligned = np.zeros((self.sample_count, len(aliases)), dtype=bool)
+        for position, alias in enumerate(aliases):
+            if alias in columns:
+                aligned[:, position] = self.hits[:, columns[alias]]
+        return aligned
+
+
+class MapTriggerSimulator:
+    """
+    Map触发模拟器
+
+    判定规则（每个Map、每个样本）：
+    - 每个条件维度：值在[min, max]内因子为1；tran下限低于min时在[tran_min, min)线性由0升到1，
+      tran上限高于max时在(max, tran_max]线性由1降到0；其余为0
+    - 样本该维度值为NaN（CSV缺列/空值）或Map该范围为空时，该维度不参与判断
+    - 多边形Map要求样本(RpG, BpG)落在多边形内（提供rpg/bpg时）
+    - 提供detect时，detect_flag为真的Map只在样本检测标志非0时触发
+    """
+
+    def __init__(self, configuration: MapConfiguration):
+        """
+        Args:
+            configuration: Map配置（使用其列式视图，Map修改后再次模拟会自动同步）
+        """
+        self.configuration = configuration
+
+    def simulate(self, conditions: Mapping[str, Any]) -> MapTriggerResult:
+        """
+        对一批样本执行触发模拟
+
+        Args:
+            conditions: 条件名 → 长度为样本数的数组；条件名见CONDITION_DIMENSIONS，另有'rpg'、'bpg'、'detect'
+
+        Returns:
+            MapTriggerResult: 样本×Map结果
+        """
+        table = self.configuration.get_point_table()
+        arrays = {name: _to_float_array(values) for name, values in conditions.items()}
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"条件数组长度不一致: { {name: len(v) for name, v in arrays.items()} }")
+        sample_count = lengths.pop() if lengths else 0
+        map_count = len(table)
+
+        factors = np.ones((sample_count, map_count), dtype=np.float64)
+        core = np.ones((sample_count, map_count), dtype=bool)
+        for dimension, tran_prefix in CONDITION_DIMENSIONS.items():
+            values = arrays.get(dimension)
+            if values is None:
+                continue
+            dimension_factors, dimension_core = self._window_factors(table, dimension, tran_prefix, values)
+            factors *= dimension_factors
+            core &= dimension_core
+
+        allowed = np.ones((sample_count, map_count), dtype=bool)
+        if 'rpg' in arrays and 'bpg' in arrays:
+            allowed &= self._polygon_membership(table, arrays['rpg'], arrays['bpg'])
+        if 'detect' in arrays:
+            detect_flags = np.array([bool(point.detect_flag) for point in table.points], dtype=bool)
+            sample_detected = np.nan_to_num(arrays['detect'], nan=0.0) != 0
+            allowed &= ~detect_flags[None, :] | sample_detected[:, None]
+
+        factors *= allowed
+        hits = factors > 0
+        weights = factors * table['weight'][None, :]
+        logger.info(f"==liuq debug== Map触发模拟: {sample_count} 个样本 × {map_count} 个Map, "
+                    f"触发 {int(np.count_nonzero(hits))} 次")
+        return MapTriggerResult(alias_names=table.alias_names.tolist(), hits=hits, core_hits=core & allowed,
+                                factors=factors, weights=weights)
+
+    def simulate_table(self, table: Any, columns: Optional[Mapping[str, str]] = None) -> MapTriggerResult:
+        """从EXIF CSV数据（DataFrame/列字典/行字典列表）提取条件后模拟，参见conditions_from_table"""
+        return self.simulate(conditions_from_table(table, columns))
+
+    @staticmethod
+    def _window_factors(table, dimension: str, tran_prefix: Optional[str], values: np.ndarray):
+        """一个维度的(过渡因子, 是否在主窗口内)，形状均为(样本数, Map数)"""
+        low, high = table[f'{dimension}_min'][None, :], table[f'{dimension}_max'][None, :]
+        v = values[:, None]
+        unconstrained = np.isnan(v) | np.isnan(low) | np.isnan(high)
+        inside = (low <= v) & (v <= high)
+        factors = inside.astype(np.float64)
+
+        if tran_prefix is not None:
+            tran_low = table[f'tran_{tran_prefix}_min'][None, :]
+            tran_high = table[f'tran_{tran_prefix}_max'][None, :]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rising = (tran_low < low) & (tran_low <= v) & (v < low)
+                factors = np.where(rising, (v - tran_low) / (low - tran_low), factors)
+                falling = (tran_high > high) & (high < v) & (v <= tran_high)
+                factors = np.where(falling, (tran_high - v) / (tran_high - high), factors)
+
+        factors = np.where(unconstrained, 1.0, factors)
+        return factors, inside | unconstrained
+
+    @staticmethod
+    def _polygon_membership(table, rpg: np.ndarray, bpg: np.ndarray) -> np.ndarray:
+        """多边形Map列为样本是否落在多边形内，其余列全为True；RpG/BpG缺失的样本不受限制"""
+        membership = np.ones((len(rpg), len(table)), dtype=bool)
+        known = ~(np.isnan(rpg) | np.isnan(bpg))
+        for row in np.flatnonzero(table.is_polygon):
+            vertices = table.polygon(row)
+            if len(vertices) >= 3:
+                membership[known, row] = _points_in_polygon(rpg[known], bpg[known], vertices)
+        return membership
@@ -14,6 +14,7 @@ from datetime import datetime
 import numpy as np
 
 from core.models.map_data import MapConfiguration, MapPoint, SceneType
+from core.models.map_point_table import SCENE_TYPES
 from core.models.scene_classification_config import SceneClassificationConfig
 from core.services.map_analysis.temperature_span_analyzer import TemperatureSpanAnalyzer
 
@@ -110,25 +111,20 @@ class MultiDimensionalAnalyzer:
             }
 
             total_maps = len(self.configuration.map_points)
+            table, bv_min, ir_ratio, scene_types = self._classify_scenes()
+            original_scene_types = self._original_scene_types(table)
 
-            for map_point in self.configuration.map_points:
-                # 获取BV和IR参数
-                bv_min = map_point.bv_range[0] if map_point.bv_range else 0.0
-                ir_ratio = map_point.ir_range[0] if map_point.ir_range else 0.0  # 直接使用ir_min
-
-                # 使用配置的规则进行分类
-                scene_type = self.classification_config.classify_scene_by_rules(
-                    bv_min, ir_ratio, map_point.alias_name
-                )
-
+            rows = zip(table.alias_names.tolist(), bv_min.tolist(), ir_ratio.tolist(), table['weight'].tolist(),
+                       table['x'].tolist(), table['y'].tolist(), scene_types.tolist(), original_scene_types)
+            for alias_name, bv, ir, weight, x, y, scene_type, original_scene_type in rows:
                 # 构建Map信息
                 map_info = {
-                    'alias_name': map_point.alias_name,
-                    'bv_min': bv_min,
-                    'ir_ratio': ir_ratio,
-                    'weight': map_point.weight,
-                    'coordinates': (map_point.x, map_point.y),
-                    'original_scene_type': map_point.scene_type.value if hasattr(map_point.scene_type, 'value') else str(map_point.scene_type)
+                    'alias_name': alias_name,
+                    'bv_min': bv,
+                    'ir_ratio': ir,
+                    'weight': weight,
+                    'coordinates': (x, y),
+                    'original_scene_type': original_scene_type
                 }
 
                 # 添加到对应场景
@@ -149,50 +145,23 @@ class MultiDimensionalAnalyzer:
     def _analyze_parameters(self) -> Dict[str, Any]:
         """分析参数分布"""
         try:
-            bv_values = []
-            ir_values = []
-            weight_values = []
-
-            for map_point in self.configuration.map_points:
-                if map_point.bv_range:
-                    bv_values.append(map_point.bv_range[0])
-                ir_values.append(map_point.ir_range[0] if map_point.ir_range else 0.0)  # 使用ir_min
-                weight_values.append(map_point.weight)
+            table = self.configuration.get_point_table()
+            bv_values = table['bv_min']
+            bv_values = bv_values[~np.isnan(bv_values)]  # 缺少BV范围的Map不参与BV统计
+            ir_values = np.nan_to_num(table['ir_min'], nan=0.0)  # 使用ir_min
+            weight_values = table['weight']
 
             parameter_stats = {}
-
-            # BV参数统计
-            if bv_values:
-                parameter_stats['bv_min'] = {
-                    'min': float(np.min(bv_values)),
-                    'max': float(np.max(bv_values)),
-                    'mean': float(np.mean(bv_values)),
-                    'std': float(np.std(bv_values)),
-                    'median': float(np.median(bv_values)),
-                    'distribution': self._get_distribution_info(bv_values)
-                }
-
-            # IR参数统计
-            if ir_values:
-                parameter_stats['ir_min'] = {
-                    'min': float(np.min(ir_values)),
-                    'max': float(np.max(ir_values)),
-                    'mean': float(np.mean(ir_values)),
-                    'std': float(np.std(ir_values)),
-                    'median': float(np.median(ir_values)),
-                    'distribution': self._get_distribution_info(ir_values)
-                }
-
-            # 权重统计
-            if weight_values:
-                parameter_stats['weight'] = {
-                    'min': float(np.min(weight_values)),
-                    'max': float(np.max(weight_values)),
-                    'mean': float(np.mean(weight_values)),
-                    'std': float(np.std(weight_values)),
-                    'median': float(np.median(weight_values)),
-                    'distribution': self._get_distribution_info(weight_values)
-                }
+            for name, values in (('bv_min', bv_values), ('ir_min', ir_values), ('weight', weight_values)):
+                if len(values):
+                    parameter_stats[name] = {
+                        'min': float(np.min(values)),
+                        'max': float(np.max(values)),
+                        'mean': float(np.mean(values)),
+                        'std': float(np.std(values)),
+                        'median': float(np.median(values)),
+                        'distribution': self._get_distribution_info(values)
+                    }
 
             return parameter_stats
 
@@ -204,38 +173,28 @@ class MultiDimensionalAnalyzer:
         """分析分类准确性"""
         try:
             total_maps = len(self.configuration.map_points)
-            consistent_count = 0
-            inconsistent_maps = []
-
-            for map_point in self.configuration.map_points:
-                bv_min = map_point.bv_range[0] if map_point.bv_range else 0.0
-                ir_ratio = map_point.ir_range[0] if map_point.ir_range else 0.0  # 使用ir_min
-
-                # 新分类结果
-                new_classification = self.classification_config.classify_scene_by_rules(
-                    bv_min, ir_ratio, map_point.alias_name
-                )
-
-                # 原始分类结果
-                original_classification = map_point.scene_type.value if hasattr(map_point.scene_type, 'value') else str(map_point.scene_type)
-
-                if new_classification == original_classification:
-                    consistent_count += 1
-                else:
-                    inconsistent_maps.append({
-                        'alias_name': map_point.alias_name,
-                        'original': original_classification,
-                        'new': new_classification,
-                        'bv_min': bv_min,
-                        'ir_ratio': ir_ratio
-                    })
+            table, bv_min, ir_ratio, new_classification = self._classify_scenes()
+            original_classification = np.array(self._original_scene_types(table), dtype=object)
+
+            inconsistent_rows = np.flatnonzero(new_classification != original_classification)
+            consistent_count = total_maps - len(inconsistent_rows)
+            inconsistent_maps = [
+                {
+                    'alias_name': table.alias_names[row],
+                    'original': original_classification[row],
+                    'new': new_classification[row],
+                    'bv_min': float(bv_min[row]),
+                    'ir_ratio': float(ir_ratio[row])
+                }
+                for row in inconsistent_rows[:10]
+            ]
 
             accuracy = (consistent_count / total_maps * 100) if total_maps > 0 else 0
 
             return {
                 'total_maps': total_maps,
                 'consistent_count': consistent_count,
-                'inconsistent_count': len(inconsistent_maps),
+                'inconsistent_count': len(inconsistent_rows),
                 'accuracy_percentage': accuracy,
                 'inconsistent_maps': inconsistent_maps[:10]  # 只返回前10个不一致的案例
             }
@@ -244,6 +203,26 @@ class MultiDimensionalAnalyzer:
             logger.error(f"==liuq debug== 分类准确性分析失败: {e}")
             return {}
 
+    def _classify_scenes(self) -> Tuple[Any, np.ndarray, np.ndarray, np.ndarray]:
+        """按配置规则批量分类全部Map，返回(列式视图, bv_min, ir_min, 场景数组)"""
+        table = self.configuration.get_point_table()
+        bv_min = np.nan_to_num(table['bv_min'], nan=0.0)
+        ir_ratio = np.nan_to_num(table['ir_min'], nan=0.0)  # 直接使用ir_min
+        scene_types = self.classification_config.classify_scenes_by_rules(bv_min, ir_ratio, table.alias_names)
+        return table, bv_min, ir_ratio, scene_types
+
+    def _original_scene_types(self, table) -> List[str]:
+        """Map点自身的场景类型字符串（按行顺序）"""
+        names = np.array([scene_type.value for scene_type in SCENE_TYPES] + [None], dtype=object)
+        original = names[table.scene_codes].tolist()
+        unknown_rows = np.flatnonzero(table.scene_codes < 0)
+        if len(unknown_rows):
+            # 非SceneType枚举值（如字符串）按原值输出
+            points = table.points
+            for row in unknown_rows:
+                original[row] = str(points[row].scene_type)
+        return original
+
     def _generate_summary_statistics(self, scene_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """生成统计摘要"""
         try:
@@ -273,10 +252,10 @@ class MultiDimensionalAnalyzer:
             logger.error(f"==liuq debug== 统计摘要生成失败: {e}")
             return {}
 
-    def _get_distribution_info(self, values: List[float]) -> Dict[str, Any]:
+    def _get_distribution_info(self, values: np.ndarray) -> Dict[str, Any]:
         """获取数值分布信息"""
         try:
-            if not values:
+            if len(values) == 0:
                 return {}
 
             # 计算分位数
@@ -10,21 +10,19 @@
 
 ==liuq debug== 本模块复用GUI等色温带绘制与筛选所用的扇形判断逻辑，确保一致性
 """
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple
 import logging
+import operator
 
-from core.models.map_data import MapConfiguration
-from utils.white_points import (
-    REFERENCE_INTERVALS,
-    is_in_temperature_sector,
-)
+import numpy as np
+
+from core.models.map_data import EDIT_SEQUENCE, MapConfiguration
+from utils.white_points import TemperatureSectorTable, get_temperature_sector_table, points_in_triangles
 
 logger = logging.getLogger(__name__)
 
 
 # --- 多边形面积与裁剪工具（Sutherland–Hodgman），用于精确相交判定 ---
-from typing import Optional
-
 _MIN_INTERSECT_RATIO = 0.01  # 大于1%视为相交
 _EPS = 1e-12
 
@@ -94,20 +92,186 @@ def _clip_polygon(subject: List[Tuple[float, float]], clipper: List[Tuple[float,
             s = e
     return output
 
+
+# --- 批量几何内核：全部(多边形, 扇形)组合一次性计算，结果与上面的逐个计算逐位一致 ---
+
+def _pad_polygons(polygons: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """多边形顶点左对齐填充为(N, M, 2)数组，返回(顶点, 顶点数)"""
+    counts = np.array([len(polygon) for polygon in polygons], dtype=np.intp)
+    padded = np.zeros((len(polygons), int(counts.max(initial=0)), 2), dtype=np.float64)
+    for row, polygon in enumerate(polygons):
+        padded[row, :len(polygon)] = polygon
+    return padded, counts
+
+def _batch_signed_areas(vertices: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """批量有向面积：按顶点顺序逐项累加（与_signed_area一致），顶点数<3为0"""
+    rows = np.arange(len(counts))
+    total = np.zeros(len(counts), dtype=np.float64)
+    with np.errstate(invalid='ignore', over='ignore'):
+        for i in range(vertices.shape[1]):
+            j = np.where(i + 1 < counts, i + 1, 0)
+            term = vertices[:, i, 0] * vertices[rows, j, 1] - vertices[rows, j, 0] * vertices[:, i, 1]
+            total = np.where(i < counts, total + term, total)
+    return np.where(counts >= 3, 0.5 * total, 0.0)
+
+def _batch_clip(subjects: np.ndarray, counts: np.ndarray, clippers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量Sutherland–Hodgman裁剪（与_clip_polygon逐个计算一致）
+
+    Args:
+        subjects: (N, M, 2) 被裁剪多边形顶点（左对齐填充）
+        counts: (N,) 各多边形顶点数
+        clippers: (N, C, 2) 已转为逆时针的裁剪多边形
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 裁剪结果顶点(N, M', 2)与顶点数(N,)
+    """
+    output = subjects
+    counts = np.where(counts >= 3, counts, 0)
+    rows = np.arange(len(counts))[:, None]
+    edges = clippers.shape[1]
+    for i in range(edges):
+        ax, ay = clippers[:, i, 0, None], clippers[:, i, 1, None]
+        bx, by = clippers[:, (i + 1) % edges, 0, None], clippers[:, (i + 1) % edges, 1, None]
+        width = output.shape[1]
+        positions = np.arange(width)[None, :]
+        valid = positions < counts[:, None]
+        previous = np.where(positions == 0, np.maximum(counts[:, None] - 1, 0), positions - 1)
+        ex, ey = output[:, :, 0], output[:, :, 1]
+        sx, sy = output[rows, previous, 0], output[rows, previous, 1]
+
+        e_inside = ((bx - ax) * (ey - ay) - (by - ay) * (ex - ax)) >= -_EPS
+        s_inside = ((bx - ax) * (sy - ay) - (by - ay) * (sx - ax)) >= -_EPS
+        dx1, dy1 = ex - sx, ey - sy
+        dx2, dy2 = bx - ax, by - ay
+        denom = dx1 * dy2 - dy1 * dx2
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            t = ((ax - sx) * dy2 - (ay - sy) * dx2) / denom
+            intersections = np.stack([sx + t * dx1, sy + t * dy1], axis=-1)
+
+        # 每个输入顶点最多输出(交点, 顶点)两个点，按原顺序稳定压缩
+        keep = np.stack([valid & (e_inside != s_inside) & ~(np.abs(denom) < _EPS), valid & e_inside], axis=2)
+        candidates = np.stack([intersections, output], axis=2).reshape(len(counts), 2 * width, 2)
+        keep = keep.reshape(len(counts), 2 * width)
+        counts = np.count_nonzero(keep, axis=1)
+        order = np.argsort(~keep, axis=1, kind='stable')[:, :int(counts.max(initial=0))]
+        output = np.take_along_axis(candidates, order[:, :, None], axis=1)
+    return output, counts
+
 class TemperatureSpanAnalyzer:
     """
     色温段跨度分析器
 
     使用与GUI绘制一致的“右上角扇形”判定方式统计跨越段。
+    每个Map点的结果按修改序号缓存，再次分析时只重算几何发生变化的Map点。
     """
 
-    def __init__(self, configuration: MapConfiguration):
+    def __init__(self, configuration: MapConfiguration, anchors: Optional[Mapping[str, Tuple[float, float]]] = None):
+        """
+        Args:
+            configuration: Map配置
+            anchors: 等色温带锚点，None表示使用white_points.TEMPERATURE_ANCHORS
+        """
         self.configuration = configuration
+        self.anchors = anchors
+        self._points: List[Any] = []
+        self._spans: List[Tuple[List[Tuple[str, str]], List[str], Tuple[float, float]]] = []
+        self._synced_at = 0
+        self._geometry_key: Optional[tuple] = None
+        self._sectors: Optional[TemperatureSectorTable] = None
+        self._clippers: Optional[np.ndarray] = None
 
-    def analyze(self) -> Dict[str, Any]:
+    def sync(self) -> int:
+        """
+        与配置同步每个Map点的跨度：Map点增删或换序、基准点或锚点变化时全部重算，
+        否则只重算修改序号新于上次同步的Map点
+
+        Returns:
+            int: 重算的Map点数
+        """
+        map_points = self.configuration.map_points
+        bb = self.configuration.base_boundary
+        origin = None if bb is None else (float(bb.rpg), float(bb.bpg))
+        sectors = get_temperature_sector_table(self.anchors)
+        geometry_key = (sectors.key, origin)
+
+        synced_at = self._synced_at
+        self._synced_at = next(EDIT_SEQUENCE)
+        if (geometry_key != self._geometry_key or len(map_points) != len(self._points)
+                or not all(map(operator.is_, map_points, self._points))):
+            self._points = list(map_points)
+            self._spans = [None] * len(self._points)
+            self._geometry_key = geometry_key
+            self._sectors = sectors
+            self._clippers = np.array([_ensure_ccw([tuple(v) for v in tri]) for tri in sectors.vertices.tolist()],
+                                      dtype=np.float64).reshape(-1, 3, 2)
+            rows = list(range(len(self._points)))
+        else:
+            rows = [row for row, mp in enumerate(self._points) if getattr(mp, '_revision', 0) > synced_at]
+        if rows:
+            self._compute(rows, origin)
+        return len(rows)
+
+    def _compute(self, rows: List[int], origin: Optional[Tuple[float, float]]):
+        """批量计算指定行的跨度并写入缓存"""
+        points = [self._points[row] for row in rows]
+        intervals, vertices = self._sectors.intervals, self._sectors.vertices
+
+        # 统一绝对坐标：多边形使用重心绝对坐标，单点=base_boundary + offset
+        coords = []
+        polygon_rows, polygons = [], []
+        for i, mp in enumerate(points):
+            if mp.is_polygon and mp.polygon_vertices:
+                coords.append((float(mp.x), float(mp.y)))
+                try:
+                    polygons.append(np.array(mp.polygon_vertices, dtype=np.float64).reshape(-1, 2))
+                    polygon_rows.append(i)
+                except (TypeError, ValueError) as e:
+                    logger.debug(f"==liuq debug== 多边形顶点无效: {mp.alias_name} {e}")
+            elif origin is None:
+                coords.append((float(getattr(mp, 'x', 0.0)), float(getattr(mp, 'y', 0.0))))
+            else:
+                coords.append((origin[0] + float(getattr(mp, 'offset_x', 0.0)),
+                               origin[1] + float(getattr(mp, 'offset_y', 0.0))))
+
+        # 重心命中（扇形）
+        xy = np.array(coords, dtype=np.float64).reshape(-1, 2)
+        hits = points_in_triangles(xy[:, 0], xy[:, 1], vertices)
+
+        # 多边形：重心未命中时采用面积相交法（>1%阈值）；外接矩形与扇形不相交的组合面积交必为0，无需裁剪
+        if polygons and len(intervals):
+            subjects, counts = _pad_polygons(polygons)
+            mask = np.arange(subjects.shape[1])[None, :] < counts[:, None]
+            lo = np.where(mask[:, :, None], subjects, np.inf).min(axis=1)
+            hi = np.where(mask[:, :, None], subjects, -np.inf).max(axis=1)
+            sector_lo, sector_hi = vertices.min(axis=1), vertices.max(axis=1)
+            overlap = ((lo[:, None, :] <= sector_hi[None, :, :]) & (sector_lo[None, :, :] <= hi[:, None, :])).all(axis=2)
+            candidates = overlap & ~hits[polygon_rows] & (counts >= 3)[:, None]
+            pair_polygons, pair_sectors = np.nonzero(candidates)
+            if len(pair_polygons):
+                clipped, clipped_counts = _batch_clip(subjects[pair_polygons], counts[pair_polygons],
+                                                      self._clippers[pair_sectors])
+                inter_area = np.abs(_batch_signed_areas(clipped, clipped_counts))
+                poly_area = np.abs(_batch_signed_areas(subjects, counts))[pair_polygons]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ratio = np.where(poly_area > 0, inter_area / poly_area, 0.0)
+                matched = ratio > _MIN_INTERSECT_RATIO
+                hits[np.asarray(polygon_rows)[pair_polygons[matched]], pair_sectors[matched]] = True
+
+        for i, (row, mp) in enumerate(zip(rows, points)):
+            interval_keys = [intervals[k] for k in np.flatnonzero(hits[i])]
+            interval_names = [f"{a}-{b}" for a, b in interval_keys]
+            self._spans[row] = (interval_keys, interval_names, coords[i])
+            logger.debug("==liuq debug== 预计算: %s coords=(%.6f,%.6f) intervals=%s",
+                         mp.alias_name, coords[i][0], coords[i][1], ','.join(interval_names))
+
+    def analyze(self, incremental: bool = True) -> Dict[str, Any]:
         """
         执行跨度统计分析。
 
+        Args:
+            incremental: 为True时只重算自上次分析以来几何发生变化的Map点，False时全部重算
+
         Returns:
             Dict[str, Any]:
                 {
@@ -123,67 +287,18 @@ class TemperatureSpanAnalyzer:
                 }
         """
         try:
-            spans_by_map: Dict[str, Any] = {}
-
-            bb = self.configuration.base_boundary if self.configuration else None
-
-            for mp in self.configuration.map_points:
-                # 统一绝对坐标：多边形使用重心绝对坐标，单点=base_boundary + offset
-                if mp.is_polygon and mp.polygon_vertices:
-                    cx = float(mp.x)
-                    cy = float(mp.y)
-                else:
-                    if bb is None:
-                        cx = float(getattr(mp, 'x', 0.0))
-                        cy = float(getattr(mp, 'y', 0.0))
-                    else:
-                        cx = float(bb.rpg) + float(getattr(mp, 'offset_x', 0.0))
-                        cy = float(bb.bpg) + float(getattr(mp, 'offset_y', 0.0))
-
-                interval_keys: List[Tuple[str, str]] = []
-                interval_names: List[str] = []
-
-                # 判定与每个扇形是否相交/重叠：
-                # - 单点：重心落入扇形即视为关联
-                # - 多边形：若重心或任一顶点在扇形内即可视为关联（工程近似，避免引入额外几何库）
-                for (a, b) in REFERENCE_INTERVALS:
-                    try:
-                        hit = False
-
-                        # 重心命中（扇形）
-                        if is_in_temperature_sector(cx, cy, a, b):
-                            hit = True
-                        else:
-                            # 多边形：严格采用面积相交法（>1%阈值），可选保留重心命中
-                            if mp.is_polygon and mp.polygon_vertices:
-                                from utils.white_points import get_temperature_sector_vertices
-                                (corner_pt, pa, pb) = get_temperature_sector_vertices(a, b)
-                                tri = [corner_pt, pa, pb]
-                                subject = [(float(vx), float(vy)) for (vx, vy) in mp.polygon_vertices]
-                                clipped = _clip_polygon(subject, tri)
-                                ratio = 0.0
-                                if clipped:
-                                    inter_area = _polygon_area(clipped)
-                                    poly_area = _polygon_area(subject)
-                                    ratio = (inter_area / poly_area) if poly_area > 0 else 0.0
-                                logger.debug(f"==liuq debug== 面积相交: {mp.alias_name} {a}-{b}, ratio={ratio:.4%}")
-                                if ratio > _MIN_INTERSECT_RATIO or is_in_temperature_sector(cx, cy, a, b):
-                                    hit = True
-
-                        if hit:
-                            interval_keys.append((a, b))
-                            interval_names.append(f"{a}-{b}")
-                    except Exception as e:
-                        logger.debug(f"==liuq debug== 扇形跨度判定异常: {mp.alias_name} {a}-{b} {e}")
-                        continue
+            if not incremental:
+                self._geometry_key = None
+            recomputed = self.sync()
 
+            spans_by_map: Dict[str, Any] = {}
+            for mp, (interval_keys, interval_names, coords) in zip(self._points, self._spans):
                 spans_by_map[mp.alias_name] = {
                     'count': len(interval_keys),
-                    'interval_keys': interval_keys,
-                    'interval_names': interval_names,
-                    'coords': (cx, cy),
+                    'interval_keys': list(interval_keys),
+                    'interval_names': list(interval_names),
+                    'coords': coords,
                 }
-                logger.info("==liuq debug== 预计算: %s coords=(%.6f,%.6f) intervals=%s", mp.alias_name, cx, cy, ','.join(interval_names))
 
             # 生成Top20
             sortable = [
@@ -203,9 +318,8 @@ class TemperatureSpanAnalyzer:
                 'top20': top20,
             }
 
-            logger.info("==liuq debug== 色温段跨度分析完成: 共 %d 个Map点", len(spans_by_map))
+            logger.info("==liuq debug== 色温段跨度分析完成: 共 %d 个Map点，重算 %d 个", len(spans_by_map), recomputed)
             return result
         except Exception as e:
             logger.error(f"==liuq debug== 色温段跨度分析失败: {e}")
             return {'spans_by_map': {}, 'top20': []}
-
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML解析后端
+==liuq debug== FastMapV2 可插拔XML解析后端（lxml优先，ElementTree回退）
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 为XMLParserService、XMLDataConversionService、XMLValidationService提供统一的解析入口。
+      安装了lxml时使用C实现的解析器与预编译XPath完成offset/range/AliasName查找，
+      否则回退到xml.etree.ElementTree；两种后端返回的元素接口一致，解析错误统一抛出ET.ParseError
+"""
+
+import logging
+from typing import Iterator, Optional, Tuple, Any
+from xml.etree import ElementTree as ET
+
+# lxml为可选依赖：存在时启用C速度解析与预编译XPath
+try:
+    from lxml import etree as _lxml_etree  # type: ignore
+    _LXML_AVAILABLE = True
+except Exception:
+    _lxml_etree = None
+    _LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ELEMENTTREE = "elementtree"
+BACKEND_LXML = "lxml"
+
+
+class ElementTreeBackend:
+    """基于xml.etree.ElementTree的解析后端（默认回退实现）"""
+
+    name = BACKEND_ELEMENTTREE
+
+    def parse_bytes(self, raw_bytes: bytes):
+        """
+        解析XML字节串
+
+        Returns:
+            具有getroot()方法的树对象
+
+        Raises:
+            ET.ParseError: XML格式错误
+        """
+        parser = ET.XMLParser()
+        parser.feed(raw_bytes)
+        return ET.ElementTree(parser.close())
+
+    def iterparse(self, source: str, events: Tuple[str, ...]) -> Iterator[Tuple[str, Any]]:
+        """流式解析，产出(event, element)"""
+        return ET.iterparse(source, events=events)
+
+    def find_child(self, node, tag: str):
+        """查找第一个指定标签的直接子节点（等价于node.find(tag)）"""
+        return node.find(tag)
+
+    def iter_descendants(self, root) -> Iterator[Any]:
+        """遍历根元素之外的全部后代元素（文档顺序）"""
+        iterator = root.iter()
+        next(iterator, None)
+        return iterator
+
+    def iter_indexed_candidates(self, root) -> Iterator[Any]:
+        """遍历可能属于offset_mapNN/base_boundaryN的后代元素（由节点索引再按标签精确匹配）"""
+        return self.iter_descendants(root)
+
+    def find_offset_xy(self, node) -> Tuple[Optional[Any], Optional[Any]]:
+        """查找第一组节点下的offset/x与offset/y"""
+        offset_node = node.find('offset')
+        if offset_node is None:
+            return None, None
+        return offset_node.find('x'), offset_node.find('y')
+
+    def find_range(self, node):
+        """查找第一组节点下的range节点"""
+        return node.find('range')
+
+    def find_alias(self, node):
+        """查找第二组节点下的AliasName节点"""
+        return node.find('AliasName')
+
+
+class LxmlBackend(ElementTreeBackend):
+    """基于lxml的解析后端，offset/range/AliasName查找使用预编译XPath"""
+
+    name = BACKEND_LXML
+
+    def __init__(self):
+        # 去除注释与处理指令，保证元素遍历结果与ElementTree一致
+        self._parser = _lxml_etree.XMLParser(remove_comments=True, remove_pis=True,
+                                             resolve_entities=False, huge_tree=True)
+        self._xpath_offset_x = _lxml_etree.XPath('offset[1]/x[1]')
+        self._xpath_offset_y = _lxml_etree.XPath('offset[1]/y[1]')
+        self._xpath_has_offset = _lxml_etree.XPath('boolean(offset)')
+        self._xpath_range = _lxml_etree.XPath('range[1]')
+        self._xpath_alias = _lxml_etree.XPath('AliasName[1]')
+        # 节点索引只关心offset_mapNN/base_boundaryN，由XPath在C层筛选，避免为全部元素创建Python代理对象
+        self._xpath_indexed = _lxml_etree.XPath(
+            "descendant::*[starts-with(name(), 'offset_map') or starts-with(name(), 'base_boundary')]")
+
+    def parse_bytes(self, raw_bytes: bytes):
+        try:
+            root = _lxml_etree.fromstring(raw_bytes, self._parser)
+        except _lxml_etree.XMLSyntaxError as e:
+            raise _to_parse_error(e) from e
+        return root.getroottree()
+
+    def iterparse(self, source: str, events: Tuple[str, ...]) -> Iterator[Tuple[str, Any]]:
+        try:
+            yield from _lxml_etree.iterparse(source, events=events, remove_comments=True,
+                                             remove_pis=True, resolve_entities=False, huge_tree=True)
+        except _lxml_etree.XMLSyntaxError as e:
+            raise _to_parse_error(e) from e
+
+    def find_child(self, node, tag: str):
+        if not _is_lxml_element(node):
+            return node.find(tag)
+        # iterchildren在C层按标签过滤，比lxml的find路径解析快
+        return next(node.iterchildren(tag), None)
+
+    def iter_indexed_candidates(self, root) -> Iterator[Any]:
+        """遍历可能属于offset_mapNN/base_boundaryN的后代元素"""
+        if not _is_lxml_element(root):
+            return super().iter_indexed_candidates(root)
+        return iter(self._xpath_indexed(root))
+
+    def find_offset_xy(self, node) -> Tuple[Optional[Any], Optional[Any]]:
+        if not _is_lxml_element(node):
+            return super().find_offset_xy(node)
+        if not self._xpath_has_offset(node):
+            return None, None
+        return _first(self._xpath_offset_x(node)), _first(self._xpath_offset_y(node))
+
+    def find_range(self, node):
+        if not _is_lxml_element(node):
+            return super().find_range(node)
+        return _first(self._xpath_range(node))
+
+    def find_alias(self, node):
+        if not _is_lxml_element(node):
+            return super().find_alias(node)
+        return _first(self._xpath_alias(node))
+
+
+def _is_lxml_element(node) -> bool:
+    """lxml后端也会收到ElementTree元素（如写入服务自行解析的树），此时回退到ElementTree查找"""
+    return isinstance(node, _lxml_etree._Element)
+
+
+def _first(matches):
+    return matches[0] if matches else None
+
+
+def _to_parse_error(error) -> ET.ParseError:
+    """将lxml语法错误转换为ET.ParseError，调用方只需捕获一种异常"""
+    parse_error = ET.ParseError(str(error))
+    parse_error.position = getattr(error, 'position', (getattr(error, 'lineno', 0), 0))
+    parse_error.code = getattr(error, 'code', None)
+    return parse_error
+
+
+def is_lxml_available() -> bool:
+    """lxml是否可用"""
+    return _LXML_AVAILABLE
+
+
+# 全局解析后端实例
+_xml_backend: Optional[ElementTreeBackend] = None
+
+
+def get_xml_backend() -> ElementTreeBackend:
+    """获取XML解析后端实例（lxml可用时优先使用）"""
+    global _xml_backend
+
+    if _xml_backend is None:
+        _xml_backend = LxmlBackend() if _LXML_AVAILABLE else ElementTreeBackend()
+        logger.info(f"==liuq debug== XML解析后端: {_xml_backend.name}")
+
+    return _xml_backend
+
+
+def set_xml_backend(name: Optional[str]) -> ElementTreeBackend:
+    """
+    指定XML解析后端
+
+    Args:
+        name: 'lxml' | 'elementtree'，None表示恢复自动选择
+
+    Returns:
+        当前生效的后端实例
+
+    Raises:
+        ValueError: 未知后端或lxml未安装
+    """
+    global _xml_backend
+
+    if name is None:
+        _xml_backend = None
+        return get_xml_backend()
+    if name == BACKEND_LXML:
+        if not _LXML_AVAILABLE:
+            raise ValueError("lxml未安装，无法使用lxml解析后端")
+        _xml_backend = LxmlBackend()
+    elif name == BACKEND_ELEMENTTREE:
+        _xml_backend = ElementTreeBackend()
+    else:
+        raise ValueError(f"未知的XML解析后端: {name}")
+
+    logger.info(f"==liuq debug== XML解析后端已切换为: {_xml_backend.name}")
+    return _xml_backend
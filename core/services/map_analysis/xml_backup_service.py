@@ -9,24 +9,37 @@ XML备份服务
 日期: 2025-08-25
 """
 
-import shutil
 import logging
-from typing import Optional, Union
+import threading
+from typing import Dict, Optional, Union
 from pathlib import Path
 from datetime import datetime
 
 from core.interfaces.xml_data_processor import BackupError
+from core.services.map_analysis.xml_backup_store import XMLBackupStore, write_file_atomic
 
 logger = logging.getLogger(__name__)
 
 
 class XMLBackupService:
-    """XML备份服务"""
+    """XML备份服务（备份内容由XMLBackupStore去重、增量压缩存储）"""
     
     def __init__(self):
         """初始化XML备份服务"""
         self.default_backup_dir = "backups"
         self.max_backup_count = 50
+        self._stores: Dict[Path, XMLBackupStore] = {}
+        self._stores_lock = threading.Lock()
+
+    def get_store(self, backup_dir: Union[str, Path]) -> XMLBackupStore:
+        """获取备份目录对应的存储（同一目录共用一个实例）"""
+        backup_dir = Path(backup_dir).absolute()
+        with self._stores_lock:
+            store = self._stores.get(backup_dir)
+            if store is None:
+                store = XMLBackupStore(backup_dir)
+                self._stores[backup_dir] = store
+            return store
         
     def backup_xml(self, xml_path: Union[str, Path], 
                    backup_dir: Optional[Union[str, Path]] = None) -> str:
@@ -38,7 +51,7 @@ class XMLBackupService:
             backup_dir: 备份目录，None则使用默认备份目录
 
         Returns:
-            str: 备份文件路径
+            str: 备份路径（备份目录/备份名，用于restore_from_backup与delete_backup）
 
         Raises:
             BackupError: 备份创建失败
@@ -55,20 +68,15 @@ class XMLBackupService:
             else:
                 backup_dir = Path(backup_dir)
 
-            # 创建备份目录
-            backup_dir.mkdir(parents=True, exist_ok=True)
+            # 记录版本（相同内容只存一份，新内容存为相对上一版本的增量）
+            store = self.get_store(backup_dir)
+            store.import_legacy_backups(xml_path)
+            entry = store.add(xml_path)
 
             # 清理旧备份（如果超过最大数量）
-            self._cleanup_old_backups(backup_dir, xml_path.stem)
-
-            # 生成备份文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"{xml_path.stem}_backup_{timestamp}{xml_path.suffix}"
-            backup_path = backup_dir / backup_name
-
-            # 复制文件
-            shutil.copy2(xml_path, backup_path)
+            store.trim(xml_path.name, self.max_backup_count)
 
+            backup_path = backup_dir / entry['name']
             logger.info(f"XML备份创建成功: {backup_path}")
             return str(backup_path)
 
@@ -83,7 +91,7 @@ class XMLBackupService:
         从备份恢复XML文件
 
         Args:
-            backup_path: 备份文件路径
+            backup_path: 备份路径（backup_xml的返回值，或旧版本留下的备份文件）
             target_path: 目标文件路径
 
         Returns:
@@ -93,7 +101,13 @@ class XMLBackupService:
             backup_path = Path(backup_path)
             target_path = Path(target_path)
 
-            if not backup_path.exists():
+            store = self.get_store(backup_path.parent)
+            if store.find(backup_path.name) is not None:
+                content = store.read(backup_path.name)
+            elif backup_path.is_file():
+                # 兼容旧版本的整文件备份
+                content = backup_path.read_bytes()
+            else:
                 logger.error(f"备份文件不存在: {backup_path}")
                 return False
 
@@ -104,8 +118,7 @@ class XMLBackupService:
                 except Exception as e:
                     logger.warning(f"恢复前备份失败: {e}")
 
-            # 复制备份文件到目标位置
-            shutil.copy2(backup_path, target_path)
+            write_file_atomic(target_path, content)
 
             logger.info(f"从备份恢复成功: {target_path}")
             return True
@@ -122,33 +135,26 @@ class XMLBackupService:
             xml_path: 原始XML文件路径
 
         Returns:
-            list: 备份文件信息列表
+            list: 备份信息列表（按创建时间倒序）
         """
         try:
             xml_path = Path(xml_path)
             backup_dir = xml_path.parent / self.default_backup_dir
 
-            if not backup_dir.exists():
-                return []
+            store = self.get_store(backup_dir)
+            store.import_legacy_backups(xml_path)
 
             backup_files = []
-            backup_pattern = f"{xml_path.stem}_backup_*{xml_path.suffix}"
-
-            for backup_file in backup_dir.glob(backup_pattern):
-                try:
-                    stat = backup_file.stat()
-                    backup_files.append({
-                        'path': str(backup_file),
-                        'name': backup_file.name,
-                        'size': stat.st_size,
-                        'created_time': datetime.fromtimestamp(stat.st_ctime),
-                        'modified_time': datetime.fromtimestamp(stat.st_mtime)
-                    })
-                except Exception as e:
-                    logger.warning(f"获取备份文件信息失败: {backup_file} - {e}")
-
-            # 按创建时间倒序排列
-            backup_files.sort(key=lambda x: x['created_time'], reverse=True)
+            for entry in store.list_versions(xml_path.name):
+                created_time = datetime.fromtimestamp(entry['created'])
+                backup_files.append({
+                    'path': str(backup_dir / entry['name']),
+                    'name': entry['name'],
+                    'size': entry['size'],
+                    'sha256': entry['sha256'],
+                    'created_time': created_time,
+                    'modified_time': created_time
+                })
             return backup_files
 
         except Exception as e:
@@ -157,10 +163,10 @@ class XMLBackupService:
 
     def delete_backup(self, backup_path: Union[str, Path]) -> bool:
         """
-        删除指定的备份文件
+        删除指定的备份
 
         Args:
-            backup_path: 备份文件路径
+            backup_path: 备份路径
 
         Returns:
             bool: 删除是否成功
@@ -168,7 +174,11 @@ class XMLBackupService:
         try:
             backup_path = Path(backup_path)
 
-            if not backup_path.exists():
+            if self.get_store(backup_path.parent).remove(backup_path.name):
+                logger.info(f"备份删除成功: {backup_path}")
+                return True
+
+            if not backup_path.is_file():
                 logger.warning(f"备份文件不存在: {backup_path}")
                 return False
 
@@ -188,52 +198,21 @@ class XMLBackupService:
             xml_path: 原始XML文件路径
 
         Returns:
-            int: 删除的备份文件数量
+            int: 删除的备份数量
         """
         try:
-            backup_list = self.get_backup_list(xml_path)
-            deleted_count = 0
-
-            for backup_info in backup_list:
-                if self.delete_backup(backup_info['path']):
-                    deleted_count += 1
+            xml_path = Path(xml_path)
+            store = self.get_store(xml_path.parent / self.default_backup_dir)
+            store.import_legacy_backups(xml_path)
+            deleted_count = store.trim(xml_path.name, 0)
 
-            logger.info(f"清理完成，删除了 {deleted_count} 个备份文件")
+            logger.info(f"清理完成，删除了 {deleted_count} 个备份")
             return deleted_count
 
         except Exception as e:
             logger.error(f"清理备份失败: {e}")
             return 0
 
-    def _cleanup_old_backups(self, backup_dir: Path, file_stem: str):
-        """
-        清理旧的备份文件
-
-        Args:
-            backup_dir: 备份目录
-            file_stem: 文件名（不含扩展名）
-        """
-        try:
-            backup_pattern = f"{file_stem}_backup_*"
-            backup_files = list(backup_dir.glob(backup_pattern))
-
-            if len(backup_files) <= self.max_backup_count:
-                return
-
-            # 按修改时间排序，删除最旧的文件
-            backup_files.sort(key=lambda x: x.stat().st_mtime)
-
-            files_to_delete = len(backup_files) - self.max_backup_count
-            for i in range(files_to_delete):
-                try:
-                    backup_files[i].unlink()
-                    logger.debug(f"删除旧备份: {backup_files[i]}")
-                except Exception as e:
-                    logger.warning(f"删除旧备份失败: {backup_files[i]} - {e}")
-
-        except Exception as e:
-            logger.warning(f"清理旧备份失败: {e}")
-
 
 # 全局备份服务实例
 _backup_service: Optional[XMLBackupService] = None
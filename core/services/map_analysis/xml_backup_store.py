@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML备份内容寻址存储
+==liuq debug== FastMapV2 去重+增量压缩的备份存储
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.1
+描述: 备份内容按SHA-256寻址，相同内容只存一份；新内容以相对上一版本的行级增量压缩存储，
+      每隔若干版本存一次完整快照以限制恢复时的增量链长度。备份版本记录在索引文件中，
+      列表、查找不再扫描目录，超出保留数量的版本从索引删除后按可达性回收对象。
+      多个进程可共用同一备份目录：每次操作在进程间文件锁内重新读取索引后再修改写回
+"""
+
+import os
+import re
+import json
+import zlib
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE_NAME = "backup_index.json"
+LOCK_FILE_NAME = "backup_index.lock"
+OBJECTS_DIR_NAME = "objects"
+INDEX_FORMAT_VERSION = 1
+
+# 增量链达到该长度时改存完整快照
+KEYFRAME_INTERVAL = 16
+
+_OBJECT_MAGIC = b'FMB1'
+_KIND_FULL = b'F'
+_KIND_DELTA = b'D'
+_OP_COPY = b'C'
+_OP_INSERT = b'I'
+_COPY_STRUCT = struct.Struct('>II')
+_INSERT_STRUCT = struct.Struct('>I')
+
+# 进程umask（只能通过设置再还原读取，导入时读取一次）
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class XMLBackupStore:
+    """
+    单个备份目录的内容寻址存储
+
+    目录结构：
+        backup_index.json               索引（文件名 → 版本列表，对象表）
+        backup_index.lock               进程间锁文件
+        objects/ab/abcdef...            压缩对象（完整快照或相对base对象的增量）
+
+    所有操作都在_locked()内进行：持有进程间文件锁，并在索引文件被其他进程改写后重新加载，
+    因此多个进程向同一目录备份时不会互相覆盖版本记录
+    """
+
+    def __init__(self, backup_dir: Path):
+        """
+        初始化备份存储（索引在首次访问时加载）
+
+        Args:
+            backup_dir: 备份目录
+        """
+        self.backup_dir = Path(backup_dir)
+        self.index_path = self.backup_dir / INDEX_FILE_NAME
+        self.objects_dir = self.backup_dir / OBJECTS_DIR_NAME
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._index_stamp: Optional[tuple] = None
+        self._legacy_checked: set = set()
+        self._versions: Optional[Dict[str, List[dict]]] = None
+        self._objects: Dict[str, dict] = {}
+        self._by_name: Dict[str, Tuple[str, dict]] = {}
+        # 每个文件最近一次备份的内容（下次备份计算增量时免去重建）
+        self._latest_lines: Dict[str, Tuple[str, List[bytes]]] = {}
+
+    # ---------- 版本操作 ----------
+
+    def add(self, xml_path: Path) -> dict:
+        """
+        备份xml_path的当前内容
+
+        Args:
+            xml_path: 源XML文件
+
+        Returns:
+            dict: 新增的版本记录（name/sha256/size/created）
+        """
+        xml_path = Path(xml_path)
+        content = xml_path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        file_key = xml_path.name
+
+        with self._locked():
+            versions = self._versions.setdefault(file_key, [])
+
+            if digest not in self._objects:
+                self._store_object(file_key, digest, content, versions)
+            self._latest_lines[file_key] = (digest, content.splitlines(True))
+
+            created = datetime.now()
+            entry = {
+                'name': self._unique_name(xml_path, created),
+                'sha256': digest,
+                'size': len(content),
+                'created': created.timestamp(),
+            }
+            versions.append(entry)
+            self._by_name[entry['name']] = (file_key, entry)
+            self._save_index()
+
+        logger.debug(f"==liuq debug== 备份版本已记录: {entry['name']} ({digest[:12]})")
+        return entry
+
+    def list_versions(self, file_key: str) -> List[dict]:
+        """返回文件的版本记录（按创建时间倒序）"""
+        with self._locked():
+            return list(reversed(self._versions.get(file_key, [])))
+
+    def find(self, name: str) -> Optional[dict]:
+        """按备份名查找版本记录"""
+        with self._locked():
+            found = self._by_name.get(name)
+            return found[1] if found else None
+
+    def read(self, name: str) -> bytes:
+        """
+        读取备份版本的完整内容
+
+        Raises:
+            KeyError: 备份不存在
+        """
+        with self._locked():
+            found = self._by_name.get(name)
+            if found is None:
+                raise KeyError(name)
+            return self._materialize(found[1]['sha256'])
+
+    def remove(self, name: str) -> bool:
+        """删除备份版本并回收不再可达的对象"""
+        with self._locked():
+            found = self._by_name.pop(name, None)
+            if found is None:
+                return False
+            file_key, entry = found
+            self._versions[file_key].remove(entry)
+            if not self._versions[file_key]:
+                del self._versions[file_key]
+                self._latest_lines.pop(file_key, None)
+            self._collect_garbage()
+            self._save_index()
+            return True
+
+    def trim(self, file_key: str, max_count: int) -> int:
+        """
+        只保留文件最新的max_count个版本
+
+        Returns:
+            int: 删除的版本数
+        """
+        with self._locked():
+            versions = self._versions.get(file_key, [])
+            excess = len(versions) - max_count
+            if excess <= 0:
+                return 0
+            for entry in versions[:excess]:
+                self._by_name.pop(entry['name'], None)
+            del versions[:excess]
+            if not versions:
+                self._versions.pop(file_key, None)
+                self._latest_lines.pop(file_key, None)
+            self._collect_garbage()
+            self._save_index()
+            return excess
+
+    def import_legacy_backups(self, xml_path: Path) -> int:
+        """
+        把旧版本留在备份目录中的整文件备份（{stem}_backup_YYYYmmdd_HHMMSS[_n]{suffix}）导入索引，
+        导入后删除原文件，之后由列表与保留数量统一管理；每个文件每个实例只检查一次
+
+        Returns:
+            int: 导入的备份数
+        """
+        xml_path = Path(xml_path)
+        file_key = xml_path.name
+        with self._locked():
+            if file_key in self._legacy_checked:
+                return 0
+            self._legacy_checked.add(file_key)
+            pattern = re.compile(re.escape(xml_path.stem) + r'_backup_\d{8}_\d{6}(_\d+)?' + re.escape(xml_path.suffix))
+            try:
+                legacy = [p for p in self.backup_dir.iterdir() if p.is_file() and pattern.fullmatch(p.name)
+                          and p.name not in self._by_name]
+            except FileNotFoundError:
+                return 0
+            if not legacy:
+                return 0
+
+            legacy.sort(key=lambda p: p.stat().st_mtime)
+            versions = self._versions.setdefault(file_key, [])
+            imported = []
+            for path in legacy:
+                content = path.read_bytes()
+                digest = hashlib.sha256(content).hexdigest()
+                if digest not in self._objects:
+                    self._store_object(file_key, digest, content, imported or versions)
+                entry = {'name': path.name, 'sha256': digest, 'size': len(content),
+                         'created': path.stat().st_mtime}
+                imported.append(entry)
+                self._by_name[entry['name']] = (file_key, entry)
+            versions.extend(imported)
+            versions.sort(key=lambda entry: entry['created'])
+            self._save_index()
+
+            for path in legacy:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"==liuq debug== 删除已导入的旧备份文件失败: {path} - {e}")
+            logger.info(f"==liuq debug== 已导入 {len(imported)} 个旧版整文件备份: {file_key}")
+            return len(imported)
+
+    # ---------- 对象存储 ----------
+
+    def _store_object(self, file_key: str, digest: str, content: bytes, versions: List[dict]):
+        """以相对上一版本的增量（或完整快照）存储新对象"""
+        base_digest = versions[-1]['sha256'] if versions else None
+        base_info = self._objects.get(base_digest) if base_digest else None
+        lines = content.splitlines(True)
+
+        payload = None
+        if base_info is not None and base_info['depth'] + 1 < KEYFRAME_INTERVAL:
+            base_lines = self._base_lines(file_key, base_digest)
+            delta = encode_line_delta(base_lines, lines)
+            if len(delta) < len(content) // 2:
+                payload = _KIND_DELTA + bytes.fromhex(base_digest) + zlib.compress(delta)
+                info = {'base': base_digest, 'depth': base_info['depth'] + 1}
+
+        if payload is None:
+            payload = _KIND_FULL + zlib.compress(content)
+            info = {'base': None, 'depth': 0}
+
+        object_path = self._object_path(digest)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        write_file_atomic(object_path, _OBJECT_MAGIC + payload)
+        info['stored'] = len(payload) + len(_OBJECT_MAGIC)
+        self._objects[digest] = info
+
+    def _base_lines(self, file_key: str, base_digest: str) -> List[bytes]:
+        cached = self._latest_lines.get(file_key)
+        if cached and cached[0] == base_digest:
+            return cached[1]
+        return self._materialize(base_digest).splitlines(True)
+
+    def _materialize(self, digest: str) -> bytes:
+        """沿增量链重建对象内容"""
+        chain = []
+        current = digest
+        while True:
+            data = self._object_path(current).read_bytes()
+            if data[:4] != _OBJECT_MAGIC:
+                raise ValueError(f"备份对象格式错误: {current}")
+            kind = data[4:5]
+            if kind == _KIND_FULL:
+                content = zlib.decompress(data[5:])
+                break
+            chain.append(zlib.decompress(data[37:]))
+            current = data[5:37].hex()
+
+        for delta in reversed(chain):
+            content = b''.join(apply_line_delta(content.splitlines(True), delta))
+
+        if hashlib.sha256(content).hexdigest() != digest:
+            raise ValueError(f"备份对象校验失败: {digest}")
+        return content
+
+    def _collect_garbage(self):
+        """删除保留版本及其增量链都不再引用的对象"""
+        reachable = set()
+        for versions in self._versions.values():
+            for entry in versions:
+                current = entry['sha256']
+                while current and current not in reachable:
+                    reachable.add(current)
+                    current = self._objects.get(current, {}).get('base')
+
+        for digest in [d for d in self._objects if d not in reachable]:
+            del self._objects[digest]
+            object_path = self._object_path(digest)
+            try:
+                object_path.unlink()
+                if not any(object_path.parent.iterdir()):
+                    object_path.parent.rmdir()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"==liuq debug== 删除备份对象失败: {digest} - {e}")
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    # ---------- 索引 ----------
+
+    @contextmanager
+    def _locked(self):
+        """持有线程锁与进程间文件锁，并保证内存中的索引与索引文件一致（可重入）"""
+        with self._lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            self.backup_dir.mkdir(parents=True, exist_ok=True)
+            with _InterProcessLock(self.backup_dir / LOCK_FILE_NAME):
+                self._lock_depth = 1
+                try:
+                    self._refresh_index()
+                    yield
+                finally:
+                    self._lock_depth = 0
+
+    def _stat_index(self) -> Optional[tuple]:
+        try:
+            st = self.index_path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _refresh_index(self):
+        """索引文件自上次读写后被改写（或首次访问）时重新加载"""
+        stamp = self._stat_index()
+        if self._versions is not None and stamp == self._index_stamp:
+            return
+        self._index_stamp = stamp
+        self._versions = {}
+        self._objects = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_FORMAT_VERSION:
+                    self._versions = data.get('files', {})
+                    self._objects = data.get('objects', {})
+                else:
+                    logger.warning(f"==liuq debug== 备份索引版本不匹配，忽略: {self.index_path}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"==liuq debug== 读取备份索引失败，重新建立: {e}")
+        self._by_name = {
+            entry['name']: (file_key, entry)
+            for file_key, versions in self._versions.items()
+            for entry in versions
+        }
+
+    def _save_index(self):
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        data = {'version': INDEX_FORMAT_VERSION, 'files': self._versions, 'objects': self._objects}
+        write_file_atomic(self.index_path, json.dumps(data, ensure_ascii=False, indent=1).encode('utf-8'))
+        self._index_stamp = self._stat_index()
+
+    def _unique_name(self, xml_path: Path, created: datetime) -> str:
+        name = f"{xml_path.stem}_backup_{created.strftime('%Y%m%d_%H%M%S')}{xml_path.suffix}"
+        suffix = 1
+        while name in self._by_name:
+            suffix += 1
+            name = f"{xml_path.stem}_backup_{created.strftime('%Y%m%d_%H%M%S')}_{suffix}{xml_path.suffix}"
+        return name
+
+    def get_statistics(self) -> dict:
+        """存储统计（版本数、对象数、对象占用字节）"""
+        with self._locked():
+            return {
+                'version_count': len(self._by_name),
+                'object_count': len(self._objects),
+                'stored_bytes': sum(info.get('stored', 0) for info in self._objects.values()),
+            }
+
+
+def encode_line_delta(base_lines: List[bytes], new_lines: List[bytes]) -> bytes:
+    """
+    计算new_lines相对base_lines的行级增量
+
+    顺序匹配：当前行与base期望位置相同则连续复制，否则查找该行在base中下一次出现的位置，
+    找不到则作为插入内容。复制操作总是引用完全相同的行，因此结果总能精确还原。
+
+    Returns:
+        bytes: 由复制(起始行, 行数)与插入(字节)操作组成的增量
+    """
+    positions: Dict[bytes, List[int]] = {}
+    for number, line in enumerate(base_lines):
+        positions.setdefault(line, []).append(number)
+
+    ops = []
+    inserted: List[bytes] = []
+    base_count = len(base_lines)
+    new_count = len(new_lines)
+    i = 0
+    expected = 0
+    while i < new_count:
+        line = new_lines[i]
+        if expected < base_count and base_lines[expected] == line:
+            start = expected
+        else:
+            candidates = positions.get(line)
+            if not candidates:
+                inserted.append(line)
+                i += 1
+                continue
+            k = bisect_left(candidates, expected)
+            start = candidates[k] if k < len(candidates) else candidates[0]
+
+        if inserted:
+            data = b''.join(inserted)
+            ops.append(_OP_INSERT + _INSERT_STRUCT.pack(len(data)) + data)
+            inserted = []
+        length = 1
+        while (i + length < new_count and start + length < base_count
+               and new_lines[i + length] == base_lines[start + length]):
+            length += 1
+        ops.append(_OP_COPY + _COPY_STRUCT.pack(start, length))
+        i += length
+        expected = start + length
+
+    if inserted:
+        data = b''.join(inserted)
+        ops.append(_OP_INSERT + _INSERT_STRUCT.pack(len(data)) + data)
+    return b''.join(ops)
+
+
+def apply_line_delta(base_lines: List[bytes], delta: bytes) -> List[bytes]:
+    """按encode_line_delta的增量还原内容，返回分片列表"""
+    chunks = []
+    position = 0
+    while position < len(delta):
+        op = delta[position:position + 1]
+        position += 1
+        if op == _OP_COPY:
+            start, length = _COPY_STRUCT.unpack_from(delta, position)
+            position += _COPY_STRUCT.size
+            chunks.extend(base_lines[start:start + length])
+        elif op == _OP_INSERT:
+            (length,) = _INSERT_STRUCT.unpack_from(delta, position)
+            position += _INSERT_STRUCT.size
+            chunks.append(delta[position:position + length])
+            position += length
+        else:
+            raise ValueError(f"未知的增量操作: {op!r}")
+    return chunks
+
+
+def write_file_atomic(path: Path, data: bytes):
+    """
+    写入同目录临时文件（唯一文件名，多个写入者互不冲突）后原子替换
+
+    mkstemp创建的临时文件权限为0600，替换前改为目标文件原有权限（目标不存在时按umask的默认权限）
+    """
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        try:
+            os.chmod(temp_path, mode)
+        except OSError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _InterProcessLock:
+    """基于锁文件的进程间互斥锁（Windows使用msvcrt，其余平台使用fcntl）"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a+b')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._file.seek(0)
+                while True:
+                    try:
+                        # LK_LOCK重试约10秒后抛出OSError，继续等待
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self._file.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
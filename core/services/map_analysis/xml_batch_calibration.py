@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML批量标定写入
+==liuq debug== FastMapV2 把同一份偏移修正计划并行写入多个XML
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.1
+描述: 标定计划为 别名 → 字段 → 目标值或增量，按文件在进程池中执行：解析、应用计划、
+      用XMLPerformanceService的节点区间替换只重写被修改的节点，返回每个文件的差异、耗时与错误。
+      命令行: python -m core.services.map_analysis.xml_batch_calibration plan.json a.xml b.xml
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from xml.etree import ElementTree as ET
+
+from core.models.map_data import (
+    MapConfiguration, XML_FIELD_CONFIG, get_map_point_field_value, is_settable_map_point_field,
+    set_map_point_field_value
+)
+
+logger = logging.getLogger(__name__)
+
+# 增量修正结果保留的小数位数
+DELTA_PRECISION = 10
+
+
+@dataclass(frozen=True)
+class CalibrationEdit:
+    """单个字段的修正：value为目标值，delta为在当前值上的增量（二选一）"""
+    value: Optional[float] = None
+    delta: Optional[float] = None
+
+    def resolve(self, current: Any) -> float:
+        """根据当前值计算目标值"""
+        if self.delta is None:
+            return self.value
+        # 去掉浮点加法的尾差（0.8 - 0.1 写为0.7而不是0.7000000000000001）
+        return round(float(current) + self.delta, DELTA_PRECISION)
+
+    def to_json(self) -> Union[float, Dict[str, float]]:
+        return self.value if self.delta is None else {'delta': self.delta}
+
+
+@dataclass
+class CalibrationPlan:
+    """
+    标定计划：别名 → 字段 → CalibrationEdit
+
+    JSON格式：{"Indoor": {"offset_x": 0.61, "offset_y": {"delta": -0.01}}, ...}
+    字段名为XML_FIELD_CONFIG中可设置的字段（offset_x、bv_min、weight等，count_min等只读范围字段除外）
+    """
+    edits: Dict[str, Dict[str, CalibrationEdit]] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, Any]]) -> 'CalibrationPlan':
+        """
+        从字典构建计划
+
+        Raises:
+            ValueError: 字段不在XML_FIELD_CONFIG中、字段只读或修正值格式错误
+        """
+        edits: Dict[str, Dict[str, CalibrationEdit]] = {}
+        for alias_name, fields in data.items():
+            alias_edits = {}
+            for field_name, spec in fields.items():
+                if field_name not in XML_FIELD_CONFIG or not is_settable_map_point_field(field_name):
+                    raise ValueError(f"不支持的标定字段: {alias_name}.{field_name}")
+                try:
+                    if isinstance(spec, dict):
+                        if set(spec) == {'delta'}:
+                            alias_edits[field_name] = CalibrationEdit(delta=float(spec['delta']))
+                        elif set(spec) == {'value'}:
+                            alias_edits[field_name] = CalibrationEdit(value=float(spec['value']))
+                        else:
+                            raise ValueError(f"需要value或delta: {spec}")
+                    else:
+                        alias_edits[field_name] = CalibrationEdit(value=float(spec))
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"标定值格式错误: {alias_name}.{field_name}: {e}")
+            edits[str(alias_name)] = alias_edits
+        return cls(edits)
+
+    @classmethod
+    def load(cls, plan_path: Union[str, Path]) -> 'CalibrationPlan':
+        """从JSON文件加载计划"""
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {alias: {name: edit.to_json() for name, edit in fields.items()}
+                for alias, fields in self.edits.items()}
+
+    def apply(self, config: MapConfiguration) -> List[str]:
+        """
+        把计划应用到config（被修改的字段记录为脏字段）
+
+        Returns:
+            List[str]: 无法应用的条目（别名不存在、字段无当前值、设置失败）
+        """
+        missing = []
+        for alias_name, fields in self.edits.items():
+            map_point = config.find_map_point_by_alias(alias_name)
+            if map_point is None:
+                missing.append(alias_name)
+                continue
+            for field_name, edit in fields.items():
+                current = get_map_point_field_value(map_point, field_name)
+                if current is None and edit.delta is not None:
+                    missing.append(f"{alias_name}.{field_name}")
+                    continue
+                if not set_map_point_field_value(map_point, field_name, edit.resolve(current)):
+                    missing.append(f"{alias_name}.{field_name}")
+        return missing
+
+
+@dataclass
+class BatchFileResult:
+    """单个文件的批量写入结果"""
+    path: str
+    success: bool
+    changes: List[Dict[str, str]] = field(default_factory=list)  # alias/field/old/new（XML文本）
+    missing: List[str] = field(default_factory=list)
+    duration_ms: int = 0
+    written: bool = False
+    error: Optional[str] = None
+
+
+def apply_plan_to_file(xml_path: Union[str, Path], plan: CalibrationPlan, backup: bool = True,
+                       dry_run: bool = False, use_cache: bool = False) -> BatchFileResult:
+    """
+    把标定计划写入单个XML文件（异常作为结果返回）
+
+    Args:
+        xml_path: XML文件路径
+        plan: 标定计划
+        backup: 写入前是否备份
+        dry_run: 只计算差异，不写文件
+        use_cache: 解析时是否使用解析结果缓存
+
+    Returns:
+        BatchFileResult: 差异、耗时与错误
+    """
+    from core.services.map_analysis.xml_parser_service import XMLParserService
+    from core.services.map_analysis.xml_performance_service import XMLPerformanceService
+    from core.services.map_analysis.xml_byte_patch_writer import (
+        open_mapped_xml, write_patched_temp_file, replace_file
+    )
+
+    xml_path = Path(xml_path)
+    result = BatchFileResult(path=str(xml_path), success=False)
+    start_time = time.time()
+    try:
+        config = XMLParserService().parse_xml(xml_path, use_cache=use_cache)
+        config.clear_dirty()
+        result.missing = plan.apply(config)
+
+        service = XMLPerformanceService()
+        tree = ET.parse(xml_path)
+        with open_mapped_xml(xml_path) as content:
+            try:
+                replacements = service.build_optimized_replacements(config, content, tree, only_dirty=True)
+            finally:
+                service.core.release_node_span_index()
+
+            # offset字段在替换列表中可能出现两次（单独的offset替换与字段配置替换），报告中只列一次
+            changes = {}
+            for replacement in replacements:
+                key = (replacement.get('alias_name', ''), replacement.get('field_type', ''))
+                changes.setdefault(key, {
+                    'alias': key[0],
+                    'field': key[1],
+                    'old': replacement.get('_current_value', ''),
+                    'new': replacement.get('replacement', ''),
+                })
+            result.changes = list(changes.values())
+
+            temp_path = None
+            if replacements and not dry_run:
+                patches = service.plan_node_patches(content, replacements)
+                if backup:
+                    service.create_backup(xml_path)
+                temp_path = write_patched_temp_file(content, patches, xml_path.parent)
+                if not service.verify_written_file(temp_path, len(content), patches,
+                                                   replacements, content.encoding):
+                    os.unlink(temp_path)
+                    raise ValueError(f"写入校验失败: {service.last_verification.describe()}")
+
+        if temp_path is not None:
+            replace_file(temp_path, xml_path)
+            result.written = True
+        result.success = True
+    except Exception as e:
+        result.error = str(e)
+        logger.error(f"==liuq debug== 批量标定写入失败: {xml_path}: {e}")
+
+    result.duration_ms = int((time.time() - start_time) * 1000)
+    return result
+
+
+def _apply_plan_in_worker(xml_path: str, plan: CalibrationPlan, backup: bool, dry_run: bool,
+                          use_cache: bool, backend_name: str) -> BatchFileResult:
+    """进程池工作函数：与主进程使用相同的解析后端"""
+    from core.services.map_analysis.xml_backend import get_xml_backend, set_xml_backend
+
+    if get_xml_backend().name != backend_name:
+        set_xml_backend(backend_name)
+    return apply_plan_to_file(xml_path, plan, backup, dry_run, use_cache)
+
+
+def apply_calibration_plan(xml_paths: Iterable[Union[str, Path]], plan: CalibrationPlan,
+                           max_workers: Optional[int] = None, backup: bool = True,
+                           dry_run: bool = False, use_cache: bool = False,
+                           progress_callback: Optional[Callable[[int, int, str], None]] = None
+                           ) -> Dict[str, BatchFileResult]:
+    """
+    使用进程池把同一份标定计划写入多个XML文件
+
+    Args:
+        xml_paths: XML文件路径列表
+        plan: 标定计划
+        max_workers: 最大工作进程数（None为CPU核数，不超过文件数）
+        backup: 写入前是否备份（在主进程中分派前依次备份全部文件，工作进程不再备份）
+        dry_run: 只计算差异，不写文件
+        use_cache: 解析时是否使用解析结果缓存
+        progress_callback: 进度回调 (已完成数, 总数, 刚完成的文件路径)
+
+    Returns:
+        Dict[str, BatchFileResult]: 路径 → 结果（按输入顺序）
+    """
+    from core.services.map_analysis.xml_backend import get_xml_backend
+
+    paths = [str(path) for path in dict.fromkeys(xml_paths)]
+    results: Dict[str, BatchFileResult] = {}
+    total = len(paths)
+    if total == 0:
+        return results
+
+    workers = min(max_workers or os.cpu_count() or 1, total)
+    logger.info(f"==liuq debug== 开始批量标定写入: {total}个文件, 工作进程{workers}个")
+    start_time = time.time()
+
+    if backup and not dry_run:
+        # 同一目录下的文件共用一个备份索引，备份统一在主进程中顺序完成
+        from core.services.map_analysis.xml_performance_service import XMLPerformanceService
+        service = XMLPerformanceService()
+        for path in paths:
+            if Path(path).is_file():
+                service.create_backup(Path(path))
+        backup = False
+
+    def record(result: BatchFileResult):
+        results[result.path] = result
+        if progress_callback:
+            try:
+                progress_callback(len(results), total, result.path)
+            except Exception as e:
+                logger.warning(f"==liuq debug== 批量标定进度回调失败: {e}")
+
+    if workers == 1:
+        for path in paths:
+            record(apply_plan_to_file(path, plan, backup, dry_run, use_cache))
+    else:
+        # spawn启动的工作进程不继承GUI进程的线程与Qt状态
+        backend_name = get_xml_backend().name
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            futures = {
+                executor.submit(_apply_plan_in_worker, path, plan, backup, dry_run, use_cache, backend_name): path
+                for path in paths
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        record(future.result())
+                    except Exception as e:
+                        # 工作进程异常退出（BrokenProcessPool等）
+                        record(BatchFileResult(path=futures[future], success=False, error=f"写入进程异常: {e}"))
+        finally:
+            executor.shutdown(wait=True)
+
+    ordered = {path: results[path] for path in paths}
+    failed = sum(1 for result in ordered.values() if not result.success)
+    logger.info(f"==liuq debug== 批量标定写入完成: 成功{total - failed}个, 失败{failed}个, "
+                f"耗时{time.time() - start_time:.2f}s")
+    return ordered
+
+
+def format_batch_report(results: Dict[str, BatchFileResult]) -> str:
+    """把批量结果格式化为文本报告（每个文件的差异、耗时与错误）"""
+    lines = []
+    for result in results.values():
+        if not result.success:
+            lines.append(f"[失败] {result.path} ({result.duration_ms}ms): {result.error}")
+            continue
+        state = '已写入' if result.written else ('无变化' if not result.changes else '未写入')
+        lines.append(f"[{state}] {result.path} ({result.duration_ms}ms, {len(result.changes)}处修改)")
+        for change in result.changes:
+            lines.append(f"    {change['alias']}.{change['field']}: {change['old']} -> {change['new']}")
+        for missing in result.missing:
+            lines.append(f"    未找到: {missing}")
+    failed = sum(1 for result in results.values() if not result.success)
+    lines.append(f"共 {len(results)} 个文件，失败 {failed} 个")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，有文件失败时返回1"""
+    parser = argparse.ArgumentParser(description="把同一份标定计划（别名→字段→值/增量）批量写入多个XML")
+    parser.add_argument('plan', help="标定计划JSON文件")
+    parser.add_argument('xml_files', nargs='+', help="要写入的XML文件")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument('--no-backup', action='store_true', help="写入前不备份")
+    parser.add_argument('--dry-run', action='store_true', help="只输出差异，不写文件")
+    parser.add_argument('--report', help="把结果以JSON写入该文件")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    try:
+        plan = CalibrationPlan.load(args.plan)
+    except (OSError, ValueError) as e:
+        print(f"读取标定计划失败: {e}", file=sys.stderr)
+        return 2
+
+    results = apply_calibration_plan(args.xml_files, plan, max_workers=args.workers,
+                                     backup=not args.no_backup, dry_run=args.dry_run)
+    print(format_batch_report(results))
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump([asdict(result) for result in results.values()], f, ensure_ascii=False, indent=2)
+
+    return 0 if all(result.success for result in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML字节区间补丁写入
+==liuq debug== FastMapV2 基于mmap的流式字节区间补丁写入
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 以只读mmap映射源文件供写入规划按字节偏移查找节点，保存时未修改的字节区间由内核直接
+      从源文件复制到临时文件（copy_file_range/sendfile，不可用时分块复制），只有被修改的节点
+      重新编码写入，原始格式（含换行符）逐字节保留
+"""
+
+import os
+import mmap
+import errno
+import logging
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 回退复制时每次读取的字节数
+COPY_BLOCK_SIZE = 1024 * 1024
+
+# 内核复制不可用时的错误（跨文件系统、文件系统不支持等），出现后改用下一种方式
+_UNSUPPORTED_COPY_ERRNOS = {'EXDEV', 'ENOSYS', 'EINVAL', 'EOPNOTSUPP', 'ENOTSUP', 'EBADF'}
+
+
+class MappedXMLText:
+    """
+    XML文件的字节视图（按字节偏移提供与str一致的find/切片接口）
+
+    写入规划只用到find与切片：find接收str子串并返回字节偏移，切片返回解码后的str。
+    节点区间都以ASCII的'<'开始和'>'结束，按这些偏移切片不会切断多字节字符。
+    """
+
+    def __init__(self, buffer: Union[mmap.mmap, bytes], encoding: str = 'utf-8',
+                 fileno: Optional[int] = None):
+        """
+        初始化字节视图
+
+        Args:
+            buffer: 文件内容（mmap或bytes）
+            encoding: 文件编码
+            fileno: 源文件描述符（可用时由内核直接复制未修改区间）
+        """
+        self.buffer = buffer
+        self.encoding = encoding
+        self.fileno = fileno
+
+    def find(self, sub: str, start: int = 0, end: int = None) -> int:
+        """在字节区间[start, end)内查找子串，返回字节偏移"""
+        if end is None:
+            end = len(self.buffer)
+        return self.buffer.find(sub.encode(self.encoding), start, end)
+
+    def __getitem__(self, key: slice) -> str:
+        """按字节偏移切片并解码"""
+        if not isinstance(key, slice):
+            raise TypeError("MappedXMLText只支持切片访问")
+        return self.buffer[key].decode(self.encoding)
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+
+@contextmanager
+def open_mapped_xml(xml_path: Path, encoding: str = 'utf-8') -> Iterator[MappedXMLText]:
+    """
+    以只读mmap打开XML文件
+
+    退出时关闭映射与文件句柄（Windows下替换文件前必须关闭）。
+
+    Args:
+        xml_path: XML文件路径
+        encoding: 文件编码
+
+    Yields:
+        MappedXMLText: 文件的字节视图
+    """
+    with open(xml_path, 'rb') as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            # 空文件无法mmap
+            yield MappedXMLText(b'', encoding)
+            return
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield MappedXMLText(buffer, encoding, source.fileno())
+
+
+def write_patched_temp_file(source: MappedXMLText, patches: List[Tuple[int, int, str]],
+                            directory: Path) -> str:
+    """
+    把补丁应用到源文件，结果写入directory下的临时文件
+
+    Args:
+        source: open_mapped_xml得到的源文件视图
+        patches: 按起始偏移排序且互不重叠的(字节起始, 字节结束, 新节点文本)
+        directory: 临时文件目录（与目标文件同目录以便原子替换）
+
+    Returns:
+        str: 临时文件路径（调用方负责替换或删除）
+    """
+    fd, temp_path = tempfile.mkstemp(suffix='.xml', dir=directory)
+    try:
+        copier = _RangeCopier(source, fd)
+        cursor = 0
+        for node_start, node_end, node_content in patches:
+            copier.copy(cursor, node_start - cursor)
+            _write_all(fd, node_content.encode(source.encoding))
+            cursor = node_end
+        copier.copy(cursor, len(source) - cursor)
+        logger.debug(f"==liuq debug== 字节补丁写入完成: {len(patches)} 个节点, 复制方式: {copier.method}")
+    except BaseException:
+        os.close(fd)
+        os.unlink(temp_path)
+        raise
+    os.close(fd)
+    return temp_path
+
+
+def replace_file(temp_path: str, xml_path: Path):
+    """用临时文件原子替换目标文件（保留目标文件权限），失败时删除临时文件"""
+    try:
+        try:
+            os.chmod(temp_path, os.stat(xml_path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(temp_path, xml_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class _RangeCopier:
+    """把源文件字节区间追加到目标fd，依次尝试copy_file_range、sendfile与分块复制"""
+
+    def __init__(self, source: MappedXMLText, dst_fd: int):
+        self.source = source
+        self.dst_fd = dst_fd
+        self.src_fd = source.fileno
+        methods = []
+        if self.src_fd is not None:
+            if hasattr(os, 'copy_file_range'):
+                methods.append('copy_file_range')
+            if hasattr(os, 'sendfile'):
+                methods.append('sendfile')
+        methods.append('buffer')
+        self._methods = methods
+
+    @property
+    def method(self) -> str:
+        return self._methods[0]
+
+    def copy(self, offset: int, count: int):
+        """复制源文件[offset, offset + count)到目标当前位置"""
+        while count > 0:
+            copied = self._copy_once(offset, count)
+            offset += copied
+            count -= copied
+
+    def _copy_once(self, offset: int, count: int) -> int:
+        while True:
+            method = self._methods[0]
+            if method == 'buffer':
+                block = self.source.buffer[offset:offset + min(count, COPY_BLOCK_SIZE)]
+                if not block:
+                    raise OSError("源文件在写入期间被截断")
+                _write_all(self.dst_fd, block)
+                return len(block)
+            try:
+                if method == 'copy_file_range':
+                    copied = os.copy_file_range(self.src_fd, self.dst_fd, count, offset_src=offset)
+                else:
+                    copied = os.sendfile(self.dst_fd, self.src_fd, offset, count)
+            except OSError as e:
+                if errno.errorcode.get(e.errno) not in _UNSUPPORTED_COPY_ERRNOS:
+                    raise
+                copied = 0
+            if copied > 0:
+                return copied
+            # 不支持或未复制任何字节：改用下一种方式
+            logger.debug(f"==liuq debug== {method}不可用，改用下一种复制方式")
+            self._methods.pop(0)
+
+
+def _write_all(fd: int, data: bytes):
+    """把data完整写入fd（os.write可能只写入部分）"""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
@@ -17,10 +17,13 @@ from pathlib import Path
 
 from core.models.map_data import (
     MapPoint, BaseBoundary,
-    XML_FIELD_CONFIG, XMLFieldNodeType, XMLFieldDataType,
-    parse_field_value, get_fields_by_node_type
+    XML_FIELD_CONFIG, XMLFieldDataType,
+    parse_field_value
+)
+from core.services.map_analysis.xml_backend import ElementTreeBackend, get_xml_backend
+from core.services.map_analysis.xml_field_extraction_plan import (
+    get_field_extraction_plan, parse_detect_flag
 )
-from core.services.shared.field_registry_service import field_registry
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +45,11 @@ class XMLDataConversionService:
         self.supported_coordinate_types = ['offset', 'absolute', 'relative']
         self.supported_range_fields = ['bv', 'ir', 'cct', 'ctemp', 'ac', 'count', 'color_cct', 'diff_ctemp', 'face_ctemp']
         logger.debug("==liuq debug== XML数据转换服务初始化完成")
+
+    @property
+    def backend(self) -> ElementTreeBackend:
+        """当前XML解析后端（lxml可用时使用预编译XPath查找）"""
+        return get_xml_backend()
     
     def extract_offset_coordinates(self, first_node: ET.Element) -> Tuple[float, float]:
         """
@@ -54,18 +62,13 @@ class XMLDataConversionService:
             Tuple[float, float]: (x, y) 坐标对
         """
         try:
-            offset_node = first_node.find('offset')
-            if offset_node is not None:
-                x_node = offset_node.find('x')
-                y_node = offset_node.find('y')
+            x_node, y_node = self.backend.find_offset_xy(first_node)
 
-                x = float(x_node.text) if x_node is not None and x_node.text else 0.0
-                y = float(y_node.text) if y_node is not None and y_node.text else 0.0
+            x = float(x_node.text) if x_node is not None and x_node.text else 0.0
+            y = float(y_node.text) if y_node is not None and y_node.text else 0.0
 
-                logger.debug(f"==liuq debug== 提取offset坐标: ({x}, {y})")
-                return x, y
-                
-            return 0.0, 0.0
+            logger.debug(f"==liuq debug== 提取offset坐标: ({x}, {y})")
+            return x, y
             
         except Exception as e:
             logger.warning(f"==liuq debug== 提取offset坐标失败: {e}")
@@ -139,17 +142,18 @@ class XMLDataConversionService:
             Tuple: (bv_range, ir_range, cct_range, detect_flag)
         """
         try:
-            range_node = first_node.find('range')
+            range_node = self.backend.find_range(first_node)
             if range_node is None:
                 return (0.0, 100.0), (0.0, 100.0), (2000.0, 10000.0), False
 
-            # 使用配置驱动的方式提取范围数据
-            bv_range = self.extract_field_range(range_node, 'bv_min', 'bv_max')
-            ir_range = self.extract_field_range(range_node, 'ir_min', 'ir_max')
-            cct_range = self.extract_field_range(range_node, 'color_cct_min', 'color_cct_max')
+            # 按预编译字段提取计划一次遍历range节点
+            values, raw_texts = get_field_extraction_plan().extract_range_fields(range_node)
+            bv_range = self._field_range_from_values(values, 'bv_min', 'bv_max')
+            ir_range = self._field_range_from_values(values, 'ir_min', 'ir_max')
+            cct_range = self._field_range_from_values(values, 'color_cct_min', 'color_cct_max')
 
             # 提取检测标志
-            detect_flag = self.extract_detect_flag(range_node)
+            detect_flag = parse_detect_flag(raw_texts.get('DetectMapFlag'), False)
 
             logger.debug(f"==liuq debug== 提取范围数据: BV{bv_range}, IR{ir_range}, CCT{cct_range}, DetectFlag={detect_flag}")
             return bv_range, ir_range, cct_range, detect_flag
@@ -158,6 +162,13 @@ class XMLDataConversionService:
             logger.warning(f"==liuq debug== 提取范围数据失败: {e}")
             return (0.0, 100.0), (0.0, 100.0), (2000.0, 10000.0), False
     
+    def _field_range_from_values(self, values: Dict[str, Any], min_field: str, max_field: str) -> Tuple[float, float]:
+        """从提取计划结果中取字段范围（字段未配置时返回(0.0, 100.0)）"""
+        if min_field not in values or max_field not in values:
+            logger.warning(f"==liuq debug== 字段配置未找到: {min_field}, {max_field}")
+            return (0.0, 100.0)
+        return (values[min_field], values[max_field])
+
     def extract_field_range(self, range_node: ET.Element, min_field: str, max_field: str) -> Tuple[float, float]:
         """
         使用配置驱动的方式提取字段范围
@@ -205,12 +216,12 @@ class XMLDataConversionService:
 
             if len(xml_path) == 1:
                 # 单层路径（如ml）
-                target_node = range_node.find(xml_path[0])
+                target_node = self.backend.find_child(range_node, xml_path[0])
             elif len(xml_path) == 2:
                 # 双层路径（如bv/min）
-                parent_node = range_node.find(xml_path[0])
+                parent_node = self.backend.find_child(range_node, xml_path[0])
                 if parent_node is not None:
-                    target_node = parent_node.find(xml_path[1])
+                    target_node = self.backend.find_child(parent_node, xml_path[1])
                 else:
                     target_node = None
             else:
@@ -265,26 +276,11 @@ class XMLDataConversionService:
         params = {}
 
         try:
-            range_node = node.find('range')
+            range_node = self.backend.find_range(node)
             if range_node is not None:
-                # 使用配置驱动的方式提取所有range节点字段
-                range_fields = get_fields_by_node_type(XMLFieldNodeType.RANGE)
-
-                for field_name in range_fields:
-                    if field_name in XML_FIELD_CONFIG:
-                        config = XML_FIELD_CONFIG[field_name]
-
-                        # 跳过offset字段（它们不在range节点中）
-                        if config.node_type != XMLFieldNodeType.RANGE:
-                            continue
-
-                        try:
-                            # 提取字段值
-                            field_value = self.extract_single_field_value(range_node, config)
-                            params[field_name] = field_value
-                        except Exception as e:
-                            logger.warning(f"==liuq debug== 提取字段 {field_name} 失败: {e}")
-                            params[field_name] = config.default_value
+                # 按预编译字段提取计划一次遍历提取所有range节点字段
+                values, raw_texts = get_field_extraction_plan().extract_range_fields(range_node)
+                params.update(values)
 
                 # ml字段保持原始值（修复数据转换bug）
                 if 'ml' in params:
@@ -292,11 +288,7 @@ class XMLDataConversionService:
                     params['ml'] = int(params['ml'])
 
                 # 提取DetectMapFlag（不在配置中的特殊字段）
-                params['detect_map_flag'] = self.extract_detect_flag(range_node)
-
-                # 添加ERatio字段（如果存在）
-                e_ratio_params = self.extract_e_ratio_range(range_node)
-                params.update(e_ratio_params)
+                params['detect_map_flag'] = parse_detect_flag(raw_texts.get('DetectMapFlag'), False)
 
             logger.debug(f"==liuq debug== 提取详细参数完成: {len(params)} 个参数")
             return params
@@ -356,27 +348,8 @@ class XMLDataConversionService:
         data = {}
 
         try:
-            # 获取所有注册的字段定义
-            field_definitions = field_registry.get_all_fields()
-
-            for field_def in field_definitions:
-                try:
-                    # 使用XPath查找元素
-                    xpath = field_def.xml_path.replace('./', './')
-                    elem = map_elem.find(xpath)
-
-                    if elem is not None and elem.text is not None:
-                        # 获取元素值并进行类型转换
-                        raw_value = elem.text.strip()
-                        converted_value = field_def.convert_value(raw_value)
-                        data[field_def.field_id] = converted_value
-                    else:
-                        # 使用默认值
-                        data[field_def.field_id] = field_def.default_value
-
-                except Exception as e:
-                    logger.warning(f"==liuq debug== 提取字段 {field_def.field_id} 失败: {e}")
-                    data[field_def.field_id] = field_def.default_value
+            # 注册表全部字段按预编译提取计划一次遍历获取
+            data = get_field_extraction_plan().extract_registry_fields(map_elem)
 
             # 特殊处理：如果没有找到offset坐标，使用x,y坐标
             if data.get('offset_x') == 0.0 and data.get('x', 0.0) != 0.0:
@@ -474,7 +447,7 @@ class XMLDataConversionService:
             str: 别名
         """
         try:
-            alias_node = second_node.find('AliasName')
+            alias_node = self.backend.find_alias(second_node)
             if alias_node is not None and alias_node.text:
                 alias_name = alias_node.text.strip()
                 logger.debug(f"==liuq debug== 提取别名: {alias_name}")
@@ -504,7 +477,7 @@ class XMLDataConversionService:
                 return False
 
             # 检查第一个节点是否有有效的range数据
-            range_node = first_node.find('range')
+            range_node = self.backend.find_range(first_node)
             if range_node is not None:
                 for elem in range_node.iter():
                     if elem.text and elem.text.strip():
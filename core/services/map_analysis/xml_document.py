@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+已解析XML文档句柄
+==liuq debug== FastMapV2 解析/验证/元数据服务共享的XML文档对象
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.1
+描述: 一次读取并解析XML文件，保存原始字节、根元素和节点索引，
+      供XMLParserService、XMLValidationService、XMLMetadataService共享，避免同一文件被反复ET.parse
+"""
+
+import os
+import sys
+import time
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+from core.services.map_analysis.xml_node_index import XMLNodeIndex
+from core.services.map_analysis.xml_backend import get_xml_backend
+
+# psutil为可选依赖：存在时在调试日志中报告解析前后的进程内存增量，
+# 不存在时Linux读取/proc/self/statm，其他类Unix平台使用resource.getrusage的峰值常驻内存
+try:
+    import psutil  # type: ignore
+    _PROCESS = psutil.Process()
+except Exception:
+    _PROCESS = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_STATM_PATH = '/proc/self/statm'
+
+logger = logging.getLogger(__name__)
+
+
+def get_process_rss() -> Optional[int]:
+    """
+    当前进程常驻内存（字节），无法获取时返回None
+
+    依次使用psutil、/proc/self/statm与resource.getrusage；getrusage只能得到峰值，
+    此时内存增量表示解析使峰值上涨的部分
+    """
+    if _PROCESS is not None:
+        try:
+            return _PROCESS.memory_info().rss
+        except Exception:
+            pass
+
+    try:
+        with open(_STATM_PATH, 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    if resource is not None:
+        try:
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        except Exception:
+            return None
+        # Linux以KB为单位，macOS以字节为单位
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+    return None
+
+
+def format_parse_stats(backend_name: str, seconds: float, memory_delta: Optional[int]) -> str:
+    """格式化解析耗时与内存增量，用于调试日志"""
+    memory_text = f"{memory_delta / 1024:.0f}KB" if memory_delta is not None else "未知"
+    return f"后端: {backend_name}, 解析耗时: {seconds * 1000:.1f}ms, 内存增量: {memory_text}"
+
+
+class ParsedXMLDocument:
+    """
+    已解析的XML文档
+
+    属性:
+        path: XML文件路径
+        raw_bytes: 文件原始字节
+        tree: 元素树对象（ElementTree或lxml，取决于当前解析后端）
+        root: 根元素
+        size / mtime_ns: 读取时的文件大小与修改时间
+        backend_name / parse_seconds / memory_delta: 解析后端、解析耗时与内存增量
+
+    节点索引、内容哈希与元素总数按需计算并缓存。
+    文档对象只读共享，使用方不应修改其中的元素树。
+    """
+
+    def __init__(self, path: Path, raw_bytes: bytes, tree,
+                 size: int, mtime_ns: int):
+        self.path = path
+        self.raw_bytes = raw_bytes
+        self.tree = tree
+        self.root = tree.getroot()
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self._node_index: Optional[XMLNodeIndex] = None
+        self._content_hash: Optional[str] = None
+        self._element_count: Optional[int] = None
+        self.backend_name = ""
+        self.parse_seconds = 0.0
+        self.memory_delta: Optional[int] = None
+
+    @classmethod
+    def load(cls, xml_path: Union[str, Path]) -> 'ParsedXMLDocument':
+        """
+        读取并解析XML文件
+
+        Args:
+            xml_path: XML文件路径
+
+        Returns:
+            ParsedXMLDocument: 文档对象
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ET.ParseError: XML格式错误
+        """
+        path = Path(xml_path)
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            raw_bytes = f.read()
+
+        backend = get_xml_backend()
+        rss_before = get_process_rss() if logger.isEnabledFor(logging.DEBUG) else None
+        start = time.perf_counter()
+        tree = backend.parse_bytes(raw_bytes)
+        elapsed = time.perf_counter() - start
+
+        document = cls(path, raw_bytes, tree, stat.st_size, stat.st_mtime_ns)
+        document.backend_name = backend.name
+        document.parse_seconds = elapsed
+        if rss_before is not None:
+            rss_after = get_process_rss()
+            document.memory_delta = rss_after - rss_before if rss_after is not None else None
+
+        logger.debug(f"==liuq debug== XML文档已加载: {path} ({len(raw_bytes)} 字节), "
+                     f"{format_parse_stats(backend.name, elapsed, document.memory_delta)}")
+        return document
+
+    @property
+    def node_index(self) -> XMLNodeIndex:
+        """offset_map/base_boundary节点索引（首次访问时构建）"""
+        if self._node_index is None:
+            self._node_index = XMLNodeIndex.build(self.root)
+        return self._node_index
+
+    @property
+    def content_hash(self) -> str:
+        """原始字节的SHA-256摘要"""
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha256(self.raw_bytes).hexdigest()
+        return self._content_hash
+
+    @property
+    def element_count(self) -> int:
+        """元素总数（含根元素）"""
+        if self._element_count is None:
+            self._element_count = sum(1 for _ in self.root.iter())
+        return self._element_count
+
+
+def load_xml_document(xml_path: Union[str, Path]) -> ParsedXMLDocument:
+    """读取并解析XML文件为共享文档对象"""
+    return ParsedXMLDocument.load(xml_path)
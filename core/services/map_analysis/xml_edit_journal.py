@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML字段编辑日志
+==liuq debug== FastMapV2 只追加的字段级编辑日志（崩溃恢复与撤销/重做）
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.2.0
+描述: 每次字段编辑以一行JSON（别名、字段、旧值、新值、时间戳）追加到XML文件旁的日志文件，
+      撤销/重做只操作内存栈并追加一行记录；保存成功后丢弃已落盘的日志前缀。
+      日志首行记录编写时XML文件的大小、修改时间与SHA-256，程序异常退出后重新打开文件时，
+      只有XML仍是该版本才把尚未保存的编辑按顺序重放，否则（已被恢复、批量改写等）丢弃日志；
+      正常退出或放弃修改时删除日志；记录按编辑前的别名定位目标，重命名后的记录仍可撤销/重做与重放，
+      目标不存在时撤销/重做返回None且不移动记录
+"""
+
+import os
+import json
+import hashlib
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from core.models.map_data import MapConfiguration, MapPoint, set_map_point_field_value
+
+logger = logging.getLogger(__name__)
+
+# base_boundary0的别名（与写入规划中边界替换使用的alias_name一致）
+BASE_BOUNDARY_ALIAS = 'base_boundary0'
+
+JOURNAL_SUFFIX = '.journal'
+
+
+@dataclass
+class EditRecord:
+    """单个字段编辑"""
+    seq: int
+    alias_name: str
+    field_name: str
+    old_value: Any
+    new_value: Any
+    timestamp: float
+
+
+class XMLEditJournal:
+    """
+    XML字段编辑日志
+
+    日志行格式（JSON）：
+        {"op": "base", "size", "mtime_ns", "sha256"}        首行，编辑所基于的XML文件版本
+        {"op": "edit", "seq", "alias", "field", "old", "new", "ts"}
+        {"op": "undo" | "redo", "seq", "alias", "field", "value", "ts"}
+    每行都带有该操作后的字段值，重放时依次赋值即可，不依赖已被保存截断的早期记录。
+    """
+
+    def __init__(self, xml_path: Union[str, Path]):
+        """
+        初始化编辑日志（日志文件为 .<XML文件名>.journal）
+
+        Args:
+            xml_path: XML文件路径
+        """
+        self.xml_path = Path(xml_path)
+        self.journal_path = self.xml_path.with_name(f".{self.xml_path.name}{JOURNAL_SUFFIX}")
+        self._lock = threading.RLock()
+        self._file = None
+        self._undo_stack: List[EditRecord] = []
+        self._redo_stack: List[EditRecord] = []
+        self._next_seq = 1
+
+    # ---------- 记录 ----------
+
+    def record(self, alias_name: str, field_name: str, old_value: Any, new_value: Any) -> EditRecord:
+        """
+        记录一次字段编辑（清空重做栈）
+
+        Args:
+            alias_name: 编辑前的Map点别名（base_boundary0表示基础边界，重命名时即旧别名）
+            field_name: 字段名
+            old_value: 编辑前的值
+            new_value: 编辑后的值
+
+        Returns:
+            EditRecord: 编辑记录
+        """
+        with self._lock:
+            record = EditRecord(self._next_seq, alias_name, field_name,
+                                old_value, new_value, time.time())
+            self._next_seq += 1
+            self._undo_stack.append(record)
+            self._redo_stack.clear()
+            self._append({'op': 'edit', 'seq': record.seq, 'alias': alias_name, 'field': field_name,
+                          'old': old_value, 'new': new_value, 'ts': record.timestamp})
+            return record
+
+    def can_undo(self) -> bool:
+        return bool(self._undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo_stack)
+
+    def undo(self, config: MapConfiguration) -> Optional[EditRecord]:
+        """撤销最近一次编辑（把旧值写回config），没有可撤销的编辑或写回失败时返回None（写回失败时栈不变）"""
+        with self._lock:
+            if not self._undo_stack:
+                return None
+            record = self._undo_stack[-1]
+            alias_name = self._target_alias(record, undo=True)
+            if not self._apply(config, alias_name, record.field_name, record.old_value):
+                return None
+            self._redo_stack.append(self._undo_stack.pop())
+            self._append({'op': 'undo', 'seq': record.seq, 'alias': alias_name,
+                          'field': record.field_name, 'value': record.old_value, 'ts': time.time()})
+            return record
+
+    def redo(self, config: MapConfiguration) -> Optional[EditRecord]:
+        """重做最近一次撤销的编辑，没有可重做的编辑或写回失败时返回None（写回失败时栈不变）"""
+        with self._lock:
+            if not self._redo_stack:
+                return None
+            record = self._redo_stack[-1]
+            alias_name = self._target_alias(record, undo=False)
+            if not self._apply(config, alias_name, record.field_name, record.new_value):
+                return None
+            self._undo_stack.append(self._redo_stack.pop())
+            self._append({'op': 'redo', 'seq': record.seq, 'alias': alias_name,
+                          'field': record.field_name, 'value': record.new_value, 'ts': time.time()})
+            return record
+
+    # ---------- 保存与恢复 ----------
+
+    def position(self) -> int:
+        """当前日志末尾位置（提交保存时记录，保存成功后传给mark_saved）"""
+        with self._lock:
+            if self._file is not None:
+                return self._file.tell()
+            return self.journal_path.stat().st_size if self.journal_path.exists() else 0
+
+    def mark_saved(self, position: Optional[int] = None):
+        """
+        保存成功后丢弃已写入XML的日志前缀（内存中的撤销/重做栈保留）
+
+        Args:
+            position: 保存内容对应的日志位置，None表示当前末尾
+        """
+        with self._lock:
+            end = self.position()
+            if position is None or position >= end:
+                self._close()
+                if self.journal_path.exists():
+                    self.journal_path.unlink()
+                return
+
+            self._close()
+            with open(self.journal_path, 'rb') as f:
+                f.seek(position)
+                tail = f.read()
+            # 剩余记录基于刚保存的XML版本
+            temp_path = self.journal_path.with_name(self.journal_path.name + '.tmp')
+            with open(temp_path, 'wb') as f:
+                f.write(self._encode(self._base_header()))
+                f.write(tail)
+            os.replace(temp_path, self.journal_path)
+
+    def has_pending(self) -> bool:
+        """是否有可重放到当前XML文件的未保存编辑（日志与XML版本不一致时丢弃日志并返回False）"""
+        with self._lock:
+            if not self.journal_path.exists() or self.journal_path.stat().st_size == 0:
+                return False
+            return self._pending_entries() is not None
+
+    def recover(self, config: MapConfiguration) -> int:
+        """
+        把日志中尚未保存的编辑重放到config（config须由最后保存的XML加载），并恢复撤销/重做栈；
+        日志不是基于当前XML版本编写的则丢弃日志
+
+        Args:
+            config: 最后保存的XML对应的配置
+
+        Returns:
+            int: 成功重放的日志行数
+        """
+        with self._lock:
+            entries = self._pending_entries() or []
+            self._undo_stack.clear()
+            self._redo_stack.clear()
+            applied = 0
+            for entry in entries:
+                op = entry.get('op')
+                seq = entry.get('seq', 0)
+                self._next_seq = max(self._next_seq, seq + 1)
+                if op == 'edit':
+                    record = EditRecord(seq, entry['alias'], entry['field'],
+                                        entry.get('old'), entry.get('new'), entry.get('ts', 0.0))
+                    if not self._apply(config, record.alias_name, record.field_name, record.new_value):
+                        continue
+                    self._undo_stack.append(record)
+                    self._redo_stack.clear()
+                elif op in ('undo', 'redo'):
+                    # undo/redo行记录的是写回时实际查找的别名
+                    if not self._apply(config, entry['alias'], entry['field'], entry.get('value')):
+                        continue
+                    source, target = ((self._undo_stack, self._redo_stack) if op == 'undo'
+                                      else (self._redo_stack, self._undo_stack))
+                    if source and source[-1].seq == seq:
+                        target.append(source.pop())
+                else:
+                    continue
+                applied += 1
+
+            if entries:
+                logger.info(f"==liuq debug== 从编辑日志恢复 {applied}/{len(entries)} 条未保存的编辑: {self.journal_path}")
+            return applied
+
+    def discard(self):
+        """删除日志并清空撤销/重做栈"""
+        with self._lock:
+            self._close()
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self._undo_stack.clear()
+            self._redo_stack.clear()
+
+    def close(self):
+        """关闭日志文件句柄"""
+        with self._lock:
+            self._close()
+
+    # ---------- 内部 ----------
+
+    def _append(self, entry: dict):
+        if self._file is None:
+            self._file = open(self.journal_path, 'ab')
+            if self._file.tell() == 0:
+                self._file.write(self._encode(self._base_header()))
+        self._file.write(self._encode(entry))
+        self._file.flush()
+
+    @staticmethod
+    def _encode(entry: dict) -> bytes:
+        return (json.dumps(entry, ensure_ascii=False, default=_json_default) + '\n').encode('utf-8')
+
+    def _base_header(self) -> dict:
+        """当前XML文件版本（大小、修改时间、SHA-256）"""
+        header = {'op': 'base', 'size': None, 'mtime_ns': None, 'sha256': None}
+        try:
+            stat = self.xml_path.stat()
+            header.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=_file_sha256(self.xml_path))
+        except OSError as e:
+            logger.warning(f"==liuq debug== 读取XML文件版本失败: {self.xml_path} - {e}")
+        return header
+
+    def _matches_base(self, header: dict) -> bool:
+        """日志首行记录的XML版本是否就是当前文件（大小不同直接判定不一致，修改时间不同时比较SHA-256）"""
+        try:
+            stat = self.xml_path.stat()
+        except OSError:
+            return False
+        if header.get('sha256') is None or header.get('size') != stat.st_size:
+            return False
+        if header.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+        return header['sha256'] == _file_sha256(self.xml_path)
+
+    def _pending_entries(self) -> Optional[List[dict]]:
+        """读取日志中的编辑记录；日志缺少版本首行或与当前XML不一致时丢弃日志并返回None"""
+        entries = self._read_entries()
+        if not entries:
+            return []
+        header = entries[0]
+        if header.get('op') != 'base' or not self._matches_base(header):
+            logger.warning(f"==liuq debug== 编辑日志与当前XML文件版本不一致，丢弃日志: {self.journal_path}")
+            self.discard()
+            return None
+        return entries[1:]
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_entries(self) -> List[dict]:
+        if not self.journal_path.exists():
+            return []
+        entries = []
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line.decode('utf-8')))
+                except ValueError:
+                    # 异常退出时最后一行可能不完整
+                    logger.warning(f"==liuq debug== 跳过无法解析的编辑日志行: {line[:80]!r}")
+        return entries
+
+    @staticmethod
+    def _target_alias(record: EditRecord, undo: bool) -> str:
+        """写回时查找目标的别名：记录的是编辑前的别名，撤销重命名时目标已使用新别名"""
+        if undo and record.field_name == 'alias_name':
+            return record.new_value
+        return record.alias_name
+
+    def _apply(self, config: MapConfiguration, alias_name: str, field_name: str, value: Any) -> bool:
+        """把字段值写回config中的目标对象，目标或字段不存在时返回False"""
+        target = self._find_target(config, alias_name)
+        if target is None:
+            logger.warning(f"==liuq debug== 编辑日志目标不存在，跳过: {alias_name}.{field_name}")
+            return False
+
+        if hasattr(target, field_name):
+            current = getattr(target, field_name)
+            if isinstance(current, tuple) and isinstance(value, list):
+                value = tuple(value)
+            setattr(target, field_name, value)
+            return True
+        if isinstance(target, MapPoint) and set_map_point_field_value(target, field_name, value):
+            return True
+        logger.warning(f"==liuq debug== 编辑日志字段不存在，跳过: {alias_name}.{field_name}")
+        return False
+
+    def _find_target(self, config: MapConfiguration, alias_name: str):
+        """按别名查找Map点或基础边界（使用配置维护的别名索引）"""
+        if alias_name == BASE_BOUNDARY_ALIAS:
+            return config.base_boundary
+        return config.find_map_point_by_alias(alias_name)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _json_default(value):
+    """numpy标量等非JSON类型按数值或字符串记录"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+# 全局编辑日志实例（按XML文件）
+_journals: Dict[Path, XMLEditJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_edit_journal(xml_path: Union[str, Path]) -> XMLEditJournal:
+    """获取XML文件的编辑日志（同一文件共用一个实例，编辑器与写入服务共享撤销栈）"""
+    key = Path(xml_path).absolute()
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = XMLEditJournal(key)
+            _journals[key] = journal
+        return journal
+
+
+def discard_edit_journals():
+    """丢弃全部已打开文件的编辑日志（正常退出或放弃未保存的修改时调用）"""
+    with _journals_lock:
+        journals = list(_journals.values())
+    for journal in journals:
+        try:
+            journal.discard()
+        except OSError as e:
+            logger.warning(f"==liuq debug== 删除编辑日志失败: {journal.journal_path} - {e}")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML字段提取计划
+==liuq debug== FastMapV2 预编译字段提取计划
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 将XML_FIELD_CONFIG与字段注册表一次性编译为提取计划（路径元组、目标类型、默认值），
+      解析时对range节点只做一次子节点遍历即可取得全部字段，而不是每个字段各自查找；
+      计划缓存在全局实例中，仅在字段定义变化时重建
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+
+from core.models.map_data import (
+    XML_FIELD_CONFIG, XMLFieldNodeType, XMLFieldDataType
+)
+from core.services.shared.field_registry_service import field_registry
+
+logger = logging.getLogger(__name__)
+
+# range节点下不在XML_FIELD_CONFIG中、但解析时需要原始文本的叶子节点
+RANGE_RAW_TAGS: Tuple[str, ...] = ('DetectMapFlag',)
+
+# 文本存在但无法解析时不使用默认值的字段（ERatio历史上按0.0处理）
+RANGE_INVALID_VALUES: Dict[str, Any] = {'e_ratio_min': 0.0, 'e_ratio_max': 0.0}
+
+
+@dataclass(frozen=True)
+class FieldExtractionStep:
+    """单个字段的提取步骤"""
+    field_name: str
+    path: Tuple[str, ...]
+    data_type: Any
+    default_value: Any
+    invalid_value: Any
+
+    def parse(self, text: str) -> Any:
+        """按目标类型解析文本（与parse_field_value规则一致）"""
+        try:
+            if self.data_type == XMLFieldDataType.DOUBLE:
+                return float(text)
+            if self.data_type in (XMLFieldDataType.UINT, XMLFieldDataType.INT):
+                return int(float(text))
+            return text
+        except (ValueError, TypeError):
+            return self.invalid_value
+
+
+@dataclass(frozen=True)
+class RegistryExtractionStep:
+    """字段注册表字段的提取步骤（xml_path已拆分为标签元组）"""
+    field_id: str
+    path: Tuple[str, ...]
+    field_definition: Any
+
+
+class FieldExtractionPlan:
+    """
+    预编译的字段提取计划
+
+    range字段按“子节点标签 → 孙节点标签 → 步骤”分组，
+    extract_range_fields对range节点只遍历一次子节点；
+    注册表字段按路径末级标签分组，extract_registry_fields对Map元素只做一次深度遍历。
+    """
+
+    def __init__(self, range_steps: List[FieldExtractionStep],
+                 registry_steps: List[RegistryExtractionStep], config_size: int):
+        self.range_steps = tuple(range_steps)
+        self.registry_steps = tuple(registry_steps)
+        self.config_size = config_size
+
+        # 单层路径（如ml）：子节点标签 → 步骤
+        self._leaf_steps: Dict[str, List[FieldExtractionStep]] = {}
+        # 双层路径（如bv/min）：子节点标签 → 孙节点标签 → 步骤
+        self._nested_steps: Dict[str, Dict[str, List[FieldExtractionStep]]] = {}
+        for step in self.range_steps:
+            if len(step.path) == 1:
+                self._leaf_steps.setdefault(step.path[0], []).append(step)
+            elif len(step.path) == 2:
+                self._nested_steps.setdefault(step.path[0], {}).setdefault(step.path[1], []).append(step)
+
+        # 注册表字段：路径末级标签 → 步骤
+        self._registry_by_last_tag: Dict[str, List[RegistryExtractionStep]] = {}
+        for step in self.registry_steps:
+            if step.path:
+                self._registry_by_last_tag.setdefault(step.path[-1], []).append(step)
+
+    def extract_range_fields(self, range_node) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        一次遍历提取range节点下的全部配置字段
+
+        与逐字段find一致：同名子节点只取第一个，节点缺失或文本为空时使用默认值。
+
+        Args:
+            range_node: range XML节点
+
+        Returns:
+            (字段值字典, RANGE_RAW_TAGS中各标签的原始文本)
+        """
+        values: Dict[str, Any] = {}
+        raw_texts: Dict[str, str] = {}
+        leaf_steps = self._leaf_steps
+        nested_steps = self._nested_steps
+        seen_children = set()
+
+        for child in range_node:
+            tag = child.tag
+            if tag in seen_children:
+                continue
+            seen_children.add(tag)
+
+            steps = leaf_steps.get(tag)
+            if steps is not None:
+                text = child.text
+                if text:
+                    for step in steps:
+                        values[step.field_name] = step.parse(text)
+
+            grandchild_steps = nested_steps.get(tag)
+            if grandchild_steps is not None:
+                seen_grandchildren = set()
+                for grandchild in child:
+                    sub_tag = grandchild.tag
+                    if sub_tag in seen_grandchildren:
+                        continue
+                    seen_grandchildren.add(sub_tag)
+                    steps = grandchild_steps.get(sub_tag)
+                    if steps is not None:
+                        text = grandchild.text
+                        if text:
+                            for step in steps:
+                                values[step.field_name] = step.parse(text)
+
+            if tag in RANGE_RAW_TAGS:
+                raw_texts[tag] = child.text
+
+        # 按配置顺序输出，缺失字段补默认值
+        ordered = {}
+        for step in self.range_steps:
+            ordered[step.field_name] = values.get(step.field_name, step.default_value)
+        return ordered, raw_texts
+
+    def extract_registry_fields(self, map_elem) -> Dict[str, Any]:
+        """
+        一次深度遍历提取字段注册表中的全部字段
+
+        每个字段取文档顺序中第一个路径匹配的后代元素，找不到时使用默认值。
+
+        Args:
+            map_elem: Map XML元素
+
+        Returns:
+            Dict[str, Any]: 字段ID → 值
+        """
+        matched: Dict[str, Any] = {}
+        by_last_tag = self._registry_by_last_tag
+        remaining = len(self.registry_steps)
+
+        # 显式栈深度遍历，tag_path记录从map_elem之下到当前元素的标签路径
+        stack = [(child, (child.tag,)) for child in reversed(list(map_elem))]
+        while stack and remaining:
+            elem, tag_path = stack.pop()
+            steps = by_last_tag.get(elem.tag)
+            if steps is not None:
+                for step in steps:
+                    if step.field_id in matched:
+                        continue
+                    if tag_path[-len(step.path):] != step.path:
+                        continue
+                    matched[step.field_id] = elem
+                    remaining -= 1
+            for child in reversed(list(elem)):
+                stack.append((child, tag_path + (child.tag,)))
+
+        data = {}
+        for step in self.registry_steps:
+            field_def = step.field_definition
+            elem = matched.get(step.field_id)
+            try:
+                if elem is not None and elem.text is not None:
+                    data[step.field_id] = field_def.convert_value(elem.text.strip())
+                else:
+                    data[step.field_id] = field_def.default_value
+            except Exception as e:
+                logger.warning(f"==liuq debug== 提取字段 {step.field_id} 失败: {e}")
+                data[step.field_id] = field_def.default_value
+        return data
+
+
+def parse_detect_flag(text: Optional[str], default: bool) -> bool:
+    """解析DetectMapFlag文本：'1'/'true'/'yes'为True，文本为空时返回默认值"""
+    if not text:
+        return default
+    return text.strip().lower() in ('1', 'true', 'yes')
+
+
+def compile_field_extraction_plan() -> FieldExtractionPlan:
+    """由XML_FIELD_CONFIG与字段注册表编译提取计划"""
+    range_steps = []
+    for field_name, config in XML_FIELD_CONFIG.items():
+        if config.node_type != XMLFieldNodeType.RANGE:
+            continue
+        range_steps.append(FieldExtractionStep(
+            field_name=field_name,
+            path=tuple(config.xml_path),
+            data_type=config.data_type,
+            default_value=config.default_value,
+            invalid_value=RANGE_INVALID_VALUES.get(field_name, config.default_value),
+        ))
+
+    registry_steps = []
+    for field_def in field_registry.get_all_fields():
+        xml_path = field_def.xml_path or ''
+        path = tuple(part for part in xml_path.replace('.//', '').split('/') if part and part != '.')
+        registry_steps.append(RegistryExtractionStep(
+            field_id=field_def.field_id,
+            path=path,
+            field_definition=field_def,
+        ))
+
+    logger.debug(f"==liuq debug== 字段提取计划编译完成: range字段{len(range_steps)}个, "
+                 f"注册表字段{len(registry_steps)}个")
+    return FieldExtractionPlan(range_steps, registry_steps, len(XML_FIELD_CONFIG))
+
+
+# 全局提取计划实例
+_field_extraction_plan: Optional[FieldExtractionPlan] = None
+_registry_callback_id: Optional[str] = None
+
+
+def _on_field_registry_changed(field_id: str, change_type: str):
+    """字段注册表变化回调：字段定义变化时丢弃已编译计划"""
+    if change_type in ("visibility_changed", "editability_changed"):
+        return
+    invalidate_field_extraction_plan()
+
+
+def invalidate_field_extraction_plan():
+    """丢弃已编译的提取计划，下次获取时重建"""
+    global _field_extraction_plan
+    _field_extraction_plan = None
+
+
+def get_field_extraction_plan() -> FieldExtractionPlan:
+    """获取字段提取计划（字段定义变化后自动重建）"""
+    global _field_extraction_plan, _registry_callback_id
+
+    if _registry_callback_id is None:
+        _registry_callback_id = field_registry.register_field_change_callback(_on_field_registry_changed)
+
+    plan = _field_extraction_plan
+    # XML_FIELD_CONFIG为模块级字典，增删字段时同样重建
+    if plan is None or plan.config_size != len(XML_FIELD_CONFIG):
+        plan = compile_field_extraction_plan()
+        _field_extraction_plan = plan
+    return plan
@@ -10,13 +10,13 @@ XML格式化服务
 """
 
 import logging
-from typing import Any, Union, Optional
+from typing import Any, Iterable, List, Union, Optional
 from decimal import Decimal
 from core.models.map_data import (
-    MapPoint, BaseBoundary, XML_FIELD_CONFIG, XMLFieldNodeType,
-    format_field_value, get_map_point_field_value
+    MapPoint, BaseBoundary, XML_FIELD_CONFIG, XMLFieldNodeType, XMLFieldDataType,
+    format_field_value, get_field_data_type, get_map_point_field_value
 )
-from utils.number_formatter import format_decimal_precise
+from utils.number_formatter import format_decimal_fast, format_decimal_batch
 
 logger = logging.getLogger(__name__)
 
@@ -63,8 +63,8 @@ class XMLFormattingService:
             if value is None:
                 return "0"
 
-            # 使用统一的格式化核心算法
-            result = format_decimal_precise(value)
+            # 使用统一的格式化核心算法（float/int快速路径，其余值带缓存）
+            result = format_decimal_fast(value)
             return result
 
         except (ValueError, TypeError):
@@ -72,6 +72,25 @@ class XMLFormattingService:
             result = str(value) if value is not None else "0"
             return result
 
+    def format_numbers_for_xml(self, values: Iterable[Any]) -> List[str]:
+        """
+        批量格式化一列数值，结果与逐个调用format_number_for_xml一致
+
+        Args:
+            values: 数值序列或numpy数组
+
+        Returns:
+            List[str]: 格式化后的字符串列表
+        """
+        if getattr(values, 'dtype', None) is None:
+            values = list(values)
+            if any(value is None for value in values):
+                return [self.format_number_for_xml(value) for value in values]
+        try:
+            return format_decimal_batch(values)
+        except (ValueError, TypeError):
+            return [self.format_number_for_xml(value) for value in values]
+
     def format_field_value(self, field_value: Any, field_name: str) -> str:
         """
         格式化字段值为XML字符串
@@ -85,6 +104,28 @@ class XMLFormattingService:
         """
         return format_field_value(field_value, field_name)
 
+    def format_field_values(self, field_values: Iterable[Any], field_name: str) -> List[str]:
+        """
+        批量格式化同一字段的一列值，结果与逐个调用format_field_value一致
+
+        Args:
+            field_values: 字段值序列
+            field_name: 字段名称
+
+        Returns:
+            List[str]: 格式化后的字符串列表
+        """
+        field_values = list(field_values)
+        if get_field_data_type(field_name) != XMLFieldDataType.DOUBLE:
+            return [format_field_value(value, field_name) for value in field_values]
+
+        config = XML_FIELD_CONFIG.get(field_name)
+        default_value = config.default_value if config else 0
+        try:
+            return format_decimal_batch([default_value if value is None else value for value in field_values])
+        except (ValueError, TypeError):
+            return [format_field_value(value, field_name) for value in field_values]
+
     def format_map_point_data(self, map_point: MapPoint) -> dict:
         """
         格式化Map点数据为XML写入格式
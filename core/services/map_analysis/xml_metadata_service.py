@@ -16,6 +16,8 @@ from typing import Dict, List, Any, Union, Optional
 from pathlib import Path
 from datetime import datetime
 
+from core.services.map_analysis.xml_document import ParsedXMLDocument
+
 logger = logging.getLogger(__name__)
 
 
@@ -81,12 +83,14 @@ class XMLMetadataService:
             logger.error(f"==liuq debug== 提取文件元数据失败: {e}")
             return {"error": f"提取文件元数据失败: {e}"}
     
-    def extract_xml_structure_metadata(self, xml_path: Union[str, Path]) -> Dict[str, Any]:
+    def extract_xml_structure_metadata(self, xml_path: Union[str, Path],
+                                       document: Optional[ParsedXMLDocument] = None) -> Dict[str, Any]:
         """
         提取XML结构元数据
         
         Args:
             xml_path: XML文件路径
+            document: 已加载的共享文档对象（提供时不再解析文件）
             
         Returns:
             Dict[str, Any]: XML结构元数据字典
@@ -98,13 +102,15 @@ class XMLMetadataService:
             
             # 解析XML结构
             try:
-                tree = ET.parse(xml_path)
-                root = tree.getroot()
+                if document is None:
+                    document = ParsedXMLDocument.load(xml_path)
+                tree = document.tree
+                root = document.root
                 
                 metadata.update({
                     'root_tag': root.tag,
-                    'element_count': len(list(root.iter())),
-                    'encoding': getattr(tree, 'docinfo', {}).get('encoding', 'unknown') if hasattr(tree, 'docinfo') else 'unknown'
+                    'element_count': document.element_count,
+                    'encoding': getattr(getattr(tree, 'docinfo', None), 'encoding', None) or 'unknown'
                 })
                 
                 # 分析XML层级结构
@@ -139,12 +145,14 @@ class XMLMetadataService:
             logger.error(f"==liuq debug== 提取XML结构元数据失败: {e}")
             return {"error": f"提取XML结构元数据失败: {e}"}
     
-    def extract_content_metadata(self, xml_path: Union[str, Path]) -> Dict[str, Any]:
+    def extract_content_metadata(self, xml_path: Union[str, Path],
+                                 document: Optional[ParsedXMLDocument] = None) -> Dict[str, Any]:
         """
         提取XML内容元数据
         
         Args:
             xml_path: XML文件路径
+            document: 已加载的共享文档对象（提供时不再解析文件）
             
         Returns:
             Dict[str, Any]: 内容元数据字典
@@ -154,8 +162,9 @@ class XMLMetadataService:
         try:
             xml_path = Path(xml_path)
             
-            tree = ET.parse(xml_path)
-            root = tree.getroot()
+            if document is None:
+                document = ParsedXMLDocument.load(xml_path)
+            root = document.root
             
             # 提取版本信息
             version_elem = root.find('.//version')
@@ -208,21 +217,30 @@ class XMLMetadataService:
             logger.error(f"==liuq debug== 提取XML内容元数据失败: {e}")
             return {"error": f"提取内容元数据失败: {e}"}
     
-    def extract_complete_metadata(self, xml_path: Union[str, Path]) -> Dict[str, Any]:
+    def extract_complete_metadata(self, xml_path: Union[str, Path],
+                                  document: Optional[ParsedXMLDocument] = None) -> Dict[str, Any]:
         """
         提取完整的XML元数据（整合所有元数据类型）
         
         Args:
             xml_path: XML文件路径
+            document: 已加载的共享文档对象（未提供时在此解析一次，结构与内容元数据共享）
             
         Returns:
             Dict[str, Any]: 完整元数据字典
         """
         try:
+            if document is None:
+                try:
+                    document = ParsedXMLDocument.load(xml_path)
+                except Exception:
+                    # 解析失败时由各子方法分别记录错误信息
+                    document = None
+
             # 提取各类元数据
             file_metadata = self.extract_file_metadata(xml_path)
-            structure_metadata = self.extract_xml_structure_metadata(xml_path)
-            content_metadata = self.extract_content_metadata(xml_path)
+            structure_metadata = self.extract_xml_structure_metadata(xml_path, document)
+            content_metadata = self.extract_content_metadata(xml_path, document)
             
             # 整合元数据
             complete_metadata = {
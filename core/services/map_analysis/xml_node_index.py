@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML节点索引
+==liuq debug== FastMapV2 offset_map/base_boundary 节点单遍索引
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 通过一次 root.iter() 遍历，将所有 offset_mapNN / base_boundaryN 节点按标签分组，
+      取代按编号逐个 root.findall('.//offset_mapNN') 的全树扫描
+"""
+
+import re
+import logging
+from typing import Dict, List, Iterator, Tuple, Optional
+from xml.etree import ElementTree as ET
+
+from core.services.map_analysis.xml_backend import get_xml_backend
+
+logger = logging.getLogger(__name__)
+
+# offset_map01 / offset_map116 / base_boundary0 ...
+_INDEXED_TAG_PATTERN = re.compile(r'^(offset_map|base_boundary)(\d+)$')
+
+
+def is_indexed_tag(tag) -> bool:
+    """判断标签是否为索引管理的 offset_mapNN / base_boundaryN"""
+    return isinstance(tag, str) and _INDEXED_TAG_PATTERN.match(tag) is not None
+
+
+class XMLNodeIndex:
+    """
+    offset_map 节点索引
+
+    XML中每个Map由两个同名节点组成（第一组为offset/range/weight数据，第二组为AliasName/RpG/BpG等元数据），
+    索引按标签名保存文档顺序的节点列表，与 root.findall('.//tag') 的结果一致。
+    """
+
+    def __init__(self):
+        """初始化空索引"""
+        self._groups: Dict[str, List[ET.Element]] = {}
+        # 标签名 -> (前缀, 编号)
+        self._tag_numbers: Dict[str, Tuple[str, int]] = {}
+
+    @classmethod
+    def build(cls, root: ET.Element) -> 'XMLNodeIndex':
+        """
+        单次遍历XML树构建索引
+
+        Args:
+            root: XML根元素
+
+        Returns:
+            XMLNodeIndex: 构建完成的索引
+        """
+        index = cls()
+        groups = index._groups
+        tag_numbers = index._tag_numbers
+
+        # 跳过根元素本身，与 './/tag' 的语义保持一致；lxml后端仅遍历标签前缀匹配的元素
+        for elem in get_xml_backend().iter_indexed_candidates(root):
+            tag = elem.tag
+            nodes = groups.get(tag)
+            if nodes is not None:
+                nodes.append(elem)
+                continue
+            if not isinstance(tag, str):
+                continue
+            match = _INDEXED_TAG_PATTERN.match(tag)
+            if match:
+                groups[tag] = [elem]
+                tag_numbers[tag] = (match.group(1), int(match.group(2)))
+
+        logger.debug(f"==liuq debug== 节点索引构建完成: {len(groups)} 个标签分组")
+        return index
+
+    def get_nodes(self, tag: str) -> List[ET.Element]:
+        """获取指定标签的全部节点（文档顺序），不存在时返回空列表"""
+        return self._groups.get(tag, [])
+
+    def has_tag(self, tag: str) -> bool:
+        """检查标签是否存在"""
+        return tag in self._groups
+
+    def iter_offset_maps(self) -> Iterator[Tuple[str, List[ET.Element]]]:
+        """按编号升序遍历所有 offset_mapNN 分组"""
+        yield from self._iter_prefix('offset_map')
+
+    def iter_base_boundaries(self) -> Iterator[Tuple[str, List[ET.Element]]]:
+        """按编号升序遍历所有 base_boundaryN 分组"""
+        yield from self._iter_prefix('base_boundary')
+
+    def get_offset_map_tag(self, number: int) -> Optional[str]:
+        """
+        按编号获取 offset_map 标签名（编号小于10时补零，如 offset_map01）
+
+        Args:
+            number: Map编号（从1开始）
+
+        Returns:
+            标签名，不存在时返回None
+        """
+        tag = f"offset_map{number:02d}"
+        return tag if tag in self._groups else None
+
+    @property
+    def offset_map_count(self) -> int:
+        """offset_map 标签分组数量"""
+        return sum(1 for prefix, _ in self._tag_numbers.values() if prefix == 'offset_map')
+
+    def _iter_prefix(self, prefix: str) -> Iterator[Tuple[str, List[ET.Element]]]:
+        tags = [tag for tag, (p, _) in self._tag_numbers.items() if p == prefix]
+        tags.sort(key=lambda tag: self._tag_numbers[tag][1])
+        for tag in tags:
+            yield tag, self._groups[tag]
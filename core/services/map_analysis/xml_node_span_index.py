@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML节点文本区间索引
+==liuq debug== FastMapV2 (节点名, 别名) → 文本区间 单遍索引
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 一次扫描XML文本，记录每个offset_mapNN/base_boundaryN节点对的起止位置与AliasName，
+      取代写入规划阶段对每个替换操作都从头扫描整个文本的_find_exact_node_by_alias
+"""
+
+import re
+import logging
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.services.map_analysis.xml_node_index import is_indexed_tag
+
+logger = logging.getLogger(__name__)
+
+# <offset_map01> / </offset_map01> / <base_boundary0> ...（与按字符串查找一致，只匹配无属性的标签）
+_SPAN_TAG_PATTERN = re.compile(r'<(/?)((?:offset_map|base_boundary)\d+)>')
+_SPAN_TAG_BYTES_PATTERN = re.compile(rb'<(/?)((?:offset_map|base_boundary)\d+)>')
+
+
+class XMLNodeSpanIndex:
+    """
+    节点文本区间索引
+
+    与XMLWriterCore._find_exact_node_by_alias的配对规则一致：同名节点两两配对，
+    第一个为数据节点、第二个为含AliasName的元数据节点，区间指向第一个节点；
+    末尾没有配对节点时在第一个节点内查找AliasName。同一(节点名, 别名)取文档中第一个。
+    """
+
+    def __init__(self):
+        """初始化空索引"""
+        self._spans: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self.content_length = 0
+
+    @classmethod
+    def build(cls, content: str) -> 'XMLNodeSpanIndex':
+        """
+        单次扫描XML文本构建区间索引
+
+        Args:
+            content: XML文本（或MappedXMLText字节视图，此时区间为字节偏移）
+
+        Returns:
+            XMLNodeSpanIndex: 构建完成的索引
+        """
+        index = cls()
+        index.content_length = len(content)
+
+        opens: Dict[str, List[int]] = {}
+        closes: Dict[str, List[int]] = {}
+        for is_close, node_name, position in _iter_span_tags(content):
+            positions = closes if is_close else opens
+            positions.setdefault(node_name, []).append(position)
+
+        for node_name, open_positions in opens.items():
+            index._index_node_pairs(content, node_name, open_positions, closes.get(node_name, []))
+
+        logger.debug(f"==liuq debug== 节点区间索引构建完成: {len(index._spans)} 个节点")
+        return index
+
+    def _index_node_pairs(self, content: str, node_name: str,
+                          open_positions: List[int], close_positions: List[int]):
+        """按双节点配对规则记录同名节点的区间"""
+        close_length = len(f'</{node_name}>')
+        search_start = 0
+        while True:
+            i = bisect_left(open_positions, search_start)
+            if i == len(open_positions):
+                break
+            first_start = open_positions[i]
+            j = bisect_left(close_positions, first_start)
+            if j == len(close_positions):
+                break
+            first_end = close_positions[j] + close_length
+
+            k = bisect_left(open_positions, first_end)
+            if k == len(open_positions):
+                # 兼容：有时AliasName就在第一个里
+                alias = _find_alias_text(content, first_start, first_end)
+                if alias is not None:
+                    self._spans.setdefault((node_name, alias), (first_start, first_end))
+                break
+            second_start = open_positions[k]
+            m = bisect_left(close_positions, second_start)
+            if m == len(close_positions):
+                break
+            second_end = close_positions[m] + close_length
+
+            alias = _find_alias_text(content, second_start, second_end)
+            if alias is not None:
+                self._spans.setdefault((node_name, alias), (first_start, first_end))
+            search_start = second_end
+
+    def covers(self, node_name: str) -> bool:
+        """节点名是否由索引管理（offset_mapNN / base_boundaryN）"""
+        return is_indexed_tag(node_name)
+
+    def find(self, node_name: str, alias_name: str) -> Tuple[int, int]:
+        """查找节点区间，未找到时返回(-1, -1)"""
+        return self._spans.get((node_name, alias_name), (-1, -1))
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+
+def _iter_span_tags(content) -> Iterator[Tuple[bool, str, int]]:
+    """逐个产出(是否结束标签, 节点名, 起始位置)，字节视图直接在底层缓冲区上匹配"""
+    buffer = getattr(content, 'buffer', None)
+    if buffer is None:
+        for match in _SPAN_TAG_PATTERN.finditer(content):
+            yield bool(match.group(1)), match.group(2), match.start()
+    else:
+        for match in _SPAN_TAG_BYTES_PATTERN.finditer(buffer):
+            yield bool(match.group(1)), match.group(2).decode('ascii'), match.start()
+
+
+def _find_alias_text(content: str, start: int, end: int) -> Optional[str]:
+    """在content[start:end]内查找第一个AliasName的文本（去除首尾空白）"""
+    alias_start = content.find('<AliasName', start, end)
+    if alias_start == -1:
+        return None
+    tag_end = content.find('>', alias_start, end)
+    if tag_end == -1:
+        return None
+    content_end = content.find('</AliasName>', tag_end, end)
+    if content_end == -1:
+        return None
+    return content[tag_end + 1:content_end].strip()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML解析结果缓存服务
+==liuq debug== FastMapV2 MapConfiguration磁盘缓存
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.2.0
+描述: 以文件指纹（路径、大小、mtime、内容哈希）为键，将解析后的MapConfiguration序列化到磁盘，
+      再次打开同一XML时直接反序列化，跳过XML解析；按总大小进行LRU淘汰，字段注册表定义变化时失效。
+      缓存目录默认位于项目根目录下（与当前工作目录无关），可通过环境变量FASTMAP_XML_PARSE_CACHE_DIR覆盖；
+      条目可附带加载流程的验证结果与元数据，命中时整个加载流程无需解析XML
+"""
+
+import os
+import pickle
+import hashlib
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union, List, Tuple
+
+from core.models.map_data import MapConfiguration, XML_FIELD_CONFIG
+from core.services.shared.field_registry_service import field_registry
+from core.services.map_analysis.xml_document import ParsedXMLDocument
+
+logger = logging.getLogger(__name__)
+
+# 缓存文件格式版本，MapConfiguration结构变化时递增
+CACHE_FORMAT_VERSION = 3
+
+# 默认缓存目录锚定到项目根目录，避免随启动时的工作目录散落在各处
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[3] / "data" / "cache" / "xml_parse"
+# 覆盖缓存目录的环境变量（对进程池中的工作进程同样生效）
+CACHE_DIR_ENV = "FASTMAP_XML_PARSE_CACHE_DIR"
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+_CACHE_SUFFIX = ".pkl"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class XMLFileFingerprint:
+    """XML文件指纹"""
+    path: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+
+
+class XMLParseCacheService:
+    """
+    XML解析结果缓存服务
+
+    每个XML路径对应一个缓存文件，内容包含文件指纹、字段注册表签名和MapConfiguration。
+    命中时以缓存文件的mtime记录最近访问时间，写入新条目后按mtime从旧到新淘汰，直到总大小不超过上限。
+    """
+
+    def __init__(self, cache_dir: Union[str, Path, None] = None,
+                 max_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+                 watch_field_registry: bool = True):
+        """
+        初始化缓存服务
+
+        Args:
+            cache_dir: 缓存目录，默认由get_default_cache_dir决定
+            max_bytes: 缓存目录总大小上限（字节）
+            watch_field_registry: 是否监听字段注册表变化
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else get_default_cache_dir()
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._registry_signature: Optional[str] = None
+        self._callback_id: Optional[str] = None
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+        if watch_field_registry:
+            self._callback_id = field_registry.register_field_change_callback(self._on_field_registry_changed)
+
+        logger.info(f"==liuq debug== XML解析缓存服务初始化完成: {self.cache_dir}")
+
+    # ==================== 指纹与签名 ====================
+
+    def compute_fingerprint(self, xml_path: Union[str, Path],
+                            document: Optional[ParsedXMLDocument] = None) -> XMLFileFingerprint:
+        """
+        计算XML文件指纹
+
+        Args:
+            xml_path: XML文件路径
+            document: 已加载的文档对象（提供时直接使用其读取时的大小、mtime与原始字节，不再读取文件）
+
+        Returns:
+            XMLFileFingerprint: 文件指纹
+        """
+        path = Path(xml_path).resolve()
+        if document is not None:
+            return XMLFileFingerprint(str(path), document.size, document.mtime_ns, document.content_hash)
+
+        stat = path.stat()
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return XMLFileFingerprint(str(path), stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+
+    def get_registry_signature(self) -> str:
+        """
+        获取字段定义签名
+
+        签名覆盖XML_FIELD_CONFIG与字段注册表中影响解析的属性（ID、类型、XML路径、默认值），
+        可见性/可编辑性等显示属性不参与签名。
+        """
+        signature = self._registry_signature
+        if signature is None:
+            digest = hashlib.sha1(str(CACHE_FORMAT_VERSION).encode('utf-8'))
+            for name in sorted(XML_FIELD_CONFIG):
+                config = XML_FIELD_CONFIG[name]
+                digest.update(repr((name, config.xml_path, config.node_type.value,
+                                    config.data_type.value, config.default_value)).encode('utf-8'))
+            for field_def in sorted(field_registry.get_all_fields(), key=lambda f: f.field_id):
+                digest.update(repr((field_def.field_id, field_def.field_type.value,
+                                    field_def.xml_path, field_def.default_value)).encode('utf-8'))
+            signature = digest.hexdigest()
+            self._registry_signature = signature
+        return signature
+
+    def _on_field_registry_changed(self, field_id: str, change_type: str):
+        """字段注册表变化回调：重新计算签名，旧签名的缓存条目在下次读取时失效"""
+        if change_type in ("visibility_changed", "editability_changed"):
+            return
+        self._registry_signature = None
+        logger.debug(f"==liuq debug== 字段定义变化({field_id}, {change_type})，XML解析缓存签名已重置")
+
+    # ==================== 读写 ====================
+
+    def get(self, fingerprint: XMLFileFingerprint, device_type: str) -> Optional[MapConfiguration]:
+        """
+        读取缓存的MapConfiguration
+
+        Args:
+            fingerprint: 当前文件指纹
+            device_type: 本次请求的设备类型
+
+        Returns:
+            命中时返回新的MapConfiguration对象，未命中返回None
+        """
+        entry = self.get_entry(fingerprint, device_type)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, fingerprint: XMLFileFingerprint,
+                  device_type: str) -> Optional[Tuple[MapConfiguration, Dict[str, Any]]]:
+        """
+        读取缓存的MapConfiguration及写入时附带的数据
+
+        Args:
+            fingerprint: 当前文件指纹
+            device_type: 本次请求的设备类型
+
+        Returns:
+            命中时返回(MapConfiguration, 附带数据字典)，未命中返回None
+        """
+        if not self.enabled:
+            return None
+
+        entry_path = self._entry_path(fingerprint.path)
+        try:
+            with open(entry_path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            self.stats['misses'] += 1
+            return None
+        except Exception as e:
+            logger.warning(f"==liuq debug== XML解析缓存条目损坏，已删除: {entry_path} ({e})")
+            self._remove_entry(entry_path)
+            self.stats['misses'] += 1
+            return None
+
+        if (not isinstance(entry, dict)
+                or entry.get('format_version') != CACHE_FORMAT_VERSION
+                or entry.get('fingerprint') != fingerprint
+                or entry.get('registry_signature') != self.get_registry_signature()):
+            self._remove_entry(entry_path)
+            self.stats['misses'] += 1
+            return None
+
+        config: MapConfiguration = entry['config']
+        config.device_type = device_type
+
+        # 以缓存文件mtime记录最近访问时间，用于LRU淘汰
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        self.stats['hits'] += 1
+        logger.info(f"==liuq debug== XML解析缓存命中: {fingerprint.path}")
+        return config, entry.get('extras') or {}
+
+    def put(self, fingerprint: XMLFileFingerprint, config: MapConfiguration,
+            extras: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        写入缓存条目
+
+        Args:
+            fingerprint: 解析前计算的文件指纹
+            config: 解析得到的MapConfiguration
+            extras: 随条目保存的附带数据（如加载流程的验证结果与元数据，需可pickle）
+
+        Returns:
+            bool: 是否写入成功
+        """
+        if not self.enabled:
+            return False
+
+        entry = {
+            'format_version': CACHE_FORMAT_VERSION,
+            'fingerprint': fingerprint,
+            'registry_signature': self.get_registry_signature(),
+            'config': config,
+            'extras': extras or {},
+        }
+
+        try:
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"==liuq debug== MapConfiguration序列化失败，跳过缓存: {e}")
+            return False
+
+        if len(data) > self.max_bytes:
+            logger.debug(f"==liuq debug== 缓存条目超过上限({len(data)} > {self.max_bytes})，跳过缓存")
+            return False
+
+        entry_path = self._entry_path(fingerprint.path)
+        with self._lock:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(data)
+                    os.replace(temp_path, entry_path)
+                except Exception:
+                    self._remove_entry(Path(temp_path))
+                    raise
+            except Exception as e:
+                logger.warning(f"==liuq debug== 写入XML解析缓存失败: {e}")
+                return False
+
+            self.stats['stores'] += 1
+            self._evict_if_needed(keep=entry_path)
+
+        logger.debug(f"==liuq debug== XML解析缓存已写入: {fingerprint.path} ({len(data)} 字节)")
+        return True
+
+    def invalidate(self, xml_path: Union[str, Path]) -> bool:
+        """删除指定XML文件的缓存条目"""
+        return self._remove_entry(self._entry_path(str(Path(xml_path).resolve())))
+
+    def clear(self) -> int:
+        """清空全部缓存条目，返回删除数量"""
+        removed = 0
+        with self._lock:
+            for entry_path, _, _ in self._list_entries():
+                if self._remove_entry(entry_path):
+                    removed += 1
+        logger.info(f"==liuq debug== XML解析缓存已清空，共删除 {removed} 个条目")
+        return removed
+
+    def close(self):
+        """取消字段注册表变化监听（不删除缓存条目）"""
+        if self._callback_id is not None:
+            field_registry.unregister_field_change_callback(self._callback_id)
+            self._callback_id = None
+
+    def get_cache_size(self) -> int:
+        """缓存目录当前总大小（字节）"""
+        return sum(size for _, size, _ in self._list_entries())
+
+    # ==================== 内部方法 ====================
+
+    def _entry_path(self, resolved_path: str) -> Path:
+        """每个XML路径对应一个缓存文件，文件更新后覆盖旧条目"""
+        name = hashlib.sha1(resolved_path.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{name}{_CACHE_SUFFIX}"
+
+    def _list_entries(self) -> List[Tuple[Path, int, int]]:
+        """列出缓存条目 (路径, 大小, 最近访问mtime_ns)"""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for dir_entry in it:
+                    if not dir_entry.name.endswith(_CACHE_SUFFIX):
+                        continue
+                    try:
+                        stat = dir_entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((Path(dir_entry.path), stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _evict_if_needed(self, keep: Path):
+        """总大小超过上限时按最近访问时间从旧到新淘汰"""
+        entries = self._list_entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        entries.sort(key=lambda item: item[2])
+        for entry_path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if entry_path == keep:
+                continue
+            if self._remove_entry(entry_path):
+                total -= size
+                self.stats['evictions'] += 1
+                logger.debug(f"==liuq debug== XML解析缓存LRU淘汰: {entry_path.name}")
+
+    @staticmethod
+    def _remove_entry(entry_path: Path) -> bool:
+        try:
+            os.remove(entry_path)
+            return True
+        except OSError:
+            return False
+
+
+def get_default_cache_dir() -> Path:
+    """默认缓存目录：环境变量FASTMAP_XML_PARSE_CACHE_DIR优先，否则为项目根目录下的data/cache/xml_parse"""
+    override = os.environ.get(CACHE_DIR_ENV)
+    return Path(override) if override else DEFAULT_CACHE_DIR
+
+
+# 全局XML解析缓存服务实例
+_parse_cache_service: Optional[XMLParseCacheService] = None
+
+
+def get_xml_parse_cache_service() -> XMLParseCacheService:
+    """获取XML解析缓存服务实例"""
+    global _parse_cache_service
+
+    if _parse_cache_service is None:
+        _parse_cache_service = XMLParseCacheService()
+        logger.info("创建XML解析缓存服务实例")
+
+    return _parse_cache_service
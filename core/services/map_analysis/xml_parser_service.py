@@ -15,8 +15,12 @@ Action: Added; Timestamp: 2025-07-28 11:00:00 +08:00; Reason: P1-LD-005 实现XM
 """
 
 import xml.etree.ElementTree as ET
+import os
+import time
 import logging
-from typing import Dict, List, Any, Optional, Union, Tuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Optional, Union, Tuple, Iterable, Callable
 from pathlib import Path
 from datetime import datetime
 
@@ -30,12 +34,21 @@ from core.interfaces.xml_data_processor import (
     BackupError
 )
 from core.models.map_data import (
-    MapConfiguration, MapPoint, BaseBoundary,
-    XML_FIELD_CONFIG, XMLFieldNodeType, XMLFieldDataType,
-    get_field_xml_path, get_field_node_type, get_field_data_type,
-    parse_field_value, get_fields_by_node_type
+    MapConfiguration, MapPoint, BaseBoundary, XMLFieldDataType,
+    get_field_xml_path, get_field_node_type, get_field_data_type
 )
 from core.services.shared.field_registry_service import field_registry
+from core.services.map_analysis.xml_node_index import XMLNodeIndex, is_indexed_tag
+from core.services.map_analysis.xml_parse_cache_service import (
+    XMLParseCacheService, get_xml_parse_cache_service
+)
+from core.services.map_analysis.xml_document import (
+    ParsedXMLDocument, get_process_rss, format_parse_stats
+)
+from core.services.map_analysis.xml_backend import ElementTreeBackend, get_xml_backend, set_xml_backend
+from core.services.map_analysis.xml_field_extraction_plan import (
+    get_field_extraction_plan, parse_detect_flag
+)
 
 logger = logging.getLogger(__name__)
 
@@ -60,15 +73,29 @@ class XMLParserService(XMLDataProcessor):
         """初始化XML解析服务"""
         self.supported_versions = ["1.0", "1.1", "2.0"]
         self.default_encoding = "utf-8"
+        # 解析结果缓存，None时使用全局缓存服务
+        self.parse_cache: Optional[XMLParseCacheService] = None
         logger.info("==liuq debug== XML解析服务初始化完成")
+
+    @property
+    def backend(self) -> ElementTreeBackend:
+        """当前XML解析后端（lxml可用时为lxml，否则为ElementTree）"""
+        return get_xml_backend()
     
-    def parse_xml(self, xml_path: Union[str, Path], device_type: str = "unknown") -> MapConfiguration:
+    def parse_xml(self, xml_path: Union[str, Path], device_type: str = "unknown",
+                  streaming: bool = False, use_cache: bool = True,
+                  document: Optional[ParsedXMLDocument] = None,
+                  cache_extras: Optional[Dict[str, Any]] = None) -> MapConfiguration:
         """
         解析XML文件为MapConfiguration对象
         
         Args:
             xml_path: XML文件路径
             device_type: 设备类型 ('reference' | 'debug' | 'unknown')
+            streaming: 是否使用iterparse流式解析（峰值内存与文件大小无关）
+            use_cache: 是否使用解析结果磁盘缓存（文件指纹未变时跳过XML解析）
+            document: 已加载的共享文档对象（提供时直接复用其元素树，不再读取文件）
+            cache_extras: 随缓存条目保存的附带数据，之后可由get_cached取回
             
         Returns:
             MapConfiguration: 解析后的配置对象
@@ -78,34 +105,175 @@ class XMLParserService(XMLDataProcessor):
             FileNotFoundError: 文件不存在
             PermissionError: 文件权限不足
         """
+        xml_path = Path(xml_path)
+        cache = None
+        fingerprint = None
+
+        if use_cache:
+            if document is None:
+                self._check_xml_file(xml_path)
+            cache = self.parse_cache or get_xml_parse_cache_service()
+            try:
+                # 指纹在解析前计算，解析期间文件被修改时缓存条目会在下次打开时失效
+                fingerprint = cache.compute_fingerprint(xml_path, document)
+                cached = cache.get_entry(fingerprint, device_type)
+                if cached is not None:
+                    cached_config, extras = cached
+                    if cache_extras and any(key not in extras for key in cache_extras):
+                        # 条目由未附带数据的调用写入，补充附带数据
+                        cache.put(fingerprint, cached_config, {**extras, **cache_extras})
+                    return cached_config
+            except Exception as e:
+                logger.warning(f"==liuq debug== 读取XML解析缓存失败，回退为完整解析: {e}")
+                fingerprint = None
+
+        if document is not None:
+            config = self._parse_xml_tree(xml_path, device_type, document)
+        elif streaming:
+            config = self.parse_xml_streaming(xml_path, device_type)
+        else:
+            config = self._parse_xml_tree(xml_path, device_type)
+
+        if fingerprint is not None:
+            try:
+                cache.put(fingerprint, config, cache_extras)
+            except Exception as e:
+                logger.warning(f"==liuq debug== 写入XML解析缓存失败: {e}")
+
+        return config
+
+    def get_cached(self, xml_path: Union[str, Path], device_type: str = "unknown"
+                   ) -> Optional[Tuple[MapConfiguration, Dict[str, Any]]]:
+        """
+        按文件指纹查询解析缓存（只读取文件字节计算哈希，不解析XML）
+
+        Args:
+            xml_path: XML文件路径
+            device_type: 设备类型
+
+        Returns:
+            命中时返回(MapConfiguration, 附带数据字典)，未命中或读取失败返回None
+        """
+        cache = self.parse_cache or get_xml_parse_cache_service()
+        if not cache.enabled:
+            return None
+        try:
+            return cache.get_entry(cache.compute_fingerprint(xml_path), device_type)
+        except Exception as e:
+            logger.warning(f"==liuq debug== 查询XML解析缓存失败: {e}")
+            return None
+
+    def parse_many(self, xml_paths: Iterable[Union[str, Path]], device_type: str = "unknown",
+                   max_workers: Optional[int] = None, use_cache: bool = True,
+                   progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                   cancel_check: Optional[Callable[[], bool]] = None
+                   ) -> Dict[Union[str, Path], Union[MapConfiguration, Exception]]:
+        """
+        使用进程池并行解析多个XML文件
+
+        每个文件在独立的工作进程中调用parse_xml，单个文件失败不影响其他文件；
+        结果按输入顺序返回，值为MapConfiguration或该文件的异常对象（均可pickle）。
+
+        Args:
+            xml_paths: XML文件路径列表
+            device_type: 设备类型
+            max_workers: 最大工作进程数（None为CPU核数，不超过文件数）
+            use_cache: 是否使用解析结果磁盘缓存
+            progress_callback: 进度回调 (已完成数, 总数, 刚完成的文件路径)
+            cancel_check: 取消检查函数，返回True时取消尚未完成的文件
+
+        Returns:
+            Dict: 路径 → MapConfiguration | XMLParseError/FileNotFoundError/PermissionError
+        """
+        paths = list(dict.fromkeys(xml_paths))
+        results: Dict[Union[str, Path], Union[MapConfiguration, Exception]] = {}
+        total = len(paths)
+        if total == 0:
+            return results
+
+        workers = min(max_workers or os.cpu_count() or 1, total)
+        logger.info(f"==liuq debug== 开始批量解析XML: {total}个文件, 工作进程{workers}个")
+        start_time = time.time()
+        backend_name = self.backend.name
+        completed = 0
+
+        def record(path, outcome):
+            nonlocal completed
+            results[path] = outcome
+            completed += 1
+            if progress_callback:
+                try:
+                    progress_callback(completed, total, str(path))
+                except Exception as e:
+                    logger.warning(f"==liuq debug== 批量解析进度回调失败: {e}")
+
+        if workers == 1:
+            # 单进程时直接在当前进程解析，省去进程启动开销
+            for path in paths:
+                if cancel_check and cancel_check():
+                    break
+                record(path, _parse_xml_isolated(self, path, device_type, use_cache))
+        else:
+            # spawn启动的工作进程不继承GUI进程的线程与Qt状态
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            futures = {}
+            try:
+                futures = {
+                    executor.submit(_parse_xml_in_worker, str(path), device_type, use_cache, backend_name): path
+                    for path in paths
+                }
+                pending = set(futures)
+                while pending:
+                    if cancel_check and cancel_check():
+                        break
+                    done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            # 工作进程异常退出（BrokenProcessPool等）
+                            outcome = XMLParseError(f"解析进程异常: {e}")
+                        record(futures[future], outcome)
+            finally:
+                # 取消尚未开始的文件（手动取消以兼容Python 3.8，shutdown的cancel_futures参数需3.9+）
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=True)
+
+        for path in paths:
+            if path not in results:
+                results[path] = XMLParseError("批量解析已取消")
+
+        # 按输入顺序返回
+        ordered = {path: results[path] for path in paths}
+        failed = sum(1 for outcome in ordered.values() if isinstance(outcome, Exception))
+        logger.info(f"==liuq debug== 批量解析完成: 成功{total - failed}个, 失败{failed}个, "
+                    f"耗时{(time.time() - start_time) * 1000:.1f}ms")
+        return ordered
+
+    def _parse_xml_tree(self, xml_path: Path, device_type: str,
+                        document: Optional[ParsedXMLDocument] = None) -> MapConfiguration:
+        """基于ElementTree整体解析XML文件（提供document时复用其元素树与节点索引）"""
         try:
             xml_path = Path(xml_path)
-            
-            # 检查文件是否存在
-            if not xml_path.exists():
-                raise FileNotFoundError(f"XML文件不存在: {xml_path}")
-            
-            # 检查文件权限
-            if not xml_path.is_file():
-                raise PermissionError(f"路径不是文件: {xml_path}")
-            
+            if document is None:
+                self._check_xml_file(xml_path)
+                document = self.load_document(xml_path)
+
             logger.info(f"==liuq debug== 开始解析XML文件: {xml_path}")
-            
-            # 解析XML文件
-            try:
-                tree = ET.parse(xml_path)
-                root = tree.getroot()
-            except ET.ParseError as e:
-                raise XMLParseError(f"XML格式错误: {e}", getattr(e, 'lineno', None))
-            
+
+            root = document.root
+            # 单次遍历构建offset_map/base_boundary节点索引，后续解析共享
+            node_index = document.node_index
+
             # 提取基础边界数据
-            base_boundary = self._extract_base_boundary(root)
+            base_boundary = self._extract_base_boundary(root, node_index)
 
             # 解析Map点（不包含base_boundary0）
-            map_points = self._parse_map_points(root)
+            map_points = self._parse_map_points(root, node_index)
 
             # 单独解析base_boundary0作为MapPoint
-            base_boundary_point = self._parse_base_boundary_as_map_point(root)
+            base_boundary_point = self._parse_base_boundary_as_map_point(root, node_index)
 
             # 提取元数据
             metadata = self._extract_metadata(root)
@@ -126,6 +294,8 @@ class XMLParserService(XMLDataProcessor):
             )
             
             logger.info(f"==liuq debug== XML解析完成: 共解析 {len(map_points)} 个Map点")
+            logger.debug(f"==liuq debug== XML解析统计: "
+                         f"{format_parse_stats(document.backend_name, document.parse_seconds, document.memory_delta)}")
             return config
             
         except (FileNotFoundError, PermissionError):
@@ -135,15 +305,238 @@ class XMLParserService(XMLDataProcessor):
         except Exception as e:
             logger.error(f"==liuq debug== XML解析失败: {e}")
             raise XMLParseError(f"解析过程中发生错误: {e}")
+
+    def parse_xml_streaming(self, xml_path: Union[str, Path], device_type: str = "unknown") -> MapConfiguration:
+        """
+        流式解析XML文件为MapConfiguration对象（基于iterparse）
+
+        每个offset_mapNN的第一组节点关闭时即提取为轻量字典并释放，第二组节点关闭时立即生成MapPoint，
+        其余已结束的节点也会从父节点上摘除并清空，整棵树不会常驻内存。
+        结果与parse_xml完全一致（同名节点超过两个的异常文件除外：多余节点被忽略）。
+
+        Args:
+            xml_path: XML文件路径
+            device_type: 设备类型 ('reference' | 'debug' | 'unknown')
+
+        Returns:
+            MapConfiguration: 解析后的配置对象
+
+        Raises:
+            XMLParseError: XML解析失败
+            FileNotFoundError: 文件不存在
+            PermissionError: 文件权限不足
+        """
+        try:
+            xml_path = Path(xml_path)
+            self._check_xml_file(xml_path)
+
+            logger.info(f"==liuq debug== 开始流式解析XML文件: {xml_path}")
+
+            rss_before = get_process_rss() if logger.isEnabledFor(logging.DEBUG) else None
+            start = time.perf_counter()
+            try:
+                state = self._stream_map_groups(xml_path)
+            except ET.ParseError as e:
+                raise XMLParseError(f"XML格式错误: {e}", getattr(e, 'lineno', None))
+
+            completed = state['completed']
+
+            # 与_parse_map_points一致：从offset_map01开始按编号连续收集
+            map_points = []
+            i = 1
+            while True:
+                formatted_i = f"0{i}" if i < 10 else str(i)
+                tag = f'offset_map{formatted_i}'
+                if tag not in completed:
+                    break
+                if completed[tag] is not None:
+                    map_points.append(completed[tag])
+                i += 1
+
+            base_boundary = state['base_boundary']
+            if base_boundary is None:
+                logger.warning("==liuq debug== 未找到base_boundary或base_boundary0元素，使用默认值")
+                base_boundary = BaseBoundary(rpg=0.0, bpg=0.0)
+
+            base_boundary_point = completed.get('base_boundary0')
+            if base_boundary_point is None:
+                logger.warning("==liuq debug== 未找到base_boundary0节点或节点数量不足")
+
+            metadata = state['metadata']
+            metadata.update({
+                'source_file': str(xml_path),
+                'parse_time': datetime.now().isoformat(),
+                'total_points': len(map_points),
+                'has_base_boundary_point': base_boundary_point is not None
+            })
+
+            config = MapConfiguration(
+                device_type=device_type,
+                base_boundary=base_boundary,
+                map_points=map_points,
+                base_boundary_point=base_boundary_point,
+                metadata=metadata
+            )
+
+            logger.info(f"==liuq debug== XML流式解析完成: 共解析 {len(map_points)} 个Map点")
+            if rss_before is not None:
+                rss_after = get_process_rss()
+                memory_delta = rss_after - rss_before if rss_after is not None else None
+                logger.debug(f"==liuq debug== XML流式解析统计: "
+                             f"{format_parse_stats(self.backend.name, time.perf_counter() - start, memory_delta)}")
+            return config
+
+        except (FileNotFoundError, PermissionError):
+            raise
+        except XMLParseError:
+            raise
+        except Exception as e:
+            logger.error(f"==liuq debug== XML流式解析失败: {e}")
+            raise XMLParseError(f"解析过程中发生错误: {e}")
+
+    def _stream_map_groups(self, xml_path: Path) -> Dict[str, Any]:
+        """
+        iterparse主循环：按双组结构配对offset_map/base_boundary节点，并收集元数据
+
+        Args:
+            xml_path: XML文件路径
+
+        Returns:
+            Dict[str, Any]: completed（标签 -> MapPoint或None）、base_boundary、metadata
+        """
+        pending_first: Dict[str, Optional[Dict[str, Any]]] = {}   # 等待第二组的第一组数据
+        completed: Dict[str, Optional[MapPoint]] = {}
+        base_boundary: Optional[BaseBoundary] = None
+        legacy_boundary: Optional[BaseBoundary] = None
+        metadata: Dict[str, Any] = {}
+        map_count = 0
+
+        stack: List[ET.Element] = []
+        group_depth = 0     # >0 表示位于需要整体保留的分组子树内
+        root_tag = None
+
+        for event, elem in get_xml_backend().iterparse(str(xml_path), ('start', 'end')):
+            if event == 'start':
+                if root_tag is None:
+                    root_tag = elem.tag
+                elif group_depth:
+                    group_depth += 1
+                elif self._is_stream_group_tag(elem.tag):
+                    group_depth = 1
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            tag = elem.tag
+
+            if tag == 'Map':
+                map_count += 1
+            if tag in ('version', 'device', 'created') and tag not in metadata:
+                metadata[tag] = elem.text
+
+            if group_depth > 1:
+                # 分组子树内部节点，随分组根节点一并释放
+                group_depth -= 1
+                continue
+
+            if group_depth == 1:
+                group_depth = 0
+                if tag == 'base_boundary':
+                    if legacy_boundary is None:
+                        legacy_boundary = self._extract_legacy_base_boundary(elem)
+                elif tag in completed:
+                    logger.debug(f"==liuq debug== 忽略多余的{tag}节点")
+                elif tag not in pending_first:
+                    pending_first[tag] = self._safe_extract_first_group_data(elem, tag)
+                else:
+                    first_data = pending_first.pop(tag)
+                    completed[tag] = self._complete_stream_group(tag, first_data, elem)
+                    if tag == 'base_boundary0':
+                        base_boundary = self._extract_boundary_from_second_node(elem)
+
+            # 已消费的节点从父节点摘除并清空，保持内存平稳
+            if stack:
+                stack[-1].remove(elem)
+            elem.clear()
+
+        metadata['total_maps'] = map_count
+        metadata['root_tag'] = root_tag
+
+        return {
+            'completed': completed,
+            'base_boundary': base_boundary if base_boundary is not None else legacy_boundary,
+            'metadata': metadata
+        }
+
+    def _is_stream_group_tag(self, tag: Any) -> bool:
+        """流式解析中需要整体保留子树的标签（offset_mapNN / base_boundaryN / base_boundary）"""
+        return tag == 'base_boundary' or is_indexed_tag(tag)
+
+    def _safe_extract_first_group_data(self, first_node: ET.Element, tag: str) -> Optional[Dict[str, Any]]:
+        """提取第一组数据，失败时返回None（与整体解析时该Map被跳过的行为一致）"""
+        try:
+            return self._extract_first_group_data(first_node)
+        except Exception as e:
+            logger.error(f"==liuq debug== 解析{tag}第一组数据失败: {e}")
+            return None
+
+    def _complete_stream_group(self, tag: str, first_data: Optional[Dict[str, Any]],
+                               second_node: ET.Element) -> Optional[MapPoint]:
+        """第二组节点关闭时生成MapPoint"""
+        if first_data is None:
+            return None
+        try:
+            if tag == 'base_boundary0':
+                return self._build_base_boundary_point(first_data, second_node, 2)
+            if tag.startswith('offset_map'):
+                return self._build_offset_map_point(first_data, second_node, tag[len('offset_map'):], 2)
+            return None
+        except Exception as e:
+            logger.error(f"==liuq debug== 解析单个{tag}失败: {e}")
+            return None
+
+    def _check_xml_file(self, xml_path: Path):
+        """检查XML文件存在且为普通文件"""
+        # 检查文件是否存在
+        if not xml_path.exists():
+            raise FileNotFoundError(f"XML文件不存在: {xml_path}")
+
+        # 检查文件权限
+        if not xml_path.is_file():
+            raise PermissionError(f"路径不是文件: {xml_path}")
+
+    def load_document(self, xml_path: Union[str, Path]) -> ParsedXMLDocument:
+        """
+        读取并解析XML文件为共享文档对象
+
+        返回的文档可依次传给validate_xml、get_xml_metadata、parse_xml以及
+        XMLValidationService/XMLMetadataService，整个加载流程只解析一次。
+
+        Args:
+            xml_path: XML文件路径
+
+        Returns:
+            ParsedXMLDocument: 文档对象
+
+        Raises:
+            XMLParseError: XML格式错误
+            FileNotFoundError: 文件不存在
+        """
+        try:
+            return ParsedXMLDocument.load(xml_path)
+        except ET.ParseError as e:
+            raise XMLParseError(f"XML格式错误: {e}", getattr(e, 'lineno', None))
     
     def validate_xml(self, xml_path: Union[str, Path], 
-                     level: ValidationLevel = ValidationLevel.FULL) -> ValidationResult:
+                     level: ValidationLevel = ValidationLevel.FULL,
+                     document: Optional[ParsedXMLDocument] = None) -> ValidationResult:
         """
         验证XML文件的结构和内容
         
         Args:
             xml_path: XML文件路径
             level: 验证级别
+            document: 已加载的共享文档对象（提供时不再解析文件）
             
         Returns:
             ValidationResult: 验证结果对象
@@ -173,10 +566,11 @@ class XMLParserService(XMLDataProcessor):
             # 结构验证
             if level.value in [ValidationLevel.STRUCTURE.value, ValidationLevel.FULL.value]:
                 try:
-                    tree = ET.parse(xml_path)
-                    root = tree.getroot()
+                    if document is None:
+                        document = ParsedXMLDocument.load(xml_path)
+                    root = document.root
                     result.metadata['root_tag'] = root.tag
-                    result.metadata['element_count'] = len(list(root.iter()))
+                    result.metadata['element_count'] = document.element_count
                 except ET.ParseError as e:
                     result.add_error(f"XML格式错误: {e}")
                     return result
@@ -185,12 +579,12 @@ class XMLParserService(XMLDataProcessor):
             if level.value in [ValidationLevel.CONTENT.value, ValidationLevel.FULL.value]:
                 try:
                     # 如果还没有解析XML，先解析
-                    if root is None:
-                        tree = ET.parse(xml_path)
-                        root = tree.getroot()
+                    if document is None:
+                        document = ParsedXMLDocument.load(xml_path)
+                    root = document.root
 
                     # 尝试解析Map点
-                    map_points = self._parse_map_points(root)
+                    map_points = self._parse_map_points(root, document.node_index)
                     result.metadata['map_point_count'] = len(map_points)
 
                     # 验证Map点数据
@@ -219,12 +613,14 @@ class XMLParserService(XMLDataProcessor):
         """
         return self.supported_versions.copy()
     
-    def get_xml_metadata(self, xml_path: Union[str, Path]) -> Dict[str, Any]:
+    def get_xml_metadata(self, xml_path: Union[str, Path],
+                         document: Optional[ParsedXMLDocument] = None) -> Dict[str, Any]:
         """
         获取XML文件的元数据信息
         
         Args:
             xml_path: XML文件路径
+            document: 已加载的共享文档对象（提供时不再解析文件）
             
         Returns:
             Dict[str, Any]: 元数据字典
@@ -247,12 +643,14 @@ class XMLParserService(XMLDataProcessor):
             
             # XML结构信息
             try:
-                tree = ET.parse(xml_path)
-                root = tree.getroot()
+                if document is None:
+                    document = ParsedXMLDocument.load(xml_path)
+                tree = document.tree
+                root = document.root
                 
                 metadata.update({
                     'root_tag': root.tag,
-                    'element_count': len(list(root.iter())),
+                    'element_count': document.element_count,
                     'encoding': tree.docinfo.encoding if hasattr(tree, 'docinfo') else 'unknown'
                 })
                 
@@ -324,12 +722,13 @@ class XMLParserService(XMLDataProcessor):
         from core.services.map_analysis.xml_writer_service import XMLWriterService
         return XMLWriterService().restore_from_backup(backup_path, target_path)
 
-    def _parse_map_points(self, root: ET.Element) -> List[MapPoint]:
+    def _parse_map_points(self, root: ET.Element, node_index: Optional[XMLNodeIndex] = None) -> List[MapPoint]:
         """
         解析Map点数据 - 使用正确的offset_map双组数据结构
 
         Args:
             root: XML根元素
+            node_index: 预构建的节点索引（None则在此构建）
 
         Returns:
             List[MapPoint]: Map点列表
@@ -341,10 +740,14 @@ class XMLParserService(XMLDataProcessor):
             # 这样可以确保base_boundary0固定在第0行，不参与排序
             logger.info("==liuq debug== 开始解析offset_map节点（base_boundary0将单独处理）")
 
-            # 然后处理offset_map01到offset_map116（按照真实XML结构）
-            for i in range(1, 117):
+            if node_index is None:
+                node_index = XMLNodeIndex.build(root)
+
+            # 从offset_map01开始按编号连续处理，直到遇到第一个不完整的编号（不再限定上限）
+            i = 1
+            while True:
                 formatted_i = f"0{i}" if i < 10 else str(i)
-                offset_map_nodes = root.findall(f'.//offset_map{formatted_i}')
+                offset_map_nodes = node_index.get_nodes(f'offset_map{formatted_i}')
 
                 if len(offset_map_nodes) >= 2:
                     try:
@@ -353,10 +756,10 @@ class XMLParserService(XMLDataProcessor):
                             map_points.append(map_point)
                     except Exception as e:
                         logger.warning(f"==liuq debug== 解析offset_map{formatted_i}失败: {e}")
-                        continue
                 else:
                     # 如果找不到节点，可能已经到达末尾
                     break
+                i += 1
 
             logger.info(f"==liuq debug== 成功解析 {len(map_points)} 个Map点（包含base_boundary）")
             return map_points
@@ -378,100 +781,9 @@ class XMLParserService(XMLDataProcessor):
         """
         try:
             # 第一个节点包含offset、range、weight等信息（第一组数据）
-            first_node = offset_map_nodes[0]
+            first_data = self._extract_first_group_data(offset_map_nodes[0])
             # 第二个节点包含AliasName、RpG、BpG等信息（第二组数据）
-            second_node = offset_map_nodes[1]
-
-            # 检查是否为空Map
-            if self._is_empty_offset_map(first_node, second_node):
-
-                return None
-
-            # 从第二组数据提取别名
-            alias_node = second_node.find('AliasName')
-            alias_name = alias_node.text if alias_node is not None and alias_node.text else f"Map_{map_id}"
-
-            # 从第一组数据提取offset坐标
-            offset_x, offset_y = self._extract_offset_coordinates(first_node)
-
-            # 从第二组数据提取多边形坐标（如果有）
-            polygon_vertices, is_polygon = self._extract_polygon_coordinates(second_node)
-
-            # 确定最终坐标
-            if is_polygon and polygon_vertices:
-                # 计算多边形重心作为代表坐标
-                x = sum(vertex[0] for vertex in polygon_vertices) / len(polygon_vertices)
-                y = sum(vertex[1] for vertex in polygon_vertices) / len(polygon_vertices)
-            else:
-                # 使用offset坐标
-                x, y = offset_x, offset_y
-
-            # 从第二组数据提取TransStep值
-            trans_step_node = second_node.find('TransStep')
-            trans_step = int(trans_step_node.text) if trans_step_node is not None and trans_step_node.text else 0
-
-            # 从第一组数据提取权重
-            weight_node = first_node.find('weight')
-            weight = float(weight_node.text) if weight_node is not None and weight_node.text else 1.0
-
-            # 从第一组数据提取范围数据
-            bv_range, ir_range, cct_range, detect_flag = self._extract_range_data_from_node(first_node)
-
-            # 从第一组数据提取详细参数
-            detailed_params = self._extract_detailed_parameters(first_node)
-
-            # 创建MapPoint对象
-            map_point = MapPoint(
-                alias_name=alias_name,
-                x=x,
-                y=y,
-                offset_x=offset_x,
-                offset_y=offset_y,
-                weight=weight,
-                trans_step=trans_step,
-                bv_range=bv_range,
-                ir_range=ir_range,
-                cct_range=cct_range,
-                ctemp_range=(detailed_params.get('ctemp_min', 0.0), detailed_params.get('ctemp_max', 0.0)),
-                e_ratio_range=(detailed_params.get('e_ratio_min', 0.0), detailed_params.get('e_ratio_max', 0.0)),
-                ac_range=(detailed_params.get('ac_min', 0.0), detailed_params.get('ac_max', 0.0)),
-                count_range=(detailed_params.get('count_min', 0.0), detailed_params.get('count_max', 0.0)),
-                color_cct_range=(detailed_params.get('color_cct_min', 0.0), detailed_params.get('color_cct_max', 0.0)),
-                diff_ctemp_range=(detailed_params.get('diff_ctemp_min', 0.0), detailed_params.get('diff_ctemp_max', 0.0)),
-                face_ctemp_range=(detailed_params.get('face_ctemp_min', 0.0), detailed_params.get('face_ctemp_max', 0.0)),
-                detect_flag=detect_flag,
-                polygon_vertices=polygon_vertices,
-                is_polygon=is_polygon,
-                # 详细范围参数
-                tran_bv_min=detailed_params.get('tran_bv_min', 0.0),
-                tran_bv_max=detailed_params.get('tran_bv_max', 0.0),
-                tran_ctemp_min=detailed_params.get('tran_ctemp_min', 0.0),
-                tran_ctemp_max=detailed_params.get('tran_ctemp_max', 0.0),
-                tran_ir_min=detailed_params.get('tran_ir_min', 0.0),
-                tran_ir_max=detailed_params.get('tran_ir_max', 0.0),
-                tran_ac_min=detailed_params.get('tran_ac_min', 0.0),
-                tran_ac_max=detailed_params.get('tran_ac_max', 0.0),
-                tran_count_min=detailed_params.get('tran_count_min', 0.0),
-                tran_count_max=detailed_params.get('tran_count_max', 0.0),
-                tran_color_cct_min=detailed_params.get('tran_color_cct_min', 0.0),
-                tran_color_cct_max=detailed_params.get('tran_color_cct_max', 0.0),
-                tran_diff_ctemp_min=detailed_params.get('tran_diff_ctemp_min', 0.0),
-                tran_diff_ctemp_max=detailed_params.get('tran_diff_ctemp_max', 0.0),
-                tran_face_ctemp_min=detailed_params.get('tran_face_ctemp_min', 0.0),
-                tran_face_ctemp_max=detailed_params.get('tran_face_ctemp_max', 0.0),
-                detect_map_flag=detailed_params.get('detect_map_flag', True)
-            )
-
-            # 设置额外属性
-            map_point.extra_attributes = {
-                'source_node_count': len(offset_map_nodes),
-                'has_polygon': is_polygon,
-                'polygon_vertex_count': len(polygon_vertices) if polygon_vertices else 0,
-                'ml': detailed_params.get('ml', 0)
-            }
-
-
-            return map_point
+            return self._build_offset_map_point(first_data, offset_map_nodes[1], map_id, len(offset_map_nodes))
 
         except Exception as e:
             logger.error(f"==liuq debug== 解析单个offset_map失败: {e}")
@@ -488,113 +800,163 @@ class XMLParserService(XMLDataProcessor):
             MapPoint对象或None
         """
         try:
-            # 第一个节点包含offset、range、weight等信息（第一组数据）
-            first_node = base_boundary_nodes[0]
-            # 第二个节点包含AliasName、RpG、BpG等信息（第二组数据）
-            second_node = base_boundary_nodes[1]
-
-            # 从第二组数据提取别名
-            alias_node = second_node.find('AliasName')
-            alias_name = alias_node.text if alias_node is not None and alias_node.text else "base_boundary0"
-
-            # 从第一组数据提取offset坐标
-            offset_x, offset_y = self._extract_offset_coordinates(first_node)
+            first_data = self._extract_first_group_data(base_boundary_nodes[0])
+            return self._build_base_boundary_point(first_data, base_boundary_nodes[1], len(base_boundary_nodes))
 
-            # 从第二组数据提取多边形坐标（如果有）
-            polygon_vertices, is_polygon = self._extract_polygon_coordinates(second_node)
-
-            # 确定最终坐标
-            if is_polygon and polygon_vertices:
-                # 计算多边形重心作为代表坐标
-                x = sum(vertex[0] for vertex in polygon_vertices) / len(polygon_vertices)
-                y = sum(vertex[1] for vertex in polygon_vertices) / len(polygon_vertices)
-            else:
-                # 使用offset坐标
-                x, y = offset_x, offset_y
+        except Exception as e:
+            logger.error(f"==liuq debug== 解析base_boundary失败: {e}")
+            return None
 
-            # 从第二组数据提取TransStep值
-            trans_step_node = second_node.find('TransStep')
-            trans_step = int(trans_step_node.text) if trans_step_node is not None and trans_step_node.text else 0
+    def _extract_first_group_data(self, first_node: ET.Element) -> Dict[str, Any]:
+        """
+        提取第一组数据（offset、weight、range）为轻量字典
 
-            # 从第一组数据提取权重
-            weight_node = first_node.find('weight')
-            weight = float(weight_node.text) if weight_node is not None and weight_node.text else 1.0
+        第一组节点读取完毕后即可释放，流式解析时只需保留该字典直到第二组节点出现。
 
-            # 从第一组数据提取范围数据
-            bv_range, ir_range, cct_range, detect_flag = self._extract_range_data_from_node(first_node)
+        Args:
+            first_node: 第一个offset_map/base_boundary节点
 
+        Returns:
+            Dict[str, Any]: 第一组数据字典
+        """
+        # 从第一组数据提取offset坐标
+        offset_x, offset_y = self._extract_offset_coordinates(first_node)
+
+        # 从第一组数据提取权重
+        weight_node = first_node.find('weight')
+        weight = float(weight_node.text) if weight_node is not None and weight_node.text else 1.0
+
+        # range节点按预编译提取计划一次遍历，范围数据与详细参数共用同一结果
+        range_fields = self._extract_range_fields(self.backend.find_range(first_node))
+        bv_range, ir_range, cct_range, detect_flag = self._range_data_from_fields(range_fields)
+
+        return {
+            'offset_x': offset_x,
+            'offset_y': offset_y,
+            'has_offset_coordinates': self._has_offset_coordinates(first_node),
+            'weight': weight,
+            'bv_range': bv_range,
+            'ir_range': ir_range,
+            'cct_range': cct_range,
+            'detect_flag': detect_flag,
             # 从第一组数据提取详细参数
-            detailed_params = self._extract_detailed_parameters(first_node)
-
-            # 创建MapPoint对象（base_boundary作为特殊的Map点）
-            map_point = MapPoint(
-                alias_name=alias_name,
-                x=x,
-                y=y,
-                offset_x=offset_x,
-                offset_y=offset_y,
-                weight=weight,
-                trans_step=trans_step,
-                bv_range=bv_range,
-                ir_range=ir_range,
-                cct_range=cct_range,
-                ctemp_range=(detailed_params.get('ctemp_min', 0.0), detailed_params.get('ctemp_max', 0.0)),
-                e_ratio_range=(detailed_params.get('e_ratio_min', 0.0), detailed_params.get('e_ratio_max', 0.0)),
-                ac_range=(detailed_params.get('ac_min', 0.0), detailed_params.get('ac_max', 0.0)),
-                count_range=(detailed_params.get('count_min', 0.0), detailed_params.get('count_max', 0.0)),
-                color_cct_range=(detailed_params.get('color_cct_min', 0.0), detailed_params.get('color_cct_max', 0.0)),
-                diff_ctemp_range=(detailed_params.get('diff_ctemp_min', 0.0), detailed_params.get('diff_ctemp_max', 0.0)),
-                face_ctemp_range=(detailed_params.get('face_ctemp_min', 0.0), detailed_params.get('face_ctemp_max', 0.0)),
-                detect_flag=detect_flag,
-                polygon_vertices=polygon_vertices,
-                is_polygon=is_polygon,
-                # 详细范围参数
-                tran_bv_min=detailed_params.get('tran_bv_min', 0.0),
-                tran_bv_max=detailed_params.get('tran_bv_max', 0.0),
-                tran_ctemp_min=detailed_params.get('tran_ctemp_min', 0.0),
-                tran_ctemp_max=detailed_params.get('tran_ctemp_max', 0.0),
-                tran_ir_min=detailed_params.get('tran_ir_min', 0.0),
-                tran_ir_max=detailed_params.get('tran_ir_max', 0.0),
-                tran_ac_min=detailed_params.get('tran_ac_min', 0.0),
-                tran_ac_max=detailed_params.get('tran_ac_max', 0.0),
-                tran_count_min=detailed_params.get('tran_count_min', 0.0),
-                tran_count_max=detailed_params.get('tran_count_max', 0.0),
-                tran_color_cct_min=detailed_params.get('tran_color_cct_min', 0.0),
-                tran_color_cct_max=detailed_params.get('tran_color_cct_max', 0.0),
-                tran_diff_ctemp_min=detailed_params.get('tran_diff_ctemp_min', 0.0),
-                tran_diff_ctemp_max=detailed_params.get('tran_diff_ctemp_max', 0.0),
-                tran_face_ctemp_min=detailed_params.get('tran_face_ctemp_min', 0.0),
-                tran_face_ctemp_max=detailed_params.get('tran_face_ctemp_max', 0.0),
-                detect_map_flag=detailed_params.get('detect_map_flag', True)
-            )
+            'detailed_params': self._detailed_parameters_from_fields(range_fields)
+        }
+
+    def _build_offset_map_point(self, first_data: Dict[str, Any], second_node: ET.Element,
+                                map_id: str, source_node_count: int) -> Optional[MapPoint]:
+        """由第一组数据字典与第二组节点构建offset_map的MapPoint（空Map返回None）"""
+        # 检查是否为空Map
+        if self._is_empty_map_group(first_data['has_offset_coordinates'], second_node):
+            return None
 
-            # 设置额外属性
-            map_point.extra_attributes = {
-                'source_node_count': len(base_boundary_nodes),
-                'has_polygon': is_polygon,
-                'polygon_vertex_count': len(polygon_vertices) if polygon_vertices else 0,
-                'ml': detailed_params.get('ml', 0)
-            }
+        # 从第二组数据提取别名
+        alias_node = self.backend.find_alias(second_node)
+        alias_name = alias_node.text if alias_node is not None and alias_node.text else f"Map_{map_id}"
+
+        return self._create_map_point(first_data, second_node, alias_name, source_node_count)
+
+    def _build_base_boundary_point(self, first_data: Dict[str, Any], second_node: ET.Element,
+                                   source_node_count: int) -> MapPoint:
+        """由第一组数据字典与第二组节点构建base_boundary0的MapPoint"""
+        # 从第二组数据提取别名
+        alias_node = self.backend.find_alias(second_node)
+        alias_name = alias_node.text if alias_node is not None and alias_node.text else "base_boundary0"
+
+        return self._create_map_point(first_data, second_node, alias_name, source_node_count)
+
+    def _create_map_point(self, first_data: Dict[str, Any], second_node: ET.Element,
+                          alias_name: str, source_node_count: int) -> MapPoint:
+        """合并第一组数据与第二组节点（多边形、TransStep）创建MapPoint"""
+        offset_x = first_data['offset_x']
+        offset_y = first_data['offset_y']
+        detailed_params = first_data['detailed_params']
+
+        # 从第二组数据提取多边形坐标（如果有）
+        polygon_vertices, is_polygon = self._extract_polygon_coordinates(second_node)
+
+        # 确定最终坐标
+        if is_polygon and polygon_vertices:
+            # 计算多边形重心作为代表坐标
+            x = sum(vertex[0] for vertex in polygon_vertices) / len(polygon_vertices)
+            y = sum(vertex[1] for vertex in polygon_vertices) / len(polygon_vertices)
+        else:
+            # 使用offset坐标
+            x, y = offset_x, offset_y
+
+        # 从第二组数据提取TransStep值
+        trans_step_node = second_node.find('TransStep')
+        trans_step = int(trans_step_node.text) if trans_step_node is not None and trans_step_node.text else 0
+
+        # 创建MapPoint对象
+        map_point = MapPoint(
+            alias_name=alias_name,
+            x=x,
+            y=y,
+            offset_x=offset_x,
+            offset_y=offset_y,
+            weight=first_data['weight'],
+            trans_step=trans_step,
+            bv_range=first_data['bv_range'],
+            ir_range=first_data['ir_range'],
+            cct_range=first_data['cct_range'],
+            ctemp_range=(detailed_params.get('ctemp_min', 0.0), detailed_params.get('ctemp_max', 0.0)),
+            e_ratio_range=(detailed_params.get('e_ratio_min', 0.0), detailed_params.get('e_ratio_max', 0.0)),
+            ac_range=(detailed_params.get('ac_min', 0.0), detailed_params.get('ac_max', 0.0)),
+            count_range=(detailed_params.get('count_min', 0.0), detailed_params.get('count_max', 0.0)),
+            color_cct_range=(detailed_params.get('color_cct_min', 0.0), detailed_params.get('color_cct_max', 0.0)),
+            diff_ctemp_range=(detailed_params.get('diff_ctemp_min', 0.0), detailed_params.get('diff_ctemp_max', 0.0)),
+            face_ctemp_range=(detailed_params.get('face_ctemp_min', 0.0), detailed_params.get('face_ctemp_max', 0.0)),
+            detect_flag=first_data['detect_flag'],
+            polygon_vertices=polygon_vertices,
+            is_polygon=is_polygon,
+            # 详细范围参数
+            tran_bv_min=detailed_params.get('tran_bv_min', 0.0),
+            tran_bv_max=detailed_params.get('tran_bv_max', 0.0),
+            tran_ctemp_min=detailed_params.get('tran_ctemp_min', 0.0),
+            tran_ctemp_max=detailed_params.get('tran_ctemp_max', 0.0),
+            tran_ir_min=detailed_params.get('tran_ir_min', 0.0),
+            tran_ir_max=detailed_params.get('tran_ir_max', 0.0),
+            tran_ac_min=detailed_params.get('tran_ac_min', 0.0),
+            tran_ac_max=detailed_params.get('tran_ac_max', 0.0),
+            tran_count_min=detailed_params.get('tran_count_min', 0.0),
+            tran_count_max=detailed_params.get('tran_count_max', 0.0),
+            tran_color_cct_min=detailed_params.get('tran_color_cct_min', 0.0),
+            tran_color_cct_max=detailed_params.get('tran_color_cct_max', 0.0),
+            tran_diff_ctemp_min=detailed_params.get('tran_diff_ctemp_min', 0.0),
+            tran_diff_ctemp_max=detailed_params.get('tran_diff_ctemp_max', 0.0),
+            tran_face_ctemp_min=detailed_params.get('tran_face_ctemp_min', 0.0),
+            tran_face_ctemp_max=detailed_params.get('tran_face_ctemp_max', 0.0),
+            detect_map_flag=detailed_params.get('detect_map_flag', True)
+        )
 
+        # 设置额外属性
+        map_point.extra_attributes = {
+            'source_node_count': source_node_count,
+            'has_polygon': is_polygon,
+            'polygon_vertex_count': len(polygon_vertices) if polygon_vertices else 0,
+            'ml': detailed_params.get('ml', 0)
+        }
 
-            return map_point
+        return map_point
 
-        except Exception as e:
-            logger.error(f"==liuq debug== 解析base_boundary失败: {e}")
-            return None
-
-    def _parse_base_boundary_as_map_point(self, root: ET.Element) -> Optional[MapPoint]:
+    def _parse_base_boundary_as_map_point(self, root: ET.Element,
+                                          node_index: Optional[XMLNodeIndex] = None) -> Optional[MapPoint]:
         """
         单独解析base_boundary0作为MapPoint
 
         Args:
             root: XML根元素
+            node_index: 预构建的节点索引（None则直接查找）
 
         Returns:
             base_boundary0的MapPoint对象或None
         """
         try:
-            base_boundary_nodes = root.findall('.//base_boundary0')
+            if node_index is not None:
+                base_boundary_nodes = node_index.get_nodes('base_boundary0')
+            else:
+                base_boundary_nodes = root.findall('.//base_boundary0')
             if len(base_boundary_nodes) >= 2:
                 base_boundary_point = self._parse_single_base_boundary(base_boundary_nodes)
                 if base_boundary_point:
@@ -618,6 +980,19 @@ class XMLParserService(XMLDataProcessor):
             first_node: 第一个offset_map节点
             second_node: 第二个offset_map节点
 
+        Returns:
+            是否为空Map
+        """
+        return self._is_empty_map_group(self._has_offset_coordinates(first_node), second_node)
+
+    def _is_empty_map_group(self, has_offset_coordinates: bool, second_node: ET.Element) -> bool:
+        """
+        检查offset_map是否为空（第一组节点只需提供是否含非零offset坐标）
+
+        Args:
+            has_offset_coordinates: 第一组节点是否含非零offset坐标
+            second_node: 第二个offset_map节点
+
         Returns:
             是否为空Map
         """
@@ -630,27 +1005,14 @@ class XMLParserService(XMLDataProcessor):
                     return True
 
             # 检查是否有别名 - 如果有别名说明是有效Map
-            alias_node = second_node.find('AliasName')
+            alias_node = self.backend.find_alias(second_node)
             if alias_node is not None and alias_node.text and alias_node.text.strip():
 
                 return False
 
             # 检查是否有坐标信息
-            offset_node = first_node.find('offset')
-            if offset_node is not None:
-                x_node = offset_node.find('x')
-                y_node = offset_node.find('y')
-                if (x_node is not None and x_node.text and
-                    y_node is not None and y_node.text):
-                    try:
-                        x_val = float(x_node.text)
-                        y_val = float(y_node.text)
-                        # 如果坐标不为(0,0)，认为是有效Map
-                        if x_val != 0.0 or y_val != 0.0:
-
-                            return False
-                    except ValueError:
-                        pass
+            if has_offset_coordinates:
+                return False
 
             # 检查是否有多边形坐标
             rpg_node = second_node.find('RpG')
@@ -668,19 +1030,29 @@ class XMLParserService(XMLDataProcessor):
             logger.warning(f"==liuq debug== 检查空offset_map失败: {e}")
             return False
 
+    def _has_offset_coordinates(self, first_node: ET.Element) -> bool:
+        """检查第一组节点是否含有非(0,0)的offset坐标"""
+        x_node, y_node = self.backend.find_offset_xy(first_node)
+        if (x_node is not None and x_node.text and
+            y_node is not None and y_node.text):
+            try:
+                x_val = float(x_node.text)
+                y_val = float(y_node.text)
+                # 如果坐标不为(0,0)，认为是有效Map
+                return x_val != 0.0 or y_val != 0.0
+            except ValueError:
+                pass
+        return False
+
     def _extract_offset_coordinates(self, first_node: ET.Element) -> Tuple[float, float]:
         """从第一组数据提取offset坐标"""
         try:
-            offset_node = first_node.find('offset')
-            if offset_node is not None:
-                x_node = offset_node.find('x')
-                y_node = offset_node.find('y')
+            x_node, y_node = self.backend.find_offset_xy(first_node)
 
-                x = float(x_node.text) if x_node is not None and x_node.text else 0.0
-                y = float(y_node.text) if y_node is not None and y_node.text else 0.0
+            x = float(x_node.text) if x_node is not None and x_node.text else 0.0
+            y = float(y_node.text) if y_node is not None and y_node.text else 0.0
 
-                return x, y
-            return 0.0, 0.0
+            return x, y
         except:
             return 0.0, 0.0
 
@@ -704,104 +1076,63 @@ class XMLParserService(XMLDataProcessor):
 
     def _extract_range_data_from_node(self, first_node: ET.Element) -> Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float], bool]:
         """
-        从第一组数据提取范围数据（重构版本 - 使用配置驱动）
+        从第一组数据提取范围数据（使用预编译字段提取计划）
 
         {{CHENGQI:
         Action: Modified; Timestamp: 2025-08-01 11:15:00 +08:00; Reason: 重构使用配置驱动的字段解析逻辑; Principle_Applied: DRY原则和配置驱动设计;
         }}
         """
-        try:
-            range_node = first_node.find('range')
-            if range_node is None:
-                return (0.0, 100.0), (0.0, 100.0), (2000.0, 10000.0), False
+        return self._range_data_from_fields(self._extract_range_fields(self.backend.find_range(first_node)))
 
-            # 使用配置驱动的方式提取范围数据
-            bv_range = self._extract_field_range(range_node, 'bv_min', 'bv_max')
-            ir_range = self._extract_field_range(range_node, 'ir_min', 'ir_max')
-            cct_range = self._extract_field_range(range_node, 'color_cct_min', 'color_cct_max')
-
-            # 提取检测标志 - 修复：正确解析0/1为bool值
-            detect_flag_node = range_node.find('DetectMapFlag')
-            detect_flag = False
-            if detect_flag_node is not None and detect_flag_node.text:
-                text_value = detect_flag_node.text.strip().lower()
-                # 支持多种格式：'1', 'true', 'yes' 为True；'0', 'false', 'no' 为False
-                detect_flag = text_value in ('1', 'true', 'yes')
-
-            return bv_range, ir_range, cct_range, detect_flag
-
-        except Exception as e:
-            logger.warning(f"==liuq debug== 提取范围数据失败: {e}")
-            return (0.0, 100.0), (0.0, 100.0), (2000.0, 10000.0), False
-
-    def _extract_field_range(self, range_node: ET.Element, min_field: str, max_field: str) -> Tuple[float, float]:
+    def _extract_range_fields(self, range_node: Optional[ET.Element]) -> Optional[Tuple[Dict[str, Any], Dict[str, str]]]:
         """
-        使用配置驱动的方式提取字段范围
+        按预编译提取计划一次遍历range节点
 
         Args:
-            range_node: range XML节点
-            min_field: 最小值字段名
-            max_field: 最大值字段名
+            range_node: range XML节点（None表示不存在）
 
         Returns:
-            (min_value, max_value) 元组
+            (字段值字典, 特殊标签原始文本)，range节点不存在或提取失败时返回None
         """
+        if range_node is None:
+            return None
         try:
-            # 获取字段配置
-            min_config = XML_FIELD_CONFIG.get(min_field)
-            max_config = XML_FIELD_CONFIG.get(max_field)
-
-            if not min_config or not max_config:
-                logger.warning(f"==liuq debug== 字段配置未找到: {min_field}, {max_field}")
-                return (0.0, 100.0)
+            return get_field_extraction_plan().extract_range_fields(range_node)
+        except Exception as e:
+            logger.warning(f"==liuq debug== 提取range字段失败: {e}")
+            return None
 
-            # 提取最小值
-            min_value = self._extract_single_field_value(range_node, min_config)
+    def _range_data_from_fields(self, range_fields) -> Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float], bool]:
+        """由range字段提取结果组装(bv_range, ir_range, cct_range, detect_flag)"""
+        if range_fields is None:
+            return (0.0, 100.0), (0.0, 100.0), (2000.0, 10000.0), False
 
-            # 提取最大值
-            max_value = self._extract_single_field_value(range_node, max_config)
+        values, raw_texts = range_fields
+        bv_range = self._field_range_from_values(values, 'bv_min', 'bv_max')
+        ir_range = self._field_range_from_values(values, 'ir_min', 'ir_max')
+        cct_range = self._field_range_from_values(values, 'color_cct_min', 'color_cct_max')
 
-            return (min_value, max_value)
+        # 提取检测标志 - 修复：正确解析0/1为bool值
+        detect_flag = parse_detect_flag(raw_texts.get('DetectMapFlag'), False)
 
-        except Exception as e:
-            logger.warning(f"==liuq debug== 提取字段范围失败 {min_field}-{max_field}: {e}")
-            return (0.0, 100.0)
+        return bv_range, ir_range, cct_range, detect_flag
 
-    def _extract_single_field_value(self, range_node: ET.Element, field_config) -> float:
+    def _field_range_from_values(self, values: Dict[str, Any], min_field: str, max_field: str) -> Tuple[float, float]:
         """
-        提取单个字段值
+        从提取结果中取字段范围
 
         Args:
-            range_node: range XML节点
-            field_config: 字段配置
+            values: range字段值字典
+            min_field: 最小值字段名
+            max_field: 最大值字段名
 
         Returns:
-            字段值
+            (min_value, max_value) 元组
         """
-        try:
-            xml_path = field_config.xml_path
-
-            if len(xml_path) == 1:
-                # 单层路径（如ml）
-                target_node = range_node.find(xml_path[0])
-            elif len(xml_path) == 2:
-                # 双层路径（如bv/min）
-                parent_node = range_node.find(xml_path[0])
-                if parent_node is not None:
-                    target_node = parent_node.find(xml_path[1])
-                else:
-                    target_node = None
-            else:
-                target_node = None
-
-            if target_node is not None and target_node.text:
-                return parse_field_value(target_node.text, field_config.field_name)
-            else:
-                return field_config.default_value
-
-        except Exception as e:
-            logger.warning(f"==liuq debug== 提取单个字段值失败 {field_config.field_name}: {e}")
-            return field_config.default_value
+        if min_field not in values or max_field not in values:
+            logger.warning(f"==liuq debug== 字段配置未找到: {min_field}, {max_field}")
+            return (0.0, 100.0)
+        return (values[min_field], values[max_field])
 
     def _extract_map_point_data(self, map_elem: ET.Element) -> Dict[str, Any]:
         """
@@ -813,29 +1144,8 @@ class XMLParserService(XMLDataProcessor):
         Returns:
             Dict[str, Any]: 提取的数据字典
         """
-        data = {}
-
-        # 获取所有注册的字段定义
-        field_definitions = field_registry.get_all_fields()
-
-        for field_def in field_definitions:
-            try:
-                # 使用XPath查找元素
-                xpath = field_def.xml_path.replace('./', './')
-                elem = map_elem.find(xpath)
-
-                if elem is not None and elem.text is not None:
-                    # 获取元素值并进行类型转换
-                    raw_value = elem.text.strip()
-                    converted_value = field_def.convert_value(raw_value)
-                    data[field_def.field_id] = converted_value
-                else:
-                    # 使用默认值
-                    data[field_def.field_id] = field_def.default_value
-
-            except Exception as e:
-                logger.warning(f"==liuq debug== 提取字段 {field_def.field_id} 失败: {e}")
-                data[field_def.field_id] = field_def.default_value
+        # 注册表全部字段按预编译提取计划一次遍历获取
+        data = get_field_extraction_plan().extract_registry_fields(map_elem)
 
         # 特殊处理：如果没有找到offset坐标，使用x,y坐标
         if data.get('offset_x') == 0.0 and data.get('x', 0.0) != 0.0:
@@ -912,44 +1222,31 @@ class XMLParserService(XMLDataProcessor):
         
         return errors
 
-    def _extract_base_boundary(self, root: ET.Element) -> BaseBoundary:
+    def _extract_base_boundary(self, root: ET.Element, node_index: Optional[XMLNodeIndex] = None) -> BaseBoundary:
         """
         提取基础边界数据
 
         Args:
             root: XML根元素
+            node_index: 预构建的节点索引（None则直接查找）
 
         Returns:
             BaseBoundary: 基础边界对象
         """
         try:
             # 首先尝试从base_boundary0的第二个节点提取RpG和BpG
-            base_boundary_nodes = root.findall('.//base_boundary0')
+            if node_index is not None:
+                base_boundary_nodes = node_index.get_nodes('base_boundary0')
+            else:
+                base_boundary_nodes = root.findall('.//base_boundary0')
             if len(base_boundary_nodes) >= 2:
                 # 第二个节点包含RpG和BpG数据
-                second_node = base_boundary_nodes[1]
-
-                rpg_elem = second_node.find('RpG')
-                bpg_elem = second_node.find('BpG')
-
-                rpg = self._parse_boundary_value(rpg_elem)
-                bpg = self._parse_boundary_value(bpg_elem)
-
-                logger.info(f"==liuq debug== 从base_boundary0提取边界数据: RpG={rpg:.3f}, BpG={bpg:.3f}")
-                return BaseBoundary(rpg=rpg, bpg=bpg)
+                return self._extract_boundary_from_second_node(base_boundary_nodes[1])
 
             # 如果没有找到base_boundary0，尝试查找base_boundary元素
             boundary_elem = root.find('.//base_boundary')
             if boundary_elem is not None:
-                # 提取rpg和bpg值
-                rpg_elem = boundary_elem.find('.//rpg')
-                bpg_elem = boundary_elem.find('.//bpg')
-
-                rpg = float(rpg_elem.text) if rpg_elem is not None and rpg_elem.text else 0.0
-                bpg = float(bpg_elem.text) if bpg_elem is not None and bpg_elem.text else 0.0
-
-                logger.info(f"==liuq debug== 从base_boundary提取边界数据: RpG={rpg:.3f}, BpG={bpg:.3f}")
-                return BaseBoundary(rpg=rpg, bpg=bpg)
+                return self._extract_legacy_base_boundary(boundary_elem)
             else:
                 # 如果都没有找到，使用默认值
                 logger.warning("==liuq debug== 未找到base_boundary或base_boundary0元素，使用默认值")
@@ -959,9 +1256,32 @@ class XMLParserService(XMLDataProcessor):
             logger.warning(f"==liuq debug== 提取基础边界数据失败: {e}")
             return BaseBoundary(rpg=0.0, bpg=0.0)
 
+    def _extract_boundary_from_second_node(self, second_node: ET.Element) -> BaseBoundary:
+        """从base_boundary0的第二组节点提取RpG和BpG"""
+        rpg = self._parse_boundary_value(second_node.find('RpG'))
+        bpg = self._parse_boundary_value(second_node.find('BpG'))
+
+        logger.info(f"==liuq debug== 从base_boundary0提取边界数据: RpG={rpg:.3f}, BpG={bpg:.3f}")
+        return BaseBoundary(rpg=rpg, bpg=bpg)
+
+    def _extract_legacy_base_boundary(self, boundary_elem: ET.Element) -> BaseBoundary:
+        """从旧格式base_boundary元素提取rpg和bpg值"""
+        try:
+            rpg_elem = boundary_elem.find('.//rpg')
+            bpg_elem = boundary_elem.find('.//bpg')
+
+            rpg = float(rpg_elem.text) if rpg_elem is not None and rpg_elem.text else 0.0
+            bpg = float(bpg_elem.text) if bpg_elem is not None and bpg_elem.text else 0.0
+
+            logger.info(f"==liuq debug== 从base_boundary提取边界数据: RpG={rpg:.3f}, BpG={bpg:.3f}")
+            return BaseBoundary(rpg=rpg, bpg=bpg)
+        except Exception as e:
+            logger.warning(f"==liuq debug== 提取基础边界数据失败: {e}")
+            return BaseBoundary(rpg=0.0, bpg=0.0)
+
     def _extract_detailed_parameters(self, node: ET.Element) -> Dict[str, float]:
         """
-        提取详细参数（重构版本 - 使用配置驱动）
+        提取详细参数（使用预编译字段提取计划）
 
         {{CHENGQI:
         Action: Modified; Timestamp: 2025-08-01 11:20:00 +08:00; Reason: 重构使用配置驱动的详细参数提取逻辑; Principle_Applied: DRY原则和配置驱动设计;
@@ -973,77 +1293,40 @@ class XMLParserService(XMLDataProcessor):
         Returns:
             详细参数字典
         """
-        params = {}
-
-        try:
-            range_node = node.find('range')
-            if range_node is not None:
-                # 使用配置驱动的方式提取所有range节点字段
-                range_fields = get_fields_by_node_type(XMLFieldNodeType.RANGE)
-
-                for field_name in range_fields:
-                    if field_name in XML_FIELD_CONFIG:
-                        config = XML_FIELD_CONFIG[field_name]
-
-                        # 跳过offset字段（它们不在range节点中）
-                        if config.node_type != XMLFieldNodeType.RANGE:
-                            continue
-
-                        try:
-                            # 提取字段值
-                            field_value = self._extract_single_field_value(range_node, config)
-                            params[field_name] = field_value
-
-
+        return self._detailed_parameters_from_fields(self._extract_range_fields(self.backend.find_range(node)))
 
-                        except Exception as e:
-                            logger.warning(f"==liuq debug== 提取字段 {field_name} 失败: {e}")
-                            params[field_name] = config.default_value
-
-                # ml字段保持原始值（修复数据转换bug）
-                #
-                # {{CHENGQI:
-                # Action: Modified; Timestamp: 2025-08-01 13:35:00 +08:00; Reason: 修复ml字段数据转换bug，保持原始内部值用于XML保存; Principle_Applied: 数据完整性原则和显示存储分离;
-                # }}
-                #
-                # 注意：ml字段的GUI显示转换（65471→2, 65535→3）应该只在GUI层处理，
-                # 而不是在数据解析层。这样确保XML保存时使用原始内部值。
-                if 'ml' in params:
-                    # 保持原始值，不进行转换
-                    params['ml'] = int(params['ml'])
-
-                # 提取DetectMapFlag（不在配置中的特殊字段）
-                detect_flag_node = range_node.find('DetectMapFlag')
-                if detect_flag_node is not None and detect_flag_node.text:
-                    text_value = detect_flag_node.text.strip().lower()
-                    params['detect_map_flag'] = text_value in ('1', 'true', 'yes')
-                else:
-                    params['detect_map_flag'] = True
+    def _detailed_parameters_from_fields(self, range_fields) -> Dict[str, float]:
+        """
+        由range字段提取结果组装详细参数
 
-                # 添加ERatio字段（如果存在）
-                e_ratio_node = range_node.find('e_ratio')
-                if e_ratio_node is not None:
-                    min_node = e_ratio_node.find('min')
-                    max_node = e_ratio_node.find('max')
+        Args:
+            range_fields: _extract_range_fields的返回值
 
-                    if min_node is not None and min_node.text:
-                        try:
-                            params['e_ratio_min'] = float(min_node.text)
-                        except ValueError:
-                            params['e_ratio_min'] = 0.0
+        Returns:
+            详细参数字典（range节点不存在时为空字典）
+        """
+        if range_fields is None:
+            return {}
 
-                    if max_node is not None and max_node.text:
-                        try:
-                            params['e_ratio_max'] = float(max_node.text)
-                        except ValueError:
-                            params['e_ratio_max'] = 0.0
+        values, raw_texts = range_fields
+        params = dict(values)
 
+        # ml字段保持原始值（修复数据转换bug）
+        #
+        # {{CHENGQI:
+        # Action: Modified; Timestamp: 2025-08-01 13:35:00 +08:00; Reason: 修复ml字段数据转换bug，保持原始内部值用于XML保存; Principle_Applied: 数据完整性原则和显示存储分离;
+        # }}
+        #
+        # 注意：ml字段的GUI显示转换（65471→2, 65535→3）应该只在GUI层处理，
+        # 而不是在数据解析层。这样确保XML保存时使用原始内部值。
+        if 'ml' in params:
+            # 保持原始值，不进行转换
+            params['ml'] = int(params['ml'])
 
-            return params
+        # 提取DetectMapFlag（不在配置中的特殊字段）
+        params['detect_map_flag'] = parse_detect_flag(raw_texts.get('DetectMapFlag'), True)
 
-        except Exception as e:
-            logger.warning(f"==liuq debug== 提取详细参数失败: {e}")
-            return params
+        return params
 
     def _parse_boundary_value(self, node: ET.Element) -> float:
         """
@@ -1074,4 +1357,31 @@ class XMLParserService(XMLDataProcessor):
                 return 0.0
 
 
+
+def _parse_xml_isolated(parser: XMLParserService, xml_path: Union[str, Path], device_type: str,
+                        use_cache: bool) -> Union[MapConfiguration, Exception]:
+    """解析单个文件并把异常作为返回值（批量解析的单文件错误隔离）"""
+    try:
+        return parser.parse_xml(xml_path, device_type, use_cache=use_cache)
+    except (XMLParseError, FileNotFoundError, PermissionError) as e:
+        return e
+    except Exception as e:
+        return XMLParseError(f"解析过程中发生错误: {e}")
+
+
+# 工作进程内复用的解析服务实例
+_worker_parser: Optional[XMLParserService] = None
+
+
+def _parse_xml_in_worker(xml_path: str, device_type: str, use_cache: bool,
+                         backend_name: str) -> Union[MapConfiguration, Exception]:
+    """进程池工作函数：与主进程使用相同的解析后端"""
+    global _worker_parser
+
+    if _worker_parser is None:
+        _worker_parser = XMLParserService()
+    if get_xml_backend().name != backend_name:
+        set_xml_backend(backend_name)
+    return _parse_xml_isolated(_worker_parser, xml_path, device_type, use_cache)
+
 logger.info("==liuq debug== XML解析服务模块加载完成")
@@ -9,20 +9,26 @@ XML性能优化服务
 日期: 2025-08-25
 """
 
+import os
 import logging
 import time
 import tempfile
 import shutil
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 from core.services.map_analysis.xml_writer_core import XMLWriterCore
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
+from core.interfaces.xml_data_processor import XMLWriteVerificationError
 from core.models.map_data import (
     MapConfiguration, MapPoint, BaseBoundary, XML_FIELD_CONFIG,
-    XMLFieldNodeType, get_map_point_field_value
+    XMLFieldNodeType, get_field_getter
 )
 from core.services.map_analysis.xml_formatting_service import get_xml_formatting_service
+from core.services.map_analysis.xml_byte_patch_writer import (
+    open_mapped_xml, write_patched_temp_file, replace_file
+)
+from core.services.map_analysis.xml_write_verifier import XMLWriteVerification, verify_patched_file
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +42,8 @@ class XMLPerformanceService:
         self._precompile_patterns()
         # 注入核心写入算法（与性能无关）
         self.core = XMLWriterCore()
+        # 最近一次写入校验结果
+        self.last_verification: Optional[XMLWriteVerification] = None
 
 
     def _precompile_patterns(self):
@@ -57,7 +65,8 @@ class XMLPerformanceService:
         return int(time.time() * 1000)
 
     def write_xml_optimized(self, config: MapConfiguration, xml_path: Path,
-                           backup: bool = True, tree: Optional[ET.ElementTree] = None) -> bool:
+                           backup: bool = True, tree: Optional[ET.ElementTree] = None,
+                           only_dirty: bool = False, verify: bool = True) -> bool:
         """
         优化的XML写入方法（高性能批量替换）
 
@@ -66,38 +75,54 @@ class XMLPerformanceService:
             xml_path: XML文件路径
             backup: 是否创建备份
             tree: XML树对象（可选）
+            only_dirty: 只为有修改记录的(Map点, 字段)构建替换（config须由xml_path加载）
+            verify: 替换前回读临时文件中被修改的节点区间校验写入结果（结果见last_verification）
 
         Returns:
-            bool: 写入是否成功
+            bool: 写入是否成功（没有需要替换的数据时返回False）
+
+        Raises:
+            XMLWriteVerificationError: 校验不通过（目标文件未被替换，调用方不应再回退到其他写入方式）
         """
         try:
             start_time = self.get_current_time_ms()
 
-            # 1. 读取原始文件内容
-            with open(xml_path, 'r', encoding='utf-8') as f:
-                original_content = f.read()
+            # 1. 以只读mmap映射原始文件（规划与写入都按字节偏移进行，不解码整份文件）
+            with open_mapped_xml(xml_path) as original_content:
+                file_size = len(original_content)
+                logger.info(f"开始高性能XML写入，文件大小: {file_size} 字节")
 
-            file_size = len(original_content)
-            logger.info(f"开始高性能XML写入，文件大小: {file_size} 字符")
+                # 2. 构建批量替换操作（节点区间索引在本次保存内复用）
+                try:
+                    replacements = self.build_optimized_replacements(config, original_content, tree, only_dirty)
+                finally:
+                    self.core.release_node_span_index()
 
-            # 2. 构建批量替换操作
-            replacements = self.build_optimized_replacements(config, original_content, tree)
+                if not replacements:
+                    logger.info("==liuq debug== 高性能写入：没有需要替换的数据，返回False以触发回退")
+                    return False
 
-            if not replacements:
-                logger.info("==liuq debug== 高性能写入：没有需要替换的数据，返回False以触发回退")
-                return False
+                # 3. 只对被修改的节点生成新文本
+                node_patches = self.plan_node_patches(original_content, replacements)
 
-            # 3. 执行批量替换
-            modified_content = self.execute_optimized_replacements(original_content, replacements)
+                # 4. 创建备份（如果需要）
+                if backup:
+                    self.create_backup(xml_path)
 
-            # 4. 创建备份（如果需要）
-            if backup:
-                self.create_backup(xml_path)
+                # 5. 未修改的字节区间直接从源文件复制到临时文件，拼入修改后的节点
+                temp_path = write_patched_temp_file(original_content, node_patches, xml_path.parent)
 
-            # 5. 原子性写入文件
-            self.atomic_write_file(xml_path, modified_content)
+            # 6. 只回读被修改的节点区间校验临时文件，不通过时保留原文件
+            if verify and not self.verify_written_file(temp_path, file_size, node_patches,
+                                                       replacements, original_content.encoding):
+                os.unlink(temp_path)
+                raise XMLWriteVerificationError(
+                    f"写入校验失败，原文件未修改: {self.last_verification.describe()}", self.last_verification)
 
-            # 6. 性能统计
+            # 关闭映射后再原子替换（Windows下被映射的文件不能替换）
+            replace_file(temp_path, xml_path)
+
+            # 7. 性能统计
             end_time = self.get_current_time_ms()
             duration = end_time - start_time
 
@@ -105,12 +130,34 @@ class XMLPerformanceService:
 
             return True
 
+        except XMLWriteVerificationError:
+            raise
         except Exception as e:
             logger.error(f"高性能XML写入失败: {e}")
             return False
 
+    def verify_written_file(self, written_path: Union[str, Path], source_length: int,
+                            node_patches: List[Tuple[int, int, str]], replacements: list,
+                            encoding: str = 'utf-8') -> bool:
+        """
+        校验写入结果（只回读被修改的节点区间），结果保存在last_verification
+
+        Returns:
+            bool: 校验是否通过
+        """
+        verification = verify_patched_file(written_path, source_length, node_patches,
+                                           replacements, encoding, self.core)
+        self.last_verification = verification
+        if verification.success:
+            logger.info(f"==liuq debug== 写入校验通过: {verification.checked_nodes}个节点, "
+                        f"{verification.checked_fields}个字段, 耗时{verification.duration_ms}ms")
+        else:
+            logger.error(f"==liuq debug== 写入校验失败: {verification.describe()}")
+        return verification.success
+
     def build_optimized_replacements(self, config: MapConfiguration,
-                                   content: str, tree: Optional[ET.ElementTree] = None) -> list:
+                                   content: str, tree: Optional[ET.ElementTree] = None,
+                                   only_dirty: bool = False) -> list:
         """
         构建优化的批量替换操作列表
 
@@ -118,6 +165,7 @@ class XMLPerformanceService:
             config: Map配置对象
             content: 原始XML内容
             tree: XML树对象
+            only_dirty: 只处理有修改记录的(Map点, 字段)
 
         Returns:
             list: 替换操作列表
@@ -131,7 +179,8 @@ class XMLPerformanceService:
         # 2. 处理Map点数据
         if tree:
             root = tree.getroot()
-            replacements.extend(self.build_map_point_replacements(config.map_points, root, content))
+            dirty_fields = config.get_dirty_xml_fields() if only_dirty else None
+            replacements.extend(self.build_map_point_replacements(config.map_points, root, content, dirty_fields))
 
         # 3. 智能差异检测：只保留真正需要替换的操作
         filtered_replacements = self.filter_changed_replacements(replacements, content)
@@ -195,7 +244,8 @@ class XMLPerformanceService:
         logger.info(f"边界数据替换操作构建完成，共 {len(replacements)} 个操作")
         return replacements
 
-    def build_map_point_replacements(self, map_points: list, root: ET.Element, content: str) -> list:
+    def build_map_point_replacements(self, map_points: list, root: ET.Element, content: str,
+                                     dirty_fields: Optional[Dict[int, Optional[List[str]]]] = None) -> list:
         """
         构建Map点替换操作
 
@@ -203,15 +253,30 @@ class XMLPerformanceService:
             map_points: Map点列表
             root: XML根元素
             content: 原始XML内容
+            dirty_fields: Map点下标 → 需写回的字段列表（None值表示该点全量检查）；
+                          为None时检查全部Map点的全部字段
 
         Returns:
             list: 替换操作列表
         """
         replacements = []
 
-        for map_point in map_points:
-            if map_point.alias_name == "base_boundary0":
-                continue
+        if dirty_fields is None:
+            planned_points = [(map_point, None) for map_point in map_points]
+        else:
+            planned_points = [(map_points[index], field_names) for index, field_names in dirty_fields.items()]
+            logger.info(f"==liuq debug== 脏字段跟踪：{len(planned_points)}/{len(map_points)} 个Map点有修改")
+
+        planned_points = [(map_point, field_names) for map_point, field_names in planned_points
+                          if map_point.alias_name != "base_boundary0"]
+
+        # 按字段整列格式化目标值（同一数值在各Map点间大量重复，批量格式化带缓存）
+        formatting_service = get_xml_formatting_service()
+        offset_x_texts = formatting_service.format_numbers_for_xml([p.offset_x for p, _ in planned_points])
+        offset_y_texts = formatting_service.format_numbers_for_xml([p.offset_y for p, _ in planned_points])
+        formatted_fields = self.format_planned_fields(planned_points)
+
+        for position, (map_point, field_names) in enumerate(planned_points):
 
             # 获取XML节点名称
             xml_node_name = self.core.get_xml_node_name_by_alias(root, map_point.alias_name)
@@ -222,12 +287,11 @@ class XMLPerformanceService:
             # 先检查这个Map点是否真的需要修改
             current_offset_x, current_offset_y = self.core.get_current_offset_values(content, xml_node_name, map_point.alias_name)
 
-            formatting_service = get_xml_formatting_service()
-            target_offset_x = formatting_service.format_number_for_xml(map_point.offset_x)
-            target_offset_y = formatting_service.format_number_for_xml(map_point.offset_y)
+            target_offset_x = offset_x_texts[position]
+            target_offset_y = offset_y_texts[position]
 
             # 只为真正需要修改的字段创建替换操作
-            if current_offset_x != target_offset_x:
+            if current_offset_x != target_offset_x and (field_names is None or 'offset_x' in field_names):
                 x_replacement_info = {
                     'node_name': xml_node_name,
                     'field_type': 'offset_x',
@@ -237,7 +301,7 @@ class XMLPerformanceService:
                 }
                 replacements.append(x_replacement_info)
 
-            if current_offset_y != target_offset_y:
+            if current_offset_y != target_offset_y and (field_names is None or 'offset_y' in field_names):
                 y_replacement_info = {
                     'node_name': xml_node_name,
                     'field_type': 'offset_y',
@@ -248,19 +312,55 @@ class XMLPerformanceService:
                 replacements.append(y_replacement_info)
 
             # 添加所有其他字段的替换操作
-            single_map_replacements = self.build_single_map_replacements(map_point, xml_node_name)
+            single_map_replacements = self.build_single_map_replacements(
+                map_point, xml_node_name, field_names, formatted_fields[position])
             replacements.extend(single_map_replacements)
 
         logger.info(f"Map点替换操作构建完成，共 {len(replacements)} 个有效操作")
         return replacements
 
-    def build_single_map_replacements(self, map_point: MapPoint, xml_node_name: str) -> list:
+    def format_planned_fields(self, planned_points: list) -> List[Dict[str, str]]:
+        """
+        按字段整列格式化计划中各Map点的字段值
+
+        Args:
+            planned_points: (Map点, 字段列表或None) 列表
+
+        Returns:
+            List[Dict[str, str]]: 与planned_points对应的 字段名 → 格式化后的值
+        """
+        formatting_service = get_xml_formatting_service()
+        formatted: List[Dict[str, str]] = [{} for _ in planned_points]
+
+        for field_name in XML_FIELD_CONFIG:
+            positions = [position for position, (_, field_names) in enumerate(planned_points)
+                         if field_names is None or field_name in field_names]
+            if not positions:
+                continue
+            getter = get_field_getter(field_name)
+            try:
+                values = [getter(planned_points[position][0]) for position in positions]
+                texts = formatting_service.format_field_values(values, field_name)
+            except Exception as e:
+                # 整列失败时留给build_single_map_replacements逐个处理
+                logger.warning(f"批量格式化字段 {field_name} 失败: {e}")
+                continue
+            for position, text in zip(positions, texts):
+                formatted[position][field_name] = text
+
+        return formatted
+
+    def build_single_map_replacements(self, map_point: MapPoint, xml_node_name: str,
+                                      field_names: Optional[List[str]] = None,
+                                      formatted_values: Optional[Dict[str, str]] = None) -> list:
         """
         为单个Map点构建替换操作（支持所有字段类型）
 
         Args:
             map_point: Map点对象
             xml_node_name: XML节点名称
+            field_names: 只处理这些字段（None为XML_FIELD_CONFIG全部字段）
+            formatted_values: 已批量格式化的字段值（缺少的字段在此逐个格式化）
 
         Returns:
             list: 替换操作列表
@@ -270,13 +370,17 @@ class XMLPerformanceService:
         formatting_service = get_xml_formatting_service()
 
         # 使用配置驱动的字段处理方式
-        for field_name, config in XML_FIELD_CONFIG.items():
+        for field_name in (XML_FIELD_CONFIG if field_names is None else field_names):
+            config = XML_FIELD_CONFIG[field_name]
             try:
-                # 获取字段值
-                field_value = get_map_point_field_value(map_point, field_name)
+                if formatted_values is not None and field_name in formatted_values:
+                    formatted_value = formatted_values[field_name]
+                else:
+                    # 获取字段值
+                    field_value = get_field_getter(field_name)(map_point)
 
-                # 使用统一的格式化函数
-                formatted_value = formatting_service.format_field_value(field_value, field_name)
+                    # 使用统一的格式化函数
+                    formatted_value = formatting_service.format_field_value(field_value, field_name)
 
                 # 创建替换操作信息
                 replacement_info = {
@@ -308,64 +412,101 @@ class XMLPerformanceService:
         Returns:
             str: 修改后的XML内容
         """
-        modified_content = content
-        replacement_count = 0
+        return ''.join(self.build_output_chunks(content, replacements))
 
-        # 按位置从后往前排序，避免位置偏移问题
-        sorted_replacements = sorted(
-            [r for r in replacements if '_node_start' in r],
-            key=lambda r: r['_node_start'],
-            reverse=True
-        )
-
-        # 处理新格式的高性能替换
-        for replacement in sorted_replacements:
-            node_start = replacement['_node_start']
-            node_end = replacement['_node_end']
-            field_type = replacement['field_type']
-            target_value = replacement['replacement']
-
-            # 获取节点内容
-            node_content = modified_content[node_start:node_end]
-
-            # 使用配置驱动的字段替换
-            if field_type in XML_FIELD_CONFIG:
-                config = XML_FIELD_CONFIG[field_type]
-
-                if config.node_type == XMLFieldNodeType.OFFSET:
-                    # 处理offset节点字段
-                    new_node_content = self.core.replace_offset_field(node_content, config.xml_path, target_value)
-                elif config.node_type == XMLFieldNodeType.RANGE:
-                    # 处理range节点字段
-                    new_node_content = self.core.replace_range_field(node_content, config.xml_path, target_value)
-                else:
-                    new_node_content = None
+    def build_output_chunks(self, content: str, replacements: list) -> List[str]:
+        """
+        按节点区间组装输出分片
 
-                if new_node_content:
-                    # 更新修改后的内容
-                    modified_content = (modified_content[:node_start] +
-                                      new_node_content +
-                                      modified_content[node_end:])
-                    replacement_count += 1
-                else:
-                    logger.warning(f"字段替换失败: {field_type}")
+        未修改的文本以切片形式原样保留，整个文件只在最终拼接（或写入）时复制一次。
+
+        Args:
+            content: 原始XML内容
+            replacements: 替换操作列表（需含_node_start/_node_end）
+
+        Returns:
+            List[str]: 依次拼接即为修改后XML内容的分片列表
+        """
+        chunks: List[str] = []
+        cursor = 0
+        for node_start, node_end, node_content in self.plan_node_patches(content, replacements):
+            chunks.append(content[cursor:node_start])
+            chunks.append(node_content)
+            cursor = node_end
+        chunks.append(content[cursor:])
+        return chunks
+
+    def plan_node_patches(self, content: str, replacements: list) -> List[Tuple[int, int, str]]:
+        """
+        按节点区间应用替换，得到每个被修改节点的新文本
+
+        替换操作按节点区间分组，每个节点只在自身内容上依次应用替换。
 
-            elif field_type in ['boundary_rpg', 'boundary_bpg']:
-                # 处理边界字段
-                tag_name = 'RpG' if field_type == 'boundary_rpg' else 'BpG'
-                new_node_content = self.replace_boundary_field(node_content, tag_name, target_value)
+        Args:
+            content: 原始XML内容（或MappedXMLText字节视图，此时区间为字节偏移）
+            replacements: 替换操作列表（需含_node_start/_node_end）
+
+        Returns:
+            List[Tuple[int, int, str]]: 按起始位置排序且互不重叠的(节点起始, 节点结束, 新节点文本)
+        """
+        # 按节点区间分组，同一节点内保持原始顺序
+        node_groups: Dict[tuple, list] = {}
+        for replacement in replacements:
+            if '_node_start' in replacement:
+                node_span = (replacement['_node_start'], replacement['_node_end'])
+                node_groups.setdefault(node_span, []).append(replacement)
+
+        patches: List[Tuple[int, int, str]] = []
+        cursor = 0
+        replacement_count = 0
+
+        for node_start, node_end in sorted(node_groups):
+            if node_start < cursor:
+                logger.warning(f"==liuq debug== 节点区间重叠，跳过替换: [{node_start}, {node_end})")
+                continue
 
+            node_content = content[node_start:node_end]
+            for replacement in node_groups[(node_start, node_end)]:
+                new_node_content = self._apply_node_replacement(node_content, replacement)
                 if new_node_content:
-                    modified_content = (modified_content[:node_start] +
-                                      new_node_content +
-                                      modified_content[node_end:])
+                    node_content = new_node_content
                     replacement_count += 1
 
-            else:
-                logger.warning(f"未知字段类型: {field_type}")
+            patches.append((node_start, node_end, node_content))
+            cursor = node_end
 
         logger.info(f"完成批量替换操作，共执行 {replacement_count} 个替换")
-        return modified_content
+        return patches
+
+    def _apply_node_replacement(self, node_content: str, replacement: dict) -> Optional[str]:
+        """在单个节点内容上应用一个替换操作，失败返回None"""
+        field_type = replacement['field_type']
+        target_value = replacement['replacement']
+
+        # 使用配置驱动的字段替换
+        if field_type in XML_FIELD_CONFIG:
+            config = XML_FIELD_CONFIG[field_type]
+
+            if config.node_type == XMLFieldNodeType.OFFSET:
+                # 处理offset节点字段
+                new_node_content = self.core.replace_offset_field(node_content, config.xml_path, target_value)
+            elif config.node_type == XMLFieldNodeType.RANGE:
+                # 处理range节点字段
+                new_node_content = self.core.replace_range_field(node_content, config.xml_path, target_value)
+            else:
+                new_node_content = None
+
+            if not new_node_content:
+                logger.warning(f"字段替换失败: {field_type}")
+            return new_node_content
+
+        if field_type in ['boundary_rpg', 'boundary_bpg']:
+            # 处理边界字段
+            tag_name = 'RpG' if field_type == 'boundary_rpg' else 'BpG'
+            return self.replace_boundary_field(node_content, tag_name, target_value)
+
+        logger.warning(f"未知字段类型: {field_type}")
+        return None
 
     # 以下为辅助方法（参考legacy实现，做精简适配）
     # 以下辅助方法已迁移到 XMLWriterCore，并通过 self.core 调用
@@ -533,30 +674,23 @@ class XMLPerformanceService:
             return None
 
     def create_backup(self, xml_path: Path):
-        """创建备份文件（委托备份服务）"""
-        try:
-            from core.services.map_analysis.xml_writer_service import get_xml_backup_service
-        except Exception:
-            pass
-        # 回退到简单复制（保持原行为）
+        """创建备份（委托备份服务，备份失败不阻止写入）"""
         try:
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_dir = xml_path.parent / "backups"
-            backup_dir.mkdir(exist_ok=True)
-            backup_path = backup_dir / f"{xml_path.stem}_backup_{timestamp}.xml"
-            shutil.copy2(xml_path, backup_path)
-            logger.info(f"==liuq debug== XML备份创建成功: {backup_path}")
+            from core.services.map_analysis.xml_backup_service import get_xml_backup_service
+            get_xml_backup_service().backup_xml(xml_path)
         except Exception as e:
             logger.warning(f"==liuq debug== 创建备份失败: {e}")
 
-    def atomic_write_file(self, xml_path: Path, content: str):
-        """原子性写入文件"""
+    def atomic_write_file(self, xml_path: Path, content: Union[str, List[str]]):
+        """原子性写入文件（content可为完整文本或输出分片列表）"""
         try:
             import tempfile
             with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', delete=False, suffix='.xml', dir=xml_path.parent) as temp_file:
                 temp_path = temp_file.name
-                temp_file.write(content)
+                if isinstance(content, str):
+                    temp_file.write(content)
+                else:
+                    temp_file.writelines(content)
             shutil.move(temp_path, xml_path)
             logger.info("==liuq debug== 原子性写入完成")
         except Exception as e:
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML后台保存队列
+==liuq debug== FastMapV2 合并连续保存请求的后台写入队列
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.1.0
+描述: 保存请求在调用线程只做内存快照，备份、替换规划与原子写入都在单个后台线程执行；
+      同一文件尚未开始写入的请求合并为一次写入（以最新快照为准），完成与失败通过EventBus通知；
+      写入成功后清除提交的配置中在快照之前修改的Map点的脏字段，之后的修改留给下次保存
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+from core.infrastructure.event_bus import EventBus, EventType, get_event_bus
+from core.models.compact_map_point import compact_configuration, expand_configuration
+from core.models.map_data import MapConfiguration
+from core.models.map_point_index import EDIT_SEQUENCE
+
+logger = logging.getLogger(__name__)
+
+# 保存完成回调：参数为是否写入成功（在后台线程调用）
+SaveCallback = Callable[[bool], None]
+
+
+@dataclass
+class _SaveRequest:
+    """一个文件的待写入请求（合并后的状态）"""
+    xml_path: Path
+    config: MapConfiguration  # 紧凑快照（CompactMapPoint），写入前还原
+    source: MapConfiguration  # 提交的配置，写入成功后清除其脏字段
+    revision: int  # 快照时的修改序号，只清除不晚于该序号修改的Map点
+    backup: bool
+    only_dirty: bool
+    callbacks: List[SaveCallback]
+    coalesced: int = 1
+
+
+class XMLSaveQueue:
+    """
+    XML后台保存队列
+
+    - 所有写入由同一个后台线程串行执行，不同文件按首次提交顺序写入
+    - 同一文件已在写入中时新的请求排在其后，不会与正在写入的快照合并，保证后提交的内容最后落盘
+    - 每次写入沿用XMLWriterService.write_xml（临时文件 + 原子替换）
+    - EventBus处理器在后台线程中调用，GUI订阅者需自行切换到界面线程
+    """
+
+    def __init__(self, event_bus: Optional[EventBus] = None,
+                 writer_factory: Optional[Callable[[], object]] = None):
+        """
+        初始化保存队列（后台线程在首次提交时启动）
+
+        Args:
+            event_bus: 事件总线，默认使用全局事件总线
+            writer_factory: 创建后台线程专用写入服务的工厂，默认创建独立的XMLWriterService
+        """
+        self._event_bus = event_bus
+        self._writer_factory = writer_factory or _create_worker_writer
+        self._condition = threading.Condition()
+        self._pending: 'OrderedDict[Path, _SaveRequest]' = OrderedDict()
+        self._active_path: Optional[Path] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def event_bus(self) -> EventBus:
+        return self._event_bus or get_event_bus()
+
+    def submit(self, config: MapConfiguration, xml_path: Union[str, Path], backup: bool = True,
+               on_complete: Optional[SaveCallback] = None, only_dirty: bool = False) -> bool:
+        """
+        提交保存请求（立即返回，不做磁盘I/O）
+
+        Args:
+            config: 要保存的配置（提交时复制为紧凑快照，之后的编辑不影响本次写入）
+            xml_path: 目标XML文件
+            backup: 是否创建备份（合并请求中任一要求备份即备份）
+            on_complete: 写入完成回调（后台线程调用，合并的请求各调用一次）
+            only_dirty: 只写有修改记录的字段（config须由xml_path加载；合并请求中任一要求全量即全量）
+
+        Returns:
+            bool: 是否已加入队列（队列关闭后返回False）
+        """
+        xml_path = Path(xml_path)
+        snapshot = compact_configuration(config)
+        revision = next(EDIT_SEQUENCE)
+        callbacks = [on_complete] if on_complete else []
+
+        with self._condition:
+            if self._closed:
+                logger.warning(f"==liuq debug== 保存队列已关闭，忽略保存请求: {xml_path}")
+                return False
+
+            request = self._pending.get(xml_path)
+            if request is None:
+                self._pending[xml_path] = _SaveRequest(xml_path, snapshot, config, revision,
+                                                       backup, only_dirty, callbacks)
+            else:
+                request.config = snapshot
+                request.source = config
+                request.revision = revision
+                request.backup = request.backup or backup
+                request.only_dirty = request.only_dirty and only_dirty
+                request.callbacks.extend(callbacks)
+                request.coalesced += 1
+                logger.debug(f"==liuq debug== 合并保存请求: {xml_path} (共 {request.coalesced} 次)")
+
+            self._ensure_worker()
+            self._condition.notify_all()
+        return True
+
+    def pending_count(self) -> int:
+        """尚未完成（排队中与写入中）的文件数"""
+        with self._condition:
+            return len(self._pending) + (1 if self._active_path is not None else 0)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待已提交的保存全部完成
+
+        Args:
+            timeout: 最长等待秒数，None表示一直等待
+
+        Returns:
+            bool: 是否在超时前全部完成
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._active_path is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None):
+        """
+        关闭队列：不再接受新请求，已提交的请求仍会写完
+
+        Args:
+            wait: 是否等待后台线程退出
+            timeout: 最长等待秒数
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if wait and thread is not None:
+            thread.join(timeout)
+
+    def _ensure_worker(self):
+        """启动后台写入线程（需持有锁）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="XMLSaveQueue", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """后台线程：逐个取出请求写入"""
+        try:
+            writer = self._writer_factory()
+        except Exception as e:
+            # 写入服务创建失败时仍逐个处理请求，以失败事件通知
+            logger.error(f"==liuq debug== 创建后台写入服务失败: {e}")
+            writer = None
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                xml_path, request = self._pending.popitem(last=False)
+                self._active_path = xml_path
+
+            try:
+                self._write(writer, request)
+            finally:
+                with self._condition:
+                    self._active_path = None
+                    self._condition.notify_all()
+
+    def _write(self, writer, request: _SaveRequest):
+        """执行一次写入并发布结果事件"""
+        start_time = time.time()
+        error = None
+        try:
+            success = writer.write_xml(expand_configuration(request.config), request.xml_path,
+                                       backup=request.backup, preserve_format=True,
+                                       only_dirty=request.only_dirty)
+            if success:
+                request.source.clear_dirty(up_to_revision=request.revision)
+            else:
+                error = "XML写入失败（回退亦失败）"
+        except Exception as e:
+            success = False
+            error = str(e)
+
+        duration_ms = int((time.time() - start_time) * 1000)
+        data = {
+            'file_path': str(request.xml_path),
+            'coalesced': request.coalesced,
+            'duration_ms': duration_ms,
+        }
+        if success:
+            logger.info(f"==liuq debug== 后台保存完成: {request.xml_path} "
+                        f"(合并 {request.coalesced} 次请求, 耗时 {duration_ms}ms)")
+            self.event_bus.emit(EventType.XML_FILE_SAVED, data, source="XMLSaveQueue")
+        else:
+            logger.error(f"==liuq debug== 后台保存失败: {request.xml_path}, 错误: {error}")
+            data['error'] = error
+            self.event_bus.emit(EventType.XML_FILE_SAVE_FAILED, data, source="XMLSaveQueue")
+
+        for callback in request.callbacks:
+            try:
+                callback(success)
+            except Exception as e:
+                logger.error(f"==liuq debug== 保存完成回调执行失败: {e}")
+
+
+def _create_worker_writer():
+    """创建后台线程专用的写入服务（性能服务独立实例，不与界面线程共享节点区间索引缓存）"""
+    from core.services.map_analysis.xml_writer_service import XMLWriterService
+    from core.services.map_analysis.xml_performance_service import XMLPerformanceService
+
+    writer = XMLWriterService()
+    writer.performance_service = XMLPerformanceService()
+    return writer
+
+
+# 全局保存队列实例
+_save_queue: Optional[XMLSaveQueue] = None
+_save_queue_lock = threading.Lock()
+
+
+def get_xml_save_queue() -> XMLSaveQueue:
+    """获取XML后台保存队列实例"""
+    global _save_queue
+
+    if _save_queue is None:
+        with _save_queue_lock:
+            if _save_queue is None:
+                _save_queue = XMLSaveQueue()
+                logger.info("==liuq debug== 创建XML后台保存队列")
+
+    return _save_queue
+
+
+def shutdown_xml_save_queue(timeout: Optional[float] = None):
+    """关闭全局保存队列并等待已提交的保存写完（未创建时不做任何事）"""
+    global _save_queue
+
+    with _save_queue_lock:
+        queue, _save_queue = _save_queue, None
+    if queue is not None:
+        queue.shutdown(wait=True, timeout=timeout)
@@ -19,6 +19,7 @@ from core.interfaces.xml_data_processor import (
     ValidationLevel, ValidationResult, XMLParseError, ValidationError
 )
 from core.models.map_data import MapPoint, XMLFieldDataType
+from core.services.map_analysis.xml_document import ParsedXMLDocument
 
 logger = logging.getLogger(__name__)
 
@@ -41,13 +42,15 @@ class XMLValidationService:
         logger.debug("==liuq debug== XML验证服务初始化完成")
     
     def validate_xml_file(self, xml_path: Union[str, Path], 
-                         level: ValidationLevel = ValidationLevel.FULL) -> ValidationResult:
+                         level: ValidationLevel = ValidationLevel.FULL,
+                         document: Optional[ParsedXMLDocument] = None) -> ValidationResult:
         """
         验证XML文件的结构和内容
         
         Args:
             xml_path: XML文件路径
             level: 验证级别
+            document: 已加载的共享文档对象（提供时不再解析文件）
             
         Returns:
             ValidationResult: 验证结果对象
@@ -71,15 +74,16 @@ class XMLValidationService:
 
             # 结构验证
             if level.value in [ValidationLevel.STRUCTURE.value, ValidationLevel.FULL.value]:
-                root = self._validate_xml_structure(xml_path, result)
+                root = self._validate_xml_structure(xml_path, result, document)
                 if not result.is_valid:
                     return result
 
             # 内容验证
             if level.value in [ValidationLevel.CONTENT.value, ValidationLevel.FULL.value]:
                 if root is None:  # 如果还没有解析XML，先解析
-                    tree = ET.parse(xml_path)
-                    root = tree.getroot()
+                    if document is None:
+                        document = ParsedXMLDocument.load(xml_path)
+                    root = document.root
                 
                 self._validate_xml_content(root, result)
 
@@ -210,14 +214,16 @@ class XMLValidationService:
         
         return True
     
-    def _validate_xml_structure(self, xml_path: Path, result: ValidationResult) -> Optional[ET.Element]:
+    def _validate_xml_structure(self, xml_path: Path, result: ValidationResult,
+                                document: Optional[ParsedXMLDocument] = None) -> Optional[ET.Element]:
         """验证XML结构"""
         try:
-            tree = ET.parse(xml_path)
-            root = tree.getroot()
+            if document is None:
+                document = ParsedXMLDocument.load(xml_path)
+            root = document.root
             
             result.metadata['root_tag'] = root.tag
-            result.metadata['element_count'] = len(list(root.iter()))
+            result.metadata['element_count'] = document.element_count
             
             # 检查根元素
             if root.tag not in ['awb_scenario', 'root', 'configuration']:
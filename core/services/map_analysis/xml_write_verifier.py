@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XML写入后校验
+==liuq debug== FastMapV2 只回读被修改节点区间的写入校验
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 字节补丁写入后，按补丁长度差把源文件中的节点区间换算到新文件的位置，只回读这些区间：
+      校验节点字节与计划一致、节点本身是完整的XML元素、每个替换字段的值等于目标值。
+      未修改的字节区间原样复制自已成功解析的源文件，再校验文件长度即可确认整份文件完好，
+      开销与修改数量成正比，不需要重新解析整个文件
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from xml.etree import ElementTree as ET
+
+from core.models.map_data import XML_FIELD_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 边界字段类型 → 标签名（与XMLPerformanceService.build_boundary_replacements一致）
+_BOUNDARY_TAGS = {'boundary_rpg': 'RpG', 'boundary_bpg': 'BpG'}
+
+
+@dataclass
+class XMLVerificationIssue:
+    """单个校验不一致项"""
+    alias_name: str
+    field_type: str
+    expected: Optional[str]
+    actual: Optional[str]
+    reason: str
+
+
+@dataclass
+class XMLWriteVerification:
+    """写入校验结果"""
+    success: bool = True
+    checked_nodes: int = 0
+    checked_fields: int = 0
+    issues: List[XMLVerificationIssue] = field(default_factory=list)
+    duration_ms: int = 0
+
+    def add_issue(self, alias_name: str, field_type: str, expected: Optional[str],
+                  actual: Optional[str], reason: str):
+        self.success = False
+        self.issues.append(XMLVerificationIssue(alias_name, field_type, expected, actual, reason))
+
+    def describe(self) -> str:
+        """按别名与字段列出不一致项"""
+        return '; '.join(f"{issue.alias_name}.{issue.field_type}: {issue.reason} "
+                         f"(期望 {issue.expected!r}, 实际 {issue.actual!r})" for issue in self.issues)
+
+
+def map_patched_spans(patches: List[Tuple[int, int, str]], encoding: str = 'utf-8'
+                      ) -> List[Tuple[int, int, int, bytes]]:
+    """
+    把补丁的源文件区间换算到写入后文件中的区间
+
+    Args:
+        patches: 按起始偏移排序的(字节起始, 字节结束, 新节点文本)
+        encoding: 文件编码
+
+    Returns:
+        List[Tuple[int, int, int, bytes]]: (源起始, 源结束, 新文件起始, 新节点字节)
+    """
+    mapped = []
+    shift = 0
+    for node_start, node_end, node_content in patches:
+        data = node_content.encode(encoding)
+        mapped.append((node_start, node_end, node_start + shift, data))
+        shift += len(data) - (node_end - node_start)
+    return mapped
+
+
+def verify_patched_file(written_path: Union[str, Path], source_length: int,
+                        patches: List[Tuple[int, int, str]], replacements: list,
+                        encoding: str = 'utf-8', core=None) -> XMLWriteVerification:
+    """
+    只回读被修改的节点区间，校验写入结果
+
+    Args:
+        written_path: 写入后的文件（临时文件或目标文件）
+        source_length: 源文件字节长度
+        patches: 写入时使用的补丁（plan_node_patches的结果）
+        replacements: 替换操作列表（含_node_start/_node_end、alias_name、field_type、replacement）
+        encoding: 文件编码
+        core: 提供extract_field_value_from_content的XMLWriterCore（None时新建）
+
+    Returns:
+        XMLWriteVerification: 校验结果（不一致项按别名与字段列出）
+    """
+    if core is None:
+        from core.services.map_analysis.xml_writer_core import XMLWriterCore
+        core = XMLWriterCore()
+
+    start_time = time.time()
+    result = XMLWriteVerification()
+    mapped = map_patched_spans(patches, encoding)
+
+    by_span: Dict[Tuple[int, int], list] = {}
+    for replacement in replacements:
+        if '_node_start' in replacement:
+            by_span.setdefault((replacement['_node_start'], replacement['_node_end']), []).append(replacement)
+
+    expected_length = source_length + sum(len(data) - (end - start) for start, end, _, data in mapped)
+    actual_length = os.path.getsize(written_path)
+    if actual_length != expected_length:
+        result.add_issue('', '', str(expected_length), str(actual_length), "文件长度不一致")
+
+    with open(written_path, 'rb') as f:
+        for node_start, node_end, new_start, expected_data in mapped:
+            span_replacements = by_span.get((node_start, node_end), [])
+            alias_name = span_replacements[0].get('alias_name', '') if span_replacements else ''
+            result.checked_nodes += 1
+
+            f.seek(new_start)
+            data = f.read(len(expected_data))
+            if data != expected_data:
+                result.add_issue(alias_name, '', None, None, f"节点字节与写入计划不一致 (偏移 {new_start})")
+                continue
+
+            node_text = data.decode(encoding)
+            try:
+                ET.fromstring(node_text)
+            except ET.ParseError as e:
+                result.add_issue(alias_name, '', None, None, f"节点不是完整的XML元素: {e}")
+                continue
+
+            # 同一节点同一字段以最后一个替换为准（offset字段可能出现两次）
+            final_replacements = {replacement['field_type']: replacement for replacement in span_replacements}
+            for replacement in final_replacements.values():
+                result.checked_fields += 1
+                expected = str(replacement['replacement']).strip()
+                actual = _extract_written_value(core, node_text, replacement['field_type'])
+                if actual != expected:
+                    result.add_issue(replacement.get('alias_name', ''), replacement['field_type'],
+                                     expected, actual, "字段值与目标值不一致")
+
+    result.duration_ms = int((time.time() - start_time) * 1000)
+    return result
+
+
+def _extract_written_value(core, node_text: str, field_type: str) -> Optional[str]:
+    """从回读的节点文本中提取字段值"""
+    if field_type in XML_FIELD_CONFIG:
+        return core.extract_field_value_from_content(node_text, XML_FIELD_CONFIG[field_type])
+    tag_name = _BOUNDARY_TAGS.get(field_type)
+    if tag_name is None:
+        return None
+    tag_start = node_text.find(f'<{tag_name}')
+    if tag_start == -1:
+        return None
+    value_start = node_text.find('>', tag_start) + 1
+    value_end = node_text.find(f'</{tag_name}>', value_start)
+    if value_start <= 0 or value_end == -1:
+        return None
+    return node_text[value_start:value_end].strip()
@@ -5,8 +5,8 @@ XML Writer Core - 核心写入辅助逻辑
 
 从 XMLPerformanceService 抽离的通用、与性能无关的核心算法：
 - base_boundary0 定位
-- 别名映射（findall + AliasName 过滤）
-- 双节点配对搜索（数据节点 + 含 AliasName 元数据节点）
+- 别名映射（单遍节点索引 + AliasName 过滤）
+- 双节点配对搜索（数据节点 + 含 AliasName 元数据节点，基于单遍文本区间索引）
 - 当前 offset 值获取
 - 字段值提取（支持 OFFSET 与 RANGE）
 - 字段替换（offset 与 range）
@@ -20,6 +20,8 @@ from typing import Any, Optional
 from xml.etree import ElementTree as ET
 
 from core.models.map_data import XMLFieldNodeType
+from core.services.map_analysis.xml_node_index import XMLNodeIndex
+from core.services.map_analysis.xml_node_span_index import XMLNodeSpanIndex
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +30,12 @@ class XMLWriterCore:
     """XML写入核心算法封装"""
 
     def __init__(self):
+        # 别名映射及其对应的XML根元素（按对象身份复用，换文件或重新解析后重建）
         self._alias_mapping_cache: Optional[dict] = None
+        self._alias_mapping_root: Optional[ET.Element] = None
+        # 文本区间索引及其对应的文本（按对象身份复用，一次保存只构建一次）
+        self._span_index: Optional[XMLNodeSpanIndex] = None
+        self._span_index_content: Optional[str] = None
 
     # ---------- base_boundary ----------
     def find_base_boundary_node(self, content: str) -> tuple:
@@ -48,16 +55,13 @@ class XMLWriterCore:
             return -1, -1
 
     # ---------- 别名映射 ----------
-    def _build_dynamic_alias_mapping(self, root: ET.Element) -> dict:
+    def _build_dynamic_alias_mapping(self, root: ET.Element, node_index: Optional[XMLNodeIndex] = None) -> dict:
         """动态构建别名到XML节点名称的映射（按AliasName筛选候选节点）"""
         alias_mapping = {}
         try:
-            for i in range(1, 300):
-                formatted_i = f"0{i}" if i < 10 else str(i)
-                element_name = f"offset_map{formatted_i}"
-                candidates = root.findall(f'.//{element_name}')
-                if not candidates:
-                    continue
+            if node_index is None:
+                node_index = XMLNodeIndex.build(root)
+            for element_name, candidates in node_index.iter_offset_maps():
                 picked = None
                 for node in candidates:
                     alias_node = node.find('AliasName')
@@ -73,14 +77,41 @@ class XMLWriterCore:
             return {}
 
     def get_xml_node_name_by_alias(self, root: ET.Element, alias_name: str) -> Optional[str]:
-        """根据别名获取对应的XML节点名称（带缓存）"""
-        if self._alias_mapping_cache is None:
+        """根据别名获取对应的XML节点名称（同一根元素只构建一次映射）"""
+        if self._alias_mapping_cache is None or self._alias_mapping_root is not root:
             self._alias_mapping_cache = self._build_dynamic_alias_mapping(root)
+            self._alias_mapping_root = root
         return self._alias_mapping_cache.get(alias_name)
 
     # ---------- 节点精确定位（双节点配对） ----------
+    def get_node_span_index(self, content: str) -> XMLNodeSpanIndex:
+        """获取content的节点区间索引（同一文本对象只构建一次）"""
+        if self._span_index is None or self._span_index_content is not content:
+            self._span_index = XMLNodeSpanIndex.build(content)
+            self._span_index_content = content
+        return self._span_index
+
+    def release_node_span_index(self):
+        """释放节点区间索引及其引用的文本（一次保存结束后调用）"""
+        self._span_index = None
+        self._span_index_content = None
+
     def _find_exact_node_by_alias(self, content: str, node_name: str, alias_name: str) -> tuple:
         """根据alias_name精确定位XML节点位置（双节点配对：第一个为数据、第二个为含AliasName的元数据）"""
+        try:
+            span_index = self.get_node_span_index(content)
+            if span_index.covers(node_name):
+                node_start, node_end = span_index.find(node_name, alias_name)
+                if node_start == -1:
+                    logger.warning(f"==liuq debug== 未找到匹配的节点对: {node_name}, 别名: {alias_name}")
+                return node_start, node_end
+            return self._scan_exact_node_by_alias(content, node_name, alias_name)
+        except Exception as e:
+            logger.error(f"==liuq debug== 精确节点定位失败: {e}")
+            return -1, -1
+
+    def _scan_exact_node_by_alias(self, content: str, node_name: str, alias_name: str) -> tuple:
+        """逐个扫描同名节点对定位节点（索引不覆盖的节点名使用）"""
         try:
             search_start = 0
             while True:
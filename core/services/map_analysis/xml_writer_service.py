@@ -16,7 +16,7 @@ from datetime import datetime
 from xml.etree import ElementTree as ET
 
 from core.interfaces.xml_data_processor import (
-    XMLDataProcessor, XMLWriteError, ValidationError, BackupError,
+    XMLDataProcessor, XMLWriteError, XMLWriteVerificationError, ValidationError, BackupError,
     ValidationLevel, ValidationResult
 )
 from core.models.map_data import (
@@ -32,6 +32,9 @@ from core.services.map_analysis.xml_backup_service import get_xml_backup_service
 from core.services.map_analysis.xml_formatting_service import get_xml_formatting_service
 from core.services.map_analysis.xml_performance_service import get_xml_performance_service
 from core.services.map_analysis.xml_writer_core import XMLWriterCore
+from core.services.map_analysis.xml_node_index import XMLNodeIndex
+from core.services.map_analysis.xml_document import ParsedXMLDocument
+from core.services.map_analysis.xml_edit_journal import get_edit_journal
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +77,7 @@ class XMLWriterService(XMLDataProcessor):
         self.current_tree = None            # 当前XML树对象
         self.is_data_modified = False       # 数据是否已修改
         self.modification_count = 0         # 修改计数器
+        self.edit_journal = None            # 当前文件的字段编辑日志
         # 写入核心算法组件（与性能无关）
         self.core = XMLWriterCore()
 
@@ -113,15 +117,22 @@ class XMLWriterService(XMLDataProcessor):
             config = parser.parse_xml(xml_path, device_type)
 
             if config:
-                # 解析XML树
-                tree = ET.parse(xml_path)
-
                 # 保存到当前状态（不触发保存）
+                # XML树仅在保存时需要，延迟到save_now再解析，缓存命中时打开文件无需任何XML解析
                 self.current_xml_path = xml_path
                 self.current_config = config
-                self.current_tree = tree
+                self.current_tree = None
                 self.is_data_modified = False
                 self.modification_count = 0
+                # 以加载时的状态作为脏字段跟踪基线
+                config.clear_dirty()
+
+                # 重放上次异常退出时尚未保存的编辑
+                self.edit_journal = get_edit_journal(xml_path)
+                recovered = self.edit_journal.recover(config)
+                if recovered:
+                    self.is_data_modified = True
+                    self.modification_count = recovered
 
                 logger.info(f"==liuq debug== XML文件加载成功，已加载 {len(config.map_points)} 个Map点")
                 return config
@@ -133,15 +144,39 @@ class XMLWriterService(XMLDataProcessor):
             logger.error(f"==liuq debug== 加载XML文件失败: {e}")
             return None
 
-    def mark_data_modified(self, description: str = "数据已修改"):
+    def mark_data_modified(self, description: str = "数据已修改", alias_name: Optional[str] = None,
+                           field_name: Optional[str] = None, old_value: Any = None, new_value: Any = None):
         """
         标记数据已修改
+
+        给出alias_name与field_name时同时写入字段编辑日志（用于崩溃恢复与撤销/重做）
         """
         if not self.is_data_modified:
             self.is_data_modified = True
 
         self.modification_count += 1
 
+        if alias_name and field_name and self.edit_journal is not None:
+            self.edit_journal.record(alias_name, field_name, old_value, new_value)
+
+    def undo_edit(self):
+        """撤销最近一次字段编辑，返回EditRecord，没有可撤销的编辑时返回None"""
+        if self.edit_journal is None or not self.current_config:
+            return None
+        record = self.edit_journal.undo(self.current_config)
+        if record:
+            self.mark_data_modified("撤销编辑")
+        return record
+
+    def redo_edit(self):
+        """重做最近一次撤销的字段编辑，返回EditRecord，没有可重做的编辑时返回None"""
+        if self.edit_journal is None or not self.current_config:
+            return None
+        record = self.edit_journal.redo(self.current_config)
+        if record:
+            self.mark_data_modified("重做编辑")
+        return record
+
     def save_now(self, backup: bool = True) -> bool:
         """
         立即保存当前数据（用户主动触发）
@@ -157,13 +192,25 @@ class XMLWriterService(XMLDataProcessor):
 
             logger.info(f"==liuq debug== 开始保存XML数据到: {self.current_xml_path}")
 
+            if self.current_tree is None:
+                self.current_tree = ET.parse(self.current_xml_path)
+
+            journal_position = self.edit_journal.position() if self.edit_journal else None
+
             # 优先使用性能优化服务
-            success = self.performance_service.write_xml_optimized(
-                self.current_config,
-                self.current_xml_path,
-                backup=backup,
-                tree=self.current_tree
-            )
+            # 配置由当前文件加载，只需为有修改记录的(Map点, 字段)构建替换
+            try:
+                success = self.performance_service.write_xml_optimized(
+                    self.current_config,
+                    self.current_xml_path,
+                    backup=backup,
+                    tree=self.current_tree,
+                    only_dirty=True
+                )
+            except XMLWriteVerificationError as e:
+                # 校验发现不一致时原文件未被替换，不能再用全量写回覆盖
+                logger.error(f"==liuq debug== {e}，不执行回退写入，修改保留在内存中")
+                return False
 
             if not success:
                 logger.warning("==liuq debug== 高性能写入失败，启动回退：ElementTree 全量写回")
@@ -172,6 +219,9 @@ class XMLWriterService(XMLDataProcessor):
             if success:
                 self.is_data_modified = False
                 self.modification_count = 0
+                self.current_config.clear_dirty()
+                if self.edit_journal is not None:
+                    self.edit_journal.mark_saved(journal_position)
                 logger.info("==liuq debug== XML数据保存成功")
             else:
                 logger.error("==liuq debug== XML数据保存失败（回退亦失败）")
@@ -182,6 +232,41 @@ class XMLWriterService(XMLDataProcessor):
             logger.error(f"==liuq debug== 保存XML数据时发生异常: {e}")
             return False
 
+    def save_async(self, backup: bool = True) -> bool:
+        """
+        提交到后台保存队列（调用线程不做磁盘I/O）
+
+        结果通过EventBus的XML_FILE_SAVED/XML_FILE_SAVE_FAILED通知；
+        写入成功且提交后没有新的修改时清除修改标记。
+
+        Returns:
+            bool: 是否已加入保存队列
+        """
+        if not self.current_config or not self.current_xml_path:
+            logger.error("==liuq debug== 没有可保存的数据")
+            return False
+
+        if not self.is_data_modified:
+            logger.info("==liuq debug== 数据未修改，跳过保存")
+            return True
+
+        from core.services.map_analysis.xml_save_queue import get_xml_save_queue
+
+        submitted_count = self.modification_count
+        journal = self.edit_journal
+        journal_position = journal.position() if journal else None
+
+        def on_complete(success: bool):
+            if success and journal is not None:
+                journal.mark_saved(journal_position)
+            if success and self.modification_count == submitted_count:
+                self.is_data_modified = False
+                self.modification_count = 0
+
+        # 配置由当前文件加载，只写有修改记录的字段；写入成功后队列清除提交前修改的点的脏字段
+        return get_xml_save_queue().submit(self.current_config, self.current_xml_path,
+                                           backup=backup, on_complete=on_complete, only_dirty=True)
+
     def is_modified(self) -> bool:
         """检查数据是否已修改"""
         return self.is_data_modified
@@ -208,9 +293,14 @@ class XMLWriterService(XMLDataProcessor):
         return parser.parse_xml(xml_path, device_type)
 
     def write_xml(self, config: MapConfiguration, xml_path: Union[str, Path],
-                  backup: bool = True, preserve_format: bool = True) -> bool:
+                  backup: bool = True, preserve_format: bool = True, only_dirty: bool = False) -> bool:
         """
         将MapConfiguration对象写入XML文件
+
+        only_dirty为True时只为有修改记录的(Map点, 字段)构建替换，要求config由xml_path加载
+
+        Raises:
+            XMLWriteVerificationError: 高性能写入校验失败（原文件未修改，不执行回退写入）
         """
         logger.info("==liuq debug== write_xml方法重定向到性能优化服务")
 
@@ -228,7 +318,8 @@ class XMLWriterService(XMLDataProcessor):
             self.current_tree = tree
 
             # 使用性能优化服务
-            success = self.performance_service.write_xml_optimized(config, Path(xml_path), backup, tree)
+            success = self.performance_service.write_xml_optimized(config, Path(xml_path), backup, tree,
+                                                                   only_dirty=only_dirty)
 
             if not success:
                 logger.warning("==liuq debug== write_xml: 高性能写入失败，启动回退：ElementTree 全量写回")
@@ -236,6 +327,10 @@ class XMLWriterService(XMLDataProcessor):
 
             return success
 
+        except XMLWriteVerificationError as e:
+            logger.error(f"==liuq debug== {e}，不执行回退写入")
+            raise
+
         except Exception as e:
             logger.error(f"==liuq debug== 高性能写入失败: {e}")
             return False
@@ -246,11 +341,12 @@ class XMLWriterService(XMLDataProcessor):
             self.current_xml_path = original_path
 
     def validate_xml(self, xml_path: Union[str, Path],
-                     level: ValidationLevel = ValidationLevel.FULL) -> ValidationResult:
+                     level: ValidationLevel = ValidationLevel.FULL,
+                     document: Optional[ParsedXMLDocument] = None) -> ValidationResult:
         """
         验证XML文件的结构和内容 - 委托给验证服务
         """
-        return self.validation_service.validate_xml_file(xml_path, level)
+        return self.validation_service.validate_xml_file(xml_path, level, document)
 
     def get_supported_versions(self) -> List[str]:
         """
@@ -340,20 +436,23 @@ class XMLWriterService(XMLDataProcessor):
         alias_mapping = {}
 
         try:
-            # 遍历所有可能的offset_map节点（01..199），遇到第一个不存在的编号后再连续缺失3次则结束
+            node_index = XMLNodeIndex.build(root)
+
+            # 从offset_map01开始按编号遍历，连续缺失3个编号则结束
             missing_streak = 0
-            for i in range(1, 200):
+            i = 0
+            while missing_streak < 3:
+                i += 1
                 formatted_i = f"0{i}" if i < 10 else str(i)
                 element_name = f"offset_map{formatted_i}"
 
                 # 查找该offset_map节点（单节点结构）
-                node = root.find(f'.//{element_name}')
-                if node is None:
+                nodes = node_index.get_nodes(element_name)
+                if not nodes:
                     missing_streak += 1
-                    if missing_streak >= 3:
-                        break
                     continue
                 missing_streak = 0
+                node = nodes[0]
 
                 # 优先在该节点下查找别名（有些XML把AliasName放在第二组detect_map/WO_NO.xx下）
                 alias_node = node.find('AliasName')
@@ -381,16 +480,16 @@ class XMLWriterService(XMLDataProcessor):
                         alias_mapping[alias_name] = element_name
 
             # 同时加入 base_boundary0..N 的映射（作为特殊Map）
-            for j in range(0, 50):
-                bb = root.find(f'.//base_boundary{j}')
-                if bb is None:
-                    break
+            j = 0
+            while node_index.has_tag(f'base_boundary{j}'):
+                bb = node_index.get_nodes(f'base_boundary{j}')[0]
                 alias_node = bb.find('AliasName')
                 if alias_node is not None and alias_node.text and alias_node.text.strip():
                     alias_mapping[alias_node.text.strip()] = f'base_boundary{j}'
                 else:
                     # 退化为用标签名作为“别名”
                     alias_mapping[f'base_boundary{j}'] = f'base_boundary{j}'
+                j += 1
 
             logger.info(f"==liuq debug== 动态构建别名映射完成，共 {len(alias_mapping)} 个映射关系")
             return alias_mapping
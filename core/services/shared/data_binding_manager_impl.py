@@ -29,6 +29,24 @@ from core.interfaces.xml_field_definition import XMLFieldDefinition, FieldType
 
 logger = logging.getLogger(__name__)
 
+# 字段ID → 属性名或取值函数（属性名不存在时使用），模块级构建一次
+_FIELD_VALUE_MAPPING = {
+    'alias_name': 'alias_name',
+    'x': 'x',
+    'y': 'y',
+    'offset_x': 'offset_x',
+    'offset_y': 'offset_y',
+    'weight': 'weight',
+    'bv_min': lambda obj: obj.bv_range[0] if obj.bv_range else 0.0,
+    'bv_max': lambda obj: obj.bv_range[1] if obj.bv_range else 100.0,
+    'ir_min': lambda obj: obj.ir_range[0] if obj.ir_range else 0.0,
+    'ir_max': lambda obj: obj.ir_range[1] if obj.ir_range else 100.0,
+    'cct_min': lambda obj: obj.cct_range[0] if obj.cct_range else 2000.0,
+    'cct_max': lambda obj: obj.cct_range[1] if obj.cct_range else 8000.0,
+    'detect_flag': 'detect_flag',
+    'trans_step': 'trans_step'
+}
+
 
 class DataBindingManagerImpl(QObject):
     """
@@ -606,22 +624,7 @@ class DataBindingManagerImpl(QObject):
                 return getattr(data_object, field_id)
 
             # 尝试常见的字段映射
-            field_mapping = {
-                'alias_name': 'alias_name',
-                'x': 'x',
-                'y': 'y',
-                'offset_x': 'offset_x',
-                'offset_y': 'offset_y',
-                'weight': 'weight',
-                'bv_min': lambda obj: obj.bv_range[0] if obj.bv_range else 0.0,
-                'bv_max': lambda obj: obj.bv_range[1] if obj.bv_range else 100.0,
-                'ir_min': lambda obj: obj.ir_range[0] if obj.ir_range else 0.0,
-                'ir_max': lambda obj: obj.ir_range[1] if obj.ir_range else 100.0,
-                'cct_min': lambda obj: obj.cct_range[0] if obj.cct_range else 2000.0,
-                'cct_max': lambda obj: obj.cct_range[1] if obj.cct_range else 8000.0,
-                'detect_flag': 'detect_flag',
-                'trans_step': 'trans_step'
-            }
+            field_mapping = _FIELD_VALUE_MAPPING
 
             if field_id in field_mapping:
                 mapping = field_mapping[field_id]
@@ -683,6 +686,11 @@ class DataBindingManagerImpl(QObject):
                 # 直接设置属性
                 setattr(data_object, field_id, converted_value)
 
+            # 范围列表为原地修改，显式标记脏字段供保存时只写回修改过的字段
+            mark_dirty = getattr(data_object, 'mark_dirty', None)
+            if mark_dirty is not None:
+                mark_dirty(field_id)
+
             logger.debug(f"==liuq debug== 设置字段值成功: {field_id} = {converted_value}")
 
         except Exception as e:
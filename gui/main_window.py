@@ -480,6 +480,8 @@ class MainWindow(QMainWindow):
             
             success = self.view_model.save_xml_file()
             if success:
+                if hasattr(self, 'map_table') and self.map_table:
+                    self.map_table.mark_saved()
                 QMessageBox.information(self, "成功", "XML文件保存成功")
             else:
                 QMessageBox.warning(self, "警告", "XML文件保存失败")
@@ -865,9 +867,13 @@ class MainWindow(QMainWindow):
                 event.accept()
                 return
 
+            # 存在未保存的编辑时提示将被丢弃（退出后不再从编辑日志恢复）
+            modified = hasattr(self, 'map_table') and self.map_table and self.map_table.is_modified()
+            message = ('当前有尚未保存的修改，退出后将丢弃这些修改。\n确定要退出FastMapV2吗？'
+                       if modified else '确定要退出FastMapV2吗？')
             reply = QMessageBox.question(
                 self, '确认退出',
-                '确定要退出FastMapV2吗？',
+                message,
                 QMessageBox.Yes | QMessageBox.No,
                 QMessageBox.No
             )
@@ -938,6 +944,20 @@ class MainWindow(QMainWindow):
                 except:
                     pass
 
+            # 等待后台保存队列写完已提交的保存
+            try:
+                from core.services.map_analysis.xml_save_queue import shutdown_xml_save_queue
+                shutdown_xml_save_queue(timeout=30)
+            except Exception as e:
+                logger.warning(f"==liuq debug== 关闭后台保存队列失败: {e}")
+
+            # 正常退出：删除编辑日志，下次打开不再重放本次未保存的编辑
+            try:
+                from core.services.map_analysis.xml_edit_journal import discard_edit_journals
+                discard_edit_journals()
+            except Exception as e:
+                logger.warning(f"==liuq debug== 删除编辑日志失败: {e}")
+
             logger.info("==liuq debug== 资源清理完成")
         except Exception as e:
             logger.debug(f"==liuq debug== 资源清理异常: {e}")
@@ -172,9 +172,15 @@ class MainWindowViewModel(BaseViewModel):
             except Exception:
                 pass
 
+            from core.services.map_analysis.xml_edit_journal import get_edit_journal
+            journal = get_edit_journal(save_path)
+            journal_position = journal.position()
+
             ok = writer.write_xml(self._map_configuration, save_path, backup=True, preserve_format=True)
 
             if ok:
+                # 已写入的编辑不再需要从日志恢复
+                journal.mark_saved(journal_position)
                 self.set_status_message(f"XML文件保存完成: {save_path.name}")
                 logger.info(f"==liuq debug== XML文件保存成功: {save_path}")
                 # 触发事件
@@ -118,24 +118,46 @@ class MapAnalysisTabViewModel(BaseViewModel):
             
             self._current_xml_file = xml_path
             
-            # 1. 验证XML文件
-            self.analysis_progress_updated.emit(20, "验证XML文件格式")
-            validation_result = self._xml_validator.validate_xml_file(xml_path)
-            self._validation_result = validation_result
-            self.validation_completed.emit(validation_result)
-            
-            if not validation_result.get('is_valid', False):
-                self.set_status_message("XML文件验证失败")
-                return False
-            
-            # 2. 提取元数据
-            self.analysis_progress_updated.emit(40, "提取XML元数据")
-            metadata = self._xml_metadata.extract_complete_metadata(xml_path)
-            self._metadata = metadata
-            
-            # 3. 解析XML数据（新架构：直接返回 MapConfiguration）
-            self.analysis_progress_updated.emit(60, "解析Map数据")
-            config = self._xml_parser.parse_xml(xml_path)
+            # 先按文件指纹查询解析缓存：命中时验证结果、元数据与Map配置都取自缓存，不解析XML
+            cached = self._xml_parser.get_cached(xml_path)
+            if cached is not None and all(key in cached[1] for key in ('validation', 'metadata')):
+                config, extras = cached
+                self.analysis_progress_updated.emit(20, "验证XML文件格式")
+                validation_result = extras['validation']
+                self._validation_result = validation_result
+                self.validation_completed.emit(validation_result)
+                self.analysis_progress_updated.emit(40, "提取XML元数据")
+                metadata = extras['metadata']
+                self._metadata = metadata
+                self.analysis_progress_updated.emit(60, "解析Map数据")
+            else:
+                # 未命中时只解析一次，验证、元数据提取与Map解析共享同一文档对象
+                try:
+                    document = self._xml_parser.load_document(xml_path)
+                except Exception as e:
+                    logger.warning(f"==liuq debug== XML文档加载失败，交由验证服务报告: {e}")
+                    document = None
+
+                # 1. 验证XML文件
+                self.analysis_progress_updated.emit(20, "验证XML文件格式")
+                validation_result = self._xml_validator.validate_xml_file(xml_path, document=document)
+                self._validation_result = validation_result
+                self.validation_completed.emit(validation_result)
+
+                if not getattr(validation_result, 'is_valid', False):
+                    self.set_status_message("XML文件验证失败")
+                    return False
+
+                # 2. 提取元数据
+                self.analysis_progress_updated.emit(40, "提取XML元数据")
+                metadata = self._xml_metadata.extract_complete_metadata(xml_path, document=document)
+                self._metadata = metadata
+
+                # 3. 解析XML数据（新架构：直接返回 MapConfiguration），验证结果与元数据随缓存条目保存
+                self.analysis_progress_updated.emit(60, "解析Map数据")
+                config = self._xml_parser.parse_xml(xml_path, document=document,
+                                                    cache_extras={'validation': validation_result,
+                                                                  'metadata': metadata})
 
             if not config:
                 self.set_status_message("XML解析失败: 无法解析配置")
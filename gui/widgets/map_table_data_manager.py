@@ -79,11 +79,12 @@ class MapTableDataManager:
             
         self.table_widget.setRowCount(0)
         
-        # 添加Map点
+        # 添加Map点（整表一次性取出各列字段值）
         map_points = self.configuration.map_points
+        row_values = self._get_map_points_field_values(map_points)
         for i, map_point in enumerate(map_points):
             self.table_widget.insertRow(i)
-            self._populate_map_point_row(i, map_point)
+            self._populate_map_point_row(i, map_point, None if row_values is None else row_values[i])
             
         # 添加Base Boundary（如果存在）
         try:
@@ -116,10 +117,13 @@ class MapTableDataManager:
         logger.info(f"成功填充表格数据，共{len(map_points)}个Map点")
         return self.table_widget.rowCount()
 
-    def _populate_map_point_row(self, row: int, map_point: MapPoint):
-        """填充Map点行数据"""
+    def _populate_map_point_row(self, row: int, map_point: MapPoint, values=None):
+        """填充Map点行数据（values为预先取出的本行各列字段值）"""
         for col, column_def in enumerate(self.column_definitions):
-            value = self._get_map_point_field_value(map_point, column_def.field_id)
+            if values is not None:
+                value = values[col]
+            else:
+                value = self._get_map_point_field_value(map_point, column_def.field_id)
             formatted_value = self._format_field_value(value, column_def)
             self._set_table_item(row, col, formatted_value, map_point)
             
@@ -130,6 +134,15 @@ class MapTableDataManager:
             formatted_value = self._format_field_value(value, column_def)
             self._set_table_item(row, col, formatted_value, base_boundary)
             
+    def _get_map_points_field_values(self, map_points):
+        """批量获取全部Map点的各列字段值，失败时返回None（改为逐单元格获取）"""
+        try:
+            from core.models.map_data import get_fields
+            return get_fields(map_points, [column_def.field_id for column_def in self.column_definitions])
+        except Exception as e:
+            logger.error(f"批量获取Map点字段值失败: {e}")
+            return None
+
     def _get_map_point_field_value(self, map_point: MapPoint, field_id: str) -> Any:
         """获取Map点字段值"""
         try:
@@ -33,6 +33,7 @@ class MapTableEditor(QObject):
         self.table_widget = table_widget
         self.editing_enabled = False
         self.column_definitions = []
+        self.edit_journal = None  # 字段编辑日志（设置XML路径后由表格组件注入）
         
     def set_column_definitions(self, column_definitions):
         """设置列定义"""
@@ -77,7 +78,9 @@ class MapTableEditor(QObject):
             
         # 更新数据
         try:
+            old_value = self._get_original_value(data_object, column_def.field_id)
             if self._update_field_value(data_object, column_def.field_id, new_value):
+                self._record_edit(data_object, column_def.field_id, old_value)
                 self.data_changed.emit(data_object, column_def.field_id, new_value)
                 logger.info(f"字段更新成功: {column_def.field_id} = {new_value}")
             else:
@@ -93,6 +96,23 @@ class MapTableEditor(QObject):
             original_value = self._get_original_value(data_object, column_def.field_id)
             item.setText(str(original_value) if original_value is not None else "")
             
+    def _record_edit(self, data_object, field_id: str, old_value: Any):
+        """把字段编辑写入编辑日志（记录转换后的实际值）"""
+        if self.edit_journal is None:
+            return
+        try:
+            from core.services.map_analysis.xml_edit_journal import BASE_BOUNDARY_ALIAS
+            if isinstance(data_object, MapPoint):
+                # 按编辑前的别名记录（重命名后当前别名已是新值）
+                alias_name = old_value if field_id == 'alias_name' else data_object.alias_name
+            else:
+                alias_name = BASE_BOUNDARY_ALIAS
+            new_value = self._get_original_value(data_object, field_id)
+            if new_value != old_value:
+                self.edit_journal.record(alias_name, field_id, old_value, new_value)
+        except Exception as e:
+            logger.warning(f"==liuq debug== 写入编辑日志失败: {e}")
+
     def _validate_field_value(self, value: str, column_def: TableColumnDefinition) -> bool:
         """验证字段值"""
         if not value.strip():
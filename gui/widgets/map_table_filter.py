@@ -42,6 +42,7 @@ class MapTableFilter:
         self.bv_max_value: Optional[float] = None
         self.configuration: Optional[MapConfiguration] = None
         self.temperature_spans: Dict[str, Dict[str, Any]] = {}
+        self._span_analyzer: Optional[TemperatureSpanAnalyzer] = None
         self._bb_coords: Tuple[float, float] = (0.0, 0.0)
 
     def set_configuration(self, configuration: MapConfiguration):
@@ -54,16 +55,21 @@ class MapTableFilter:
                 )
             except Exception:
                 self._bb_coords = (0.0, 0.0)
-            try:
-                analyzer = TemperatureSpanAnalyzer(configuration)
-                result = analyzer.analyze()
-                self.temperature_spans = result.get('spans_by_map', {}) or {}
-            except Exception as _e:
-                logger.warning("==liuq debug== 预计算色温段跨度失败: %s", _e)
-                self.temperature_spans = {}
+            if self._span_analyzer is None or self._span_analyzer.configuration is not configuration:
+                self._span_analyzer = TemperatureSpanAnalyzer(configuration)
+            self.refresh_temperature_spans()
         except Exception as e:
             logger.warning("==liuq debug== set_configuration失败: %s", e)
 
+    def refresh_temperature_spans(self):
+        """增量刷新色温段跨度（只重算编辑过几何的Map点）"""
+        try:
+            result = self._span_analyzer.analyze() if self._span_analyzer else {}
+            self.temperature_spans = result.get('spans_by_map', {}) or {}
+        except Exception as _e:
+            logger.warning("==liuq debug== 预计算色温段跨度失败: %s", _e)
+            self.temperature_spans = {}
+
     def set_filter_widgets(self, filter_input: QLineEdit, status_label: QLabel, column_combo: QComboBox = None,
                            interval_combo: QComboBox = None, bv_min_edit: QLineEdit = None, bv_max_edit: QLineEdit = None):
         self.filter_input = filter_input
@@ -122,6 +128,9 @@ class MapTableFilter:
         if not self.table_widget:
             return
         self._read_bv_inputs()
+        if self.selected_interval:
+            # Map点编辑后跨度可能变化，增量刷新开销很小
+            self.refresh_temperature_spans()
         filter_text = (self.filter_input.text().lower() if self.filter_input else "").strip()
         visible_rows = 0
 
@@ -13,7 +13,7 @@ import logging
 from typing import List, Optional, Dict, Any
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QHeaderView, QAbstractItemView, QLabel, QLineEdit, QPushButton, QComboBox, QShortcut
+    QHeaderView, QAbstractItemView, QLabel, QLineEdit, QPushButton, QComboBox, QShortcut, QMessageBox
 )
 from PyQt5.QtCore import Qt, QObject, pyqtSignal
 from PyQt5.QtGui import QFont, QColor, QPainter, QPen, QDoubleValidator, QKeySequence
@@ -42,6 +42,9 @@ class MapTableWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.configuration: Optional[MapConfiguration] = None
+        self._journal_configuration: Optional[MapConfiguration] = None  # 已重放编辑日志的配置
+        self._modified = False  # 存在尚未保存的编辑（含从编辑日志恢复的编辑）
+        self._edit_count = 0    # 编辑计数，用于判断后台保存完成时是否有新的编辑
 
         # 初始化UI
         self._init_ui()
@@ -200,6 +203,7 @@ class MapTableWidget(QWidget):
         self.data_manager.set_configuration(configuration)
         self.filter.set_configuration(configuration)
         self.editor.set_column_definitions(self.data_manager.column_definitions)
+        self._modified = False
 
         # 更新列选择下拉框
         self._update_column_combo()
@@ -213,10 +217,44 @@ class MapTableWidget(QWidget):
         try:
             # 某些调用方依赖此方法存在；此处仅记录日志并保留路径
             self._xml_file_path = xml_file_path
+            # 单元格编辑写入该文件的编辑日志（崩溃恢复与撤销/重做）
+            from core.services.map_analysis.xml_edit_journal import get_edit_journal
+            journal = get_edit_journal(xml_file_path) if xml_file_path else None
+            self.editor.edit_journal = journal
+            # 新加载的配置：重放上次异常退出时尚未保存的编辑
+            if (journal is not None and self.configuration is not None
+                    and self._journal_configuration is not self.configuration):
+                self._journal_configuration = self.configuration
+                if journal.has_pending():
+                    if not self._confirm_recover(xml_file_path):
+                        journal.discard()
+                    elif journal.recover(self.configuration):
+                        self._modified = True
+                        self._edit_count += 1
+                        self.refresh_table()
             logger.info(f"==liuq debug== MapTableWidget 记录XML路径: {xml_file_path}")
         except Exception as _e:
             logger.warning(f"==liuq debug== MapTableWidget.set_xml_file_path失败: {_e}")
 
+    def _confirm_recover(self, xml_file_path: str) -> bool:
+        """询问是否恢复上次异常退出时尚未保存的编辑"""
+        reply = QMessageBox.question(
+            self, '恢复未保存的编辑',
+            f'检测到 {xml_file_path} 上次有尚未保存的编辑，是否恢复？\n'
+            '选择"否"将丢弃这些编辑。',
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes
+        )
+        return reply == QMessageBox.Yes
+
+    def is_modified(self) -> bool:
+        """是否存在尚未保存的编辑"""
+        return self._modified
+
+    def mark_saved(self):
+        """外部保存成功后清除修改标记"""
+        self._modified = False
+
     def _update_column_combo(self):
         """更新列选择下拉框"""
         self.column_combo.clear()
@@ -244,6 +282,8 @@ class MapTableWidget(QWidget):
 
     def _on_data_changed(self, data_object, field_id, new_value):
         """数据改变事件"""
+        self._modified = True
+        self._edit_count += 1
         self.data_changed.emit(data_object, field_id, new_value)
 
     def refresh_table(self):
@@ -252,14 +292,18 @@ class MapTableWidget(QWidget):
             # 清空筛选
             self.filter.reset_filters()
 
-            # 重新填充数据
-            row_count = self.data_manager.populate_table()
+            # 重新填充数据并应用样式（写入单元格不是用户编辑，不触发itemChanged）
+            self.table_widget.blockSignals(True)
+            try:
+                row_count = self.data_manager.populate_table()
 
-            # 默认加宽列宽（不影响用户后续拖动调整）
-            self._apply_default_column_widths()
+                # 默认加宽列宽（不影响用户后续拖动调整）
+                self._apply_default_column_widths()
 
-            # 应用样式
-            self.styler.apply_row_styles()
+                # 应用样式
+                self.styler.apply_row_styles()
+            finally:
+                self.table_widget.blockSignals(False)
 
             logger.info(f"表格刷新完成，共{row_count}行")
 
@@ -350,27 +394,27 @@ class MapTableWidget(QWidget):
             if not self.configuration:
                 logger.warning("==liuq debug== 无可保存配置")
                 return
-            from core.services.map_analysis.xml_writer_service import XMLWriterService
-            writer = XMLWriterService()
-            # 若上层已通过 load_xml_for_editing 载入，可设置当前路径
             if hasattr(self, '_xml_file_path') and getattr(self, '_xml_file_path', None):
-                # 装载当前xml到writer，以便优化写入保持原格式
-                try:
-                    writer.load_xml_for_editing(self._xml_file_path)
-                except Exception as _e:
-                    logger.warning(f"==liuq debug== 预载入XML以保持格式失败，继续直接写入: {_e}")
-                # 标记已修改（编辑器on_item_changed时也可标记）
-                try:
-                    writer.mark_data_modified("用户快捷键保存")
-                except Exception:
-                    pass
-                ok = writer.write_xml(self.configuration, self._xml_file_path, backup=True, preserve_format=True)
+                # 提交到后台保存队列：连续的保存请求合并写入，界面线程不等待磁盘I/O
+                from core.services.map_analysis.xml_save_queue import get_xml_save_queue
+                journal = self.editor.edit_journal
+                journal_position = journal.position() if journal else None
+                submitted_count = self._edit_count
+
+                def on_saved(success: bool):
+                    if success and journal is not None:
+                        journal.mark_saved(journal_position)
+                    if success and self._edit_count == submitted_count:
+                        self._modified = False
+
+                ok = get_xml_save_queue().submit(self.configuration, self._xml_file_path,
+                                                 backup=True, on_complete=on_saved, only_dirty=True)
             else:
                 # 未知路径时不保存，避免误写
                 logger.warning("==liuq debug== 未设置XML路径，保存已跳过")
                 ok = False
             if ok:
-                logger.info("==liuq debug== Ctrl+S 保存成功")
+                logger.info("==liuq debug== Ctrl+S 已提交后台保存")
             else:
                 logger.error("==liuq debug== Ctrl+S 保存失败")
         except Exception as e:
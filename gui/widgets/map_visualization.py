@@ -399,13 +399,18 @@ class MapVisualizationWidget(QWidget):
 
 
     def _check_polygon_click(self, click_x: float, click_y: float) -> Optional[MapPoint]:
-        """检查是否点击了多边形"""
-        for patch in self.ax.patches:
-            if hasattr(patch, '_map_point') and isinstance(patch, Polygon):
-                # 检查点是否在多边形内
-                if patch.contains_point((click_x, click_y)):
-                    return patch._map_point
-        return None
+        """检查是否点击了多边形（空间索引取候选，按绘制顺序返回第一个可见的多边形）"""
+        index = self.configuration.get_spatial_index()
+        hits = index.query_point(click_x, click_y, points=False)
+        if not hits:
+            return None
+        visible = {id(point) for point in self.get_filtered_map_points()}
+        candidates = [index.map_points[row] for row in hits if id(index.map_points[row]) in visible]
+        if not candidates:
+            return None
+        # plot_scatter按场景分组绘制，同一场景内保持列表顺序
+        scene_order = {scene_type: order for order, scene_type in enumerate(SceneType)}
+        return min(candidates, key=lambda point: scene_order.get(point.scene_type, len(scene_order)))
 
     def _check_point_click(self, click_x: float, click_y: float) -> Optional[MapPoint]:
         """检查是否点击了单点"""
@@ -413,9 +418,11 @@ class MapVisualizationWidget(QWidget):
         closest_point = None
         threshold = 0.05  # 相对于坐标系的阈值
 
-        filtered_points = self.get_filtered_map_points()
-        for point in filtered_points:
-            if not point.is_polygon:  # 只检查单点
+        index = self.configuration.get_spatial_index()
+        visible = {id(point) for point in self.get_filtered_map_points()}
+        for row in index.query_point(click_x, click_y, threshold, polygons=False):
+            point = index.map_points[row]
+            if id(point) in visible and not point.is_polygon:  # 只检查单点
                 distance = ((point.x - click_x) ** 2 + (point.y - click_y) ** 2) ** 0.5
                 if distance < min_distance and distance < threshold:
                     min_distance = distance
@@ -406,3 +406,74 @@ def mock_services():
         'html_generator': Mock(),
         'chart_generator': Mock()
     }
+
+
+@pytest.fixture(autouse=True)
+def _isolated_xml_parse_cache(tmp_path_factory, monkeypatch):
+    """
+    XML解析缓存指向每个测试独立的临时目录，不读写项目的data/cache
+
+    主进程中的全局缓存默认停用，解析相关测试总是执行真实解析（例如比较不同解析路径的结果）；
+    需要缓存行为的测试使用xml_parse_cache fixture启用。环境变量同时作用于进程池中的工作进程。
+    """
+    from core.services.map_analysis import xml_parse_cache_service as cache_module
+
+    cache_dir = tmp_path_factory.mktemp("xml_parse_cache")
+    monkeypatch.setenv(cache_module.CACHE_DIR_ENV, str(cache_dir))
+    service = cache_module.XMLParseCacheService(cache_dir=cache_dir)
+    service.enabled = False
+    monkeypatch.setattr(cache_module, '_parse_cache_service', service)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def xml_parse_cache(_isolated_xml_parse_cache):
+    """启用的全局XML解析缓存（位于临时目录）"""
+    _isolated_xml_parse_cache.enabled = True
+    return _isolated_xml_parse_cache
+
+
+def _make_random_map_config(count: int = 40, seed: int = 1, aliases=('Map_{}',), area=(1.0, 1.0),
+                            polygon_ratio: float = 0.5, max_radius: float = 0.3, max_vertices: int = 7):
+    """
+    生成随机Map配置：坐标在area范围内，各范围参数、权重、类型与检测标志随机或按下标交替
+
+    Args:
+        count: Map点数量
+        seed: 随机种子（相同参数生成相同配置）
+        aliases: 别名模板，按下标轮流使用（如'Indoor_{}'使场景推断为室内）
+        area: 坐标范围 (宽, 高)
+        polygon_ratio: 多边形Map点的比例
+        max_radius / max_vertices: 多边形顶点到中心的最大距离与最多顶点数
+    """
+    import random
+    from core.models.map_data import BaseBoundary, MapConfiguration, MapPoint, MapType
+
+    rng = random.Random(seed)
+    points = []
+    for i in range(count):
+        cx, cy = rng.uniform(0.0, area[0]), rng.uniform(0.0, area[1])
+        bv_min = float(rng.randint(0, 6000))
+        ir_min = float(rng.randint(0, 200))
+        ctemp_min = rng.randint(2000, 5000)
+        kwargs = dict(alias_name=aliases[i % len(aliases)].format(i), x=cx, y=cy,
+                      offset_x=cx - 0.5, offset_y=cy - 0.5, weight=rng.random(),
+                      bv_range=(bv_min, bv_min + 3000), ir_range=(ir_min, ir_min + rng.randint(1, 400)),
+                      cct_range=(1000.0, 9000.0), ctemp_range=(ctemp_min, ctemp_min + 2000),
+                      tran_bv_min=bv_min - 500 if i % 2 else 0.0, tran_bv_max=bv_min + 3500,
+                      tran_ctemp_min=ctemp_min - 300, tran_ctemp_max=0, detect_flag=i % 4 == 0,
+                      map_type=MapType.REDUCE if i % 3 == 0 else MapType.ENHANCE)
+        if rng.random() < polygon_ratio:
+            radius = rng.uniform(0.01, max_radius)
+            kwargs['polygon_vertices'] = [(cx + radius * rng.uniform(-1, 1), cy + radius * rng.uniform(-1, 1))
+                                          for _ in range(rng.randint(3, max_vertices))]
+            kwargs['is_polygon'] = True
+        points.append(MapPoint(**kwargs))
+    return MapConfiguration('reference', BaseBoundary(0.5, 0.5), points)
+
+
+@pytest.fixture
+def random_map_config():
+    """随机Map配置工厂：random_map_config(count, seed, aliases=..., area=..., ...)，参数见_make_random_map_config"""
+    return _make_random_map_config
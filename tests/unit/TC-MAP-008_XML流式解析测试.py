@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-008: XML流式解析测试
+==liuq debug== 验证iterparse流式解析与整体解析结果一致
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.0.0
+描述: 验证XMLParserService.parse_xml(streaming=True)与默认解析生成相同的MapConfiguration
+"""
+
+import dataclasses
+import logging
+import pytest
+from pathlib import Path
+
+from core.services.map_analysis.xml_parser_service import XMLParserService
+
+logger = logging.getLogger(__name__)
+
+
+def _first_group(tag: str, x: float, y: float, weight: float, bv_min: int) -> str:
+    """第一组数据（offset/weight/range）"""
+    return f"""
+    <{tag}>
+      <offset><x type="double">{x}</x><y type="double">{y}</y></offset>
+      <weight type="double">{weight}</weight>
+      <range>
+        <bv><min type="double">{bv_min}</min><max type="double">9000</max></bv>
+        <tranBv><min type="double">0</min><max type="double">9500</max></tranBv>
+        <ir><min type="double">0</min><max type="double">999</max></ir>
+        <colorCCT><min type="uint">1</min><max type="uint">12000</max></colorCCT>
+        <ctemp><min type="uint">2000</min><max type="uint">8000</max></ctemp>
+        <ml type="int">65471</ml>
+        <DetectMapFlag type="uint">1</DetectMapFlag>
+      </range>
+    </{tag}>"""
+
+
+def _second_group(tag: str, alias: str, rpg: str = "", bpg: str = "", enabled: int = 1) -> str:
+    """第二组数据（AliasName/RpG/BpG）"""
+    return f"""
+    <{tag}>
+      <AliasName type="string">{alias}</AliasName>
+      <MapEnabled type="uint">{enabled}</MapEnabled>
+      <TransStep type="int">2</TransStep>
+      <RpG type="double">{rpg}</RpG>
+      <BpG type="double">{bpg}</BpG>
+    </{tag}>"""
+
+
+@pytest.fixture
+def sample_xml_file(tmp_path) -> Path:
+    """包含base_boundary0、多边形Map、禁用Map和编号断档的小型XML"""
+    firsts = [
+        _first_group('base_boundary0', 0.5, 0.5, 1.0, 0),
+        _first_group('offset_map01', 0.61, 0.42, 0.8, 100),
+        _first_group('offset_map02', 0.0, 0.0, 0.5, 200),
+        _first_group('offset_map03', 0.73, 0.35, 1.2, 300),
+        # offset_map04 缺失第二组，解析应在此截止
+        _first_group('offset_map04', 0.8, 0.3, 1.0, 400),
+        _first_group('offset_map05', 0.9, 0.2, 1.0, 500),
+    ]
+    seconds = [
+        _second_group('base_boundary0', 'Base Boundary', '0.52 0.6', '0.48 0.5'),
+        _second_group('offset_map01', '1_Indoor_Map', '0.6 0.7 0.65', '0.4 0.45 0.5'),
+        _second_group('offset_map02', '', enabled=0),
+        _second_group('offset_map03', '3_Outdoor_Map'),
+        _second_group('offset_map05', '5_Night_Map'),
+    ]
+    content = ('<?xml version="1.0" encoding="utf-8"?>\n<awb_scenario>\n  <version>2.0</version>\n'
+               '  <detect_map>' + ''.join(firsts) + '\n  </detect_map>\n'
+               '  <map_info>' + ''.join(seconds) + '\n  </map_info>\n</awb_scenario>\n')
+    xml_file = tmp_path / "awb_stream_sample.xml"
+    xml_file.write_text(content, encoding='utf-8')
+    return xml_file
+
+
+def _normalize(config):
+    """去除解析时间戳后转换为可比较的结构"""
+    metadata = dict(config.metadata)
+    metadata.pop('parse_time', None)
+    return (
+        config.device_type,
+        config.base_boundary,
+        metadata,
+        [dataclasses.asdict(point) for point in config.map_points],
+        dataclasses.asdict(config.base_boundary_point) if config.base_boundary_point else None,
+    )
+
+
+class TestTC_MAP_008_XML流式解析测试:
+    """TC-MAP-008: XML流式解析测试"""
+
+    @pytest.fixture
+    def xml_parser(self):
+        """XML解析器服务"""
+        return XMLParserService()
+
+    def test_streaming_matches_tree_parse(self, xml_parser, sample_xml_file):
+        """流式解析结果与整体解析完全一致"""
+        tree_config = xml_parser.parse_xml(sample_xml_file, "reference")
+        stream_config = xml_parser.parse_xml(sample_xml_file, "reference", streaming=True)
+
+        print(f"==liuq debug== 整体解析 {len(tree_config.map_points)} 个Map点，流式解析 {len(stream_config.map_points)} 个Map点")
+        assert _normalize(tree_config) == _normalize(stream_config)
+
+    def test_streaming_pairing_rules(self, xml_parser, sample_xml_file):
+        """禁用Map被跳过，编号断档后停止，base_boundary0单独解析"""
+        config = xml_parser.parse_xml_streaming(sample_xml_file)
+
+        aliases = [point.alias_name for point in config.map_points]
+        assert aliases == ['1_Indoor_Map', '3_Outdoor_Map']
+        assert config.base_boundary_point is not None
+        assert config.base_boundary_point.alias_name == 'Base Boundary'
+        assert config.base_boundary.rpg == pytest.approx(0.52)
+        assert config.base_boundary.bpg == pytest.approx(0.48)
+
+        polygon_point = config.map_points[0]
+        assert polygon_point.is_polygon
+        assert polygon_point.polygon_vertices == [(0.6, 0.4), (0.7, 0.45), (0.65, 0.5)]
+        assert polygon_point.extra_attributes['ml'] == 65471
+        assert config.metadata['version'] == '2.0'
+        assert config.metadata['root_tag'] == 'awb_scenario'
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-009: XML解析缓存测试
+==liuq debug== 验证MapConfiguration磁盘缓存的命中、失效与LRU淘汰
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.1.0
+描述: 验证XMLParseCacheService按文件指纹命中、文件修改与字段定义变化后失效、超出大小上限时淘汰；
+      默认缓存目录与工作目录无关，可由环境变量覆盖
+"""
+
+import os
+import logging
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from core.services.map_analysis.xml_parse_cache_service import (
+    CACHE_DIR_ENV, DEFAULT_CACHE_DIR, XMLParseCacheService, get_default_cache_dir, get_xml_parse_cache_service
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _build_xml(alias: str, weight: float) -> str:
+    """生成包含base_boundary0与一个offset_map01的最小XML"""
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<awb_scenario>
+  <detect_map>
+    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>
+    <offset_map01>
+      <offset><x type="double">0.61</x><y type="double">0.42</y></offset>
+      <weight type="double">{weight}</weight>
+    </offset_map01>
+  </detect_map>
+  <map_info>
+    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>
+    <offset_map01><AliasName type="string">{alias}</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map01>
+  </map_info>
+</awb_scenario>
+"""
+
+
+@pytest.fixture
+def cache(tmp_path) -> XMLParseCacheService:
+    """使用临时目录的缓存服务"""
+    service = XMLParseCacheService(cache_dir=tmp_path / "cache")
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def xml_parser(cache) -> XMLParserService:
+    """使用临时缓存的XML解析器"""
+    parser = XMLParserService()
+    parser.parse_cache = cache
+    return parser
+
+
+class TestTC_MAP_009_XML解析缓存测试:
+    """TC-MAP-009: XML解析缓存测试"""
+
+    def test_warm_open_skips_parsing(self, xml_parser, cache, tmp_path, monkeypatch):
+        """二次打开同一文件时直接返回缓存结果，不再解析XML"""
+        xml_file = tmp_path / "awb.xml"
+        xml_file.write_text(_build_xml("1_Indoor_Map", 0.8), encoding='utf-8')
+
+        cold = xml_parser.parse_xml(xml_file, "reference")
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("缓存命中时不应解析XML")
+        monkeypatch.setattr(xml_parser, "_parse_xml_tree", _fail)
+
+        warm = xml_parser.parse_xml(xml_file, "debug")
+        print(f"==liuq debug== 缓存统计: {cache.stats}")
+
+        assert cache.stats['hits'] == 1
+        assert warm is not cold
+        assert warm.device_type == "debug"
+        assert [p.alias_name for p in warm.map_points] == [p.alias_name for p in cold.map_points]
+        assert warm.map_points[0].weight == pytest.approx(0.8)
+
+    def test_modified_file_invalidates_entry(self, xml_parser, cache, tmp_path):
+        """文件内容变化后重新解析（即使mtime与大小不变）"""
+        xml_file = tmp_path / "awb.xml"
+        xml_file.write_text(_build_xml("1_Indoor_Map", 0.8), encoding='utf-8')
+        stat = xml_file.stat()
+        xml_parser.parse_xml(xml_file)
+
+        xml_file.write_text(_build_xml("1_Indoor_Map", 0.9), encoding='utf-8')
+        os.utime(xml_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        config = xml_parser.parse_xml(xml_file)
+        assert cache.stats['hits'] == 0
+        assert config.map_points[0].weight == pytest.approx(0.9)
+
+    def test_field_registry_change_invalidates_entry(self, xml_parser, cache, tmp_path, monkeypatch):
+        """字段定义变化后旧条目失效"""
+        from core.services.shared.field_registry_service import field_registry
+
+        xml_file = tmp_path / "awb.xml"
+        xml_file.write_text(_build_xml("1_Indoor_Map", 0.8), encoding='utf-8')
+        xml_parser.parse_xml(xml_file)
+
+        extra_field = SimpleNamespace(field_id="extra_gain", field_type=SimpleNamespace(value="float"),
+                                      xml_path=".//extra_gain", default_value=0.0)
+        original_fields = field_registry.get_all_fields()
+        monkeypatch.setattr(field_registry, "get_all_fields", lambda: original_fields + [extra_field])
+        cache._on_field_registry_changed("extra_gain", "registered")
+
+        xml_parser.parse_xml(xml_file)
+        assert cache.stats['hits'] == 0
+        assert cache.stats['stores'] == 2
+
+    def test_lru_eviction_bounds_cache_size(self, xml_parser, cache, tmp_path):
+        """总大小超过上限时淘汰最久未访问的条目"""
+        files = []
+        for i in range(3):
+            xml_file = tmp_path / f"awb_{i}.xml"
+            xml_file.write_text(_build_xml(f"{i}_Map", 0.5), encoding='utf-8')
+            files.append(xml_file)
+
+        xml_parser.parse_xml(files[0])
+        entry_size = cache.get_cache_size()
+        cache.max_bytes = entry_size * 2 + entry_size // 2
+
+        xml_parser.parse_xml(files[1])
+        # 访问files[0]，使files[1]成为最久未访问条目
+        past = 1_000_000_000
+        os.utime(cache._entry_path(str(files[1].resolve())), ns=(past, past))
+        xml_parser.parse_xml(files[0])
+        xml_parser.parse_xml(files[2])
+
+        assert cache.stats['evictions'] == 1
+        assert cache.get_cache_size() <= cache.max_bytes
+        assert not cache._entry_path(str(files[1].resolve())).exists()
+        assert cache._entry_path(str(files[0].resolve())).exists()
+
+    def test_default_cache_dir_independent_of_cwd(self, tmp_path, monkeypatch):
+        """默认缓存目录位于项目根目录下，环境变量可覆盖"""
+        project_root = Path(__file__).resolve().parents[2]
+        assert DEFAULT_CACHE_DIR == project_root / "data" / "cache" / "xml_parse"
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv(CACHE_DIR_ENV)
+        assert get_default_cache_dir() == DEFAULT_CACHE_DIR
+        monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "elsewhere"))
+        assert get_default_cache_dir() == tmp_path / "elsewhere"
+
+    def test_global_cache_isolated_in_tests(self, xml_parse_cache, tmp_path):
+        """测试中的全局缓存位于临时目录，parse_xml默认使用它"""
+        assert get_xml_parse_cache_service() is xml_parse_cache
+        assert xml_parse_cache.cache_dir != DEFAULT_CACHE_DIR
+        xml_file = tmp_path / "awb_global.xml"
+        xml_file.write_text(_build_xml("1_Indoor_Map", 0.8), encoding='utf-8')
+        XMLParserService().parse_xml(xml_file)
+        XMLParserService().parse_xml(xml_file)
+        assert xml_parse_cache.stats['stores'] == 1 and xml_parse_cache.stats['hits'] == 1
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-010: XML共享文档测试
+==liuq debug== 验证加载-验证-元数据-解析流程共享同一ParsedXMLDocument
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.2.0
+描述: 验证各服务接受ParsedXMLDocument后结果与按路径调用一致，且整个流程只解析一次XML；
+      缓存条目附带验证结果与元数据时，再次加载先按指纹查询缓存，命中时不加载文档；
+      没有psutil时仍能在类Unix平台读取进程内存
+"""
+
+import logging
+import dataclasses
+import pytest
+import xml.etree.ElementTree as ET
+
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from core.services.map_analysis.xml_validation_service import XMLValidationService
+from core.services.map_analysis.xml_metadata_service import XMLMetadataService
+from core.services.map_analysis import xml_document
+from core.services.map_analysis.xml_backend import get_xml_backend
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_XML = """<?xml version="1.0" encoding="utf-8"?>
+<awb_scenario>
+  <version>2.0</version>
+  <detect_map>
+    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>
+    <offset_map01>
+      <offset><x type="double">0.61</x><y type="double">0.42</y></offset>
+      <weight type="double">0.8</weight>
+    </offset_map01>
+  </detect_map>
+  <map_info>
+    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>
+    <offset_map01><AliasName type="string">1_Indoor_Map</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map01>
+  </map_info>
+</awb_scenario>
+"""
+
+
+@pytest.fixture
+def xml_file(tmp_path):
+    """示例XML文件"""
+    path = tmp_path / "awb_shared.xml"
+    path.write_text(SAMPLE_XML, encoding='utf-8')
+    return path
+
+
+class TestTC_MAP_010_XML共享文档测试:
+    """TC-MAP-010: XML共享文档测试"""
+
+    def test_load_flow_parses_once(self, xml_file, monkeypatch):
+        """加载-验证-元数据-解析整个流程只解析一次XML"""
+        parser = XMLParserService()
+        validator = XMLValidationService()
+        metadata_service = XMLMetadataService()
+
+        backend = get_xml_backend()
+        parse_calls = []
+        original_parse = backend.parse_bytes
+
+        def counting_parse(raw_bytes):
+            parse_calls.append(len(raw_bytes))
+            return original_parse(raw_bytes)
+
+        monkeypatch.setattr(backend, "parse_bytes", counting_parse)
+        monkeypatch.setattr(ET, "parse", None)
+
+        document = parser.load_document(xml_file)
+        validation = validator.validate_xml_file(xml_file, document=document)
+        metadata = metadata_service.extract_complete_metadata(xml_file, document=document)
+        config = parser.parse_xml(xml_file, document=document)
+
+        print(f"==liuq debug== XML解析次数: {len(parse_calls)}")
+        assert len(parse_calls) == 1
+        assert validation.metadata['root_tag'] == 'awb_scenario'
+        assert metadata['content_info']['xml_version'] == '2.0'
+        assert [p.alias_name for p in config.map_points] == ['1_Indoor_Map']
+
+    def test_document_results_match_path_results(self, xml_file):
+        """传入文档与按路径调用的结果一致"""
+        parser = XMLParserService()
+        metadata_service = XMLMetadataService()
+        document = parser.load_document(xml_file)
+
+        assert parser.get_xml_metadata(xml_file, document=document) == parser.get_xml_metadata(xml_file)
+        assert (metadata_service.extract_xml_structure_metadata(xml_file, document)
+                == metadata_service.extract_xml_structure_metadata(xml_file))
+
+        from_document = parser.parse_xml(xml_file, document=document)
+        from_path = parser.parse_xml(xml_file)
+        assert ([dataclasses.asdict(p) for p in from_document.map_points]
+                == [dataclasses.asdict(p) for p in from_path.map_points])
+        assert from_document.base_boundary == from_path.base_boundary
+
+    def test_warm_load_skips_document(self, xml_file, xml_parse_cache, monkeypatch):
+        """首次加载把验证结果与元数据随缓存保存，再次加载按指纹命中且不解析XML"""
+        parser = XMLParserService()
+        validator = XMLValidationService()
+        metadata_service = XMLMetadataService()
+
+        # 未附带数据的条目（如编辑服务加载时写入）在加载流程中补充附带数据
+        parser.parse_xml(xml_file)
+        assert parser.get_cached(xml_file)[1] == {}
+
+        document = parser.load_document(xml_file)
+        validation = validator.validate_xml_file(xml_file, document=document)
+        metadata = metadata_service.extract_complete_metadata(xml_file, document=document)
+        parser.parse_xml(xml_file, document=document,
+                         cache_extras={'validation': validation, 'metadata': metadata})
+
+        parse_calls = []
+        monkeypatch.setattr(get_xml_backend(), "parse_bytes", lambda raw_bytes: parse_calls.append(raw_bytes))
+        monkeypatch.setattr(ET, "parse", None)
+
+        config, extras = parser.get_cached(xml_file, "reference")
+        assert parse_calls == []
+        assert extras['validation'] == validation
+        assert extras['metadata']['content_info'] == metadata['content_info']
+        assert config.device_type == "reference"
+        assert [p.alias_name for p in config.map_points] == ['1_Indoor_Map']
+
+        xml_file.write_text(SAMPLE_XML.replace('1_Indoor_Map', '2_Outdoor_Map'), encoding='utf-8')
+        assert parser.get_cached(xml_file) is None
+
+    @pytest.mark.parametrize('statm', [True, False])
+    def test_process_rss_without_psutil(self, monkeypatch, statm):
+        """psutil不可用时依次使用/proc/self/statm与resource.getrusage"""
+        monkeypatch.setattr(xml_document, '_PROCESS', None)
+        if not statm:
+            monkeypatch.setattr(xml_document, '_STATM_PATH', '/nonexistent/statm')
+        rss = xml_document.get_process_rss()
+        print(f"==liuq debug== 进程内存: {rss}")
+        if xml_document.resource is None:
+            assert rss is None
+        else:
+            assert isinstance(rss, int) and rss > 0
+
+        monkeypatch.setattr(xml_document, 'resource', None)
+        monkeypatch.setattr(xml_document, '_STATM_PATH', '/nonexistent/statm')
+        assert xml_document.get_process_rss() is None
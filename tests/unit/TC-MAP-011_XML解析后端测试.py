@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-011: XML解析后端测试
+==liuq debug== 验证lxml与ElementTree两种解析后端输出一致
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.0.0
+描述: 验证两种后端解析得到相同的MapConfiguration，且格式错误统一抛出XMLParseError
+"""
+
+import logging
+import dataclasses
+import pytest
+
+from core.interfaces.xml_data_processor import XMLParseError
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from core.services.map_analysis.xml_backend import set_xml_backend, is_lxml_available
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_XML = """<?xml version="1.0" encoding="utf-8"?>
+<awb_scenario>
+  <!-- 注释节点不应影响解析结果 -->
+  <version>2.0</version>
+  <detect_map>
+    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>
+    <offset_map01>
+      <offset><x type="double">0.61</x><y type="double">0.42</y></offset>
+      <weight type="double">0.8</weight>
+      <range>
+        <bv><min type="double">100</min><max type="double">9000</max></bv>
+        <ctemp><min type="uint">2000</min><max type="uint">8000</max></ctemp>
+        <ml type="int">65471</ml>
+        <DetectMapFlag type="uint">1</DetectMapFlag>
+      </range>
+    </offset_map01>
+  </detect_map>
+  <map_info>
+    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>
+    <offset_map01><AliasName type="string">1_Indoor_Map</AliasName><RpG type="double">0.6 0.7 0.65</RpG><BpG type="double">0.4 0.45 0.5</BpG></offset_map01>
+  </map_info>
+</awb_scenario>
+"""
+
+
+@pytest.fixture
+def restore_backend():
+    """测试结束后恢复自动选择的后端"""
+    yield
+    set_xml_backend(None)
+
+
+def _parse_with_backend(backend_name, xml_file, streaming=False):
+    set_xml_backend(backend_name)
+    config = XMLParserService().parse_xml(xml_file, "reference", streaming=streaming)
+    metadata = dict(config.metadata)
+    metadata.pop('parse_time', None)
+    return (config.base_boundary, metadata,
+            [dataclasses.asdict(p) for p in config.map_points],
+            dataclasses.asdict(config.base_boundary_point))
+
+
+class TestTC_MAP_011_XML解析后端测试:
+    """TC-MAP-011: XML解析后端测试"""
+
+    @pytest.mark.skipif(not is_lxml_available(), reason="lxml未安装")
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_backends_produce_identical_configuration(self, tmp_path, restore_backend, streaming):
+        """lxml与ElementTree解析结果完全一致"""
+        xml_file = tmp_path / "awb_backend.xml"
+        xml_file.write_text(SAMPLE_XML, encoding='utf-8')
+
+        etree_result = _parse_with_backend("elementtree", xml_file, streaming)
+        lxml_result = _parse_with_backend("lxml", xml_file, streaming)
+
+        print(f"==liuq debug== 后端对比: {len(etree_result[2])} 个Map点")
+        assert etree_result == lxml_result
+
+    @pytest.mark.parametrize("backend_name", ["elementtree", "lxml"])
+    def test_malformed_xml_raises_parse_error(self, tmp_path, restore_backend, backend_name):
+        """格式错误的XML在任一后端下均抛出XMLParseError"""
+        if backend_name == "lxml" and not is_lxml_available():
+            pytest.skip("lxml未安装")
+        xml_file = tmp_path / "broken.xml"
+        xml_file.write_text("<awb_scenario><offset_map01></awb_scenario>", encoding='utf-8')
+
+        set_xml_backend(backend_name)
+        with pytest.raises(XMLParseError):
+            XMLParserService().parse_xml(xml_file)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-012: XML字段提取计划测试
+==liuq debug== 验证预编译字段提取计划与逐字段查找结果一致且仅在字段定义变化时重建
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.0.0
+描述: 验证一次遍历提取的range字段、注册表字段与逐字段find结果一致，以及提取计划的缓存与重建
+"""
+
+import logging
+import pytest
+import xml.etree.ElementTree as ET
+
+from core.models.map_data import (
+    XML_FIELD_CONFIG, XMLFieldConfig, XMLFieldNodeType, XMLFieldDataType
+)
+from core.services.shared.field_registry_service import field_registry
+from core.services.map_analysis.xml_data_conversion_service import XMLDataConversionService
+from core.services.map_analysis.xml_field_extraction_plan import (
+    get_field_extraction_plan, invalidate_field_extraction_plan
+)
+
+logger = logging.getLogger(__name__)
+
+RANGE_XML = """<range>
+  <bv><min type="double">100</min><max type="double">bad</max></bv>
+  <bv><min type="double">999</min></bv>
+  <ctemp><min type="uint">2000.0</min><max type="uint"></max></ctemp>
+  <ml type="int">65471</ml>
+  <e_ratio><min type="double">0.2</min><max type="double">oops</max></e_ratio>
+  <DetectMapFlag type="uint"> Yes </DetectMapFlag>
+</range>"""
+
+MAP_XML = """<offset_map01>
+  <offset><x type="double">0.61</x><y type="double">0.42</y><weight type="double">0.8</weight></offset>
+  <range><bv><min type="double">100</min><max type="double">9000</max></bv><ml type="int">3</ml></range>
+  <AliasName type="string"> 1_Indoor_Map </AliasName>
+</offset_map01>"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_plan():
+    """每个用例使用重新编译的提取计划"""
+    invalidate_field_extraction_plan()
+    yield
+    invalidate_field_extraction_plan()
+
+
+class TestTC_MAP_012_XML字段提取计划测试:
+    """TC-MAP-012: XML字段提取计划测试"""
+
+    def test_range_fields_match_per_field_lookup(self):
+        """一次遍历结果与逐字段查找一致（重复节点取第一个、空文本与非法值取默认）"""
+        range_node = ET.fromstring(RANGE_XML)
+        values, raw_texts = get_field_extraction_plan().extract_range_fields(range_node)
+
+        service = XMLDataConversionService()
+        for field_name, config in XML_FIELD_CONFIG.items():
+            if config.node_type != XMLFieldNodeType.RANGE or field_name.startswith('e_ratio'):
+                continue
+            assert values[field_name] == service.extract_single_field_value(range_node, config), field_name
+
+        print(f"==liuq debug== 提取range字段数: {len(values)}")
+        assert values['bv_min'] == 100.0
+        assert values['bv_max'] == XML_FIELD_CONFIG['bv_max'].default_value
+        assert values['ctemp_min'] == 2000
+        assert values['e_ratio_min'] == 0.2
+        assert values['e_ratio_max'] == 0.0
+        assert raw_texts['DetectMapFlag'] == ' Yes '
+
+        params = service.extract_detailed_parameters(ET.fromstring(f"<n>{RANGE_XML}</n>"))
+        assert params['ml'] == 65471
+        assert params['detect_map_flag'] is True
+
+    def test_registry_fields_match_find(self):
+        """注册表字段一次深度遍历结果与逐字段find一致"""
+        map_elem = ET.fromstring(MAP_XML)
+        data = get_field_extraction_plan().extract_registry_fields(map_elem)
+
+        for field_def in field_registry.get_all_fields():
+            elem = map_elem.find(field_def.xml_path)
+            expected = (field_def.convert_value(elem.text.strip())
+                        if elem is not None and elem.text is not None else field_def.default_value)
+            assert data[field_def.field_id] == expected, field_def.field_id
+        assert data['alias_name'] == '1_Indoor_Map'
+
+    def test_plan_cached_and_rebuilt_on_field_change(self, monkeypatch):
+        """提取计划被缓存，仅在字段定义变化时重建"""
+        plan = get_field_extraction_plan()
+        assert get_field_extraction_plan() is plan
+
+        # 可见性变化不影响提取
+        field_registry._trigger_change_callbacks('bv_min', 'visibility_changed')
+        assert get_field_extraction_plan() is plan
+
+        field_registry._trigger_change_callbacks('bv_min', 'registered')
+        rebuilt = get_field_extraction_plan()
+        assert rebuilt is not plan
+
+        # 直接向XML_FIELD_CONFIG增加字段同样触发重建，新字段随即可被提取
+        monkeypatch.setitem(XML_FIELD_CONFIG, 'gain_min', XMLFieldConfig(
+            field_name='gain_min', xml_path=('gain', 'min'),
+            node_type=XMLFieldNodeType.RANGE, data_type=XMLFieldDataType.DOUBLE, default_value=1.0))
+        extended = get_field_extraction_plan()
+        assert extended is not rebuilt
+
+        values, _ = extended.extract_range_fields(ET.fromstring("<range><gain><min>2.5</min></gain></range>"))
+        print(f"==liuq debug== 新增字段提取值: {values['gain_min']}")
+        assert values['gain_min'] == 2.5
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-013: XML批量并行解析测试
+==liuq debug== 验证parse_many进程池批量解析的错误隔离、进度回调与取消
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.1.0
+描述: 验证parse_many按输入顺序返回每个文件的MapConfiguration或异常，结果与逐个parse_xml一致；
+      进程池解析中途取消时尚未开始的文件被取消（不依赖Python 3.9的cancel_futures）
+"""
+
+import logging
+import pickle
+import dataclasses
+import pytest
+
+from core.interfaces.xml_data_processor import XMLParseError
+from core.services.map_analysis.xml_parser_service import XMLParserService
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_XML = """<?xml version="1.0" encoding="utf-8"?>
+<awb_scenario>
+  <version>2.0</version>
+  <detect_map>
+    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>
+    <offset_map01>
+      <offset><x type="double">{x}</x><y type="double">0.42</y></offset>
+      <weight type="double">0.8</weight>
+    </offset_map01>
+  </detect_map>
+  <map_info>
+    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>
+    <offset_map01><AliasName type="string">Map_{x}</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map01>
+  </map_info>
+</awb_scenario>
+"""
+
+
+@pytest.fixture
+def device_files(tmp_path):
+    """两个有效文件、一个格式错误文件、一个不存在的文件"""
+    paths = []
+    for x in ('0.61', '0.73'):
+        path = tmp_path / f"device_{x}.xml"
+        path.write_text(SAMPLE_XML.format(x=x), encoding='utf-8')
+        paths.append(path)
+    broken = tmp_path / "broken.xml"
+    broken.write_text("<awb_scenario><offset_map01>", encoding='utf-8')
+    paths.append(broken)
+    paths.append(tmp_path / "missing.xml")
+    return paths
+
+
+class TestTC_MAP_013_XML批量并行解析测试:
+    """TC-MAP-013: XML批量并行解析测试"""
+
+    def test_parse_many_isolates_errors(self, device_files):
+        """进程池解析：结果按输入顺序返回，单个文件失败不影响其他文件"""
+        parser = XMLParserService()
+        progress = []
+
+        results = parser.parse_many(device_files, max_workers=2,
+                                    progress_callback=lambda done, total, path: progress.append((done, total)))
+
+        print(f"==liuq debug== 批量解析结果: {[type(v).__name__ for v in results.values()]}")
+        assert list(results) == device_files
+        for path in device_files[:2]:
+            expected = parser.parse_xml(path)
+            assert ([dataclasses.asdict(p) for p in results[path].map_points]
+                    == [dataclasses.asdict(p) for p in expected.map_points])
+        assert isinstance(results[device_files[2]], XMLParseError)
+        assert isinstance(results[device_files[3]], FileNotFoundError)
+        assert progress[-1] == (4, 4)
+
+    def test_parse_many_cancel(self, device_files):
+        """取消后未完成的文件标记为XMLParseError"""
+        parser = XMLParserService()
+        results = parser.parse_many(device_files[:2], max_workers=1,
+                                    cancel_check=lambda: True)
+        assert all(isinstance(v, XMLParseError) for v in results.values())
+
+    def test_parse_many_cancel_in_pool(self, tmp_path):
+        """进程池解析中途取消：已完成的文件保留结果，其余文件标记为已取消"""
+        paths = []
+        for i in range(8):
+            path = tmp_path / f"device_{i}.xml"
+            path.write_text(SAMPLE_XML.format(x=f"0.{i + 1}"), encoding='utf-8')
+            paths.append(path)
+        progress = []
+        results = XMLParserService().parse_many(paths, max_workers=2,
+                                                progress_callback=lambda done, total, path: progress.append(done),
+                                                cancel_check=lambda: bool(progress))
+        assert list(results) == paths
+        parsed = [v for v in results.values() if not isinstance(v, Exception)]
+        cancelled = [v for v in results.values() if isinstance(v, XMLParseError)]
+        assert len(parsed) == len(progress) >= 1
+        assert len(cancelled) == len(paths) - len(parsed) > 0
+        assert all(str(v) == "批量解析已取消" for v in cancelled)
+
+    def test_parse_error_picklable(self):
+        """XMLParseError跨进程传递后保留行列号"""
+        error = pickle.loads(pickle.dumps(XMLParseError("XML格式错误", 3, 7)))
+        assert (str(error), error.line_number, error.column_number) == ("XML格式错误", 3, 7)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-014: XML节点区间索引测试
+==liuq debug== 验证节点区间索引与逐个扫描定位结果一致且一次保存只构建一次
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.0.0
+描述: 验证XMLNodeSpanIndex的双节点配对、末尾单节点兼容、重复别名取第一个等规则与原扫描实现一致
+"""
+
+import logging
+
+from core.services.map_analysis.xml_writer_core import XMLWriterCore
+from core.services.map_analysis.xml_node_span_index import XMLNodeSpanIndex
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_CONTENT = """<awb_scenario>
+  <detect_map>
+    <offset_map01><offset><x type="double">0.61</x><y type="double">0.42</y></offset></offset_map01>
+    <offset_map02><offset><x type="double">0.30</x><y type="double">0.20</y></offset></offset_map02>
+    <offset_map03><offset><x type="double">0.11</x><y type="double">0.12</y></offset></offset_map03>
+    <offset_map03><offset><x type="double">0.13</x><y type="double">0.14</y></offset></offset_map03>
+  </detect_map>
+  <map_info>
+    <offset_map01><AliasName type="string"> Indoor </AliasName></offset_map01>
+    <offset_map02><AliasName type="string">Outdoor</AliasName></offset_map02>
+    <offset_map03><AliasName type="string">Dup</AliasName></offset_map03>
+    <offset_map03><AliasName type="string">Dup</AliasName></offset_map03>
+    <offset_map04><AliasName type="string">Tail</AliasName></offset_map04>
+  </map_info>
+</awb_scenario>"""
+
+CASES = [
+    ('offset_map01', 'Indoor'),
+    ('offset_map02', 'Outdoor'),
+    ('offset_map03', 'Dup'),
+    ('offset_map04', 'Tail'),
+    ('offset_map02', 'Indoor'),
+    ('offset_map09', 'Indoor'),
+]
+
+
+class TestTC_MAP_014_XML节点区间索引测试:
+    """TC-MAP-014: XML节点区间索引测试"""
+
+    def test_index_matches_scan(self):
+        """索引定位结果与逐个扫描一致"""
+        core = XMLWriterCore()
+        for node_name, alias_name in CASES:
+            indexed = core._find_exact_node_by_alias(SAMPLE_CONTENT, node_name, alias_name)
+            scanned = core._scan_exact_node_by_alias(SAMPLE_CONTENT, node_name, alias_name)
+            print(f"==liuq debug== {node_name}/{alias_name}: {indexed}")
+            assert indexed == scanned
+
+        start, end = core._find_exact_node_by_alias(SAMPLE_CONTENT, 'offset_map01', 'Indoor')
+        assert SAMPLE_CONTENT[start:end].startswith('<offset_map01><offset>')
+
+    def test_index_built_once_per_content(self, monkeypatch):
+        """同一文本只构建一次索引，文本变化后重建"""
+        builds = []
+        original_build = XMLNodeSpanIndex.build.__func__
+
+        def counting_build(cls, content):
+            builds.append(len(content))
+            return original_build(cls, content)
+
+        monkeypatch.setattr(XMLNodeSpanIndex, 'build', classmethod(counting_build))
+
+        core = XMLWriterCore()
+        for node_name, alias_name in CASES:
+            core._find_exact_node_by_alias(SAMPLE_CONTENT, node_name, alias_name)
+            core.get_current_offset_values(SAMPLE_CONTENT, node_name, alias_name)
+        assert len(builds) == 1
+        assert core.get_current_offset_values(SAMPLE_CONTENT, 'offset_map02', 'Outdoor') == ('0.30', '0.20')
+
+        changed = SAMPLE_CONTENT.replace('0.30', '0.35')
+        assert core.get_current_offset_values(changed, 'offset_map02', 'Outdoor') == ('0.35', '0.20')
+        assert len(builds) == 2
+
+        core.release_node_span_index()
+        assert core._span_index is None
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-015: XML分片输出构建测试
+==liuq debug== 验证批量替换按节点区间分片组装输出
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.0.0
+描述: 验证同一节点内多次替换（前一次改变节点长度）全部生效，未修改文本原样保留，分片可直接原子写入
+"""
+
+import logging
+
+from core.services.map_analysis.xml_performance_service import XMLPerformanceService
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_CONTENT = """<awb_scenario>
+  <base_boundary0><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>
+  <offset_map01><offset><x type="double">0.6</x><y type="double">0.4</y></offset><range><bv><min type="double">100</min></bv><ml type="int">3</ml></range></offset_map01>
+  <offset_map02><offset><x type="double">0.3</x><y type="double">0.2</y></offset><range><ml type="int">1</ml></range></offset_map02>
+</awb_scenario>"""
+
+
+def _span(content, tag):
+    start = content.find(f'<{tag}>')
+    return start, content.find(f'</{tag}>', start) + len(f'</{tag}>')
+
+
+def _replacement(content, tag, field_type, value):
+    start, end = _span(content, tag)
+    return {'field_type': field_type, 'replacement': value, '_node_start': start, '_node_end': end}
+
+
+class TestTC_MAP_015_XML分片输出构建测试:
+    """TC-MAP-015: XML分片输出构建测试"""
+
+    def test_all_replacements_applied(self):
+        """同一节点内前一次替换加长内容后，靠后的字段仍被替换"""
+        service = XMLPerformanceService()
+        replacements = [
+            _replacement(SAMPLE_CONTENT, 'offset_map02', 'offset_x', '0.35'),
+            _replacement(SAMPLE_CONTENT, 'offset_map01', 'offset_x', '0.612345678'),
+            _replacement(SAMPLE_CONTENT, 'offset_map01', 'bv_min', '1234.5678'),
+            _replacement(SAMPLE_CONTENT, 'offset_map01', 'ml', '65471'),
+            _replacement(SAMPLE_CONTENT, 'base_boundary0', 'boundary_rpg', '0.5'),
+        ]
+
+        chunks = service.build_output_chunks(SAMPLE_CONTENT, replacements)
+        result = ''.join(chunks)
+        print(f"==liuq debug== 输出分片数: {len(chunks)}")
+
+        expected = (SAMPLE_CONTENT
+                    .replace('<x type="double">0.3</x>', '<x type="double">0.35</x>')
+                    .replace('<x type="double">0.6</x>', '<x type="double">0.612345678</x>')
+                    .replace('<min type="double">100</min>', '<min type="double">1234.5678</min>')
+                    .replace('<ml type="int">3</ml>', '<ml type="int">65471</ml>')
+                    .replace('<RpG type="double">0.52</RpG>', '<RpG type="double">0.5</RpG>'))
+        assert result == expected
+        assert service.execute_optimized_replacements(SAMPLE_CONTENT, replacements) == expected
+        assert len(chunks) == 7
+
+    def test_no_replacements_keeps_content(self):
+        """没有替换时输出与原文一致"""
+        service = XMLPerformanceService()
+        assert service.execute_optimized_replacements(SAMPLE_CONTENT, []) == SAMPLE_CONTENT
+
+    def test_atomic_write_chunks(self, tmp_path):
+        """分片列表直接写入临时文件后原子替换"""
+        service = XMLPerformanceService()
+        xml_path = tmp_path / "awb.xml"
+        xml_path.write_text("old", encoding='utf-8')
+
+        service.atomic_write_file(xml_path, ['<a>', '中文', '</a>'])
+        assert xml_path.read_text(encoding='utf-8') == '<a>中文</a>'
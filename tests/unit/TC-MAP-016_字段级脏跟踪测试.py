@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-016: 字段级脏跟踪测试
+==liuq debug== 验证MapPoint/MapConfiguration脏字段跟踪及只写回修改字段的保存规划
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.1.0
+描述: 验证解析后无脏字段、属性赋值与set_map_point_field_value记录脏字段（设置失败时不记录），
+      只规划脏字段的结果与全量规划一致
+"""
+
+import logging
+import pytest
+import xml.etree.ElementTree as ET
+
+from core.models.map_data import set_map_point_field_value
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from core.services.map_analysis.xml_performance_service import XMLPerformanceService
+
+logger = logging.getLogger(__name__)
+
+MAP_TEMPLATE = """    <offset_map{n:02d}>
+      <offset><x type="double">0.{n:02d}</x><y type="double">0.42</y></offset>
+      <weight type="double">0.8</weight>
+      <range>
+        <bv><min type="double">100</min><max type="double">9000</max></bv>
+        <ml type="int">3</ml>
+      </range>
+    </offset_map{n:02d}>
+"""
+INFO_TEMPLATE = """    <offset_map{n:02d}><AliasName type="string">Map_{n:02d}</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map{n:02d}>
+"""
+
+
+@pytest.fixture
+def xml_file(tmp_path):
+    """包含5个Map的示例XML文件"""
+    maps = ''.join(MAP_TEMPLATE.format(n=n) for n in range(1, 6))
+    infos = ''.join(INFO_TEMPLATE.format(n=n) for n in range(1, 6))
+    content = ('<?xml version="1.0" encoding="utf-8"?>\n<awb_scenario>\n  <detect_map>\n'
+               '    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>\n'
+               f'{maps}  </detect_map>\n  <map_info>\n'
+               '    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>\n'
+               f'{infos}  </map_info>\n</awb_scenario>\n')
+    path = tmp_path / "awb_dirty.xml"
+    path.write_text(content, encoding='utf-8')
+    return path
+
+
+class TestTC_MAP_016_字段级脏跟踪测试:
+    """TC-MAP-016: 字段级脏跟踪测试"""
+
+    def test_dirty_tracking(self, xml_file):
+        """解析结果无脏字段，赋值与字段设置函数记录脏字段，保存后清空"""
+        config = XMLParserService().parse_xml(xml_file)
+        assert config.get_dirty_xml_fields() == {}
+
+        config.map_points[1].bv_range = (150.0, config.map_points[1].bv_range[1])
+        config.map_points[2].weight = config.map_points[2].weight  # 值未变化
+        set_map_point_field_value(config.map_points[3], 'ml', '2')
+
+        dirty = config.get_dirty_xml_fields()
+        print(f"==liuq debug== 脏字段: {dirty}")
+        assert dirty == {1: ['bv_min', 'bv_max'], 3: ['ml']}
+
+        config.clear_dirty()
+        assert config.get_dirty_xml_fields() == {}
+
+    def test_failed_set_not_marked_dirty(self, xml_file, monkeypatch):
+        """字段设置失败或抛出异常时不记录脏字段"""
+        config = XMLParserService().parse_xml(xml_file)
+        point = config.map_points[1]
+        assert not set_map_point_field_value(point, 'no_such_field', 1)
+
+        def _raise(map_point, value):
+            raise ValueError("设置失败")
+        monkeypatch.setattr('core.models.map_data.get_field_setter', lambda field_name: _raise)
+        assert not set_map_point_field_value(point, 'ml', '2')
+        assert config.get_dirty_xml_fields() == {}
+
+    def test_dirty_plan_matches_full_plan(self, xml_file):
+        """只规划脏字段的替换结果与全量规划一致"""
+        config = XMLParserService().parse_xml(xml_file)
+        config.map_points[0].offset_x = 0.15
+        config.map_points[4].bv_range = (200.0, 8000.0)
+        set_map_point_field_value(config.map_points[2], 'ml', '2')
+
+        content = xml_file.read_text(encoding='utf-8')
+        tree = ET.parse(xml_file)
+        full_service = XMLPerformanceService()
+        dirty_service = XMLPerformanceService()
+        full = full_service.build_optimized_replacements(config, content, tree)
+        dirty = dirty_service.build_optimized_replacements(config, content, tree, only_dirty=True)
+
+        assert [(r['alias_name'], r['field_type']) for r in dirty] == [(r['alias_name'], r['field_type']) for r in full]
+        assert (dirty_service.execute_optimized_replacements(content, dirty)
+                == full_service.execute_optimized_replacements(content, full))
+
+    def test_untracked_point_falls_back_to_full_check(self, xml_file):
+        """未启用跟踪的Map点（如旧缓存对象）按全量检查"""
+        config = XMLParserService().parse_xml(xml_file)
+        del config.map_points[2].__dict__['_dirty_fields']
+        config.map_points[2].__dict__['weight'] = 0.5
+
+        assert config.get_dirty_xml_fields() == {2: None}
+        replacements = XMLPerformanceService().build_optimized_replacements(
+            config, xml_file.read_text(encoding='utf-8'), ET.parse(xml_file), only_dirty=True)
+        assert [(r['alias_name'], r['field_type']) for r in replacements] == [('Map_03', 'weight')]
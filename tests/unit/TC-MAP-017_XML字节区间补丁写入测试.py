@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-017: XML字节区间补丁写入测试
+==liuq debug== 验证基于mmap的字节区间补丁写入逐字节保留未修改内容
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.0.0
+描述: 验证字节视图下的节点定位、CRLF换行与中文别名原样保留、内核复制不可用时回退分块复制
+"""
+
+import os
+import logging
+import pytest
+import xml.etree.ElementTree as ET
+
+from core.services.map_analysis import xml_byte_patch_writer
+from core.services.map_analysis.xml_byte_patch_writer import (
+    MappedXMLText, open_mapped_xml, write_patched_temp_file
+)
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from core.services.map_analysis.xml_performance_service import XMLPerformanceService
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_XML = ('<?xml version="1.0" encoding="utf-8"?>\r\n<awb_scenario>\r\n  <detect_map>\r\n'
+              '    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>\r\n'
+              '    <offset_map01><offset><x type="double">0.61</x><y type="double">0.42</y></offset>'
+              '<weight type="double">0.8</weight></offset_map01>\r\n'
+              '    <offset_map02><offset><x type="double">0.30</x><y type="double">0.20</y></offset>'
+              '<weight type="double">0.5</weight></offset_map02>\r\n'
+              '  </detect_map>\r\n  <map_info>\r\n'
+              '    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>\r\n'
+              '    <offset_map01><AliasName type="string">室内</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map01>\r\n'
+              '    <offset_map02><AliasName type="string">室外</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map02>\r\n'
+              '  </map_info>\r\n</awb_scenario>\r\n')
+
+
+@pytest.fixture
+def xml_file(tmp_path):
+    """CRLF换行、中文别名的示例XML文件"""
+    path = tmp_path / "awb_bytes.xml"
+    path.write_bytes(SAMPLE_XML.encode('utf-8'))
+    return path
+
+
+class TestTC_MAP_017_XML字节区间补丁写入测试:
+    """TC-MAP-017: XML字节区间补丁写入测试"""
+
+    def test_mapped_text_byte_offsets(self, xml_file):
+        """字节视图按字节偏移查找并解码切片，节点定位与文本定位指向同一节点"""
+        service = XMLPerformanceService()
+        with open_mapped_xml(xml_file) as mapped:
+            start, end = service.core._find_exact_node_by_alias(mapped, 'offset_map02', '室外')
+            raw = SAMPLE_XML.encode('utf-8')
+            assert raw[start:end].decode('utf-8') == mapped[start:end]
+            assert mapped[start:end].startswith('<offset_map02><offset><x type="double">0.30</x>')
+            assert mapped.find('室外') == raw.find('室外'.encode('utf-8'))
+            service.core.release_node_span_index()
+
+    def test_write_preserves_untouched_bytes(self, xml_file):
+        """只修改目标字段，其余字节（含CRLF）原样保留"""
+        config = XMLParserService().parse_xml(xml_file)
+        config.map_points[1].offset_x = 0.35
+
+        ok = XMLPerformanceService().write_xml_optimized(config, xml_file, backup=False,
+                                                         tree=ET.parse(xml_file), only_dirty=True)
+        result = xml_file.read_bytes()
+        print(f"==liuq debug== 写入结果: {ok}, 大小: {len(result)}")
+
+        assert ok
+        assert result == SAMPLE_XML.replace('<x type="double">0.30</x>', '<x type="double">0.35</x>').encode('utf-8')
+        assert [p.name for p in xml_file.parent.iterdir()] == [xml_file.name]
+
+    def test_buffer_copy_fallback(self, xml_file, monkeypatch):
+        """内核复制不可用时回退到从映射分块复制，结果一致"""
+        monkeypatch.delattr(os, 'copy_file_range', raising=False)
+        monkeypatch.delattr(os, 'sendfile', raising=False)
+        monkeypatch.setattr(xml_byte_patch_writer, 'COPY_BLOCK_SIZE', 16)
+
+        patch = '<offset_map01>patched</offset_map01>'
+        with open_mapped_xml(xml_file) as mapped:
+            start = mapped.find('<offset_map01>')
+            end = mapped.find('</offset_map01>', start) + len('</offset_map01>')
+            temp_path = write_patched_temp_file(mapped, [(start, end, patch)], xml_file.parent)
+
+        raw = SAMPLE_XML.encode('utf-8')
+        with open(temp_path, 'rb') as f:
+            assert f.read() == raw[:start] + patch.encode('utf-8') + raw[end:]
+        os.unlink(temp_path)
+
+    def test_bytes_view_without_file(self, tmp_path):
+        """无文件描述符的字节视图也可写入（直接从缓冲区复制）"""
+        mapped = MappedXMLText('<a>中文</a><b>1</b>'.encode('utf-8'))
+        start = mapped.find('<b>')
+        assert mapped[start:len(mapped)] == '<b>1</b>'
+        with pytest.raises(TypeError):
+            mapped[0]
+
+        temp_path = write_patched_temp_file(mapped, [(start, len(mapped), '<b>2</b>')], tmp_path)
+        with open(temp_path, 'rb') as f:
+            assert f.read().decode('utf-8') == '<a>中文</a><b>2</b>'
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-018: XML后台保存队列测试
+==liuq debug== 验证后台保存队列合并连续保存、按顺序写入并通过EventBus通知结果
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.1.0
+描述: 验证写入中提交的多次保存合并为一次、提交时快照不受后续编辑影响、失败发布XML_FILE_SAVE_FAILED、真实文件写入结果正确；
+      only_dirty传给写入服务，写入成功后只清除快照之前修改的Map点的脏字段
+"""
+
+import logging
+import threading
+import pytest
+
+from core.infrastructure.event_bus import EventBus, EventType
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from core.services.map_analysis.xml_save_queue import XMLSaveQueue
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_XML = """<?xml version="1.0" encoding="utf-8"?>
+<awb_scenario>
+  <detect_map>
+    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>
+    <offset_map01><offset><x type="double">0.61</x><y type="double">0.42</y></offset><weight type="double">0.8</weight></offset_map01>
+  </detect_map>
+  <map_info>
+    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>
+    <offset_map01><AliasName type="string">Indoor</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map01>
+  </map_info>
+</awb_scenario>
+"""
+
+
+class _BlockingWriter:
+    """记录写入内容的写入服务，第一次写入阻塞到放行"""
+
+    def __init__(self, fail: bool = False):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.writes = []
+        self.only_dirty = []
+        self.fail = fail
+
+    def write_xml(self, config, xml_path, backup=True, preserve_format=True, only_dirty=False):
+        self.started.set()
+        self.release.wait(5)
+        self.writes.append((xml_path.name, config.map_points[0].weight))
+        self.only_dirty.append(only_dirty)
+        if self.fail:
+            raise OSError("磁盘已满")
+        return True
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "awb_queue.xml"
+    path.write_text(SAMPLE_XML, encoding='utf-8')
+    return XMLParserService().parse_xml(path)
+
+
+def _collect(event_bus, event_type):
+    events = []
+    event_bus.subscribe(event_type, lambda event: events.append(event.data), "TC-MAP-018")
+    return events
+
+
+class TestTC_MAP_018_XML后台保存队列测试:
+    """TC-MAP-018: XML后台保存队列测试"""
+
+    def test_coalesce_and_order(self, config, tmp_path):
+        """写入中提交的多次保存合并为一次，且在当前写入完成后执行"""
+        event_bus = EventBus()
+        saved = _collect(event_bus, EventType.XML_FILE_SAVED)
+        writer = _BlockingWriter()
+        queue = XMLSaveQueue(event_bus=event_bus, writer_factory=lambda: writer)
+        target = tmp_path / "a.xml"
+
+        queue.submit(config, target)
+        assert writer.started.wait(5)
+        for weight in (0.1, 0.2, 0.3):
+            config.map_points[0].weight = weight
+            queue.submit(config, target)
+        config.map_points[0].weight = 0.9  # 提交后的编辑不影响已提交的快照
+        writer.release.set()
+
+        assert queue.flush(timeout=5)
+        print(f"==liuq debug== 写入记录: {writer.writes}, 事件: {saved}")
+        assert writer.writes == [('a.xml', 0.8), ('a.xml', 0.3)]
+        assert [event['coalesced'] for event in saved] == [1, 3]
+        assert queue.pending_count() == 0
+        queue.shutdown()
+
+    def test_failure_event_and_callback(self, config, tmp_path):
+        """写入异常发布XML_FILE_SAVE_FAILED并以False调用完成回调"""
+        event_bus = EventBus()
+        failed = _collect(event_bus, EventType.XML_FILE_SAVE_FAILED)
+        writer = _BlockingWriter(fail=True)
+        writer.release.set()
+        queue = XMLSaveQueue(event_bus=event_bus, writer_factory=lambda: writer)
+        results = []
+
+        queue.submit(config, tmp_path / "b.xml", on_complete=results.append)
+        assert queue.flush(timeout=5)
+        assert results == [False]
+        assert failed[0]['error'] == "磁盘已满"
+
+        queue.shutdown()
+        assert queue.submit(config, tmp_path / "b.xml") is False
+
+    def test_only_dirty_clears_snapshot_edits(self, config, tmp_path):
+        """only_dirty传给写入服务（合并时任一全量即全量）；写入成功后快照之后的修改仍保持为脏"""
+        writer = _BlockingWriter()
+        queue = XMLSaveQueue(event_bus=EventBus(), writer_factory=lambda: writer)
+        target = tmp_path / "c.xml"
+        point = config.map_points[0]
+
+        point.weight = 0.7
+        queue.submit(config, target, only_dirty=True)
+        assert writer.started.wait(5)
+        point.offset_x = 0.65  # 写入中的编辑不在快照中
+        writer.release.set()
+        assert queue.flush(timeout=5)
+        print(f"==liuq debug== 写入后脏字段: {point.get_dirty_fields()}")
+        assert point.get_dirty_fields() == {'weight', 'offset_x'}
+
+        queue.submit(config, target, only_dirty=True)
+        assert queue.flush(timeout=5)
+        assert config.get_dirty_xml_fields() == {}
+
+        writer.release.clear()
+        writer.started.clear()
+        queue.submit(config, target, only_dirty=True)
+        assert writer.started.wait(5)
+        queue.submit(config, target, only_dirty=True)
+        queue.submit(config, target)
+        writer.release.set()
+        assert queue.flush(timeout=5)
+        assert writer.only_dirty == [True, True, True, False]
+        queue.shutdown()
+
+    def test_real_write(self, config, tmp_path):
+        """默认写入服务在后台线程完成真实文件写入"""
+        event_bus = EventBus()
+        saved = _collect(event_bus, EventType.XML_FILE_SAVED)
+        queue = XMLSaveQueue(event_bus=event_bus)
+        xml_path = tmp_path / "awb_queue.xml"
+
+        config.map_points[0].weight = 0.75
+        queue.submit(config, xml_path, backup=False, only_dirty=True)
+        queue.shutdown(wait=True, timeout=30)
+        assert config.get_dirty_xml_fields() == {}
+
+        assert saved and saved[0]['file_path'] == str(xml_path)
+        assert xml_path.read_text(encoding='utf-8') == SAMPLE_XML.replace(
+            '<weight type="double">0.8</weight>', '<weight type="double">0.75</weight>')
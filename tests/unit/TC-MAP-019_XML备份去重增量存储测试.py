@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-019: XML备份去重增量存储测试
+==liuq debug== 验证内容寻址备份存储的去重、增量还原、保留数量与恢复
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.2.0
+描述: 验证相同内容只存一份、增量链与快照间隔下每个版本都能逐字节还原、超出保留数量后回收对象、从备份恢复；
+      多个进程同时向同一目录备份时索引不丢失版本；旧版整文件备份导入索引后参与列表与清理；
+      恢复后保留目标文件原有权限
+"""
+
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from core.services.map_analysis import xml_backup_store
+from core.services.map_analysis.xml_backup_store import apply_line_delta, encode_line_delta
+from core.services.map_analysis.xml_backup_service import XMLBackupService
+
+logger = logging.getLogger(__name__)
+
+MAP_LINE = '    <offset_map{n:02d}><x type="double">0.{n:02d}</x><weight type="double">{w}</weight></offset_map{n:02d}>\r\n'
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+_WORKER_SCRIPT = """
+import sys
+from pathlib import Path
+from core.services.map_analysis.xml_backup_service import XMLBackupService
+xml_path = Path(sys.argv[1])
+service = XMLBackupService()
+for step in range(5):
+    xml_path.write_bytes(('<root>' + sys.argv[2] + str(step) + '</root>\\n').encode('utf-8'))
+    service.backup_xml(xml_path)
+"""
+
+
+def _content(weights):
+    body = ''.join(MAP_LINE.format(n=n, w=w) for n, w in enumerate(weights))
+    return f'<?xml version="1.0" encoding="utf-8"?>\r\n<awb_scenario>\r\n{body}</awb_scenario>\r\n'.encode('utf-8')
+
+
+class TestTC_MAP_019_XML备份去重增量存储测试:
+    """TC-MAP-019: XML备份去重增量存储测试"""
+
+    def test_line_delta_roundtrip(self):
+        """增量编码可精确还原插入、删除、移动与无结尾换行的内容"""
+        base = _content([0.5] * 40).splitlines(True)
+        new = list(base)
+        new[5] = b'changed\r\n'
+        del new[10:12]
+        new.insert(20, b'inserted')
+        new = new + base[3:6]
+        delta = encode_line_delta(base, new)
+        assert b''.join(apply_line_delta(base, delta)) == b''.join(new)
+        assert len(delta) < len(b''.join(new)) // 4
+
+    def test_dedup_delta_and_trim(self, tmp_path, monkeypatch):
+        """相同内容共用对象，每个版本逐字节还原，超过保留数量后回收对象"""
+        monkeypatch.setattr(xml_backup_store, 'KEYFRAME_INTERVAL', 3)
+        service = XMLBackupService()
+        service.max_backup_count = 5
+        xml_path = tmp_path / "awb.xml"
+
+        history = []
+        for step in range(8):
+            weights = [0.5] * 200
+            weights[step % 4] = 0.9 if step % 2 else 0.5
+            xml_path.write_bytes(_content(weights))
+            service.backup_xml(xml_path)
+            history.append(xml_path.read_bytes())
+
+        backups = service.get_backup_list(xml_path)
+        stats = service.get_store(tmp_path / "backups").get_statistics()
+        print(f"==liuq debug== 备份数: {len(backups)}, 存储统计: {stats}")
+
+        assert len(backups) == 5
+        assert stats['object_count'] < 5
+        assert stats['stored_bytes'] < len(history[-1])
+        assert list(tmp_path.joinpath("backups").glob("*.xml")) == []
+        store = service.get_store(tmp_path / "backups")
+        for info, expected in zip(backups, reversed(history)):
+            assert store.read(info['name']) == expected
+
+    def test_restore_and_delete(self, tmp_path):
+        """恢复写回原始字节、保留目标文件权限并先备份目标；删除后索引中不再存在"""
+        service = XMLBackupService()
+        xml_path = tmp_path / "awb.xml"
+        original = _content([0.5, 0.6, 0.7])
+        xml_path.write_bytes(original)
+        backup_path = service.backup_xml(xml_path)
+
+        xml_path.write_bytes(_content([0.1, 0.6, 0.7]))
+        os.chmod(xml_path, 0o640)
+        mode = os.stat(xml_path).st_mode & 0o777
+        assert service.restore_from_backup(backup_path, xml_path)
+        assert xml_path.read_bytes() == original
+        assert os.stat(xml_path).st_mode & 0o777 == mode
+        assert len(service.get_backup_list(xml_path)) == 2
+
+        # 新的服务实例从索引文件加载
+        reloaded = XMLBackupService()
+        assert reloaded.delete_backup(backup_path)
+        assert backup_path not in [b['path'] for b in reloaded.get_backup_list(xml_path)]
+        assert not reloaded.restore_from_backup(backup_path, xml_path)
+        assert reloaded.cleanup_all_backups(xml_path) == 1
+
+    def test_concurrent_processes_share_index(self, tmp_path):
+        """多个进程同时备份同一目录下的不同文件，全部版本都保留在索引中且可还原"""
+        env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+        workers = [subprocess.Popen([sys.executable, '-c', _WORKER_SCRIPT, str(tmp_path / f"f{i}.xml"), f"v{i}_"],
+                                    cwd=str(tmp_path), env=env) for i in range(4)]
+        assert [worker.wait(timeout=120) for worker in workers] == [0] * 4
+
+        service = XMLBackupService()
+        store = service.get_store(tmp_path / "backups")
+        assert store.get_statistics()['version_count'] == 20
+        for i in range(4):
+            backups = service.get_backup_list(tmp_path / f"f{i}.xml")
+            assert [store.read(b['name']) for b in reversed(backups)] == \
+                [f'<root>v{i}_{step}</root>\n'.encode('utf-8') for step in range(5)]
+        assert [p.name for p in tmp_path.joinpath("backups").iterdir() if p.name.endswith('.tmp')] == []
+
+    def test_import_legacy_backups(self, tmp_path):
+        """旧版整文件备份导入索引后可列出、恢复，并计入保留数量"""
+        backup_dir = tmp_path / "backups"
+        backup_dir.mkdir()
+        xml_path = tmp_path / "awb.xml"
+        legacy = []
+        for step in range(3):
+            path = backup_dir / f"awb_backup_20250101_00000{step}.xml"
+            path.write_bytes(_content([0.1 * step] * 20))
+            os.utime(path, (1735689600 + step, 1735689600 + step))
+            legacy.append(path)
+        (backup_dir / "other_backup_20250101_000000.xml").write_bytes(b'<other/>')
+
+        service = XMLBackupService()
+        service.max_backup_count = 3
+        backups = service.get_backup_list(xml_path)
+        assert [b['name'] for b in backups] == [p.name for p in reversed(legacy)]
+        assert not any(p.exists() for p in legacy)
+        assert (backup_dir / "other_backup_20250101_000000.xml").exists()
+
+        xml_path.write_bytes(_content([0.9] * 20))
+        service.backup_xml(xml_path)
+        names = [b['name'] for b in service.get_backup_list(xml_path)]
+        assert len(names) == 3 and legacy[0].name not in names
+        assert service.restore_from_backup(backup_dir / legacy[1].name, xml_path)
+        assert xml_path.read_bytes() == _content([0.1] * 20)
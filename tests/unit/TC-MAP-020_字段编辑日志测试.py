@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-020: 字段编辑日志测试
+==liuq debug== 验证只追加的字段编辑日志的撤销/重做、保存截断与崩溃恢复
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.2.0
+描述: 验证撤销/重做只改内存配置不触碰备份目录，保存后只保留保存之后的记录，重新加载时重放未保存的编辑；
+      XML在日志编写后被改写（恢复备份、批量写入）或日志没有版本首行时丢弃日志，正常退出时删除全部日志；
+      重命名后的编辑按编辑前的别名记录，重放与撤销/重做都能找到目标，目标不存在时不移动记录
+"""
+
+import logging
+import pytest
+
+from core.services.map_analysis.xml_edit_journal import (
+    XMLEditJournal, BASE_BOUNDARY_ALIAS, discard_edit_journals, get_edit_journal
+)
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from core.services.map_analysis.xml_writer_service import XMLWriterService
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_XML = """<?xml version="1.0" encoding="utf-8"?>
+<awb_scenario>
+  <detect_map>
+    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>
+    <offset_map01>
+      <offset><x type="double">0.61</x><y type="double">0.42</y></offset>
+      <weight type="double">0.8</weight>
+      <range><bv><min type="double">100</min><max type="double">9000</max></bv></range>
+    </offset_map01>
+  </detect_map>
+  <map_info>
+    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>
+    <offset_map01><AliasName type="string">Indoor</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map01>
+  </map_info>
+</awb_scenario>
+"""
+
+
+@pytest.fixture
+def xml_file(tmp_path):
+    path = tmp_path / "awb_journal.xml"
+    path.write_text(SAMPLE_XML, encoding='utf-8')
+    return path
+
+
+def _load(xml_file):
+    return XMLParserService().parse_xml(xml_file)
+
+
+class TestTC_MAP_020_字段编辑日志测试:
+    """TC-MAP-020: 字段编辑日志测试"""
+
+    def test_undo_redo(self, xml_file):
+        """撤销/重做按顺序恢复字段值，新的编辑清空重做栈"""
+        config = _load(xml_file)
+        point = config.map_points[0]
+        journal = XMLEditJournal(xml_file)
+
+        point.weight = 0.7
+        journal.record('Indoor', 'weight', 0.8, 0.7)
+        point.bv_range = (150.0, 9000.0)
+        journal.record('Indoor', 'bv_range', (100.0, 9000.0), (150.0, 9000.0))
+
+        assert journal.undo(config).field_name == 'bv_range'
+        assert point.bv_range == (100.0, 9000.0)
+        assert journal.undo(config).field_name == 'weight'
+        assert point.weight == 0.8
+        assert journal.undo(config) is None
+
+        journal.redo(config)
+        assert point.weight == 0.7
+        journal.record(BASE_BOUNDARY_ALIAS, 'rpg', 0.52, 0.6)
+        assert not journal.can_redo()
+        assert not (xml_file.parent / "backups").exists()
+        journal.close()
+
+    def test_crash_recovery(self, xml_file):
+        """未保存的编辑在重新加载时重放到最后保存的XML上，撤销栈一并恢复"""
+        writer = XMLWriterService()
+        config = writer.load_xml_for_editing(xml_file)
+        point = config.map_points[0]
+
+        point.weight = 0.7
+        writer.mark_data_modified("编辑", 'Indoor', 'weight', 0.8, 0.7)
+        point.offset_x = 0.65
+        writer.mark_data_modified("编辑", 'Indoor', 'offset_x', 0.61, 0.65)
+        writer.undo_edit()
+        writer.edit_journal.close()  # 模拟异常退出：XML未保存
+
+        recovered_writer = XMLWriterService()
+        recovered = recovered_writer.load_xml_for_editing(xml_file)
+        print(f"==liuq debug== 恢复后: weight={recovered.map_points[0].weight}, x={recovered.map_points[0].offset_x}")
+
+        assert recovered.map_points[0].weight == 0.7
+        assert recovered.map_points[0].offset_x == 0.61
+        assert recovered_writer.is_modified()
+        assert recovered_writer.redo_edit().field_name == 'offset_x'
+        assert recovered.map_points[0].offset_x == 0.65
+
+        assert recovered_writer.save_now(backup=False)
+        assert not recovered_writer.edit_journal.has_pending()
+        assert _load(xml_file).map_points[0].offset_x == 0.65
+
+    def test_rename_then_edit_recover(self, xml_file):
+        """表格先重命名再改权重：按编辑前的别名记录，重放后别名与权重都恢复"""
+        from gui.widgets.map_table_editor import MapTableEditor
+        config = _load(xml_file)
+        point = config.map_points[0]
+        editor = MapTableEditor(None)
+        editor.edit_journal = XMLEditJournal(xml_file)
+
+        point.alias_name = 'Outdoor'
+        editor._record_edit(point, 'alias_name', 'Indoor')
+        point.weight = 5.0
+        editor._record_edit(point, 'weight', 0.8)
+        editor.edit_journal.close()
+
+        recovered = _load(xml_file)
+        assert XMLEditJournal(xml_file).recover(recovered) == 2
+        print(f"==liuq debug== 重放后: {recovered.map_points[0].alias_name}, {recovered.map_points[0].weight}")
+        assert (recovered.map_points[0].alias_name, recovered.map_points[0].weight) == ('Outdoor', 5.0)
+
+    def test_rename_undo_redo(self, xml_file):
+        """重命名的撤销按新别名查找、重做按旧别名查找，撤销/重做行重放后结果一致"""
+        config = _load(xml_file)
+        point = config.map_points[0]
+        journal = XMLEditJournal(xml_file)
+
+        point.alias_name = 'Outdoor'
+        journal.record('Indoor', 'alias_name', 'Indoor', 'Outdoor')
+        point.weight = 5.0
+        journal.record('Outdoor', 'weight', 0.8, 5.0)
+
+        assert journal.undo(config).field_name == 'weight'
+        assert journal.undo(config).field_name == 'alias_name'
+        assert (point.alias_name, point.weight) == ('Indoor', 0.8)
+        assert journal.redo(config).field_name == 'alias_name'
+        assert journal.redo(config).field_name == 'weight'
+        assert (point.alias_name, point.weight) == ('Outdoor', 5.0)
+        journal.undo(config)
+        journal.close()
+
+        recovered = _load(xml_file)
+        replay = XMLEditJournal(xml_file)
+        assert replay.recover(recovered) == 7
+        assert (recovered.map_points[0].alias_name, recovered.map_points[0].weight) == ('Outdoor', 0.8)
+        assert replay.can_undo() and replay.can_redo()
+
+    def test_failed_apply_keeps_stacks(self, xml_file):
+        """目标不存在时撤销/重做返回None，记录留在原栈，重放不计入"""
+        config = _load(xml_file)
+        journal = XMLEditJournal(xml_file)
+        journal.record('Missing', 'weight', 0.8, 0.7)
+        assert journal.undo(config) is None
+        assert journal.can_undo() and not journal.can_redo()
+        journal.close()
+        assert XMLEditJournal(xml_file).recover(_load(xml_file)) == 0
+
+    def test_mark_saved_keeps_later_edits(self, xml_file):
+        """保存期间追加的记录在截断后保留"""
+        journal = XMLEditJournal(xml_file)
+        journal.record('Indoor', 'weight', 0.8, 0.7)
+        position = journal.position()
+        journal.record('Indoor', 'weight', 0.7, 0.6)
+        journal.mark_saved(position)
+
+        config = _load(xml_file)
+        assert XMLEditJournal(xml_file).recover(config) == 1
+        assert config.map_points[0].weight == 0.6
+
+    def test_journal_dropped_when_xml_changed(self, xml_file):
+        """日志编写后XML被改写或日志缺少版本首行时不重放并删除日志"""
+        journal = XMLEditJournal(xml_file)
+        journal.record('Indoor', 'weight', 0.8, 0.7)
+        journal.close()
+        assert XMLEditJournal(xml_file).has_pending()
+
+        xml_file.write_text(SAMPLE_XML.replace('0.61', '0.62'), encoding='utf-8')
+        config = _load(xml_file)
+        assert XMLEditJournal(xml_file).recover(config) == 0
+        assert config.map_points[0].weight == 0.8
+        assert not journal.journal_path.exists()
+
+        # 内容相同、只有修改时间变化时仍可重放
+        journal = XMLEditJournal(xml_file)
+        journal.record('Indoor', 'weight', 0.8, 0.7)
+        journal.close()
+        xml_file.write_bytes(xml_file.read_bytes())
+        assert XMLEditJournal(xml_file).recover(config) == 1
+
+        journal.journal_path.write_text('{"op": "edit", "seq": 1, "alias": "Indoor", "field": "weight", '
+                                        '"old": 0.8, "new": 0.5, "ts": 0}\n', encoding='utf-8')
+        assert not XMLEditJournal(xml_file).has_pending()
+        assert not journal.journal_path.exists()
+
+    def test_discard_on_clean_exit(self, xml_file):
+        """正常退出（放弃未保存的修改）时删除全部编辑日志"""
+        journal = get_edit_journal(xml_file)
+        journal.record('Indoor', 'weight', 0.8, 0.7)
+        assert journal.journal_path.exists()
+        discard_edit_journals()
+        assert not journal.journal_path.exists() and not journal.can_undo()
+
+    @pytest.mark.parametrize('accept', [True, False])
+    def test_table_widget_recover_prompt(self, xml_file, monkeypatch, accept):
+        """表格组件恢复前询问：恢复后标记为已修改，拒绝则删除日志"""
+        from PyQt5.QtWidgets import QApplication
+        from gui.widgets.map_table_widget import MapTableWidget
+        app = QApplication.instance() or QApplication([])
+
+        journal = XMLEditJournal(xml_file)
+        journal.record('Indoor', 'weight', 0.8, 0.7)
+        journal.close()
+
+        monkeypatch.setattr(MapTableWidget, '_confirm_recover', lambda self, path: accept)
+        widget = MapTableWidget()
+        config = _load(xml_file)
+        widget.set_configuration(config)
+        widget.set_xml_file_path(str(xml_file))
+        try:
+            assert widget.is_modified() is accept
+            assert config.map_points[0].weight == (0.7 if accept else 0.8)
+            assert get_edit_journal(xml_file).has_pending() is accept
+        finally:
+            discard_edit_journals()
+            widget.deleteLater()
+            app.processEvents()
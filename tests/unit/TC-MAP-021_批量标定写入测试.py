@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-021: 批量标定写入测试
+==liuq debug== 验证同一份标定计划写入多个XML的差异报告、失败隔离与命令行入口
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.2.0
+描述: 验证目标值与增量两种修正、每个文件的差异记录、缺失别名与损坏文件不影响其他文件、dry_run不写文件；
+      进程池写入同一目录下多个文件时每个文件都保留写入前的备份；只读范围字段在加载计划时报错，
+      设置失败的字段记入missing
+"""
+
+import json
+import logging
+import pytest
+
+from core.services.map_analysis.xml_batch_calibration import (
+    CalibrationEdit, CalibrationPlan, apply_calibration_plan, main
+)
+from core.services.map_analysis.xml_backup_service import XMLBackupService
+from core.services.map_analysis.xml_parser_service import XMLParserService
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_XML = """<?xml version="1.0" encoding="utf-8"?>
+<awb_scenario>
+  <detect_map>
+    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>
+    <offset_map01>
+      <offset><x type="double">{x}</x><y type="double">0.42</y></offset>
+      <weight type="double">0.8</weight>
+      <range><bv><min type="double">100</min><max type="double">9000</max></bv></range>
+    </offset_map01>
+  </detect_map>
+  <map_info>
+    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>
+    <offset_map01><AliasName type="string">{alias}</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map01>
+  </map_info>
+</awb_scenario>
+"""
+
+PLAN = {"Indoor": {"offset_x": 0.7, "weight": {"delta": -0.1}}}
+
+
+@pytest.fixture
+def xml_files(tmp_path):
+    paths = []
+    for index, (x, alias) in enumerate([(0.61, "Indoor"), (0.55, "Indoor"), (0.61, "Outdoor")]):
+        path = tmp_path / f"awb_{index}.xml"
+        path.write_text(SAMPLE_XML.format(x=x, alias=alias), encoding='utf-8')
+        paths.append(path)
+    broken = tmp_path / "broken.xml"
+    broken.write_text("<awb_scenario><detect_map>", encoding='utf-8')
+    paths.append(broken)
+    return paths
+
+
+class TestTC_MAP_021_批量标定写入测试:
+    """TC-MAP-021: 批量标定写入测试"""
+
+    def test_plan_validation(self):
+        """不支持的字段与错误的修正格式在加载计划时报错"""
+        plan = CalibrationPlan.from_dict(PLAN)
+        assert plan.to_dict() == {"Indoor": {"offset_x": 0.7, "weight": {"delta": -0.1}}}
+        with pytest.raises(ValueError):
+            CalibrationPlan.from_dict({"Indoor": {"no_such_field": 1}})
+        with pytest.raises(ValueError):
+            CalibrationPlan.from_dict({"Indoor": {"weight": {"scale": 2}}})
+        for field_name in ('count_min', 'diff_ctemp_min', 'color_cct_max', 'ac_min'):
+            with pytest.raises(ValueError):
+                CalibrationPlan.from_dict({"Indoor": {field_name: {"delta": 1}}})
+
+    def test_failed_set_reported_missing(self, xml_files):
+        """设置失败的字段记入missing，不报告为已修改"""
+        plan = CalibrationPlan({"Indoor": {"count_min": CalibrationEdit(value=1), "weight": CalibrationEdit(value=0.5)}})
+        result = apply_calibration_plan(xml_files[:1], plan, max_workers=1, backup=False)[str(xml_files[0])]
+        print(f"==liuq debug== missing={result.missing}, changes={result.changes}")
+        assert result.success and result.missing == ["Indoor.count_min"]
+        assert {c['field'] for c in result.changes} == {'weight'}
+
+    def test_batch_apply(self, xml_files):
+        """每个文件独立应用计划并报告差异，失败文件不影响其他文件"""
+        results = apply_calibration_plan(xml_files, CalibrationPlan.from_dict(PLAN), max_workers=1, backup=False)
+        for result in results.values():
+            print(f"==liuq debug== {result.path}: success={result.success}, changes={result.changes}")
+
+        first, second, other, broken = (results[str(path)] for path in xml_files)
+        assert list(results) == [str(path) for path in xml_files]
+        assert first.success and first.written
+        assert {(c['field'], c['old'], c['new']) for c in first.changes} >= {('offset_x', '0.61', '0.7')}
+
+        point = XMLParserService().parse_xml(xml_files[1]).map_points[0]
+        assert point.offset_x == 0.7
+        assert point.weight == pytest.approx(0.7)
+
+        assert other.success and not other.written
+        assert other.changes == [] and other.missing == ["Indoor"]
+        assert not broken.success and broken.error
+
+    def test_dry_run_and_cli(self, xml_files, tmp_path):
+        """dry_run只报告差异；命令行在有文件失败时返回1并写出JSON报告"""
+        original = xml_files[0].read_bytes()
+        results = apply_calibration_plan(xml_files[:1], CalibrationPlan.from_dict(PLAN),
+                                         max_workers=1, dry_run=True)
+        assert results[str(xml_files[0])].changes and not results[str(xml_files[0])].written
+        assert xml_files[0].read_bytes() == original
+
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(json.dumps(PLAN), encoding='utf-8')
+        report_path = tmp_path / "report.json"
+        args = [str(plan_path), "--no-backup", "-j", "1", "--report", str(report_path)]
+
+        assert main(args + [str(path) for path in xml_files[:2]]) == 0
+        assert main(args + [str(path) for path in xml_files]) == 1
+        report = json.loads(report_path.read_text(encoding='utf-8'))
+        assert [entry['success'] for entry in report] == [True, True, True, False]
+
+    def test_process_pool_backups_in_same_dir(self, xml_files):
+        """进程池写入同一目录下的多个文件时，每个文件都有写入前内容的备份"""
+        originals = {path: path.read_bytes() for path in xml_files}
+        results = apply_calibration_plan(xml_files, CalibrationPlan.from_dict(PLAN), max_workers=2, backup=True)
+        assert [results[str(path)].written for path in xml_files] == [True, True, False, False]
+
+        service = XMLBackupService()
+        store = service.get_store(xml_files[0].parent / "backups")
+        for path in xml_files:
+            backups = service.get_backup_list(path)
+            assert len(backups) == 1, path
+            assert store.read(backups[0]['name']) == originals[path]
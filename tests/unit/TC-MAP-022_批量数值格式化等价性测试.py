@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-022: 批量数值格式化等价性测试
+==liuq debug== 验证批量/快速数值格式化与原Decimal格式化逐字符一致
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.0.0
+描述: 对测试XML中的全部数值文本、解析后的全部字段值以及边界数值，比较format_decimal_batch、
+      format_field_values与原format_decimal_precise、format_field_value的结果
+"""
+
+import math
+import random
+import re
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from core.models.map_data import XML_FIELD_CONFIG, format_field_value, get_map_point_field_value
+from core.services.map_analysis.xml_formatting_service import XMLFormattingService
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from utils.number_formatter import format_decimal_batch, format_decimal_fast, format_decimal_precise
+
+logger = logging.getLogger(__name__)
+
+TEST_DATA_DIR = Path(__file__).resolve().parent.parent / "test_data"
+
+SAMPLE_XML = """<?xml version="1.0" encoding="utf-8"?>
+<awb_scenario>
+  <detect_map>
+    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>
+    <offset_map01>
+      <offset><x type="double">0.6123</x><y type="double">-0.000015</y></offset>
+      <weight type="double">1.0</weight>
+      <range><bv><min type="double">-1e-07</min><max type="double">1e+16</max></bv></range>
+    </offset_map01>
+  </detect_map>
+  <map_info>
+    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>
+    <offset_map01><AliasName type="string">Indoor</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map01>
+  </map_info>
+</awb_scenario>
+"""
+
+EDGE_VALUES = [
+    0, 0.0, -0.0, 1.0, 2.3, 0.75, 1e-4, 1e-5, 1.5e-5, 1e-7, -2.5e-7, 1e15, 1e16, 1e22,
+    -9.511829943497916e+18, 1e300, 123456789012345678, 10 ** 60, True, False,
+    float('inf'), float('-inf'), np.float64(0.1), np.float32(0.1), np.int64(7),
+    "0.25", " 1.50 ", "1e-7", "abc", "",
+]
+
+
+def _test_xml_files(tmp_path):
+    sample = tmp_path / "awb_sample.xml"
+    sample.write_text(SAMPLE_XML, encoding='utf-8')
+    return [sample] + sorted(TEST_DATA_DIR.glob("*.xml"))
+
+
+def _reference(value):
+    try:
+        return format_decimal_precise(value)
+    except Exception as e:
+        return type(e)
+
+
+def _fast(value):
+    try:
+        return format_decimal_fast(value)
+    except Exception as e:
+        return type(e)
+
+
+class TestTC_MAP_022_批量数值格式化等价性测试:
+    """TC-MAP-022: 批量数值格式化等价性测试"""
+
+    def test_xml_values_equivalent(self, tmp_path):
+        """测试XML中的数值文本及其float形式：批量结果与原算法一致"""
+        for xml_file in _test_xml_files(tmp_path):
+            texts = re.findall(r'>([-+0-9.eE]+)<', xml_file.read_text(encoding='utf-8'))
+            floats = [float(text) for text in texts]
+            print(f"==liuq debug== {xml_file.name}: {len(texts)}个数值")
+
+            assert format_decimal_batch(texts) == [format_decimal_precise(text) for text in texts]
+            assert format_decimal_batch(floats) == [format_decimal_precise(value) for value in floats]
+            assert format_decimal_batch(np.array(floats)) == [format_decimal_precise(value) for value in floats]
+
+    def test_field_values_equivalent(self, tmp_path):
+        """解析后的每个字段整列格式化与逐个format_field_value一致"""
+        service = XMLFormattingService()
+        for xml_file in _test_xml_files(tmp_path):
+            config = XMLParserService().parse_xml(xml_file)
+            for field_name in XML_FIELD_CONFIG:
+                values = [get_map_point_field_value(point, field_name) for point in config.map_points]
+                values.append(None)
+                assert service.format_field_values(values, field_name) == \
+                    [format_field_value(value, field_name) for value in values], field_name
+
+    def test_edge_and_random_values(self):
+        """边界数值与随机数值（含科学计数法范围）逐个一致"""
+        random.seed(20261016)
+        values = list(EDGE_VALUES)
+        for _ in range(20000):
+            values.append(random.uniform(-1, 1) * 10 ** random.randint(-12, 20))
+            values.append(round(random.uniform(-100, 100), random.randint(0, 8)))
+
+        mismatches = [value for value in values if _fast(value) != _reference(value)]
+        assert mismatches == []
+        assert _fast(float('nan')) == format_decimal_precise(float('nan'))
+
+        float32_values = np.array([value for value in values if isinstance(value, float)
+                                   and math.isfinite(value) and abs(value) < 1e30], dtype=np.float32)
+        assert format_decimal_batch(float32_values) == [format_decimal_precise(value) for value in float32_values]
+        assert XMLFormattingService().format_numbers_for_xml([None, 1.0, "x"]) == ["0", "1", "x"]
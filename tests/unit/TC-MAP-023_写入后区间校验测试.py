@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-023: 写入后区间校验测试
+==liuq debug== 验证高性能写入只回读被修改节点区间的写入校验
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.2.0
+描述: 验证正常写入时校验通过且只检查被修改的节点与字段；临时文件内容被破坏时不替换原文件，
+      抛出XMLWriteVerificationError并按别名与字段报告不一致项，写入服务不再回退到全量写回；
+      同一写入服务先后写入不同文件时别名映射随文件重建
+"""
+
+import logging
+from xml.etree import ElementTree as ET
+
+import pytest
+
+from core.interfaces.xml_data_processor import XMLWriteVerificationError
+from core.models.map_data import set_map_point_field_value
+from core.services.map_analysis import xml_performance_service
+from core.services.map_analysis.xml_byte_patch_writer import write_patched_temp_file
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from core.services.map_analysis.xml_performance_service import XMLPerformanceService
+from core.services.map_analysis.xml_writer_core import XMLWriterCore
+from core.services.map_analysis.xml_writer_service import XMLWriterService
+from core.services.map_analysis.xml_write_verifier import map_patched_spans, verify_patched_file
+
+logger = logging.getLogger(__name__)
+
+MAP_DATA = """    <offset_map{n:02d}>
+      <offset><x type="double">0.{n:02d}</x><y type="double">0.42</y></offset>
+      <weight type="double">0.8</weight>
+      <range><bv><min type="double">100</min><max type="double">9000</max></bv></range>
+    </offset_map{n:02d}>
+"""
+MAP_INFO = """    <offset_map{n:02d}><AliasName type="string">Map{n}</AliasName><MapEnabled type="uint">1</MapEnabled></offset_map{n:02d}>
+"""
+
+
+@pytest.fixture
+def xml_file(tmp_path):
+    maps = range(1, 11)
+    content = ('<?xml version="1.0" encoding="utf-8"?>\n<awb_scenario>\n  <detect_map>\n'
+               '    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>\n'
+               + ''.join(MAP_DATA.format(n=n) for n in maps) + '  </detect_map>\n  <map_info>\n'
+               '    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG>'
+               '<BpG type="double">0.48</BpG></base_boundary0>\n'
+               + ''.join(MAP_INFO.format(n=n) for n in maps) + '  </map_info>\n</awb_scenario>\n')
+    path = tmp_path / "awb_verify.xml"
+    path.write_text(content, encoding='utf-8')
+    return path
+
+
+def _edit(xml_file):
+    config = XMLParserService().parse_xml(xml_file)
+    config.clear_dirty()
+    points = {point.alias_name: point for point in config.map_points}
+    set_map_point_field_value(points['Map3'], 'offset_x', 0.123456)
+    set_map_point_field_value(points['Map3'], 'weight', 1.5)
+    set_map_point_field_value(points['Map8'], 'bv_max', 12000.0)
+    return config
+
+
+class TestTC_MAP_023_写入后区间校验测试:
+    """TC-MAP-023: 写入后区间校验测试"""
+
+    def test_verification_passes_for_edited_spans(self, xml_file):
+        """正常写入时校验通过，只检查被修改的节点与字段"""
+        service = XMLPerformanceService()
+        assert service.write_xml_optimized(_edit(xml_file), xml_file, backup=False,
+                                           tree=ET.parse(xml_file), only_dirty=True)
+        verification = service.last_verification
+        print(f"==liuq debug== 校验结果: {verification}")
+
+        assert verification.success
+        assert verification.checked_nodes == 2
+        assert verification.checked_fields == 3
+        point = {p.alias_name: p for p in XMLParserService().parse_xml(xml_file).map_points}['Map3']
+        assert point.offset_x == 0.123456
+
+    def test_corrupted_temp_file_keeps_original(self, xml_file, monkeypatch):
+        """临时文件中被修改的节点损坏时不替换原文件，并报告别名与字段"""
+        original = xml_file.read_bytes()
+
+        def corrupt_writer(source, patches, directory):
+            bad = [(start, end, text.replace('<weight type="double">1.5', '<weight type="double">9.9'))
+                   for start, end, text in patches]
+            return write_patched_temp_file(source, bad, directory)
+
+        monkeypatch.setattr(xml_performance_service, 'write_patched_temp_file', corrupt_writer)
+        service = XMLPerformanceService()
+        with pytest.raises(XMLWriteVerificationError) as raised:
+            service.write_xml_optimized(_edit(xml_file), xml_file, backup=False,
+                                        tree=ET.parse(xml_file), only_dirty=True)
+        assert raised.value.verification is service.last_verification
+        assert xml_file.read_bytes() == original
+        assert list(xml_file.parent.glob("tmp*.xml")) == []
+        assert not service.last_verification.success
+        assert [issue.alias_name for issue in service.last_verification.issues] == ['Map3']
+
+    def test_writer_skips_fallback_on_verification_failure(self, xml_file, monkeypatch):
+        """校验失败时写入服务不执行全量写回，原文件保持不变，修改仍保留"""
+        original = xml_file.read_bytes()
+
+        def corrupt_writer(source, patches, directory):
+            return write_patched_temp_file(source, [(s, e, t.replace('1.5', '9.9')) for s, e, t in patches], directory)
+
+        monkeypatch.setattr(xml_performance_service, 'write_patched_temp_file', corrupt_writer)
+        writer = XMLWriterService()
+        fallback_calls = []
+        monkeypatch.setattr(writer, '_write_xml_fallback', lambda *args, **kwargs: fallback_calls.append(args) or True)
+
+        with pytest.raises(XMLWriteVerificationError):
+            writer.write_xml(_edit(xml_file), xml_file, backup=False)
+
+        writer.current_config = _edit(xml_file)
+        writer.current_xml_path = xml_file
+        writer.current_tree = ET.parse(xml_file)
+        writer.is_data_modified = True
+        assert not writer.save_now(backup=False)
+        assert writer.is_modified()
+        assert fallback_calls == []
+        assert xml_file.read_bytes() == original
+
+    def test_field_mismatch_reported(self, tmp_path):
+        """字段值与目标值不一致、节点不完整时逐项报告"""
+        written = tmp_path / "written.xml"
+        node = '<offset_map01><weight type="double">0.8</weight></offset_map01>'
+        written.write_text('<r>' + node + '<offset_map02><x>', encoding='utf-8')
+        patches = [(3, 3 + len(node), node), (3 + len(node), 3 + len(node) + 17, '<offset_map02><x>')]
+        replacements = [
+            {'alias_name': 'A', 'field_type': 'weight', 'replacement': '0.9', '_node_start': 3, '_node_end': 3 + len(node)},
+            {'alias_name': 'B', 'field_type': 'offset_x', 'replacement': '1',
+             '_node_start': 3 + len(node), '_node_end': 3 + len(node) + 17},
+        ]
+        assert [entry[2] for entry in map_patched_spans(patches)] == [3, 3 + len(node)]
+
+        verification = verify_patched_file(written, written.stat().st_size, patches, replacements)
+        assert [(issue.alias_name, issue.field_type, issue.actual) for issue in verification.issues] == \
+            [('A', 'weight', '0.8'), ('B', '', None)]
+
+    def test_alias_mapping_follows_root(self, xml_file, tmp_path):
+        """别名映射按XML根元素缓存，写入另一个文件时不沿用上一个文件的映射"""
+        other = tmp_path / "awb_other.xml"
+        other.write_text(xml_file.read_text(encoding='utf-8').replace('>Map3<', '>Renamed<'), encoding='utf-8')
+        core = XMLWriterCore()
+        root = ET.parse(xml_file).getroot()
+        assert core.get_xml_node_name_by_alias(root, 'Map3') == 'offset_map03'
+        assert core.get_xml_node_name_by_alias(root, 'Map8') == 'offset_map08'
+
+        other_root = ET.parse(other).getroot()
+        assert core.get_xml_node_name_by_alias(other_root, 'Map3') is None
+        assert core.get_xml_node_name_by_alias(other_root, 'Renamed') == 'offset_map03'
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-024: 紧凑Map点表示测试
+==liuq debug== 验证CompactMapPoint与MapPoint属性接口一致且内存占用更小
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.0.0
+描述: 验证紧凑配置与原配置逐字段相等、字段读写函数与脏字段跟踪行为一致、
+      还原后的配置可正常写入，以及持有多份配置时内存占用明显下降
+"""
+
+import copy
+import logging
+import tracemalloc
+
+import pytest
+
+from core.models.compact_map_point import (CompactMapPoint, MAP_POINT_FIELDS, compact_configuration,
+                                           expand_configuration)
+from core.models.map_data import (XML_FIELD_CONFIG, get_map_point_field_value, set_map_point_field_value)
+from core.services.map_analysis.xml_parser_service import XMLParserService
+
+logger = logging.getLogger(__name__)
+
+MAP_TEMPLATE = """    <offset_map{n:02d}>
+      <offset><x type="double">0.{n:02d}</x><y type="double">0.42</y></offset>
+      <weight type="double">0.8</weight>
+      <range>
+        <bv><min type="double">100</min><max type="double">9000</max></bv>
+        <ctemp><min type="uint">2500</min><max type="uint">7000</max></ctemp>
+        <tranCtemp><min type="uint">2300</min><max type="uint">7200</max></tranCtemp>
+        <ml type="int">3</ml>
+      </range>
+    </offset_map{n:02d}>
+"""
+INFO_TEMPLATE = """    <offset_map{n:02d}><AliasName type="string">Outdoor_{n:02d}</AliasName><MapEnabled type="uint">1</MapEnabled>{polygon}</offset_map{n:02d}>
+"""
+POLYGON = '<RpG type="double">0.3 0.6 0.45</RpG><BpG type="double">0.3 0.3 0.6</BpG><TransStep type="int">2</TransStep>'
+
+
+@pytest.fixture
+def config(tmp_path):
+    """包含单点与多边形Map的示例配置"""
+    maps = ''.join(MAP_TEMPLATE.format(n=n) for n in range(1, 21))
+    infos = ''.join(INFO_TEMPLATE.format(n=n, polygon=POLYGON if n % 2 == 0 else '') for n in range(1, 21))
+    content = ('<?xml version="1.0" encoding="utf-8"?>\n<awb_scenario>\n  <detect_map>\n'
+               '    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>\n'
+               f'{maps}  </detect_map>\n  <map_info>\n'
+               '    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG><BpG type="double">0.48</BpG></base_boundary0>\n'
+               f'{infos}  </map_info>\n</awb_scenario>\n')
+    path = tmp_path / "awb_compact.xml"
+    path.write_text(content, encoding='utf-8')
+    return XMLParserService().parse_xml(path)
+
+
+class TestTC_MAP_024_紧凑Map点表示测试:
+    """TC-MAP-024: 紧凑Map点表示测试"""
+
+    def test_same_attribute_api(self, config):
+        """紧凑配置逐字段相等，字段读取函数结果与类型一致"""
+        compact = compact_configuration(config)
+        assert compact.map_points, "示例配置应包含Map点"
+        for original, point in zip(config.map_points, compact.map_points):
+            assert isinstance(point, CompactMapPoint)
+            for name in MAP_POINT_FIELDS:
+                value = getattr(point, name)
+                assert value == getattr(original, name), name
+                assert type(value) is type(getattr(original, name)), name
+            for field_name in XML_FIELD_CONFIG:
+                assert get_map_point_field_value(point, field_name) == get_map_point_field_value(original, field_name)
+            assert point.get_detailed_range_info() == original.get_detailed_range_info()
+            assert point.calculate_polygon_centroid() == original.calculate_polygon_centroid()
+        assert compact.get_weight_statistics() == config.get_weight_statistics()
+        assert any(point.is_polygon for point in compact.map_points)
+
+    def test_dirty_tracking_and_round_trip(self, config):
+        """字段设置与脏字段跟踪同MapPoint，往返转换保留修改与脏字段"""
+        compact = compact_configuration(config)
+        assert compact.get_dirty_xml_fields() == {}
+
+        reference = copy.deepcopy(config)
+        for point in (compact.map_points[0], reference.map_points[0]):
+            point.weight = point.weight  # 值未变化
+            assert set_map_point_field_value(point, 'bv_max', '12000')
+            assert set_map_point_field_value(point, 'tran_ctemp_min', 2100)
+            assert set_map_point_field_value(point, 'ml', 2)
+            point.polygon_vertices = [(0.1, 0.2), (0.3, 0.4), (0.2, 0.5)]
+        assert compact.get_dirty_xml_fields() == reference.get_dirty_xml_fields()
+        assert set(compact.get_dirty_xml_fields()[0]) == {'bv_min', 'bv_max', 'tran_ctemp_min', 'ml'}
+
+        point = compact.map_points[0]
+        assert point.bv_range == (100.0, 12000.0)
+        assert point.extra_attributes['ml'] == 65471
+        assert config.map_points[0].bv_range == (100.0, 9000.0), "原配置不受影响"
+
+        expanded = expand_configuration(copy.deepcopy(compact))
+        assert expanded.get_dirty_xml_fields() == compact.get_dirty_xml_fields()
+        assert expanded.map_points[0].tran_ctemp_min == 2100
+        assert expanded.map_points[0].polygon_vertices == [(0.1, 0.2), (0.3, 0.4), (0.2, 0.5)]
+        assert [p.scene_type for p in expanded.map_points] == [p.scene_type for p in config.map_points]
+
+        compact.clear_dirty()
+        assert compact.get_dirty_xml_fields() == {}
+
+    def test_memory_reduction(self, config):
+        """持有多份配置时紧凑表示的内存占用明显更小"""
+        def measure(build):
+            tracemalloc.start()
+            held = [build() for _ in range(20)]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert len(held) == 20
+            return size
+
+        full_size = measure(lambda: copy.deepcopy(config))
+        compact_size = measure(lambda: compact_configuration(config))
+        print(f"==liuq debug== 20份配置内存: 普通 {full_size} 字节, 紧凑 {compact_size} 字节")
+        assert compact_size < full_size * 0.7
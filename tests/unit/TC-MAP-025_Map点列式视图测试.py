@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-025: Map点列式视图测试
+==liuq debug== 验证MapPointTable列数据、编辑同步与分析器向量化结果
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 2.1.0
+描述: 验证列式视图各列与Map点属性一致；属性编辑后只刷新被修改的行、增删Map点时整体重建；
+      配置统计、多配置拼接与多维度分析结果与逐点计算一致；随机配置使用conftest中的random_map_config
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from core.models.compact_map_point import compact_configuration
+from core.models.map_data import MapType, SceneType, set_map_point_field_value
+from core.models.map_point_table import NUMERIC_COLUMNS, RANGE_COLUMNS, MapPointTable
+from core.services.map_analysis.multi_dimensional_analyzer import MultiDimensionalAnalyzer
+
+logger = logging.getLogger(__name__)
+
+ALIASES = ('Indoor_{}', 'Outdoor_{}', 'Night_{}', 'Map_{}')
+
+
+def _column_from_points(points, column):
+    if column in RANGE_COLUMNS:
+        attribute, index = RANGE_COLUMNS[column]
+        return np.array([getattr(point, attribute)[index] for point in points], dtype=float)
+    return np.array([getattr(point, column) for point in points], dtype=float)
+
+
+class TestTC_MAP_025_Map点列式视图测试:
+    """TC-MAP-025: Map点列式视图测试"""
+
+    def test_columns_match_points(self, random_map_config):
+        """全部数值列、编码列与多边形顶点与Map点属性一致"""
+        config = random_map_config(40, aliases=ALIASES)
+        table = config.get_point_table()
+        assert len(table) == len(config.map_points)
+        for column in NUMERIC_COLUMNS:
+            np.testing.assert_array_equal(table[column], _column_from_points(config.map_points, column), column)
+        assert table.alias_names.tolist() == [point.alias_name for point in config.map_points]
+        for row, point in enumerate(config.map_points):
+            assert table.polygon(row).tolist() == [list(vertex) for vertex in point.polygon_vertices]
+        assert table.scene_mask(SceneType.OUTDOOR).sum() == len(config.get_map_points_by_scene(SceneType.OUTDOOR))
+        assert table.map_type_counts()['reduce'] == len(config.get_map_points_by_type(MapType.REDUCE))
+        with pytest.raises(ValueError):
+            table['weight'][0] = 1.0
+
+        weights = [point.weight for point in config.map_points]
+        stats = config.get_weight_statistics()
+        assert stats['min'] == min(weights) and stats['max'] == max(weights) and stats['count'] == len(weights)
+        assert stats['mean'] == pytest.approx(sum(weights) / len(weights))
+        assert config.get_coordinate_bounds() == ((min(p.x for p in config.map_points), max(p.x for p in config.map_points)),
+                                                  (min(p.y for p in config.map_points), max(p.y for p in config.map_points)))
+
+    @pytest.mark.parametrize('compact', [False, True])
+    def test_incremental_sync(self, random_map_config, compact):
+        """编辑只刷新被修改的行，增删Map点时整体重建"""
+        config = random_map_config(40, aliases=ALIASES)
+        if compact:
+            config = compact_configuration(config)
+        table = config.get_point_table()
+        assert table.sync(config.map_points) == 0
+
+        set_map_point_field_value(config.map_points[3], 'bv_max', 12345)
+        config.map_points[7].weight = 0.01
+        config.map_points[8].polygon_vertices = [(0.9, 0.9), (0.8, 0.7), (0.6, 0.9), (0.7, 0.95)]
+        assert table.sync(config.map_points) == 3
+        assert config.get_point_table() is table
+        assert table['bv_max'][3] == 12345.0
+        assert table['weight'][7] == 0.01
+        assert table.polygon(8).shape == (4, 2)
+        assert table.polygon(10).tolist() == [list(v) for v in config.map_points[10].polygon_vertices]
+
+        config.map_points.append(random_map_config(1, seed=9, aliases=ALIASES).map_points[0])
+        del config.map_points[0]
+        table = config.get_point_table()
+        assert table.alias_names.tolist() == [point.alias_name for point in config.map_points]
+        np.testing.assert_array_equal(table['x'], _column_from_points(config.map_points, 'x'))
+
+    def test_concat_and_multi_dimensional_analysis(self, random_map_config):
+        """多配置拼接统计与多维度分析结果与逐点计算一致"""
+        configs = [random_map_config(40, seed=seed, aliases=ALIASES) for seed in range(3)]
+        combined, groups = MapPointTable.concat([config.get_point_table() for config in configs])
+        assert len(combined) == sum(len(config.map_points) for config in configs)
+        for index, config in enumerate(configs):
+            np.testing.assert_array_equal(combined['weight'][groups == index],
+                                          _column_from_points(config.map_points, 'weight'))
+
+        config = configs[0]
+        analyzer = MultiDimensionalAnalyzer(config)
+        result = analyzer.analyze()
+        rules = analyzer.classification_config
+        expected = {}
+        for point in config.map_points:
+            scene = rules.classify_scene_by_rules(point.bv_range[0], point.ir_range[0], point.alias_name)
+            expected.setdefault(scene, []).append(point.alias_name)
+        for scene, data in result['scene_analysis'].items():
+            assert [info['alias_name'] for info in data['maps']] == expected.get(scene, [])
+
+        inconsistent = [point.alias_name for point in config.map_points
+                        if rules.classify_scene_by_rules(point.bv_range[0], point.ir_range[0], point.alias_name)
+                        != point.scene_type.value]
+        accuracy = result['accuracy_analysis']
+        assert accuracy['inconsistent_count'] == len(inconsistent)
+        assert [info['alias_name'] for info in accuracy['inconsistent_maps']] == inconsistent[:10]
+        assert result['parameter_analysis']['weight']['median'] == pytest.approx(
+            float(np.median([point.weight for point in config.map_points])))
+        print(f"==liuq debug== 多维度分析: {accuracy['accuracy_percentage']:.1f}% 一致")
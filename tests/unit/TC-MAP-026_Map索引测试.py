@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-026: Map索引测试
+==liuq debug== 验证MapConfiguration别名/场景/类型索引在编辑后与线性扫描一致
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.2.0
+描述: 验证增删Map点、改名、重新分类、排序与整体替换后，按别名/场景/类型查询的结果
+      与逐点扫描一致（包括重复别名取最靠前者、结果保持列表顺序），复制与序列化后索引独立；
+      键变化只通知包含该点的索引，其他配置的编辑不影响本索引；随机配置使用conftest中的random_map_config
+"""
+
+import copy
+import gc
+import logging
+import pickle
+import random
+import weakref
+
+import pytest
+
+from core.models.compact_map_point import compact_configuration
+from core.models.map_data import BaseBoundary, MapConfiguration, MapType, SceneType
+from core.models.map_point_index import INDEXES_ATTRIBUTE, MapPointList
+
+logger = logging.getLogger(__name__)
+
+ALIASES = ('Indoor_{}', 'Outdoor_{}', 'Night_{}', 'Map_{}')
+
+
+def _assert_matches_scan(config: MapConfiguration):
+    points = config.map_points
+    for alias in {point.alias_name for point in points} | {'Missing'}:
+        expected = next((point for point in points if point.alias_name == alias), None)
+        assert config.find_map_point_by_alias(alias) is expected, alias
+    for scene in SceneType:
+        assert config.get_map_points_by_scene(scene) == [p for p in points if p.scene_type == scene]
+        assert all(a is b for a, b in zip(config.get_map_points_by_scene(scene),
+                                          [p for p in points if p.scene_type == scene]))
+    for map_type in MapType:
+        assert [id(p) for p in config.get_map_points_by_type(map_type)] == \
+            [id(p) for p in points if p.map_type == map_type]
+
+
+class TestTC_MAP_026_Map索引测试:
+    """TC-MAP-026: Map索引测试"""
+
+    @pytest.mark.parametrize('compact', [False, True])
+    def test_index_follows_edits(self, random_map_config, compact):
+        """增删、改名、重新分类与排序后查询结果与线性扫描一致"""
+        config = random_map_config(30, aliases=ALIASES)
+        if compact:
+            config = compact_configuration(config)
+        assert isinstance(config.map_points, MapPointList)
+        _assert_matches_scan(config)
+        assert config.find_map_point_by_alias('Indoor_0') is config.map_points[0], "重复别名取最靠前者"
+
+        points = config.map_points
+        points[5].alias_name = 'Renamed'
+        points[6].scene_type = SceneType.NIGHT
+        points[7].map_type = MapType.REDUCE
+        points.insert(0, copy.deepcopy(points[10]))
+        points.append(copy.deepcopy(points[2]))
+        del points[3]
+        points[4] = copy.deepcopy(points[20])
+        points.pop()
+        _assert_matches_scan(config)
+        assert config.find_map_point_by_alias(points[10].alias_name) is points[0]
+
+        rng = random.Random(3)
+        rng.shuffle(points)
+        _assert_matches_scan(config)
+        points.sort(key=lambda point: point.x)
+        points[2:4] = [copy.deepcopy(points[0])]
+        _assert_matches_scan(config)
+
+        config.map_points = list(reversed(points))
+        assert isinstance(config.map_points, MapPointList)
+        _assert_matches_scan(config)
+        config.map_points.clear()
+        assert config.find_map_point_by_alias('Renamed') is None
+
+    def test_per_index_changes_and_copies(self, random_map_config):
+        """键变化只通知包含该点的索引（共享Map点的两个配置都更新），索引不持有已移除的点，
+        深拷贝与序列化后的配置使用独立索引"""
+        config = random_map_config(30, aliases=ALIASES)
+        assert config.find_map_point_by_alias('Map_3') is config.map_points[3]
+        other = random_map_config(30, aliases=ALIASES)
+        other.find_map_point_by_alias('Map_0')
+        for i in range(2000):
+            other.map_points[i % 30].alias_name = f'Flood_{i}'
+        assert not config.map_points.get_index()._changed
+        config.map_points[3].alias_name = 'Changed'
+        _assert_matches_scan(config)
+        _assert_matches_scan(other)
+        assert config.find_map_point_by_alias('Changed') is config.map_points[3]
+
+        shared = MapConfiguration('shared', BaseBoundary(0.5, 0.5), config.map_points[:5])
+        assert shared.find_map_point_by_alias('Changed') is config.map_points[3]
+        config.map_points[3].alias_name = 'Shared'
+        assert shared.find_map_point_by_alias('Shared') is config.map_points[3]
+        assert config.find_map_point_by_alias('Shared') is config.map_points[3]
+
+        removed = shared.map_points.pop()
+        removed_ref = weakref.ref(removed)
+        config.map_points.remove(removed)
+        del removed
+        gc.collect()
+        assert removed_ref() is None
+        del shared
+        gc.collect()
+        assert len(getattr(config.map_points[3], INDEXES_ATTRIBUTE)) == 1
+        config.map_points[3].alias_name = 'Changed'
+
+        for clone in (copy.deepcopy(config), pickle.loads(pickle.dumps(config))):
+            assert isinstance(clone.map_points, MapPointList)
+            clone.map_points[3].alias_name = 'CloneOnly'
+            _assert_matches_scan(clone)
+            assert config.find_map_point_by_alias('CloneOnly') is None
+            assert config.find_map_point_by_alias('Changed') is config.map_points[3]
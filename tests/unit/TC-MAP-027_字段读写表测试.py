@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-027: 字段读写表测试
+==liuq debug== 验证预编译字段读写函数与批量取值get_fields
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 验证get_fields与逐个get_map_point_field_value结果一致（含数值数组），
+      范围字段在空范围时的默认值、ctemp整型转换、ml映射、不支持设置的字段返回False等行为保持不变
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from core.models.compact_map_point import CompactMapPoint
+from core.models.map_data import (XML_FIELD_CONFIG, MapPoint, get_field_getter, get_fields,
+                                  get_map_point_field_value, set_map_point_field_value)
+
+logger = logging.getLogger(__name__)
+
+
+def _make_point(index: int = 0, **overrides) -> MapPoint:
+    kwargs = dict(alias_name=f'Map_{index}', x=0.1 * index, y=0.2, offset_x=0.3, offset_y=0.4, weight=1.0,
+                  bv_range=(10.0 + index, 90.0), ir_range=(1.0, 500.0), cct_range=(2000.0, 8000.0),
+                  ctemp_range=(2500, 7000), tran_bv_min=5.0 + index)
+    kwargs.update(overrides)
+    point = MapPoint(**kwargs)
+    point.extra_attributes['ml'] = 65471
+    return point
+
+
+class TestTC_MAP_027_字段读写表测试:
+    """TC-MAP-027: 字段读写表测试"""
+
+    def test_get_fields_matches_single_reads(self):
+        """get_fields与逐个读取一致，object数组保留原值类型，float数组可直接计算"""
+        points = [_make_point(i) for i in range(12)]
+        points.append(CompactMapPoint.from_map_point(_make_point(12)))
+        field_names = list(XML_FIELD_CONFIG) + ['alias_name', 'bv_range', 'temperature_span_names']
+
+        values = get_fields(points, field_names)
+        assert values.shape == (len(points), len(field_names))
+        for row, point in enumerate(points):
+            for column, field_name in enumerate(field_names):
+                expected = get_map_point_field_value(point, field_name)
+                assert values[row, column] == expected and type(values[row, column]) is type(expected)
+
+        numeric = get_fields(points, ['bv_min', 'ctemp_max', 'tran_bv_min', 'ml'], dtype=float)
+        assert numeric.dtype == np.float64
+        np.testing.assert_array_equal(numeric[:, 0], [p.bv_range[0] for p in points])
+        assert get_fields([], ['bv_min']).shape == (0, 1)
+        assert get_field_getter('bv_min') is get_field_getter('bv_min')
+
+    def test_setter_behaviour(self):
+        """设置函数的类型转换与空范围默认值保持原有行为"""
+        point = _make_point(ir_range=(), ctemp_range=())
+        assert get_map_point_field_value(point, 'ir_max') == 999.0
+        assert set_map_point_field_value(point, 'ir_max', '12.5') and point.ir_range == (0.0, 12.5)
+        assert set_map_point_field_value(point, 'ctemp_min', 'bad') and point.ctemp_range == (1500, 12000)
+        assert set_map_point_field_value(point, 'ctemp_max', '6500.7') and point.ctemp_range == (1500, 6500)
+        assert set_map_point_field_value(point, 'bv_min', 3) and point.bv_range == (3.0, 90.0)
+        assert set_map_point_field_value(point, 'offset_x', '0.75') and point.offset_x == 0.75
+        assert set_map_point_field_value(point, 'ml', '3') and point.extra_attributes['ml'] == 65535
+        assert not set_map_point_field_value(point, 'ac_min', 1.0), "ac范围字段不支持设置"
+        assert not set_map_point_field_value(point, 'not_a_field', 1.0)
+        assert point.get_dirty_fields() >= {'ir_range', 'ctemp_range', 'bv_range', 'offset_x', 'ml'}
+
+    @pytest.mark.parametrize('field_name', ['bv_max', 'tran_ctemp_min', 'weight'])
+    def test_compact_point_setters(self, field_name):
+        """紧凑Map点经同一设置函数写入后读取一致"""
+        point, compact = _make_point(), CompactMapPoint.from_map_point(_make_point())
+        for target in (point, compact):
+            assert set_map_point_field_value(target, field_name, '42')
+        assert get_map_point_field_value(compact, field_name) == get_map_point_field_value(point, field_name)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-028: Map空间索引测试
+==liuq debug== 验证MapSpatialIndex点/矩形/多边形查询与逐个几何判断一致
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.1.0
+描述: 随机多边形与单点Map上，索引查询结果与暴力遍历一致；修改顶点、偏移后只重新登记变化的Map点，
+      增删Map点时整体重建；单点坐标可按base_boundary + offset计算；随机配置使用conftest中的random_map_config
+"""
+
+import logging
+import random
+
+import pytest
+
+from core.models.map_spatial_index import MapSpatialIndex, point_in_polygon, polygons_overlap
+
+logger = logging.getLogger(__name__)
+
+# 随机Map点的坐标范围（覆盖色温段图的RpG/BpG区域）
+SPATIAL_AREA = (2.5, 1.7)
+
+
+def _brute_force_point(config, x, y, tolerance):
+    hits = []
+    for row, point in enumerate(config.map_points):
+        if point.is_polygon and point.polygon_vertices:
+            if point_in_polygon(x, y, point.polygon_vertices):
+                hits.append(row)
+        elif (point.x - x) ** 2 + (point.y - y) ** 2 <= tolerance ** 2:
+            hits.append(row)
+    return hits
+
+
+def _brute_force_polygon(config, vertices):
+    hits = []
+    for row, point in enumerate(config.map_points):
+        if point.is_polygon and point.polygon_vertices:
+            if polygons_overlap(point.polygon_vertices, vertices):
+                hits.append(row)
+        elif point_in_polygon(point.x, point.y, vertices):
+            hits.append(row)
+    return hits
+
+
+class TestTC_MAP_028_Map空间索引测试:
+    """TC-MAP-028: Map空间索引测试"""
+
+    def test_queries_match_brute_force(self, random_map_config):
+        """点、矩形与多边形查询结果与逐个判断一致"""
+        config = random_map_config(120, seed=5, area=SPATIAL_AREA)
+        index = config.get_spatial_index()
+        rng = random.Random(11)
+        for _ in range(200):
+            x, y = rng.uniform(-0.2, 2.7), rng.uniform(-0.2, 1.9)
+            assert index.query_point(x, y, 0.05) == _brute_force_point(config, x, y, 0.05)
+
+            x0, y0 = rng.uniform(0.0, 2.3), rng.uniform(0.0, 1.5)
+            x1, y1 = x0 + rng.uniform(0.0, 0.5), y0 + rng.uniform(0.0, 0.5)
+            rect = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+            assert index.query_rect(x0, y0, x1, y1) == _brute_force_polygon(config, rect)
+
+            triangle = [(rng.uniform(0, 2.5), rng.uniform(0, 1.7)) for _ in range(3)]
+            assert index.query_polygon(triangle) == _brute_force_polygon(config, triangle)
+
+        single = next(row for row, p in enumerate(config.map_points) if not p.is_polygon)
+        point = config.map_points[single]
+        assert index.nearest_point(point.x + 0.001, point.y, 0.05) == single
+
+    def test_incremental_updates(self, random_map_config):
+        """修改顶点/坐标后只重新登记变化的Map点，增删时整体重建"""
+        config = random_map_config(120, seed=5, area=SPATIAL_AREA)
+        index = config.get_spatial_index()
+        assert index.sync(config.map_points) == 0
+
+        moved = next(row for row, p in enumerate(config.map_points) if p.is_polygon)
+        config.map_points[moved].polygon_vertices = [(5.0, 5.0), (5.2, 5.0), (5.1, 5.3)]
+        single = next(row for row, p in enumerate(config.map_points) if not p.is_polygon)
+        config.map_points[single].x = 7.0
+        config.map_points[single].y = 7.0
+        assert index.sync(config.map_points) == 2
+        assert config.get_spatial_index() is index
+        assert index.query_point(5.1, 5.1) == [moved]
+        assert index.query_point(7.0, 7.0, 0.01) == [single]
+        assert moved not in index.query_rect(0.0, 0.0, 2.5, 1.7)
+
+        del config.map_points[0]
+        rebuilt = config.get_spatial_index()
+        assert len(rebuilt) == len(config.map_points)
+        assert rebuilt.query_point(5.1, 5.1) == [moved - 1]
+
+    @pytest.mark.parametrize('cell_size', [None, 0.01, 10.0])
+    def test_base_boundary_origin(self, random_map_config, cell_size):
+        """给定原点时单点坐标为原点 + offset，结果与单元边长无关"""
+        config = random_map_config(40, seed=5, area=SPATIAL_AREA)
+        index = MapSpatialIndex(config.map_points, origin=(0.5, 0.5), cell_size=cell_size)
+        for row, point in enumerate(config.map_points):
+            if not point.is_polygon:
+                assert row in index.query_point(0.5 + point.offset_x, 0.5 + point.offset_y, 1e-9)
+        assert config.get_spatial_index(use_base_boundary=True).query_point(0.0, 0.0, 3.0) == \
+            index.query_point(0.0, 0.0, 3.0)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-029: Map触发模拟测试
+==liuq debug== 验证MapTriggerSimulator向量化结果与逐样本逐Map计算一致
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.2.0
+描述: 随机样本与Map上，触发矩阵、tran过渡因子、多边形包含与检测标志与逐个标量计算一致；
+      主范围结果与MapPoint.is_in_range一致；可直接读取EXIF CSV并对比两份配置的触发差异；
+      随机配置使用conftest中的random_map_config；默认条件列均为EXIF导出中的实际列
+"""
+
+import csv
+import logging
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.models.map_spatial_index import point_in_polygon
+from core.services.map_analysis.map_trigger_simulator import (CONDITION_DIMENSIONS, DEFAULT_CONDITION_COLUMNS,
+                                                              MapTriggerSimulator, conditions_from_table)
+
+logger = logging.getLogger(__name__)
+
+CSV_PATH = Path(__file__).parent.parent / 'test_data' / 'ceshiji.csv'
+
+
+def _scalar_factor(value, low, high, tran_low, tran_high):
+    if low <= value <= high:
+        return 1.0
+    if tran_low is not None and tran_low < low and tran_low <= value < low:
+        return (value - tran_low) / (low - tran_low)
+    if tran_high is not None and tran_high > high and high < value <= tran_high:
+        return (tran_high - value) / (tran_high - high)
+    return 0.0
+
+
+def _reference_weight(point, sample):
+    factor = 1.0
+    for dimension, tran_prefix in CONDITION_DIMENSIONS.items():
+        if dimension not in sample:
+            continue
+        low, high = getattr(point, f'{dimension}_range')
+        tran_low = getattr(point, f'tran_{tran_prefix}_min') if tran_prefix else None
+        tran_high = getattr(point, f'tran_{tran_prefix}_max') if tran_prefix else None
+        factor *= _scalar_factor(sample[dimension], low, high, tran_low, tran_high)
+    if point.is_polygon and not point_in_polygon(sample['rpg'], sample['bpg'], point.polygon_vertices):
+        factor = 0.0
+    if point.detect_flag and not sample['detect']:
+        factor = 0.0
+    return factor * point.weight
+
+
+class TestTC_MAP_029_Map触发模拟测试:
+    """TC-MAP-029: Map触发模拟测试"""
+
+    def test_matches_scalar_reference(self, random_map_config):
+        """权重矩阵与逐样本逐Map的标量计算一致"""
+        config = random_map_config(24, seed=2)
+        rng = np.random.RandomState(7)
+        count = 500
+        conditions = {
+            'bv': rng.uniform(-1000, 10000, count), 'ir': rng.uniform(0, 450, count),
+            'cct': rng.uniform(500, 9500, count), 'ctemp': rng.uniform(1500, 7500, count),
+            'rpg': rng.uniform(0.2, 0.9, count), 'bpg': rng.uniform(0.2, 0.9, count),
+            'detect': rng.randint(0, 2, count),
+        }
+        result = MapTriggerSimulator(config).simulate(conditions)
+        assert result.weights.shape == (count, len(config.map_points))
+
+        for sample_index in range(0, count, 7):
+            sample = {name: values[sample_index] for name, values in conditions.items()}
+            for column, point in enumerate(config.map_points):
+                expected = _reference_weight(point, sample)
+                assert result.weights[sample_index, column] == pytest.approx(expected)
+                assert result.hits[sample_index, column] == (result.factors[sample_index, column] > 0)
+                if not point.is_polygon and not point.detect_flag:
+                    in_range = point.is_in_range(sample['bv'], sample['ir'], sample['cct'])
+                    assert result.core_hits[sample_index, column] == (
+                        in_range and point.ctemp_range[0] <= sample['ctemp'] <= point.ctemp_range[1])
+
+        counts = result.hit_counts()
+        assert sum(counts.values()) == int(result.hits.sum())
+        assert result.maps_for_sample(0) == [config.map_points[c].alias_name for c in np.flatnonzero(result.hits[0])]
+
+    def test_missing_values_and_config_comparison(self, random_map_config):
+        """缺失条件不参与判断，两份配置按别名对比触发差异"""
+        config = random_map_config(24, seed=2)
+        simulator = MapTriggerSimulator(config)
+        result = simulator.simulate({'bv': [np.nan, 100.0], 'ir': ['', '10']})
+        assert result.hits.shape == (2, len(config.map_points))
+        assert result.factors[0].tolist() == [1.0] * len(config.map_points), "全部为空值的样本不受限制"
+
+        conditions = {'bv': np.linspace(0, 9000, 50), 'ctemp': np.linspace(2000, 7000, 50)}
+        before = simulator.simulate(conditions)
+        config.map_points[1].bv_range = (-1e9, 1e9)
+        config.map_points[1].tran_bv_min = 0.0
+        config.map_points[1].ctemp_range = (0, 100000)
+        after = simulator.simulate(conditions)
+        assert after.hits[:, 1].all()
+        differences = after.compare(before)
+        assert all(diff['only_other'] == [] for diff in differences)
+        assert [diff['only_self'] == ['Map_1'] for diff in differences] == (~before.hits[:, 1]).tolist()
+        with pytest.raises(ValueError):
+            simulator.simulate({'bv': [1.0, 2.0], 'ir': [1.0]})
+
+    @pytest.mark.skipif(not CSV_PATH.exists(), reason="缺少EXIF CSV测试数据")
+    def test_exif_csv_rows(self, random_map_config):
+        """EXIF CSV行数据可直接用于模拟"""
+        with open(CSV_PATH, encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+        conditions = conditions_from_table(rows)
+        # 默认列都是EXIF导出中的实际列（该CSV未导出BV）；count等维度没有默认列
+        assert set(conditions) == set(DEFAULT_CONDITION_COLUMNS) - {'bv'}
+        assert len(conditions['ctemp']) == len(rows) and not np.isnan(conditions['e_ratio']).all()
+        columns = dict(DEFAULT_CONDITION_COLUMNS, count='ctemp_weight_Ctemp_count')
+        assert 'count' in conditions_from_table(rows, columns)
+        result = MapTriggerSimulator(random_map_config(24, seed=2)).simulate_table(rows)
+        assert result.sample_count == len(rows)
+        print(f"==liuq debug== CSV模拟: {result.sample_count} 张图片, 触发 {int(result.hits.sum())} 次")
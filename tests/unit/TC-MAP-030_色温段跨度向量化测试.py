@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-030: 色温段跨度向量化测试
+==liuq debug== 验证TemperatureSpanAnalyzer批量裁剪结果与逐个计算一致及增量重算
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.1.0
+描述: 批量Sutherland–Hodgman裁剪与面积结果与_clip_polygon/_polygon_area逐位一致；
+      分析结果与逐个扇形判定一致；修改Map点后只重算变化的Map点，锚点变化时扇形表与全部结果重新计算；
+      随机配置使用conftest中的random_map_config
+"""
+
+import logging
+
+import numpy as np
+
+from core.services.map_analysis.temperature_span_analyzer import (_MIN_INTERSECT_RATIO, TemperatureSpanAnalyzer,
+                                                                  _batch_clip, _batch_signed_areas, _clip_polygon,
+                                                                  _ensure_ccw, _pad_polygons, _polygon_area)
+from utils.white_points import (REFERENCE_INTERVALS, TEMPERATURE_ANCHORS, get_temperature_sector_table,
+                                get_temperature_sector_vertices, is_in_temperature_sector)
+
+logger = logging.getLogger(__name__)
+
+# 随机Map点的坐标范围（覆盖色温段图的RpG/BpG区域）
+SPATIAL_AREA = (2.5, 1.7)
+
+
+def _reference_intervals(point, base_boundary):
+    """逐个扇形判定（重心命中或面积相交>1%）"""
+    if point.is_polygon and point.polygon_vertices:
+        cx, cy = point.x, point.y
+    else:
+        cx, cy = base_boundary.rpg + point.offset_x, base_boundary.bpg + point.offset_y
+    names = []
+    for a, b in REFERENCE_INTERVALS:
+        hit = is_in_temperature_sector(cx, cy, a, b)
+        if not hit and point.is_polygon and point.polygon_vertices:
+            subject = [tuple(v) for v in point.polygon_vertices]
+            clipped = _clip_polygon(subject, list(get_temperature_sector_vertices(a, b)))
+            hit = bool(clipped) and _polygon_area(clipped) / _polygon_area(subject) > _MIN_INTERSECT_RATIO
+        if hit:
+            names.append(f"{a}-{b}")
+    return names
+
+
+class TestTC_MAP_030_色温段跨度向量化测试:
+    """TC-MAP-030: 色温段跨度向量化测试"""
+
+    def test_batch_clip_matches_scalar(self, random_map_config):
+        """批量裁剪的顶点与面积和逐个裁剪逐位一致"""
+        config = random_map_config(150, seed=3, area=SPATIAL_AREA, max_radius=0.6, max_vertices=9)
+        polygons = [np.array(p.polygon_vertices) for p in config.map_points if p.is_polygon]
+        sectors = get_temperature_sector_table()
+        clippers = np.array([_ensure_ccw([tuple(v) for v in tri]) for tri in sectors.vertices.tolist()])
+        subjects, counts = _pad_polygons(polygons)
+        pairs = [(p, k) for p in range(len(polygons)) for k in range(len(clippers))]
+        rows, ks = np.array(pairs).T
+        clipped, clipped_counts = _batch_clip(subjects[rows], counts[rows], clippers[ks])
+        areas = np.abs(_batch_signed_areas(clipped, clipped_counts))
+        for i, (p, k) in enumerate(pairs):
+            expected = _clip_polygon([tuple(v) for v in polygons[p].tolist()], sectors.vertices[k].tolist())
+            assert clipped[i, :clipped_counts[i]].tolist() == [list(v) for v in expected]
+            assert areas[i] == _polygon_area(expected)
+
+    def test_analyze_matches_reference(self, random_map_config):
+        """分析结果与逐个扇形判定一致"""
+        config = random_map_config(150, seed=3, area=SPATIAL_AREA, max_radius=0.6, max_vertices=9)
+        spans = TemperatureSpanAnalyzer(config).analyze()['spans_by_map']
+        assert len(spans) == len(config.map_points)
+        for point in config.map_points:
+            assert spans[point.alias_name]['interval_names'] == _reference_intervals(point, config.base_boundary)
+
+    def test_incremental_and_anchor_change(self, random_map_config):
+        """修改Map点只重算变化的行；锚点变化时扇形表失效并全部重算"""
+        config = random_map_config(150, seed=3, area=SPATIAL_AREA, max_radius=0.6, max_vertices=9)
+        analyzer = TemperatureSpanAnalyzer(config)
+        first = analyzer.analyze()
+        assert analyzer.sync() == 0
+        assert analyzer.analyze() == first
+
+        moved = next(p for p in config.map_points if p.is_polygon)
+        moved.polygon_vertices = [(2.3, 0.05), (2.5, 0.05), (2.4, 0.3)]
+        moved.x, moved.y = 2.4, 0.13
+        config.map_points[0].offset_x = -0.45
+        assert analyzer.sync() == 2
+        result = analyzer.analyze()
+        assert result['spans_by_map'][moved.alias_name]['interval_names'] == ['1500-100K']
+        assert result == TemperatureSpanAnalyzer(config).analyze(incremental=False)
+
+        anchors = dict(TEMPERATURE_ANCHORS, D65=(0.47, 0.72))
+        assert get_temperature_sector_table(anchors) is get_temperature_sector_table(dict(anchors))
+        assert get_temperature_sector_table(anchors) is not get_temperature_sector_table()
+        analyzer.anchors = anchors
+        assert analyzer.sync() == len(config.map_points)
+
+        del anchors['A']
+        table = get_temperature_sector_table(anchors)
+        assert ('F', 'A') not in table.intervals and table.vertices.shape == (len(REFERENCE_INTERVALS) - 2, 3, 2)
+        spans = analyzer.analyze()['spans_by_map']
+        assert all('F-A' not in data['interval_names'] for data in spans.values())
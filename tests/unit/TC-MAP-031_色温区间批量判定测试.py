@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-031: 色温区间批量判定测试
+==liuq debug== 验证white_points批量扇形/轨迹带判定与逐点判定一致
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: points_in_temperature_sectors/points_in_temperature_intervals返回的N×K归属矩阵与
+      is_in_temperature_sector/is_in_temperature_interval逐点结果一致（含锚点、边界上的点）；
+      区间序号取第一个命中的区间，锚点缺失的区间整列为False
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from utils.white_points import (REFERENCE_INTERVALS, TEMPERATURE_ANCHORS, get_temperature_sector_table,
+                                get_temperature_sector_vertices, is_in_temperature_interval, is_in_temperature_sector,
+                                points_in_temperature_intervals, points_in_temperature_sectors,
+                                temperature_interval_index, temperature_sector_index)
+
+logger = logging.getLogger(__name__)
+
+
+def _sample_points(count: int = 3000, seed: int = 4):
+    rng = np.random.RandomState(seed)
+    x = rng.uniform(-0.1, 2.6, count)
+    y = rng.uniform(-0.1, 1.8, count)
+    # 锚点、扇形顶点与NaN
+    extra = list(TEMPERATURE_ANCHORS.values())
+    for a, b in REFERENCE_INTERVALS:
+        extra.extend(get_temperature_sector_vertices(a, b))
+    extra.append((np.nan, 0.5))
+    x = np.concatenate([x, [p[0] for p in extra]])
+    y = np.concatenate([y, [p[1] for p in extra]])
+    return x, y
+
+
+class TestTC_MAP_031_色温区间批量判定测试:
+    """TC-MAP-031: 色温区间批量判定测试"""
+
+    def test_sectors_match_scalar(self):
+        """批量扇形归属与逐点判定一致，区间序号为第一个命中的区间"""
+        x, y = _sample_points()
+        membership = points_in_temperature_sectors(x, y)
+        assert membership.shape == (len(x), len(REFERENCE_INTERVALS))
+        expected = np.array([[is_in_temperature_sector(px, py, a, b) for a, b in REFERENCE_INTERVALS]
+                             for px, py in zip(x, y)])
+        np.testing.assert_array_equal(membership, expected)
+
+        index = temperature_sector_index(x, y)
+        for row in range(len(x)):
+            hits = np.flatnonzero(expected[row])
+            assert index[row] == (hits[0] if len(hits) else -1)
+
+    @pytest.mark.parametrize('band', [None, 0.02])
+    def test_intervals_match_scalar(self, band):
+        """批量轨迹带归属与逐点判定一致"""
+        x, y = _sample_points(1500)
+        membership = points_in_temperature_intervals(x, y, band)
+        expected = np.array([[is_in_temperature_interval(px, py, a, b, band) for a, b in REFERENCE_INTERVALS]
+                             for px, py in zip(x, y)])
+        np.testing.assert_array_equal(membership, expected)
+        assert membership.any()
+        np.testing.assert_array_equal(temperature_interval_index(x, y, band) >= 0, expected.any(axis=1))
+
+    def test_runtime_anchors(self):
+        """传入运行期锚点时几何表按锚点缓存，锚点缺失的区间整列为False"""
+        anchors = dict(TEMPERATURE_ANCHORS)
+        del anchors['F']
+        table = get_temperature_sector_table(anchors)
+        assert table is get_temperature_sector_table(dict(anchors))
+        assert table.columns.tolist() == [k for k, (a, b) in enumerate(REFERENCE_INTERVALS) if 'F' not in (a, b)]
+
+        x, y = _sample_points(500)
+        membership = points_in_temperature_sectors(x, y, anchors)
+        full = points_in_temperature_sectors(x, y)
+        missing = [k for k, (a, b) in enumerate(REFERENCE_INTERVALS) if 'F' in (a, b)]
+        assert not membership[:, missing].any()
+        np.testing.assert_array_equal(np.delete(membership, missing, axis=1), np.delete(full, missing, axis=1))
+        assert not points_in_temperature_intervals(x, y, anchors=anchors)[:, missing].any()
+
+        assert points_in_temperature_sectors([], []).shape == (0, len(REFERENCE_INTERVALS))
+        with pytest.raises(ValueError):
+            points_in_temperature_sectors([0.5, 0.6], [0.5])
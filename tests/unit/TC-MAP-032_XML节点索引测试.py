@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TC-MAP-032: XML节点索引测试
+==liuq debug== 验证XMLNodeIndex单遍分组与解析器/别名映射的节点查找
+
+作者: 龙sir团队
+创建时间: 2026-10-16
+版本: 1.0.0
+描述: 索引分组与root.findall('.//tag')逐个查找结果一致并按编号排序；解析器不再受116个Map的上限限制，
+      仍在第一个不完整的编号处停止；别名映射不再受offset_map299的上限限制，范围内与逐个编号扫描结果一致
+"""
+
+import logging
+from xml.etree import ElementTree as ET
+
+import pytest
+
+from core.services.map_analysis.xml_node_index import XMLNodeIndex, is_indexed_tag
+from core.services.map_analysis.xml_parser_service import XMLParserService
+from core.services.map_analysis.xml_writer_core import XMLWriterCore
+
+logger = logging.getLogger(__name__)
+
+MAP_DATA = """    <offset_map{tag}>
+      <offset><x type="double">0.{n:03d}</x><y type="double">0.42</y></offset>
+      <weight type="double">0.8</weight>
+      <range><bv><min type="double">100</min><max type="double">9000</max></bv></range>
+    </offset_map{tag}>
+"""
+MAP_INFO = """    <offset_map{tag}>{alias}<MapEnabled type="uint">1</MapEnabled></offset_map{tag}>
+"""
+
+
+def _tag(n: int) -> str:
+    return f"{n:02d}"
+
+
+def _build_xml(data_numbers, info_numbers=None, aliases=None) -> str:
+    """生成offset_map双节点结构的XML（data_numbers为第一组节点编号，info_numbers为第二组节点编号）"""
+    info_numbers = data_numbers if info_numbers is None else info_numbers
+    aliases = aliases or {}
+
+    def alias(n):
+        name = aliases.get(n, f"Map{n}")
+        return '' if name is None else f'<AliasName type="string">{name}</AliasName>'
+
+    return ('<?xml version="1.0" encoding="utf-8"?>\n<awb_scenario>\n  <detect_map>\n'
+            '    <base_boundary0><offset><x type="double">0.5</x><y type="double">0.5</y></offset></base_boundary0>\n'
+            + ''.join(MAP_DATA.format(tag=_tag(n), n=n) for n in data_numbers)
+            + '  </detect_map>\n  <map_info>\n'
+            '    <base_boundary0><AliasName type="string">Base</AliasName><RpG type="double">0.52</RpG>'
+            '<BpG type="double">0.48</BpG></base_boundary0>\n'
+            + ''.join(MAP_INFO.format(tag=_tag(n), alias=alias(n)) for n in info_numbers)
+            + '  </map_info>\n</awb_scenario>\n')
+
+
+def _scan_alias_mapping(root, upper: int = 300) -> dict:
+    """索引引入前的别名映射：按编号逐个root.findall扫描offset_map01..offset_map299"""
+    mapping = {}
+    for i in range(1, upper):
+        element_name = f"offset_map{_tag(i)}"
+        for node in root.findall(f'.//{element_name}'):
+            alias_node = node.find('AliasName')
+            if alias_node is not None and alias_node.text and alias_node.text.strip():
+                mapping[alias_node.text.strip()] = element_name
+                break
+    return mapping
+
+
+def _parse(tmp_path, content: str):
+    path = tmp_path / "awb_index.xml"
+    path.write_text(content, encoding='utf-8')
+    return XMLParserService().parse_xml(path)
+
+
+class TestTC_MAP_032_XML节点索引测试:
+    """TC-MAP-032: XML节点索引测试"""
+
+    def test_build_groups_match_findall(self):
+        """每个标签分组与root.findall('.//tag')一致，按编号而非字典序遍历"""
+        content = _build_xml([1, 2, 9, 10, 100]).replace(
+            '</awb_scenario>', '<offset_map_x/><offset_mapA/><nested><offset_map02/></nested></awb_scenario>')
+        root = ET.fromstring(content.encode('utf-8'))
+        index = XMLNodeIndex.build(root)
+
+        tags = {elem.tag for elem in root.iter() if elem is not root and is_indexed_tag(elem.tag)}
+        assert tags == {'base_boundary0', 'offset_map01', 'offset_map02', 'offset_map09',
+                        'offset_map10', 'offset_map100'}
+        for tag in tags:
+            assert index.get_nodes(tag) == root.findall(f'.//{tag}')
+        assert len(index.get_nodes('offset_map02')) == 3
+        assert not index.has_tag('offset_map_x') and index.get_nodes('offset_mapA') == []
+
+        assert [tag for tag, _ in index.iter_offset_maps()] == [
+            'offset_map01', 'offset_map02', 'offset_map09', 'offset_map10', 'offset_map100']
+        assert [tag for tag, _ in index.iter_base_boundaries()] == ['base_boundary0']
+        assert index.offset_map_count == 5
+        assert index.get_offset_map_tag(9) == 'offset_map09'
+        assert index.get_offset_map_tag(3) is None
+
+        # 根元素本身不参与索引，与'.//tag'语义一致
+        assert not XMLNodeIndex.build(ET.fromstring('<offset_map01/>')).has_tag('offset_map01')
+
+    def test_no_fixed_upper_bounds(self, tmp_path):
+        """解析器不受116个Map的上限限制，别名映射不受offset_map299的上限限制"""
+        numbers = list(range(1, 131))
+        config = _parse(tmp_path, _build_xml(numbers))
+        assert [p.alias_name for p in config.map_points] == [f"Map{n}" for n in numbers]
+
+        root = ET.fromstring(_build_xml(list(range(1, 306))).encode('utf-8'))
+        mapping = XMLWriterCore()._build_dynamic_alias_mapping(root)
+        assert len(mapping) == 305
+        assert mapping['Map305'] == 'offset_map305'
+        assert 'Map305' not in _scan_alias_mapping(root)
+
+    @pytest.mark.parametrize('data_numbers, info_numbers, expected', [
+        ([1, 2, 3, 5, 6], None, 3),        # 编号断档
+        ([1, 2, 3, 4], [1, 2, 4], 2),      # offset_map03只有一个节点
+        ([2, 3], None, 0),                 # 缺少offset_map01
+    ])
+    def test_parsing_stops_at_first_gap(self, tmp_path, data_numbers, info_numbers, expected):
+        """从offset_map01开始连续解析，遇到第一个缺失或不完整的编号即停止"""
+        config = _parse(tmp_path, _build_xml(data_numbers, info_numbers))
+        assert [p.alias_name for p in config.map_points] == [f"Map{n}" for n in range(1, expected + 1)]
+
+    def test_alias_mapping_matches_scan(self):
+        """别名映射与逐个编号扫描一致（含缺少别名、空白别名、编号断档与重名）"""
+        aliases = {3: None, 4: '  ', 7: ' Padded ', 12: 'Map11'}
+        root = ET.fromstring(_build_xml([1, 2, 3, 4, 5, 7, 9, 11, 12, 40, 299], aliases=aliases).encode('utf-8'))
+        mapping = XMLWriterCore()._build_dynamic_alias_mapping(root)
+        print(f"==liuq debug== 别名映射: {mapping}")
+        assert mapping == _scan_alias_mapping(root)
+        assert mapping['Padded'] == 'offset_map07' and mapping['Map11'] == 'offset_map12'
+        assert 'Map3' not in mapping and 'Map4' not in mapping
+
+        index = XMLNodeIndex.build(root)
+        assert XMLWriterCore()._build_dynamic_alias_mapping(root, index) == mapping
@@ -14,9 +14,17 @@ Action: Added; Timestamp: 2025-08-02 11:00:00 +08:00; Reason: 重构数值格式
 """
 
 from decimal import Decimal, getcontext, InvalidOperation
-from typing import Any
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
+import math
 import re
 
+# 批量格式化的结果缓存大小（保存方案中同一数值在各Map点间大量重复）
+FORMAT_MEMO_SIZE = 65536
+
+# 整数快速路径的上限（超过Decimal 50位精度时交给原算法处理）
+_FAST_INT_LIMIT = 10 ** 49
+
 
 def format_decimal_precise(value: Any) -> str:
     """
@@ -134,6 +142,77 @@ def _format_decimal_result(decimal_value: Decimal) -> str:
     return result_str
 
 
+def _format_float_fast(value: float) -> Optional[str]:
+    """
+    float快速路径：结果与format_decimal_precise一致时直接返回，否则返回None
+
+    format_decimal_precise对float使用Decimal(str(value))，而str(float)是可精确往返的最短表示：
+    - repr不含指数（1e-4≤绝对值<1e16）时Decimal与float的值完全相同：
+      整数值的float结果为str(int(value))；非整数的repr没有尾随零，normalize后的字符串与repr相同
+    其余情况（nan/inf、科学计数法表示的值）走原算法。
+    """
+    if not math.isfinite(value):
+        return None
+    text = float.__repr__(value)
+    if 'e' in text:
+        return None
+    if value.is_integer():
+        return str(int(value))
+    return text
+
+
+@lru_cache(maxsize=FORMAT_MEMO_SIZE, typed=True)
+def _format_decimal_memo(value: Any) -> str:
+    """按(类型, 值)缓存的format_decimal_precise"""
+    return format_decimal_precise(value)
+
+
+def format_decimal_fast(value: Any) -> str:
+    """
+    format_decimal_precise的快速版本，结果逐字符一致
+
+    float与int先走无Decimal的快速路径，其余值（字符串、科学计数法等）查缓存后走原算法
+
+    Args:
+        value: 要格式化的数值
+
+    Returns:
+        str: 格式化后的字符串
+    """
+    value_type = type(value)
+    if value_type is float or (isinstance(value, float) and value_type.__str__ is float.__str__):
+        result = _format_float_fast(value)
+        if result is not None:
+            return result
+    elif value_type is int and -_FAST_INT_LIMIT < value < _FAST_INT_LIMIT:
+        return str(value)
+
+    try:
+        return _format_decimal_memo(value)
+    except TypeError:
+        # 不可哈希的值不进缓存
+        return format_decimal_precise(value)
+
+
+def format_decimal_batch(values: Iterable[Any]) -> List[str]:
+    """
+    批量格式化一列数值，结果与逐个调用format_decimal_precise一致
+
+    numpy的float64/整数数组先整体转为Python标量；其他dtype（如float32）逐个元素处理，
+    以保持与str(元素)相同的结果
+
+    Args:
+        values: 数值序列或numpy数组
+
+    Returns:
+        List[str]: 格式化后的字符串列表
+    """
+    dtype = getattr(values, 'dtype', None)
+    if dtype is not None and (dtype.kind in 'iu' or (dtype.kind == 'f' and dtype.itemsize == 8)):
+        values = values.tolist()
+    return [format_decimal_fast(value) for value in values]
+
+
 # 为了保持向后兼容性，提供别名函数
 def format_number_precise(value: Any) -> str:
     """
@@ -8,10 +8,12 @@
 
 ==liuq debug== 本文件用于提供白点参考坐标与区间判断工具
 """
-from typing import Dict, Tuple
+from typing import Dict, Mapping, Optional, Sequence, Tuple
 import logging
 import xml.etree.ElementTree as ET
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # 锚点坐标 (RpG, BpG) 用于等色温带绘制；不作为白点标注数据源
@@ -283,9 +285,183 @@ def is_in_temperature_sector(x: float, y: float, a: str, b: str,
         pa_x, pa_y = pa
         pb_x, pb_y = pb
         inside = _point_in_triangle(x, y, cx, cy, pa_x, pa_y, pb_x, pb_y)
-        logger.debug(f"==liuq debug== 扇形判定: P=({x:.6f},{y:.6f}), sector={a}-{b}, corner=({cx:.3f},{cy:.3f}), pa=({pa_x:.3f},{pa_y:.3f}), pb=({pb_x:.3f},{pb_y:.3f}), inside={inside}")
+        logger.debug("==liuq debug== 扇形判定: P=(%.6f,%.6f), sector=%s-%s, corner=(%.3f,%.3f), pa=(%.3f,%.3f), pb=(%.3f,%.3f), inside=%s",
+                     x, y, a, b, cx, cy, pa_x, pa_y, pb_x, pb_y, inside)
         return inside
     except Exception as e:
         logger.warning(f"==liuq debug== is_in_temperature_sector异常: {e}")
         return False
 
+
+class TemperatureSectorTable(NamedTuple):
+    """全部区间的扇形三角形与轨迹线段几何表"""
+    intervals: Tuple[Tuple[str, str], ...]  # 可用区间（锚点缺失的区间被剔除）
+    columns: np.ndarray                     # (K,) 可用区间在输入区间列表中的位置
+    vertices: np.ndarray                    # (K, 3, 2)：每个区间的扇形(Corner, Pa, Pb)
+    segments: np.ndarray                    # (K, 2, 2)：每个区间的轨迹线段(A, B)
+    bands: np.ndarray                       # (K,) 每个区间的经验带宽
+    key: tuple                              # 锚点坐标、带宽、Corner与坐标范围，任一变化即重新计算
+
+
+_SECTOR_TABLE_CACHE: Dict[tuple, TemperatureSectorTable] = {}
+_SECTOR_TABLE_CACHE_SIZE = 16
+
+
+def get_temperature_sector_table(anchors: Optional[Mapping[str, Sequence[float]]] = None,
+                                 intervals: Sequence[Tuple[str, str]] = REFERENCE_INTERVALS,
+                                 corner: Tuple[float, float] = TOP_RIGHT_CORNER,
+                                 bounds: RectBounds = RectBounds(PLOT_X_MIN, PLOT_X_MAX, PLOT_Y_MIN, PLOT_Y_MAX)
+                                 ) -> TemperatureSectorTable:
+    """
+    获取区间几何表（按锚点坐标缓存，锚点未变化时直接复用）
+
+    Args:
+        anchors: 锚点名称 → (RpG, BpG)，None表示使用TEMPERATURE_ANCHORS（如运行期校准后的锚点可直接传入）
+        intervals: 区间列表，默认REFERENCE_INTERVALS
+        corner: 扇形公共顶点
+        bounds: 坐标矩形范围
+
+    Returns:
+        TemperatureSectorTable: 扇形顶点与get_temperature_sector_vertices逐个计算结果一致
+    """
+    anchors = TEMPERATURE_ANCHORS if anchors is None else anchors
+    points = {name: tuple(float(v) for v in anchors[name])
+              for pair in intervals for name in pair if name in anchors}
+    key = (tuple((a, b, points.get(a), points.get(b), _get_band(a, b)) for a, b in intervals),
+           tuple(corner), tuple(bounds))
+    table = _SECTOR_TABLE_CACHE.get(key)
+    if table is not None:
+        return table
+
+    cx, cy = corner
+    available, columns, vertices, segments, bands = [], [], [], [], []
+    for column, (a, b) in enumerate(intervals):
+        if a not in points or b not in points:
+            logger.debug("==liuq debug== 区间几何表跳过锚点缺失的区间: %s-%s", a, b)
+            continue
+        pa = _ray_to_rect_intersection(cx, cy, points[a][0], points[a][1], bounds)
+        pb = _ray_to_rect_intersection(cx, cy, points[b][0], points[b][1], bounds)
+        available.append((a, b))
+        columns.append(column)
+        vertices.append(((cx, cy), pa, pb))
+        segments.append((points[a], points[b]))
+        bands.append(_get_band(a, b))
+    table = TemperatureSectorTable(intervals=tuple(available),
+                                   columns=np.array(columns, dtype=np.intp),
+                                   vertices=np.array(vertices, dtype=np.float64).reshape(-1, 3, 2),
+                                   segments=np.array(segments, dtype=np.float64).reshape(-1, 2, 2),
+                                   bands=np.array(bands, dtype=np.float64),
+                                   key=key)
+    for array in (table.columns, table.vertices, table.segments, table.bands):
+        array.flags.writeable = False
+    if len(_SECTOR_TABLE_CACHE) >= _SECTOR_TABLE_CACHE_SIZE:
+        _SECTOR_TABLE_CACHE.clear()
+    _SECTOR_TABLE_CACHE[key] = table
+    logger.debug("==liuq debug== 区间几何表已重新计算: %d 个区间", len(available))
+    return table
+
+
+# ---------------- 批量判断：N个点 × K个区间 ----------------
+
+def _as_coordinates(x, y) -> Tuple[np.ndarray, np.ndarray]:
+    x = np.asarray(x, dtype=np.float64).reshape(-1)
+    y = np.asarray(y, dtype=np.float64).reshape(-1)
+    if len(x) != len(y):
+        raise ValueError(f"坐标数组长度不一致: {len(x)} != {len(y)}")
+    return x, y
+
+
+def _first_column(membership: np.ndarray) -> np.ndarray:
+    return np.where(membership.any(axis=1), np.argmax(membership, axis=1), -1)
+
+
+def points_in_triangles(x, y, vertices: np.ndarray) -> np.ndarray:
+    """
+    N个点是否在K个三角形内（含边，与_point_in_triangle逐个判定一致）
+
+    Args:
+        x, y: 长度为N的坐标数组
+        vertices: (K, 3, 2) 三角形顶点
+
+    Returns:
+        np.ndarray: (N, K) 布尔数组
+    """
+    x, y = _as_coordinates(x, y)
+    px, py = x[:, None], y[:, None]
+
+    def sign(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return (px - b[:, 0]) * (a[:, 1] - b[:, 1]) - (a[:, 0] - b[:, 0]) * (py - b[:, 1])
+
+    first, second, third = vertices[:, 0], vertices[:, 1], vertices[:, 2]
+    d1, d2, d3 = sign(first, second), sign(second, third), sign(third, first)
+    has_neg = (d1 < 0) | (d2 < 0) | (d3 < 0)
+    has_pos = (d1 > 0) | (d2 > 0) | (d3 > 0)
+    return ~(has_neg & has_pos)
+
+
+def points_in_temperature_sectors(x, y, anchors: Optional[Mapping[str, Sequence[float]]] = None,
+                                  intervals: Sequence[Tuple[str, str]] = REFERENCE_INTERVALS,
+                                  corner: Tuple[float, float] = TOP_RIGHT_CORNER,
+                                  bounds: RectBounds = RectBounds(PLOT_X_MIN, PLOT_X_MAX, PLOT_Y_MIN, PLOT_Y_MAX)
+                                  ) -> np.ndarray:
+    """
+    is_in_temperature_sector的批量版本：N个点 × 全部区间的扇形归属
+
+    Returns:
+        np.ndarray: (N, len(intervals)) 布尔数组，列顺序与intervals一致；锚点缺失的区间整列为False
+    """
+    x, y = _as_coordinates(x, y)
+    table = get_temperature_sector_table(anchors, intervals, corner, bounds)
+    membership = np.zeros((len(x), len(intervals)), dtype=bool)
+    membership[:, table.columns] = points_in_triangles(x, y, table.vertices)
+    logger.debug("==liuq debug== 批量扇形判定: %d 个点 × %d 个区间", len(x), len(intervals))
+    return membership
+
+
+def points_in_temperature_intervals(x, y, band: float = None,
+                                    anchors: Optional[Mapping[str, Sequence[float]]] = None,
+                                    intervals: Sequence[Tuple[str, str]] = REFERENCE_INTERVALS) -> np.ndarray:
+    """
+    is_in_temperature_interval的批量版本：N个点 × 全部区间的轨迹带归属
+
+    Args:
+        band: 统一带宽，None表示使用各区间的经验带宽
+
+    Returns:
+        np.ndarray: (N, len(intervals)) 布尔数组，列顺序与intervals一致；锚点缺失的区间整列为False
+    """
+    x, y = _as_coordinates(x, y)
+    table = get_temperature_sector_table(anchors, intervals)
+    px, py = x[:, None], y[:, None]
+    ax, ay = table.segments[:, 0, 0], table.segments[:, 0, 1]
+    vx, vy = table.segments[:, 1, 0] - ax, table.segments[:, 1, 1] - ay
+    wx, wy = px - ax, py - ay
+    denom = vx * vx + vy * vy
+    degenerate = denom == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(degenerate, 0.0, (wx * vx + wy * vy) / denom)
+    dx = px - np.where(degenerate, ax, ax + t * vx)
+    dy = py - np.where(degenerate, ay, ay + t * vy)
+    tolerance = table.bands if band is None else band
+    inside = ~((t < 0.0) | (t > 1.0)) & (np.sqrt(dx * dx + dy * dy) <= tolerance)
+
+    membership = np.zeros((len(x), len(intervals)), dtype=bool)
+    membership[:, table.columns] = inside
+    logger.debug("==liuq debug== 批量轨迹带判定: %d 个点 × %d 个区间", len(x), len(intervals))
+    return membership
+
+
+def temperature_sector_index(x, y, anchors: Optional[Mapping[str, Sequence[float]]] = None,
+                             intervals: Sequence[Tuple[str, str]] = REFERENCE_INTERVALS,
+                             corner: Tuple[float, float] = TOP_RIGHT_CORNER,
+                             bounds: RectBounds = RectBounds(PLOT_X_MIN, PLOT_X_MAX, PLOT_Y_MIN, PLOT_Y_MAX)
+                             ) -> np.ndarray:
+    """每个点所在扇形的区间序号（落在公共边上时取intervals中靠前的区间），不在任何扇形内为-1"""
+    return _first_column(points_in_temperature_sectors(x, y, anchors, intervals, corner, bounds))
+
+
+def temperature_interval_index(x, y, band: float = None,
+                               anchors: Optional[Mapping[str, Sequence[float]]] = None,
+                               intervals: Sequence[Tuple[str, str]] = REFERENCE_INTERVALS) -> np.ndarray:
+    """每个点所在轨迹带的区间序号（同时落在多个带内时取intervals中靠前的区间），不在任何带内为-1"""
+    return _first_column(points_in_temperature_intervals(x, y, band, anchors, intervals))